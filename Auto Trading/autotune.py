@@ -9,13 +9,102 @@ import random
 from datetime import datetime, timedelta
 import itertools
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 # Modules
+import backtester as backtester_module
 from backtester import Backtester
 
 from strategy import Strategy
 
+DISQUALIFIED_SCORE = -999.0
+FULL_RUN = -1 # Task index of the full-period (artifact) run
+
+
+def _analyze_panel(raw_dfs, params):
+    """Re-run signal analysis for one parameter set (stable coins skipped)."""
+    strat = Strategy()
+    symbol_dfs = {}
+    for s, df in raw_dfs.items():
+        if df.empty: continue
+        if "USDT" in s or "USDC" in s: continue
+        symbol_dfs[s] = strat.analyze(df, params=params)
+    return symbol_dfs
+
+
+def _summarize_fold(res):
+    """Reduce a run_portfolio result to the fold metrics used for scoring."""
+    dd = 0.0
+    # Calculate Max DD from trade list (Approximation)
+    if res['trade_list']:
+        df_t = pd.DataFrame(res['trade_list'])
+        if 'max_dd' in df_t.columns:
+            dd = df_t['max_dd'].min() # Max DD is usually negative
+    return {
+        'return': res['total_return'],
+        'trades': res['trades'],
+        'win_rate': res['win_rate'],
+        'max_dd': dd,
+    }
+
+
+def _summarize_full(res):
+    """Keep only what the trial artifacts need (avoids pickling daily_debug back)."""
+    return {
+        'total_return': res['total_return'],
+        'trades': res['trades'],
+        'win_rate': res['win_rate'],
+        'trade_list': res['trade_list'],
+        'event_list': res['event_list'],
+    }
+
+
+def _run_trial(raw_dfs, params, runs, min_trades, abort_on_fail):
+    """
+    Yields (f_idx, result) for one trial's runs [(f_idx, start_dt, end_dt), ...] after a
+    single analyze pass. Once a fold misses min_trades[f_idx] (abort_on_fail) the remaining
+    folds yield None; the full run always executes.
+    """
+    symbol_dfs = _analyze_panel(raw_dfs, params)
+    bt = Backtester()
+    aborted = False
+    for f_idx, start_dt, end_dt in runs:
+        if aborted and f_idx != FULL_RUN:
+            yield f_idx, None
+            continue
+        res = bt.run_portfolio(symbol_dfs, params, start_date=start_dt, end_date=end_dt, verbose=False)
+        if f_idx == FULL_RUN:
+            yield f_idx, _summarize_full(res)
+            continue
+        out = _summarize_fold(res)
+        if abort_on_fail and out['trades'] < min_trades[f_idx]:
+            aborted = True
+        yield f_idx, out
+
+
+# --- Process Pool Workers ---
+# The raw panel is shipped once per worker via the pool initializer and treated as read-only.
+# A whole trial is one task, so its folds and full run share one analyze pass on one worker.
+_WORKER_PANEL = {}
+
+
+def _init_fold_worker(raw_dfs):
+    global _WORKER_PANEL
+    _WORKER_PANEL = raw_dfs
+    # Per-run tqdm bars from N workers would interleave on the parent console.
+    backtester_module.tqdm = None
+
+
+def _run_trial_task(params, runs, min_trades, abort_on_fail):
+    return list(_run_trial(_WORKER_PANEL, params, runs, min_trades, abort_on_fail))
+
+
+def default_fold_workers():
+    # Each worker holds a copy of the panel; leave one core for the UI/main process.
+    return max(1, min(5, (os.cpu_count() or 1) - 1))
+
 class AutoTuner:
     def __init__(self, raw_dfs, base_params, output_dir="autotune_runs"):
         self.raw_dfs = raw_dfs # Changed from symbol_dfs
@@ -136,156 +225,179 @@ class AutoTuner:
         score = ret * stability * sample_bonus
         return score
 
-    def run_process(self, group, num_trials=20, seed=42, callback=None):
+    def _score_fold(self, f_idx, start_dt, end_dt, fm):
+        # Dynamic Min Trades
+        min_req = self.calculate_min_trades(start_dt, end_dt)
+        if fm['trades'] < min_req:
+            score = DISQUALIFIED_SCORE # Disqualify
+        else:
+            score = self.calculate_score(fm['return'], fm['max_dd'], fm['trades'], fm['win_rate'])
+        return {
+            'fold': f_idx,
+            'return': fm['return'],
+            'trades': fm['trades'],
+            'win_rate': fm['win_rate'],
+            'max_dd': fm['max_dd'],
+            'score': score,
+            'min_req': min_req
+        }
+
+    @staticmethod
+    def _group_trials(tasks):
+        """Task stream -> [(t_idx, params, [(f_idx, start_dt, end_dt), ...]), ...] in trial order."""
+        trials = {}
+        for t_idx, f_idx, params, start_dt, end_dt in tasks:
+            trials.setdefault(t_idx, (params, []))[1].append((f_idx, start_dt, end_dt))
+        return [(t_idx, params, runs) for t_idx, (params, runs) in trials.items()]
+
+    def _iter_sequential(self, tasks, abort_on_fail, min_trades):
+        """In-process fallback: the same per-trial runs as the pool, in trial order."""
+        for t_idx, params, runs in self._group_trials(tasks):
+            for f_idx, out in _run_trial(self.raw_dfs, params, runs, min_trades, abort_on_fail):
+                yield t_idx, f_idx, out
+
+    def _iter_parallel(self, tasks, n_workers, abort_on_fail, min_trades):
+        """One task per trial (analyze once, folds in order, abort inside the worker); stream as trials finish."""
+        trials = self._group_trials(tasks)
+        n_workers = max(1, min(n_workers, len(trials)))
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_fold_worker, initargs=(self.raw_dfs,)) as pool:
+            futures = {
+                pool.submit(_run_trial_task, params, runs, min_trades, abort_on_fail): t_idx
+                for t_idx, params, runs in trials
+            }
+            for fut in as_completed(futures):
+                t_idx = futures[fut]
+                for f_idx, out in fut.result():
+                    yield t_idx, f_idx, out
+
+    def run_process(self, group, num_trials=20, seed=42, callback=None, n_workers=None, abort_on_fail=True):
         """
         Main AutoTune Process
         1. Generate Trials
-        2. Walk-Forward Eval (4 Folds)
+        2. Walk-Forward Eval (4 Folds + 1 Full run per trial; one pool task per trial)
         3. Save Results
+
+        n_workers: pool size (None = auto, 1 = in-process sequential).
+        abort_on_fail: once a fold misses its min-trades constraint, the trial's remaining
+                       folds are skipped and the trial is disqualified.
         """
         run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{group}_N{num_trials}"
         run_dir = os.path.join(self.output_dir, run_id)
         os.makedirs(run_dir)
-        
+
+        if n_workers is None:
+            n_workers = default_fold_workers()
+        n_workers = max(1, int(n_workers))
+
         # Save Config
         config = {
             'group': group,
             'num_trials': num_trials,
             'seed': seed,
+            'n_workers': n_workers,
+            'abort_on_fail': bool(abort_on_fail),
             'base_params': self.base_params
         }
         with open(os.path.join(run_dir, "run_config.json"), "w") as f:
             json.dump(config, f, indent=4, default=str)
-            
+
         # 1. Generate Trials
         trial_params_list = self.generate_trials(group, num_trials, seed)
-        
+
         # 2. Prepare Folds
         if not self.dates:
             return None
-            
+
         # Split dates into 4 chunks
         # Simple count-based split
         total_days = len(self.dates)
         chunk_size = total_days // 4
-        
+
         folds = []
         for i in range(4):
             start_i = i * chunk_size
             end_i = (i + 1) * chunk_size if i < 3 else total_days
             folds.append((self.dates[start_i], self.dates[end_i-1]))
-            
-        # 3. Execution Loop
-        results = []
-        bt = Backtester()
-        
-        total_steps = len(trial_params_list) * 4
-        current_step = 0
-        
-        print(f"[AutoTune] Starting Run {run_id} with {len(trial_params_list)} trials over 4 folds.")
-        
-        strat = Strategy()
-        
+
+        # 3. Execution (task stream: 4 folds + 1 full run per trial)
+        tasks = []
         for t_idx, params in enumerate(trial_params_list):
-            trial_id = f"trial_{t_idx:04d}"
-            trial_dir = os.path.join(run_dir, trial_id)
-            os.makedirs(trial_dir)
-            
-            # --- Re-Analyze Signals (CRITICAL for Parameter Tuning) ---
-            # Some params (vol, rsi thresholds) change signals.
-            # We must re-run analyze on raw data.
-            current_symbol_dfs = {}
-            for s, df in self.raw_dfs.items():
-                if df.empty: continue
-                # Skip stable coins if needed (usually done in app level, but safeguard here)
-                if "USDT" in s or "USDC" in s: continue
-                
-                # Analyze
-                current_symbol_dfs[s] = strat.analyze(df, params=params)
-            
-            fold_scores = []
-            fold_metrics = [] # To store details
-            
-            # --- Walk Forward (4 Folds) ---
+            os.makedirs(os.path.join(run_dir, f"trial_{t_idx:04d}"))
             for f_idx, (start_dt, end_dt) in enumerate(folds):
-                # Run Backtest
-                res = bt.run_portfolio(current_symbol_dfs, params, start_date=start_dt, end_date=end_dt, verbose=False)
-                
-                # Metric Extraction
-                ret = res['total_return']
-                dd = 0.0
-                trades_count = res['trades']
-                win_rate = res['win_rate']
-                
-                # Calculate Max DD from trade list (Approximation)
-                if res['trade_list']:
-                    df_t = pd.DataFrame(res['trade_list'])
-                    if 'max_dd' in df_t.columns:
-                        dd = df_t['max_dd'].min() # Max DD is usually negative
-                
-                # Dynamic Min Trades
-                min_req = self.calculate_min_trades(start_dt, end_dt)
-                
-                if trades_count < min_req:
-                    score = -999.0 # Disqualify
+                tasks.append((t_idx, f_idx, params, start_dt, end_dt))
+            tasks.append((t_idx, FULL_RUN, params, None, None))
+
+        total_steps = len(tasks)
+        current_step = 0
+
+        print(f"[AutoTune] Starting Run {run_id} with {len(trial_params_list)} trials over 4 folds ({n_workers} workers).")
+
+        fold_metrics = {t_idx: {} for t_idx in range(len(trial_params_list))}
+        full_results = {}
+        failed_trials = set()
+
+        # Computed here: workers only get plain values, not this tuner.
+        min_trades = {f_idx: self.calculate_min_trades(start_dt, end_dt) for f_idx, (start_dt, end_dt) in enumerate(folds)}
+
+        if n_workers > 1:
+            stream = self._iter_parallel(tasks, n_workers, abort_on_fail, min_trades)
+        else:
+            stream = self._iter_sequential(tasks, abort_on_fail, min_trades)
+
+        try:
+            for t_idx, f_idx, out in stream:
+                if f_idx == FULL_RUN:
+                    full_results[t_idx] = out
+                    label = "Full"
+                elif out is None:
+                    fold_metrics[t_idx][f_idx] = {'fold': f_idx, 'skipped': True, 'score': DISQUALIFIED_SCORE}
+                    label = f"Fold {f_idx+1} skipped"
                 else:
-                    score = self.calculate_score(ret, dd, trades_count, win_rate)
-                
-                fold_scores.append(score)
-                fold_metrics.append({
-                    'fold': f_idx,
-                    'return': ret,
-                    'trades': trades_count,
-                    'win_rate': win_rate,
-                    'max_dd': dd,
-                    'score': score, 
-                    'min_req': min_req
-                })
-                
+                    start_dt, end_dt = folds[f_idx]
+                    fm = self._score_fold(f_idx, start_dt, end_dt, out)
+                    if fm['score'] == DISQUALIFIED_SCORE:
+                        failed_trials.add(t_idx)
+                    fold_metrics[t_idx][f_idx] = fm
+                    label = f"Fold {f_idx+1}"
+
                 # Feedback
                 current_step += 1
                 if callback:
                     prog = current_step / total_steps
-                    callback(prog, f"Trial {t_idx+1}/{len(trial_params_list)} (Fold {f_idx+1})")
-            
+                    callback(prog, f"Trial {t_idx+1}/{len(trial_params_list)} ({label})")
+        except BrokenProcessPool as e:
+            raise RuntimeError(f"AutoTune worker pool crashed: {e}")
+
+        # 4. Aggregate + Artifacts (trial order, independent of completion order)
+        results = []
+        for t_idx, params in enumerate(trial_params_list):
+            trial_id = f"trial_{t_idx:04d}"
+            trial_dir = os.path.join(run_dir, trial_id)
+            metrics = [fold_metrics[t_idx][f_idx] for f_idx in sorted(fold_metrics[t_idx])]
+            fold_scores = [m['score'] for m in metrics]
+
             # --- Aggregate Score ---
             # Spec: score_final = 0.7*mean(score_fold) + 0.3*min(score_fold)
-            final_score = 0.7 * np.mean(fold_scores) + 0.3 * np.min(fold_scores)
-            
-            # SSOT: Run ONE Full Backtest for the artifacts?
-            # Or merge fold results? Merging is hard with state. 
-            # Ideally, we verify the "Best" by running Full Backtest.
-            # But we need to save artifacts for EVERY trial?
-            # "trial_0000/ ... SSOT 산출물 4종"
-            # It seems we should run full backtest once per trial to generate artifacts.
-            # Running 4 folds AND 1 Full = 5 runs per trial.
-            # If speed is OK.
-            
-            # Running Full for Artifacts
-            full_res = bt.run_portfolio(current_symbol_dfs, params, verbose=False)
-            
+            # With early abort the folds after a failed one never ran, so a trial that
+            # failed any fold is disqualified outright.
+            if abort_on_fail and t_idx in failed_trials:
+                final_score = DISQUALIFIED_SCORE
+            else:
+                final_score = 0.7 * np.mean(fold_scores) + 0.3 * np.min(fold_scores)
+
+            # SSOT: the full-period run supplies per-trial artifacts (final_trades / events).
+            full_res = full_results[t_idx]
+
             # Check constraints (Diagnosis)
             diagnosis = []
             if full_res['trades'] < 10: diagnosis.append("LowTrades")
             if full_res['total_return'] == 0: diagnosis.append("NoReturn")
-            
+            if t_idx in failed_trials: diagnosis.append("FoldConstraintFail")
+
             # Save Artifacts
             pd.DataFrame(full_res['trade_list']).to_csv(os.path.join(trial_dir, "final_trades.csv"), index=False, encoding='utf-8-sig')
             pd.DataFrame(full_res['event_list']).to_csv(os.path.join(trial_dir, "events.csv"), index=False, encoding='utf-8-sig')
-            
-            # Debug candidates log is HUGE. Maybe zip it or optimize? 
-            # For now save simple JSON or CSV?
-            # It's a dict date->list.
-            # Let's skip saving heavy daily_debug for all trials (disk safeguard). 
-            # Only save for Top? Or save separate per date?
-            # User said "Output ... SSOT ... candidates_debug".
-            # Let's save it. Maybe pickle or json.
-            # with open(os.path.join(trial_dir, "daily_debug.json"), "w") as f:
-            #     # Convert dates to str
-            #     serializable_debug = {k.strftime('%Y-%m-%d'): v for k, v in full_res['daily_debug'].items()}
-            #     json.dump(serializable_debug, f)
-            # Avoiding huge IO for now unless critical.
-            
+
             # Summary Result
             res_entry = {
                 'trial_id': trial_id,
@@ -295,31 +407,31 @@ class AutoTuner:
                 'win_rate': full_res['win_rate'],
                 'params': params,
                 'diagnosis': diagnosis,
-                'fold_metrics': fold_metrics
+                'fold_metrics': metrics
             }
             results.append(res_entry)
-            
-        # 4. Finalize Run
+
+        # 5. Finalize Run
         # Leaderboard
         df_res = pd.DataFrame(results)
         df_res = df_res.sort_values('score', ascending=False)
         df_res.to_csv(os.path.join(run_dir, "leaderboard.csv"), index=False)
-        
+
         # Best Params
         best_trial = df_res.iloc[0]
         best_params = best_trial['params']
         with open(os.path.join(run_dir, "best_params.json"), "w") as f:
             json.dump(best_params, f, indent=4)
-            
+
         # --- Backup Logic (Requested) ---
         backup_dir = os.path.join(self.output_dir, "backups")
         os.makedirs(backup_dir, exist_ok=True) # Defensive code as requested
-        
+
         completion_time = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_file = os.path.join(backup_dir, f"best_params_{completion_time}.json")
         with open(backup_file, "w") as f:
             json.dump(best_params, f, indent=4)
-            
+
         # --- Terminal Output (Requested) ---
         print("\n" + "="*50)
         print(f"✅ Optimization Complete! Run ID: {run_id}")
@@ -333,5 +445,5 @@ class AutoTuner:
         # Next Params (Top 10)
         top10 = df_res.head(10)[['trial_id', 'score', 'total_return']]
         top10.to_csv(os.path.join(run_dir, "next_params.csv"), index=False)
-        
+
         return run_dir
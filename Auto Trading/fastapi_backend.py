@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import json
 import os
 import sys
@@ -11,8 +12,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # Align cwd/import behavior with legacy backend
 AUTO_DIR = Path(__file__).resolve().parent
@@ -20,6 +22,8 @@ ROOT_DIR = AUTO_DIR.parent
 sys.path.append(str(AUTO_DIR))
 os.chdir(str(ROOT_DIR))
 
+from modules import api_contract
+from modules.api_contract import ConfirmRequest, ManualRoundtripRequest, StartRequest
 from modules.adapter_upbit import UpbitAdapter
 from modules.adapter_bithumb import BithumbAdapter
 from modules.capital_ledger import CapitalLedger
@@ -34,6 +38,10 @@ from modules.safe_start import (
     PHASE_WAITING_SYNC,
 )
 from modules.single_instance_lock import SingleInstanceLock
+from modules.state_journal import read_journaled_state
+from modules.status_shm import read_runtime_status
+from modules.status_stream import StatusBroadcaster, apply_merge_patch, format_sse
+from modules.status_watcher import StatusFileWatcher
 
 
 RESULTS_DIR = ROOT_DIR / "results"
@@ -44,6 +52,11 @@ SAFE_START_STATE_PATH = RESULTS_DIR / "safe_start_state.json"
 BACKEND_LOG_PATH = RESULTS_DIR / "logs" / "backend.log"
 OWNER_TELEGRAM_CHAT_ID = "7024783360"
 MODE_ALERT_DEBOUNCE_SEC = 60
+# Status stream: rebuilt on watched-file changes, control actions, and at least every refresh
+# (shared-memory hot fields and in-process controller state do not touch the files).
+STATUS_WATCH_PATHS = (RUNTIME_STATUS_PATH, RUNTIME_STATE_PATH, SAFE_START_STATE_PATH, LOCK_PATH)
+STATUS_STREAM_REFRESH_SEC = 1.0
+STREAM_HEARTBEAT_SEC = 15.0
 
 
 class AccessHealthStatusMuteFilter(logging.Filter):
@@ -104,28 +117,6 @@ def configure_logging() -> dict:
     return uvicorn_log_config
 
 
-class StartRequest(BaseModel):
-    mode: str = "PAPER"
-    exchange: str = "UPBIT"
-    seed: int = 1000000
-    force_unlock: bool = False
-
-
-class ConfirmRequest(BaseModel):
-    phrase: str
-
-
-class ManualRoundtripRequest(BaseModel):
-    symbol: str = "KRW-XRP"
-    krw_notional: float = 5500
-    buy_offset_ticks: int = 1
-    hold_seconds: int = 30
-    bid_minus_ticks: int = 0
-    confirm: str = ""
-
-
-
-
 def _normalize_reason_code(value: str) -> str:
     allowed = {"manual_stop", "risk_hard_stop", "sync_block", "crash", "unknown"}
     v = str(value or "").strip().lower()
@@ -230,7 +221,7 @@ class BackendService:
     def _build_rich_snapshot_text(self, truth: dict, headline: str) -> str:
         runtime = self._read_runtime_status() or {}
         try:
-            state = json.loads(RUNTIME_STATE_PATH.read_text(encoding="utf-8")) if RUNTIME_STATE_PATH.exists() else {}
+            state = read_journaled_state(RUNTIME_STATE_PATH)
         except Exception:
             state = {}
         vc = self._build_virtual_capital() or {}
@@ -340,12 +331,11 @@ class BackendService:
         }
 
     def _read_runtime_status(self):
+        # Shared-memory hot fields over the low-frequency JSON fallback.
         try:
-            if RUNTIME_STATUS_PATH.exists():
-                return json.loads(RUNTIME_STATUS_PATH.read_text(encoding="utf-8"))
+            return read_runtime_status(RUNTIME_STATUS_PATH)
         except Exception:
-            pass
-        return {}
+            return {}
 
     def _build_virtual_capital(self):
         seed = 0.0
@@ -465,6 +455,22 @@ class BackendService:
         }
         return self._json_safe(payload)
 
+    def stream_status(self):
+        """status() plus the runtime/position fields the TUI shows, for stream subscribers."""
+        payload = self.status()
+        runtime = self._read_runtime_status() or {}
+        try:
+            state = read_journaled_state(RUNTIME_STATE_PATH)
+        except Exception:
+            state = {}
+        payload["runtime"] = self._json_safe(
+            {k: runtime.get(k) for k in ("equity", "pnl_pct", "last_tick_ts", "last_error")}
+        )
+        payload["position"] = self._json_safe(
+            {"state": state.get("state", "-"), "symbol": state.get("symbol"), "position_qty": state.get("position_qty", 0.0)}
+        )
+        return payload
+
     def _control_result(self, ok: bool, phase: Optional[str] = None, running: Optional[bool] = None, reason_code: Optional[str] = None, **extra):
         safe_state = self.safe_start.read_state()
         truth = self._canonical_status(safe_state)
@@ -726,12 +732,87 @@ class BackendService:
             self.safe_start.mark_stopped("Stopped by operator", reason_code=reason_code)
             return self._control_result(True, phase="STOPPED", running=False, reason_code=reason_code)
 
+    def shutdown(self):
+        """Process exit: stops a live controller so its notifier outbox is flushed and closed."""
+        if self.controller is not None:
+            try:
+                self.stop()
+            except Exception as e:
+                logging.getLogger("BackendService").warning(f"stop on shutdown failed: {e}")
+
+
+class StatusStreamPublisher:
+    """
+    Single status producer for /api/v1/stream, /api/v1/ws and the TUI.
+
+    One thread waits on a StatusFileWatcher (inotify, or mtime polling) over the
+    status files, rebuilds BackendService.stream_status() when they change, when
+    poke()d after a control action, or every `refresh_sec`, and publishes it to
+    a StatusBroadcaster that fans merge patches out to subscribers. It starts
+    with the first subscriber, so a backend nobody watches does no extra work.
+    """
+
+    def __init__(self, backend_service: BackendService, paths=STATUS_WATCH_PATHS, refresh_sec: float = STATUS_STREAM_REFRESH_SEC):
+        self.backend_service = backend_service
+        self.paths = tuple(paths)
+        self.refresh_sec = float(refresh_sec)
+        self.broadcaster = StatusBroadcaster()
+        self.watcher: Optional[StatusFileWatcher] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_evt = threading.Event()
+        self._mtx = threading.Lock()
+        self.builds = 0
+
+    def start(self):
+        with self._mtx:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_evt.clear()
+            self.watcher = StatusFileWatcher(self.paths)
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="status-stream")
+            self._thread.start()
+
+    def stop(self):
+        with self._mtx:
+            self._stop_evt.set()
+            if self.watcher is not None:
+                self.watcher.wake()
+            if self._thread and self._thread.is_alive():
+                self._thread.join(timeout=2.0)
+            if self.watcher is not None:
+                self.watcher.close()
+            self._thread = None
+
+    def poke(self):
+        if self.watcher is not None:
+            self.watcher.wake()
+
+    def subscribe(self, notify=None):
+        client = self.broadcaster.subscribe(notify=notify)
+        self.start()
+        return client
+
+    def unsubscribe(self, client):
+        self.broadcaster.unsubscribe(client)
+
+    def _loop(self):
+        while not self._stop_evt.is_set():
+            try:
+                payload = self.backend_service.stream_status()
+                self.builds += 1
+                self.broadcaster.publish(payload)
+            except Exception as e:
+                logging.getLogger("StatusStream").warning(f"status publish failed: {e}")
+            self.watcher.wait(self.refresh_sec)
+
 
 class BackendStatusTUI:
     _ANSI_CLEAR_HOME = "\x1b[2J\x1b[H"
 
-    def __init__(self, backend_service: BackendService, interval_sec: float = 1.5):
+    def __init__(self, backend_service: BackendService, interval_sec: float = 1.5, stream: Optional[StatusStreamPublisher] = None):
+        """With `stream`, the panel is redrawn from the status stream instead of polling every interval."""
         self.backend_service = backend_service
+        self.stream = stream
         self.interval_sec = max(1.0, float(interval_sec))
         self._stop_evt = threading.Event()
         self._thread: Optional[threading.Thread] = None
@@ -782,6 +863,8 @@ class BackendStatusTUI:
             return 0, f"ERR:{e.__class__.__name__}"
 
     def _loop(self):
+        if self.stream is not None:
+            return self._stream_loop()
         while not self._stop_evt.is_set():
             try:
                 self._render_once()
@@ -789,13 +872,32 @@ class BackendStatusTUI:
                 pass
             self._stop_evt.wait(self.interval_sec)
 
+    def _stream_loop(self):
+        client = self.stream.subscribe()
+        payload = None
+        try:
+            while not self._stop_evt.is_set():
+                # No event within the interval still redraws (tick age, clock).
+                event = client.next_event(timeout=self.interval_sec)
+                if event is not None:
+                    kind, _, data = event
+                    payload = data if kind == "snapshot" else apply_merge_patch(payload, data)
+                if payload is None:
+                    continue
+                try:
+                    self._render(payload.get("truth") or {}, payload.get("runtime") or {}, payload.get("position") or {})
+                except Exception:
+                    pass
+        finally:
+            self.stream.unsubscribe(client)
+
     def _render_once(self):
-        backend = self._safe_json_read(RESULTS_DIR / "backend_status.json")
-        runtime = self._safe_json_read(RUNTIME_STATUS_PATH)
-        state = self._safe_json_read(RUNTIME_STATE_PATH)
+        runtime = self.backend_service._read_runtime_status()
+        state = read_journaled_state(RUNTIME_STATE_PATH)
         safe = self.backend_service.safe_start.read_state()
+        self._render(self.backend_service._canonical_status(safe), runtime, state)
 
-        canonical = self.backend_service._canonical_status(safe)
+    def _render(self, canonical: dict, runtime: dict, state: dict):
         mode = str((canonical.get("mode") or "PAPER")).upper()
         is_live = mode == "LIVE"
         mode_badge = f"{mode} {'LIVE REAL MONEY' if is_live else 'PAPER'}"
@@ -890,44 +992,155 @@ class BackendStatusTUI:
 
 
 service = BackendService()
+status_stream = StatusStreamPublisher(service)
 app = FastAPI(title="SafeBot Backend API", version="0.1.0")
 
 
-@app.get("/api/v1/health")
-def health():
+def health(req=None):
     safe_state = service.safe_start.read_state()
     truth = service._canonical_status(safe_state)
     return {"ok": True, "phase": truth.get("phase"), "running": truth.get("running"), "reason_code": truth.get("reason_code"), "truth": truth}
 
 
-@app.get("/api/v1/status")
-def status():
+def status(req=None):
     return service.status()
 
 
-@app.post("/api/v1/control/start")
+def _subscribe_stream():
+    """Subscribes a client whose publisher wake-ups set an asyncio.Event on this loop."""
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    client = status_stream.subscribe(notify=lambda: loop.call_soon_threadsafe(wakeup.set))
+    return client, wakeup
+
+
+async def _next_stream_event(client, wakeup):
+    # Waits on the loop rather than in next_event(): an idle subscriber holds no threadpool worker.
+    deadline = time.monotonic() + STREAM_HEARTBEAT_SEC
+    while not client.closed:
+        wakeup.clear()  # before polling, so a publish in between is not missed
+        event = client.next_event(timeout=0)
+        if event is not None:
+            return event
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            await asyncio.wait_for(wakeup.wait(), remaining)
+        except asyncio.TimeoutError:
+            return None
+    return None
+
+
+@app.get("/api/v1/stream")
+async def status_event_stream():
+    """SSE: `snapshot` first, then JSON merge `patch` events (same wire format as web_backend)."""
+    client, wakeup = _subscribe_stream()
+
+    async def _events():
+        try:
+            yield b"retry: 2000\n\n"
+            while not client.closed:
+                event = await _next_stream_event(client, wakeup)
+                if event is None:
+                    yield f": heartbeat {time.time():.0f}\n\n".encode("utf-8")
+                else:
+                    yield format_sse(*event)
+        finally:
+            status_stream.unsubscribe(client)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_events(), media_type="text/event-stream", headers=headers)
+
+
+@app.websocket("/api/v1/ws")
+async def status_websocket(websocket: WebSocket):
+    """WebSocket variant of /api/v1/stream: {"event": snapshot|patch|heartbeat, "id": seq, "data": ...}."""
+    await websocket.accept()
+    client, wakeup = _subscribe_stream()
+    try:
+        while not client.closed:
+            event = await _next_stream_event(client, wakeup)
+            if event is None:
+                await websocket.send_json({"event": "heartbeat", "ts": time.time()})
+            else:
+                kind, seq, data = event
+                await websocket.send_json({"event": kind, "id": seq, "data": data})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        status_stream.unsubscribe(client)
+
+
+def _poke_stream(result):
+    # Control actions change in-process state the file watcher cannot see.
+    status_stream.poke()
+    return result
+
+
 def control_start(req: StartRequest):
-    return service.start(req)
+    return _poke_stream(service.start(req))
 
 
-@app.post("/api/v1/control/mode")
 def control_mode(req: StartRequest):
-    return service.mode(req)
+    return _poke_stream(service.mode(req))
 
 
-@app.post("/api/v1/control/confirm")
 def control_confirm(req: ConfirmRequest):
-    return service.confirm_and_run(req)
+    return _poke_stream(service.confirm_and_run(req))
 
 
-@app.post("/api/v1/control/stop")
-def control_stop():
-    return service.stop()
+def control_stop(req=None):
+    return _poke_stream(service.stop())
 
 
-@app.post("/api/v1/manual/roundtrip-test")
 def manual_roundtrip_test(req: ManualRoundtripRequest):
-    return service.start_manual_roundtrip(req)
+    result = service.start_manual_roundtrip(req)
+    # Same contract as web_backend: message + manual_roundtrip on every answer, 400 when refused.
+    result.setdefault("message", result.get("error") or "")
+    result.setdefault("manual_roundtrip", service.manual_roundtrip)
+    return result, (200 if result.get("ok") else 400)
+
+
+_API_HEADERS = {"X-API-Version": api_contract.API_VERSION}
+
+
+def _contract_endpoint(route: api_contract.Route, handler):
+    """Wraps a sync handler(req) with the contract's body parsing; handlers may return (payload, status)."""
+
+    async def endpoint(request: Request):
+        try:
+            req = api_contract.parse_body(route, await request.body()) if route.request is not None else None
+        except api_contract.ContractError as e:
+            return JSONResponse(e.to_dict(), status_code=e.status, headers=_API_HEADERS)
+        result = await run_in_threadpool(handler, req)
+        payload, status_code = result if isinstance(result, tuple) else (result, 200)
+        return JSONResponse(payload, status_code=status_code, headers=_API_HEADERS)
+
+    endpoint.__name__ = route.name
+    return endpoint
+
+
+# api_contract route name -> handler; paths and schemas are declared in modules/api_contract.py.
+FASTAPI_ROUTE_HANDLERS = {
+    "health": health,
+    "status": status,
+    "control_start": control_start,
+    "control_mode": control_mode,
+    "control_confirm": control_confirm,
+    "control_stop": control_stop,
+    "manual_roundtrip": manual_roundtrip_test,
+}
+for _route in api_contract.routes_for(api_contract.FASTAPI):
+    if _route.name in FASTAPI_ROUTE_HANDLERS:
+        app.add_api_route(
+            _route.path,
+            _contract_endpoint(_route, FASTAPI_ROUTE_HANDLERS[_route.name]),
+            methods=[_route.method],
+            name=_route.name,
+        )
+_served = set(FASTAPI_ROUTE_HANDLERS) | {"stream", "status_ws"}
+assert _served == {r.name for r in api_contract.routes_for(api_contract.FASTAPI)}, "fastapi routes out of sync with api_contract"
 
 
 if __name__ == "__main__":
@@ -937,6 +1150,7 @@ if __name__ == "__main__":
     parser.add_argument("--tui", dest="tui", action="store_true", default=True, help="Enable periodic status panel")
     parser.add_argument("--no-tui", dest="tui", action="store_false", help="Disable periodic status panel")
     parser.add_argument("--tui-interval", type=float, default=1.5, help="TUI refresh interval seconds (default: 1.5)")
+    parser.add_argument("--tui-subscribe", action="store_true", help="Redraw the TUI from the status stream instead of polling")
     args = parser.parse_args()
 
     uvicorn_log_config = configure_logging()
@@ -946,11 +1160,13 @@ if __name__ == "__main__":
 
     tui = None
     if args.tui:
-        tui = BackendStatusTUI(service, interval_sec=args.tui_interval)
+        tui = BackendStatusTUI(service, interval_sec=args.tui_interval, stream=status_stream if args.tui_subscribe else None)
         tui.start()
 
     try:
         uvicorn.run(app, host=host, port=port, log_config=uvicorn_log_config)
     finally:
+        service.shutdown()
         if tui:
             tui.stop()
+        status_stream.stop()
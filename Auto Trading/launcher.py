@@ -16,6 +16,7 @@ from modules.watch_engine import WatchEngine
 from modules.run_controller import RunController
 from modules.notifier_telegram import TelegramNotifier
 from modules.dashboard_cli import DashboardCLI
+from modules.status_shm import read_runtime_status
 
 # Configure centralized logging (Launcher Level)
 Path("results/logs").mkdir(parents=True, exist_ok=True)
@@ -239,19 +240,14 @@ class Launcher:
                 print(f" [Launcher Error] Backend Status: {e}")
                 return "ERROR"
 
-        # Read IPC JSON
+        # Runtime status: shared-memory hot fields over the JSON fallback
         try:
-            path = Path("results/runtime_status.json")
-            if not path.exists():
-                if previous_status != "STARTING":
+            data = read_runtime_status(Path("results/runtime_status.json"))
+            if not data:
+                if previous_status != "STARTING":
                     print(" [Launcher] Waiting for Controller Status...")
                 return "STARTING"
 
-            text_content = path.read_text()
-            if not text_content: # Empty file check
-                return "STARTING"
-                
-            data = json.loads(text_content)
             status = data.get('status', 'UNKNOWN')
             
             # Check for ERROR state
@@ -0,0 +1,397 @@
+"""
+HTTP API contract shared by web_backend (stdlib server) and fastapi_backend.
+
+Every route is declared once in ROUTES, keyed by (method, path) so both
+servers dispatch with a single dict lookup. A Route carries:
+
+  * request: a dataclass the JSON body is parsed into (parse_body), `dict` for
+    free-form objects, or None when the body is ignored;
+  * response: the dataclass describing the success payload. Responses may
+    carry extra keys; check_response() only verifies the declared fields;
+  * servers: which backends serve it ("web", "fastapi"). Routes served by both
+    must return the same status codes and the same declared fields;
+  * probe: an example body for routes that are safe to call in contract tests
+    (read-only, or rejected without side effects). test_api_contract.py
+    generates one test per probe against every server of the route.
+
+Bad bodies raise ContractError, which both servers answer with HTTP 400 and
+{"error": ..., "field": ...}. Unknown body keys are ignored, as before.
+Responses carry an X-API-Version header with API_VERSION.
+"""
+import json
+import typing
+from dataclasses import MISSING, dataclass, fields, is_dataclass
+from typing import Dict, Optional, Tuple
+
+API_VERSION = "1"
+WEB = "web"
+FASTAPI = "fastapi"
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off", ""}
+
+
+class ContractError(ValueError):
+    status = 400
+
+    def __init__(self, message, field_name=None):
+        super().__init__(message)
+        self.field = field_name
+
+    def to_dict(self):
+        return {"ok": False, "error": str(self), "field": self.field}
+
+
+# ----- request schemas -----
+@dataclass
+class ConfirmPhraseRequest:
+    confirm: str = ""
+
+
+@dataclass
+class PanicRequest:
+    slider: float = 0.0
+    symbol: Optional[str] = None
+    hard_loss_cap: Optional[float] = None
+
+
+@dataclass
+class CancelOrdersRequest:
+    all: bool = False
+    order_id: Optional[str] = None
+    symbol: Optional[str] = None
+
+
+@dataclass
+class JobCancelRequest:
+    job_id: str
+
+
+@dataclass
+class ManualRoundtripRequest:
+    symbol: str = "KRW-XRP"
+    krw_notional: float = 5500
+    buy_offset_ticks: int = 1
+    hold_seconds: int = 30
+    bid_minus_ticks: int = 0
+    confirm: str = ""
+
+
+@dataclass
+class StartRequest:
+    mode: str = "PAPER"
+    exchange: str = "UPBIT"
+    seed: int = 1000000
+    force_unlock: bool = False
+
+
+@dataclass
+class ConfirmRequest:
+    phrase: str
+
+
+# ----- response schemas -----
+@dataclass
+class StatusResponse:
+    mode: str
+    running: bool
+    phase: str
+    reason_code: str
+    truth: dict
+
+
+@dataclass
+class HealthResponse:
+    ok: bool
+    phase: str
+    running: bool
+    reason_code: str
+    truth: dict
+
+
+@dataclass
+class OkMessageResponse:
+    ok: bool
+    message: str
+
+
+@dataclass
+class ControlResponse:
+    ok: bool
+    phase: Optional[str] = None
+    running: Optional[bool] = None
+    reason_code: Optional[str] = None
+    truth: Optional[dict] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RoundtripResponse:
+    ok: bool
+    message: str
+    manual_roundtrip: dict
+
+
+@dataclass
+class JobSubmitResponse:
+    ok: bool
+    message: str
+    created: bool
+    job: dict
+
+
+@dataclass
+class JobsResponse:
+    classes: dict
+    active: list
+    recent: list
+
+
+@dataclass
+class OrdersResponse:
+    ok: bool
+    exchange: str
+    orders: list
+
+
+@dataclass
+class CancelOrdersResponse:
+    ok: bool
+    requested: int
+    canceled: int
+    failed: int
+
+
+@dataclass
+class TimingsResponse:
+    ts: float
+    sections: dict
+
+
+@dataclass
+class HealthCheckResponse:
+    overall: str
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    path: str
+    name: str
+    request: object = None
+    response: object = dict
+    servers: Tuple[str, ...] = (WEB,)
+    probe: Optional[dict] = None
+    content_type: str = "application/json"
+
+
+_ROUTE_LIST = [
+    # Served by both backends.
+    Route("GET", "/api/v1/health", "health", response=HealthResponse, servers=(WEB, FASTAPI), probe={}),
+    Route("GET", "/api/v1/status", "status", response=StatusResponse, servers=(WEB, FASTAPI), probe={}),
+    Route("GET", "/api/v1/stream", "stream", servers=(WEB, FASTAPI), content_type="text/event-stream"),
+    Route("WEBSOCKET", "/api/v1/ws", "status_ws", servers=(FASTAPI,)),
+    Route(
+        "POST",
+        "/api/v1/manual/roundtrip-test",
+        "manual_roundtrip",
+        request=ManualRoundtripRequest,
+        response=RoundtripResponse,
+        servers=(WEB, FASTAPI),
+        probe={"symbol": "KRW-XRP", "hold_seconds": 5},
+    ),
+    # web_backend
+    Route("GET", "/", "index", content_type="text/html"),
+    Route("GET", "/api/status", "status_legacy", response=StatusResponse),
+    Route("GET", "/api/settings", "settings", probe={}),
+    Route("GET", "/api/v1/status/timings", "status_timings", response=TimingsResponse, probe={}),
+    Route("GET", "/api/labs/status", "labs_status"),
+    Route("GET", "/api/data/status", "data_status", probe={}),
+    Route("GET", "/api/jobs", "jobs", response=JobsResponse),
+    Route("GET", "/api/notify/metrics", "notify_metrics"),
+    Route("GET", "/api/models", "models"),
+    Route("GET", "/api/orders", "orders", response=OrdersResponse, probe={}),
+    Route("POST", "/api/orders", "orders_post", response=OrdersResponse, probe={}),
+    Route("POST", "/api/health_all", "health_all", response=HealthCheckResponse),
+    Route("POST", "/api/shutdown", "shutdown", response=OkMessageResponse),
+    Route("POST", "/api/stop", "stop", response=OkMessageResponse),
+    Route("POST", "/api/settings", "save_settings", request=dict),
+    Route("POST", "/api/start", "start", request=ConfirmPhraseRequest, response=OkMessageResponse),
+    Route("POST", "/api/restart", "restart", request=ConfirmPhraseRequest, response=OkMessageResponse),
+    Route("POST", "/api/panic", "panic", request=PanicRequest, response=OkMessageResponse, probe={"slider": 100}),
+    Route(
+        "POST",
+        "/api/orders/cancel",
+        "orders_cancel",
+        request=CancelOrdersRequest,
+        response=CancelOrdersResponse,
+        probe={"all": True},
+    ),
+    Route("POST", "/api/test/entry", "test_entry", request=dict, response=OkMessageResponse),
+    Route("POST", "/api/test/exit", "test_exit", request=dict, response=OkMessageResponse),
+    Route("POST", "/api/labs/run_backtest", "labs_run_backtest", response=JobSubmitResponse),
+    Route("POST", "/api/labs/run_evolution", "labs_run_evolution", response=JobSubmitResponse),
+    Route("POST", "/api/labs/approve_live", "labs_approve_live", response=OkMessageResponse),
+    Route("POST", "/api/jobs/cancel", "jobs_cancel", request=JobCancelRequest, response=OkMessageResponse, probe={}),
+    Route("POST", "/api/data/update", "data_update", response=JobSubmitResponse),
+    # fastapi_backend
+    Route("POST", "/api/v1/control/start", "control_start", request=StartRequest, response=ControlResponse, servers=(FASTAPI,)),
+    Route("POST", "/api/v1/control/mode", "control_mode", request=StartRequest, response=ControlResponse, servers=(FASTAPI,)),
+    Route(
+        "POST",
+        "/api/v1/control/confirm",
+        "control_confirm",
+        request=ConfirmRequest,
+        response=ControlResponse,
+        servers=(FASTAPI,),
+        probe={},
+    ),
+    Route("POST", "/api/v1/control/stop", "control_stop", response=ControlResponse, servers=(FASTAPI,)),
+]
+
+ROUTES: Dict[Tuple[str, str], Route] = {(r.method, r.path): r for r in _ROUTE_LIST}
+ROUTES_BY_NAME: Dict[str, Route] = {r.name: r for r in _ROUTE_LIST}
+assert len(ROUTES) == len(ROUTES_BY_NAME) == len(_ROUTE_LIST), "duplicate route in api_contract"
+
+
+def routes_for(server):
+    return [r for r in _ROUTE_LIST if server in r.servers]
+
+
+def lookup(method, raw_path):
+    """(route or None, query string) for a request line path."""
+    path, _, query = str(raw_path).partition("?")
+    return ROUTES.get((method, path)), query
+
+
+# ----- validation -----
+def _unwrap_optional(tp):
+    if typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return tp, False
+
+
+def _type_name(tp):
+    return getattr(tp, "__name__", str(tp))
+
+
+def _coerce(name, tp, value):
+    base, optional = _unwrap_optional(tp)
+    if value is None:
+        if optional:
+            return None
+        raise ContractError(f"{name}: must not be null", name)
+    if base is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)) and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+            return value.strip().lower() in _TRUE
+    elif base is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str):
+            try:
+                return int(value.strip())
+            except ValueError:
+                pass
+    elif base is float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value.strip())
+            except ValueError:
+                pass
+    elif base is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    elif base in (dict, list):
+        if isinstance(value, base):
+            return value
+    else:
+        return value
+    raise ContractError(f"{name}: expected {_type_name(base)}, got {type(value).__name__}", name)
+
+
+def parse_request(schema, data):
+    """Builds `schema` from a decoded JSON object (dict schemas pass the object through)."""
+    if schema is None:
+        return None
+    if not isinstance(data, dict):
+        raise ContractError("request body must be a JSON object")
+    if schema is dict:
+        return data
+    hints = typing.get_type_hints(schema)
+    kwargs = {}
+    for f in fields(schema):
+        if f.name in data:
+            kwargs[f.name] = _coerce(f.name, hints[f.name], data[f.name])
+        elif f.default is MISSING and f.default_factory is MISSING:
+            raise ContractError(f"{f.name}: required", f.name)
+    return schema(**kwargs)
+
+
+def parse_body(route, raw):
+    """Parses a raw request body for `route`; an empty body is an empty object."""
+    if route.request is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    try:
+        data = json.loads(raw) if raw and raw.strip() else {}
+    except ValueError:
+        raise ContractError("invalid JSON body")
+    return parse_request(route.request, data)
+
+
+def _matches(tp, value):
+    base, optional = _unwrap_optional(tp)
+    if value is None:
+        return optional
+    if base is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if base is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if isinstance(base, type):
+        return isinstance(value, base)
+    return True
+
+
+def check_response(schema, payload):
+    """Problems with `payload` against a response schema (empty list when it conforms)."""
+    if schema is None:
+        return []
+    if not isinstance(payload, dict):
+        return [f"expected a JSON object, got {type(payload).__name__}"]
+    if not is_dataclass(schema):
+        return []
+    hints = typing.get_type_hints(schema)
+    problems = []
+    for f in fields(schema):
+        if f.name not in payload:
+            if f.default is MISSING and f.default_factory is MISSING:
+                problems.append(f"{f.name}: missing")
+            continue
+        if not _matches(hints[f.name], payload[f.name]):
+            problems.append(f"{f.name}: expected {_type_name(hints[f.name])}, got {type(payload[f.name]).__name__}")
+    return problems
+
+
+def shape(schema, payload):
+    """The declared part of a response: {field: JSON type name}, for diffing two servers."""
+    if not isinstance(payload, dict) or not is_dataclass(schema):
+        return type(payload).__name__
+    out = {}
+    for f in fields(schema):
+        if f.name in payload:
+            value = payload[f.name]
+            out[f.name] = "number" if isinstance(value, (int, float)) and not isinstance(value, bool) else type(value).__name__
+    return out
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class BalanceSnapshotCache:
+    """
+    Shared exchange balance snapshot with a staleness budget.
+
+    get(max_age_sec) returns the cached balance map while it is younger than
+    max_age_sec and refetches otherwise (max_age_sec <= 0 always refetches).
+    invalidate() forces the next get() to refetch, e.g. after a fill.
+
+    Counters (fetch_calls / cache_hits / fetch_errors / invalidations) make the
+    private REST call rate measurable from runtime status.
+    """
+
+    def __init__(self, fetch_fn, clock=time.monotonic):
+        self._fetch_fn = fetch_fn
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._balances = None
+        self._fetched_at = None
+        self.fetch_calls = 0
+        self.cache_hits = 0
+        self.fetch_errors = 0
+        self.invalidations = 0
+
+    def age_sec(self):
+        with self._lock:
+            if self._fetched_at is None:
+                return None
+            return max(0.0, self._clock() - self._fetched_at)
+
+    def get(self, max_age_sec=0.0):
+        with self._lock:
+            if self._balances is not None and self._fetched_at is not None:
+                if (self._clock() - self._fetched_at) < float(max_age_sec or 0.0):
+                    self.cache_hits += 1
+                    return dict(self._balances)
+
+            self.fetch_calls += 1
+            try:
+                balances = self._fetch_fn()
+            except Exception:
+                balances = None
+            if not balances:
+                # Empty/failed reads are not cached; the next call retries.
+                self.fetch_errors += 1
+                return {}
+            self._balances = dict(balances)
+            self._fetched_at = self._clock()
+            return dict(self._balances)
+
+    def invalidate(self):
+        with self._lock:
+            self._balances = None
+            self._fetched_at = None
+            self.invalidations += 1
+
+    def stats(self, budget_sec=None):
+        age = self.age_sec()
+        with self._lock:
+            return {
+                "age_sec": None if age is None else round(age, 3),
+                "budget_sec": budget_sec,
+                "fetch_calls": self.fetch_calls,
+                "cache_hits": self.cache_hits,
+                "fetch_errors": self.fetch_errors,
+                "invalidations": self.invalidations,
+            }
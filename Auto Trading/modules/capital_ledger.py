@@ -23,6 +23,33 @@ class CapitalLedger:
         self.peak_equity = self.equity
         self.max_drawdown = 0.0
 
+        # Per-position capital reservations (multi-symbol runs): key -> KRW
+        self.allocations = {}
+
+    def allocate(self, key: str, max_slots: int) -> float:
+        """
+        Reserves an equal share (equity / max_slots) of bot capital for one position.
+        Bounded by the equity not yet reserved; idempotent per key.
+        Returns the reserved KRW (0.0 when nothing is left).
+        """
+        if key in self.allocations:
+            return self.allocations[key]
+        slots = max(1, int(max_slots or 1))
+        free = max(0.0, self.equity - self.allocated_total())
+        amount = min(self.equity / slots, free)
+        if amount <= 0:
+            logger.warning(f"[{self.exchange_name}] No capital left to allocate for {key}.")
+            return 0.0
+        self.allocations[key] = float(amount)
+        return self.allocations[key]
+
+    def release(self, key: str) -> float:
+        """Frees the reservation held by key (0.0 if none)."""
+        return float(self.allocations.pop(key, 0.0))
+
+    def allocated_total(self) -> float:
+        return float(sum(self.allocations.values()))
+
     def update(self, current_equity: float):
         """
         Updates the current equity state logic.
@@ -56,7 +83,9 @@ class CapitalLedger:
             "roi_pct": round(roi_pct, 2),
             "withdrawable_profit": max(0.0, pnl_cycle),
             "max_drawdown_pct": round(self.max_drawdown * 100, 2),
-            "start_ts": self.start_ts.isoformat()
+            "start_ts": self.start_ts.isoformat(),
+            "allocations": dict(self.allocations),
+            "allocated_krw": self.allocated_total(),
         }
 
     def can_reset(self, open_positions_count: int, open_orders_count: int) -> bool:
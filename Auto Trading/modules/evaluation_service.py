@@ -0,0 +1,136 @@
+"""
+Candidate evaluation service: params + window in, (metrics, backtest result) out.
+
+One code path for every candidate backtest. run_tuning_cycle (train search,
+candidate/active OOS checks) and the web labs jobs (auto backtests, manual
+backtest) call it instead of keeping their own analyze/backtest/metrics loops.
+Results are those of oos_tuner.evaluate_params; the service adds:
+
+  * a result cache keyed by (data signature, full params, window, cost stress),
+    so the labs job's auto backtest of the candidate and of the active model
+    reuses the tuning cycle's OOS evaluations instead of re-running them;
+  * an analysis-panel cache keyed by the signal params only (execution-only
+    params share one Strategy.analyze panel, as in param_stability);
+  * evaluate_many() with a process pool when n_workers > 1.
+
+Cached results are handed out as deep copies: callers may annotate them.
+"""
+import copy
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from . import oos_tuner
+from .param_stability import params_key, signal_key
+
+_WORKER_PANEL = {}
+_WORKER_ANALYSIS = OrderedDict()
+
+
+def data_signature(raw_dfs):
+    """Cheap identity of a data panel: symbol, row count, last timestamp and last close."""
+    sig = []
+    for sym in sorted((raw_dfs or {}).keys()):
+        df = raw_dfs[sym]
+        dates = oos_tuner._extract_index_datetime(df)
+        last_close = None
+        if df is not None and len(df) and "close" in df.columns:
+            last_close = float(df["close"].iloc[-1])
+        sig.append((str(sym), int(len(dates)), str(dates.max() if not dates.empty else None), last_close))
+    return json.dumps(sig, default=str)
+
+
+def _window_key(start_dt, end_dt, include_cost_stress):
+    return (str(oos_tuner._to_timestamp(start_dt)), str(oos_tuner._to_timestamp(end_dt)), bool(include_cost_stress))
+
+
+def _lru_put(cache, key, value, size):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+def _init_worker(raw_dfs):
+    global _WORKER_PANEL
+    _WORKER_PANEL = raw_dfs
+    _WORKER_ANALYSIS.clear()
+
+
+def _eval_task(task):
+    params, start_dt, end_dt, include_cost_stress = task
+    key = signal_key(params)
+    analyzed = _WORKER_ANALYSIS.get(key)
+    if analyzed is None:
+        analyzed = oos_tuner._prepare_symbol_dfs(_WORKER_PANEL, params)
+        _lru_put(_WORKER_ANALYSIS, key, analyzed, EvaluationService.PANEL_CACHE_SIZE)
+    return oos_tuner.evaluate_params(
+        _WORKER_PANEL, params, start_dt, end_dt, include_cost_stress=include_cost_stress, analyzed=analyzed
+    )
+
+
+class EvaluationService:
+    PANEL_CACHE_SIZE = 4
+
+    def __init__(self, n_workers=1, cache_size=512):
+        self.n_workers = max(1, int(n_workers or 1))
+        self.cache_size = int(cache_size)
+        self._results = OrderedDict()
+        self._panels = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "panels": 0}
+
+    def _analyzed(self, data_key, raw_dfs, params):
+        key = (data_key, signal_key(params))
+        analyzed = self._panels.get(key)
+        if analyzed is None:
+            analyzed = oos_tuner._prepare_symbol_dfs(raw_dfs, params)
+            self.stats["panels"] += 1
+        _lru_put(self._panels, key, analyzed, self.PANEL_CACHE_SIZE)
+        return analyzed
+
+    def evaluate(self, raw_dfs, params, start_dt, end_dt, include_cost_stress=False):
+        """Same contract as oos_tuner.evaluate_params (raises on an empty panel)."""
+        return self.evaluate_many(raw_dfs, [params], start_dt, end_dt, include_cost_stress=include_cost_stress)[0]
+
+    def evaluate_many(self, raw_dfs, param_sets, start_dt, end_dt, include_cost_stress=False):
+        data_key = data_signature(raw_dfs)
+        window = _window_key(start_dt, end_dt, include_cost_stress)
+        keys = [(data_key, params_key(p), window) for p in param_sets]
+        found = {}
+        todo = OrderedDict()
+        for key, params in zip(keys, param_sets):
+            if key in found or key in todo:
+                continue
+            if key in self._results:
+                self.stats["hits"] += 1
+                found[key] = self._results[key]
+                self._results.move_to_end(key)
+            else:
+                todo[key] = params
+        self.stats["misses"] += len(todo)
+
+        if len(todo) > 1 and self.n_workers > 1:
+            tasks = [(p, start_dt, end_dt, include_cost_stress) for p in todo.values()]
+            # Neighbouring tasks share a signal subset, so worker chunks mostly hit their panel cache.
+            order = sorted(range(len(tasks)), key=lambda i: signal_key(tasks[i][0]))
+            with ProcessPoolExecutor(
+                max_workers=min(self.n_workers, len(tasks)), initializer=_init_worker, initargs=(raw_dfs,)
+            ) as pool:
+                out = list(pool.map(_eval_task, [tasks[i] for i in order]))
+            todo_keys = list(todo)
+            computed = {todo_keys[i]: res for i, res in zip(order, out)}
+        else:
+            computed = {}
+            for key, params in todo.items():
+                computed[key] = oos_tuner.evaluate_params(
+                    raw_dfs,
+                    params,
+                    start_dt,
+                    end_dt,
+                    include_cost_stress=include_cost_stress,
+                    analyzed=self._analyzed(data_key, raw_dfs, params),
+                )
+        for key, res in computed.items():
+            _lru_put(self._results, key, res, self.cache_size)
+        found.update(computed)
+        return [copy.deepcopy(found[key]) for key in keys]
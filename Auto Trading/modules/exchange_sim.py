@@ -0,0 +1,636 @@
+"""
+Deterministic local exchange for end-to-end RunController runs.
+
+ExchangeSimulator implements both surfaces the live path touches:
+  - the adapter surface of UpbitAdapter / BithumbAdapter (health, get_balances,
+    get_open_orders, get_recent_fills, create_order), with `client` pointing
+    back at the simulator, and
+  - the ccxt calls RunController / ExecutionEngine make on `adapter.client`
+    (load_markets, market, fetch_ticker(s), fetch_order_book, fetch_ohlcv,
+    fetch_balance, create/cancel/fetch orders, fetch_open_orders,
+    fetch_my_trades, fetch_trades, get_fills).
+
+Prices follow historical OHLCV bars (data/*.parquet): inside a bar the mid
+walks open -> low -> high -> close (open -> high -> low -> close on down bars).
+The book is synthesized around that mid (`spread_bps`, `depth_levels` levels of
+`level_krw` each, `level_step_bps` apart) and refreshes every
+`book_refresh_sec`; liquidity taken from a book stays taken until it refreshes.
+
+Matching: a limit order takes liquidity through its price (at most `fill_ratio`
+of its remainder per match, to force partial fills) and the rest rests; resting
+orders keep matching as the path moves through them. IOC remainders are
+canceled. Funds are locked on submit and settled per fill.
+Faults: seeded random rejects (`reject_rate`), insufficient-funds and
+min-notional rejects, and a per-second request budget (`rate_limit_per_sec`)
+that raises 429 errors.
+
+Time is a SimClock. Every API call costs `latency_sec` of simulated time and
+sleeps advance it instantly, so a RunController built with clock=sim.clock,
+sleep=sim.clock.sleep runs a day of bars in seconds (run_sim_session).
+"""
+import bisect
+import logging
+import random
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger("ExchangeSim")
+
+_EPS = 1e-12
+_TIMEFRAME_SEC = {"1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "4h": 14400, "1d": 86400}
+
+
+class SimRateLimitExceeded(Exception):
+    pass
+
+
+class SimOrderRejected(Exception):
+    pass
+
+
+class SimInsufficientFunds(SimOrderRejected):
+    pass
+
+
+class SimOrderNotFound(Exception):
+    pass
+
+
+class SimClock:
+    def __init__(self, t0=0.0):
+        self.t = float(t0)
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, dt):
+        self.t += max(0.0, float(dt or 0.0))
+
+    def advance_to(self, ts):
+        self.t = max(self.t, float(ts))
+
+
+class PricePath:
+    """Intra-bar mid price path over OHLCV bars (timestamps in ms or seconds)."""
+
+    def __init__(self, bars):
+        df = bars.sort_values("timestamp")
+        ts = [float(x) for x in df["timestamp"]]
+        if ts and max(ts) > 1e11:
+            ts = [x / 1000.0 for x in ts]
+        self.ts = ts
+        self.open = [float(x) for x in df["open"]]
+        self.high = [float(x) for x in df["high"]]
+        self.low = [float(x) for x in df["low"]]
+        self.close = [float(x) for x in df["close"]]
+        self.volume = [float(x) for x in df["volume"]] if "volume" in df else [0.0] * len(ts)
+        gaps = sorted(b - a for a, b in zip(ts, ts[1:]))
+        self.bar_sec = gaps[len(gaps) // 2] if gaps else 60.0
+
+    @property
+    def start(self):
+        return self.ts[0]
+
+    @property
+    def end(self):
+        return self.ts[-1] + self.bar_sec
+
+    def _waypoints(self, i):
+        o, h, l, c = self.open[i], self.high[i], self.low[i], self.close[i]
+        return [o, l, h, c] if c >= o else [o, h, l, c]
+
+    def _locate(self, t):
+        i = bisect.bisect_right(self.ts, t) - 1
+        if i < 0:
+            return 0, 0.0
+        frac = (t - self.ts[i]) / self.bar_sec if self.bar_sec > 0 else 1.0
+        return i, min(1.0, max(0.0, frac))
+
+    def price_at(self, t):
+        i, frac = self._locate(t)
+        way = self._waypoints(i)
+        pos = frac * 3.0
+        k = min(2, int(pos))
+        return way[k] + (way[k + 1] - way[k]) * (pos - k)
+
+    def volume_between(self, t0, t1):
+        total = 0.0
+        if t1 <= t0:
+            return total
+        for i in range(max(0, bisect.bisect_right(self.ts, t0) - 1), len(self.ts)):
+            a, b = self.ts[i], self.ts[i] + self.bar_sec
+            if a >= t1:
+                break
+            overlap = min(b, t1) - max(a, t0)
+            if overlap > 0:
+                total += self.volume[i] * overlap / self.bar_sec
+        return total
+
+    def bars_until(self, t):
+        """[ts_ms, o, h, l, c, v] for completed bars plus the bar forming at t."""
+        out = []
+        i, frac = self._locate(t)
+        for j in range(0, i):
+            out.append([int(self.ts[j] * 1000), self.open[j], self.high[j], self.low[j], self.close[j], self.volume[j]])
+        if self.ts and t >= self.ts[0]:
+            way = self._waypoints(i)
+            now = self.price_at(t)
+            seen = way[: min(3, int(frac * 3.0)) + 1] + [now]
+            out.append([int(self.ts[i] * 1000), way[0], max(seen), min(seen), now, self.volume[i] * frac])
+        return out
+
+
+class ExchangeSimulator:
+    def __init__(
+        self,
+        bars,
+        clock=None,
+        balances=None,
+        fee_rate=0.0005,
+        spread_bps=10.0,
+        depth_levels=10,
+        level_krw=5_000_000.0,
+        level_step_bps=5.0,
+        book_refresh_sec=1.0,
+        latency_sec=0.05,
+        fill_ratio=1.0,
+        reject_rate=0.0,
+        rate_limit_per_sec=None,
+        min_order_krw=5000.0,
+        seed=0,
+    ):
+        self.paths = {self._ccxt(sym): PricePath(df) for sym, df in bars.items()}
+        if not self.paths:
+            raise ValueError("ExchangeSimulator needs at least one symbol")
+        self.clock = clock or SimClock(min(p.start for p in self.paths.values()))
+        self.balances = {}
+        for ccy, amount in (balances if balances is not None else {"KRW": 1_000_000.0}).items():
+            self.balances[ccy] = {"free": float(amount), "used": 0.0}
+        self.fee_rate = float(fee_rate)
+        self.spread_bps = float(spread_bps)
+        self.depth_levels = max(1, int(depth_levels))
+        self.level_krw = float(level_krw)
+        self.level_step_bps = float(level_step_bps)
+        self.book_refresh_sec = max(1e-6, float(book_refresh_sec))
+        self.latency_sec = max(0.0, float(latency_sec))
+        self.fill_ratio = min(1.0, max(0.0, float(fill_ratio)))
+        self.reject_rate = max(0.0, float(reject_rate))
+        self.rate_limit_per_sec = rate_limit_per_sec
+        self.min_order_krw = float(min_order_krw)
+        self._rng = random.Random(seed)
+        self._orders = {}
+        self._fills = {}
+        self._trades = []
+        self._consumed = {}
+        self._seq = 0
+        self._bucket_sec = None
+        self._bucket_used = 0
+        self.calls = Counter()
+        self.rejects = 0
+        self.rate_limited = 0
+        self.status = "OK"
+
+    @classmethod
+    def from_parquet(cls, data_dir="data", symbols=None, **kwargs):
+        """Loads `<BASE>_KRW.parquet` bar files (the data_loader layout)."""
+        wanted = {cls._ccxt(s) for s in symbols} if symbols else None
+        bars = {}
+        for path in sorted(Path(data_dir).glob("*_KRW.parquet")):
+            symbol = cls._ccxt(path.stem)
+            if wanted is not None and symbol not in wanted:
+                continue
+            bars[symbol] = pd.read_parquet(path, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        return cls(bars, **kwargs)
+
+    # ----- symbols / plumbing -----
+    @staticmethod
+    def _ccxt(symbol):
+        symbol = str(symbol)
+        if "/" in symbol:
+            return symbol
+        if "-" in symbol:
+            quote, base = symbol.split("-", 1)
+            return f"{base}/{quote}"
+        if "_" in symbol:
+            base, quote = symbol.rsplit("_", 1)
+            return f"{base}/{quote}"
+        return f"{symbol}/KRW"
+
+    def _normalize_symbol(self, ccxt_symbol):
+        base, quote = self._ccxt(ccxt_symbol).split("/")
+        return f"{quote}-{base}"
+
+    @property
+    def client(self):
+        return self
+
+    @property
+    def end_ts(self):
+        return max(p.end for p in self.paths.values())
+
+    def _path(self, symbol):
+        path = self.paths.get(self._ccxt(symbol))
+        if path is None:
+            raise SimOrderRejected(f"BadSymbol: {symbol}")
+        return path
+
+    def _api(self, name):
+        """Every request: request budget, latency, then resting orders match."""
+        self.calls[name] += 1
+        if self.rate_limit_per_sec:
+            sec = int(self.clock())
+            if sec != self._bucket_sec:
+                self._bucket_sec, self._bucket_used = sec, 0
+            self._bucket_used += 1
+            if self._bucket_used > int(self.rate_limit_per_sec):
+                self.rate_limited += 1
+                raise SimRateLimitExceeded("429 Too Many Requests (simulated)")
+        self.clock.sleep(self.latency_sec)
+        self._match_resting()
+
+    def _now_ms(self):
+        return int(self.clock() * 1000)
+
+    def _balance(self, ccy):
+        return self.balances.setdefault(ccy, {"free": 0.0, "used": 0.0})
+
+    # ----- book / matching -----
+    def mid(self, symbol):
+        return self._path(symbol).price_at(self.clock())
+
+    def _levels(self, symbol, side):
+        symbol = self._ccxt(symbol)
+        mid = self.mid(symbol)
+        epoch = int(self.clock() // self.book_refresh_sec)
+        sign = 1.0 if side == "ask" else -1.0
+        levels = []
+        for k in range(self.depth_levels):
+            px = mid * (1.0 + sign * (self.spread_bps / 2.0 + k * self.level_step_bps) / 1e4)
+            if px <= 0:
+                break
+            qty = self.level_krw / px - self._consumed.get((symbol, side, epoch, k), 0.0)
+            levels.append((k, px, max(0.0, qty)))
+        return epoch, levels
+
+    def _match(self, order):
+        remaining = order["amount"] - order["filled"]
+        if remaining <= _EPS:
+            return
+        budget = remaining if self.fill_ratio >= 1.0 else remaining * self.fill_ratio
+        side = "ask" if order["side"] == "buy" else "bid"
+        epoch, levels = self._levels(order["symbol"], side)
+        for k, px, avail in levels:
+            through = px <= order["price"] if order["side"] == "buy" else px >= order["price"]
+            if not through or budget <= _EPS:
+                break
+            take = min(avail, budget)
+            if take <= _EPS:
+                continue
+            key = (order["symbol"], side, epoch, k)
+            self._consumed[key] = self._consumed.get(key, 0.0) + take
+            budget -= take
+            self._settle_fill(order, take, px)
+        if order["amount"] - order["filled"] <= _EPS:
+            order["status"] = "closed"
+            self._release(order)
+
+    def _settle_fill(self, order, qty, px):
+        base, quote = order["symbol"].split("/")
+        fee = qty * px * self.fee_rate
+        if order["side"] == "buy":
+            release = qty * order["price"] * (1.0 + self.fee_rate)
+            release = min(release, order["_locked"])
+            order["_locked"] -= release
+            self._balance(quote)["used"] -= release
+            self._balance(quote)["free"] += release - (qty * px + fee)
+            self._balance(base)["free"] += qty
+        else:
+            order["_locked"] -= qty
+            self._balance(base)["used"] -= qty
+            self._balance(quote)["free"] += qty * px - fee
+        order["filled"] += qty
+        order["cost"] += qty * px
+        order["fee"]["cost"] += fee
+        self._seq += 1
+        trade = {
+            "id": f"sim-t{self._seq}",
+            "order": order["id"],
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "amount": qty,
+            "price": px,
+            "cost": qty * px,
+            "timestamp": self._now_ms(),
+            "fee": {"cost": fee, "currency": quote},
+        }
+        self._trades.append(trade)
+        self._fills.setdefault(order["id"], []).append(trade)
+
+    def _release(self, order):
+        """Returns whatever is still locked for a closed/canceled order."""
+        if order["_locked"] <= 0:
+            return
+        base, quote = order["symbol"].split("/")
+        ccy = quote if order["side"] == "buy" else base
+        self._balance(ccy)["used"] -= order["_locked"]
+        self._balance(ccy)["free"] += order["_locked"]
+        order["_locked"] = 0.0
+
+    def _match_resting(self):
+        for order in self._orders.values():
+            if order["status"] == "open":
+                self._match(order)
+
+    def _public(self, order):
+        out = {k: v for k, v in order.items() if not k.startswith("_")}
+        out["fee"] = dict(order["fee"])
+        out["remaining"] = max(0.0, order["amount"] - order["filled"])
+        out["average"] = order["cost"] / order["filled"] if order["filled"] > 0 else None
+        return out
+
+    # ----- ccxt surface -----
+    def load_markets(self, reload=False):
+        return {symbol: self.market(symbol) for symbol in self.paths}
+
+    def market(self, symbol):
+        symbol = self._ccxt(symbol)
+        if symbol not in self.paths:
+            raise SimOrderRejected(f"BadSymbol: {symbol}")
+        base, quote = symbol.split("/")
+        return {
+            "id": self._normalize_symbol(symbol),
+            "symbol": symbol,
+            "base": base,
+            "quote": quote,
+            "active": True,
+            "state": "ACTIVE",
+            "warning": "NONE",
+            "limits": {"cost": {"min": self.min_order_krw}},
+        }
+
+    def fetch_ticker(self, symbol, params=None):
+        self._api("fetch_ticker")
+        symbol = self._ccxt(symbol)
+        path = self._path(symbol)
+        now = self.clock()
+        mid = path.price_at(now)
+        half = self.spread_bps / 2.0 / 1e4
+        volume = path.volume_between(now - 86400.0, now)
+        return {
+            "symbol": symbol,
+            "timestamp": self._now_ms(),
+            "last": mid,
+            "close": mid,
+            "bid": mid * (1.0 - half),
+            "ask": mid * (1.0 + half),
+            "baseVolume": volume,
+            "quoteVolume": volume * mid,
+        }
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return {self._ccxt(s): self.fetch_ticker(s) for s in (symbols or list(self.paths))}
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        self._api("fetch_order_book")
+        _, asks = self._levels(symbol, "ask")
+        _, bids = self._levels(symbol, "bid")
+        n = int(limit) if limit else self.depth_levels
+        return {
+            "symbol": self._ccxt(symbol),
+            "asks": [[px, qty] for _, px, qty in asks if qty > _EPS][:n],
+            "bids": [[px, qty] for _, px, qty in bids if qty > _EPS][:n],
+            "timestamp": self._now_ms(),
+        }
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self._api("fetch_ohlcv")
+        path = self._path(symbol)
+        rows = path.bars_until(self.clock())
+        tf_sec = _TIMEFRAME_SEC.get(str(timeframe), path.bar_sec)
+        if rows and tf_sec > path.bar_sec:
+            df = pd.DataFrame(rows, columns=["ts", "open", "high", "low", "close", "volume"])
+            df["bucket"] = (df["ts"] // int(tf_sec * 1000)) * int(tf_sec * 1000)
+            agg = df.groupby("bucket", sort=True).agg(
+                open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last"), volume=("volume", "sum")
+            )
+            rows = [[int(ts), r.open, r.high, r.low, r.close, r.volume] for ts, r in agg.iterrows()]
+        if since is not None:
+            rows = [r for r in rows if r[0] >= int(since)]
+        if limit:
+            rows = rows[-int(limit):]
+        return rows
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        """Market prints: bar volume traded since `since` (pro rata), as one print."""
+        self._api("fetch_trades")
+        path = self._path(symbol)
+        now = self.clock()
+        since_s = float(since) / 1000.0 if since is not None else now - path.bar_sec
+        volume = path.volume_between(since_s, now)
+        if volume <= 0:
+            return []
+        return [{"timestamp": self._now_ms(), "symbol": self._ccxt(symbol), "amount": volume, "price": path.price_at(now)}]
+
+    def fetch_balance(self, params=None):
+        self._api("fetch_balance")
+        free = {c: b["free"] for c, b in self.balances.items()}
+        used = {c: b["used"] for c, b in self.balances.items()}
+        total = {c: b["free"] + b["used"] for c, b in self.balances.items()}
+        return {"free": free, "used": used, "total": total}
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self._api("create_order")
+        params = params or {}
+        symbol = self._ccxt(symbol)
+        self._path(symbol)
+        side = str(side).lower()
+        qty = float(amount or 0.0)
+        if self.reject_rate and self._rng.random() < self.reject_rate:
+            self.rejects += 1
+            raise SimOrderRejected("InvalidOrder: rejected by exchange (simulated)")
+        ioc = str(params.get("timeInForce", "")).upper() == "IOC"
+        if str(type).lower() == "market" or price is None:
+            # Market orders sweep the synthetic book and never rest.
+            _, levels = self._levels(symbol, "ask" if side == "buy" else "bid")
+            price = levels[-1][1]
+            ioc = True
+        price = float(price)
+        if qty <= 0 or price <= 0:
+            self.rejects += 1
+            raise SimOrderRejected(f"InvalidOrder: qty={qty} price={price}")
+        if qty * price < self.min_order_krw:
+            self.rejects += 1
+            raise SimOrderRejected(f"InvalidOrder: under_min_total ({qty * price:.0f} < {self.min_order_krw:.0f})")
+
+        base, quote = symbol.split("/")
+        if side == "buy":
+            ccy, need = quote, qty * price * (1.0 + self.fee_rate)
+        else:
+            ccy, need = base, qty
+        bal = self._balance(ccy)
+        if bal["free"] + 1e-9 < need:
+            self.rejects += 1
+            raise SimInsufficientFunds(f"InsufficientFunds: {ccy} free={bal['free']:.8f} need={need:.8f}")
+        bal["free"] -= need
+        bal["used"] += need
+
+        self._seq += 1
+        order = {
+            "id": f"sim-{self._seq}",
+            "symbol": symbol,
+            "type": "limit",
+            "side": side,
+            "price": price,
+            "amount": qty,
+            "filled": 0.0,
+            "cost": 0.0,
+            "fee": {"cost": 0.0, "currency": quote},
+            "status": "open",
+            "timestamp": self._now_ms(),
+            "datetime": datetime.fromtimestamp(self.clock()).isoformat(),
+            "_locked": need,
+        }
+        self._orders[order["id"]] = order
+        self._match(order)
+        if ioc and order["status"] == "open":
+            order["status"] = "canceled"
+            self._release(order)
+        return self._public(order)
+
+    def create_limit_buy_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, "limit", "buy", amount, price, params)
+
+    def create_limit_sell_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, "limit", "sell", amount, price, params)
+
+    def _order(self, order_id):
+        order = self._orders.get(order_id)
+        if order is None:
+            raise SimOrderNotFound(f"OrderNotFound: {order_id}")
+        return order
+
+    def cancel_order(self, order_id, symbol=None, params=None):
+        self._api("cancel_order")
+        order = self._order(order_id)
+        if order["status"] == "open":
+            order["status"] = "canceled"
+            self._release(order)
+        return self._public(order)
+
+    def fetch_order(self, order_id, symbol=None, params=None):
+        self._api("fetch_order")
+        return self._public(self._order(order_id))
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        self._api("fetch_open_orders")
+        symbol = self._ccxt(symbol) if symbol else None
+        return [
+            self._public(o)
+            for o in self._orders.values()
+            if o["status"] == "open" and (symbol is None or o["symbol"] == symbol)
+        ]
+
+    def fetch_my_trades(self, symbol=None, since=None, limit=None, params=None):
+        self._api("fetch_my_trades")
+        symbol = self._ccxt(symbol) if symbol else None
+        out = [
+            dict(t)
+            for t in self._trades
+            if (symbol is None or t["symbol"] == symbol) and (since is None or t["timestamp"] >= int(since))
+        ]
+        return out[-int(limit):] if limit else out
+
+    def get_fills(self, order_id):
+        self._api("get_fills")
+        return [dict(t) for t in self._fills.get(order_id, [])]
+
+    # ----- adapter surface -----
+    def health(self):
+        return {"status": self.status, "latency_ms": round(self.latency_sec * 1000.0, 2)}
+
+    def get_balances(self):
+        raw = self.fetch_balance()
+        return {
+            ccy: {"free": float(raw["free"][ccy]), "used": float(raw["used"][ccy]), "total": float(total)}
+            for ccy, total in raw["total"].items()
+            if total > _EPS
+        }
+
+    def get_open_orders(self):
+        return [
+            {
+                "id": o["id"],
+                "symbol": self._normalize_symbol(o["symbol"]),
+                "type": o["type"],
+                "side": o["side"],
+                "price": o["price"],
+                "amount": o["amount"],
+                "remaining": o["remaining"],
+                "created_at": o["datetime"],
+            }
+            for o in self.fetch_open_orders()
+        ]
+
+    def get_recent_fills(self, limit=20):
+        return [dict(t, symbol=self._normalize_symbol(t["symbol"])) for t in self._trades[-int(limit):]]
+
+    # ----- diagnostics -----
+    def equity(self, quote="KRW"):
+        """Mark-to-market value of all balances at the current mid."""
+        total = 0.0
+        for ccy, bal in self.balances.items():
+            qty = bal["free"] + bal["used"]
+            if ccy == quote:
+                total += qty
+            elif qty > _EPS and f"{ccy}/{quote}" in self.paths:
+                total += qty * self.mid(f"{ccy}/{quote}")
+        return total
+
+
+def run_sim_session(controller, sim, strategy=None, end_ts=None, step_sec=60.0):
+    """
+    Runs RunController.run() against `sim` until `end_ts` of simulated time.
+
+    The controller must be built with the simulator as adapter and
+    clock=sim.clock, sleep=sim.clock.sleep. Each main-loop pass is followed by
+    `step_sec` of simulated time and then strategy(controller, sim, now), which
+    may call controller.process_entry_signal / process_exit_signal.
+    """
+    end_ts = min(float(end_ts if end_ts is not None else sim.end_ts), sim.end_ts)
+    start_ts = sim.clock()
+    start_equity = sim.equity()
+    steps = 0
+    # The engine polls orders on the raw simulated sleep; only loop pauses step the session.
+    controller._ensure_execution_engine()
+    controller.loop_interval_sec = float(step_sec)
+
+    def _step(dt):
+        nonlocal steps
+        steps += 1
+        sim.clock.sleep(dt)
+        if sim.clock() >= end_ts:
+            controller.running = False
+            return
+        if strategy is not None:
+            strategy(controller, sim, sim.clock())
+
+    controller._sleep = _step
+    try:
+        controller.run()
+    finally:
+        controller._sleep = sim.clock.sleep
+    return {
+        "start_ts": start_ts,
+        "end_ts": sim.clock(),
+        "steps": steps,
+        "orders": len(sim._orders),
+        "trades": len(sim._trades),
+        "rejects": sim.rejects,
+        "rate_limited": sim.rate_limited,
+        "api_calls": sum(sim.calls.values()),
+        "start_equity": start_equity,
+        "equity": sim.equity(),
+    }
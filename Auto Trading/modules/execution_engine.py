@@ -3,17 +3,21 @@ import time
 import threading
 from datetime import datetime
 
-from .logger_utils import CsvLogger
+from .logger_utils import BufferedCsvLogger
+from .order_tracker import OrderTracker
+from .sliced_execution import SLICED_MODES, SlicedEntryExecutor, twap_slice_money
 
 logger = logging.getLogger("ExecutionEngine")
 
 # Global active symbol lock for race-safe entry blocking
 _ACTIVE_SYMBOLS = set()
 _ACTIVE_LOCK = threading.Lock()
+# Execution/shadow CSVs are rotated (and gzipped) past this size.
+LOG_ROTATE_BYTES = 64 * 1024 * 1024
 
 
 class ExecutionEngine:
-    def __init__(self, run_id, log_dir, budget_manager, notifier=None):
+    def __init__(self, run_id, log_dir, budget_manager, notifier=None, clock=time.time, sleep=time.sleep):
         self.run_id = run_id
         self.log_dir = log_dir
         self.budget_mgr = budget_manager
@@ -30,12 +34,43 @@ class ExecutionEngine:
         self.entry_timeout_sec = 10.0
         self.exit_timeout_sec = 3.0
         self.poll_interval_sec = 0.3
-        self.backoff_factor = 1.5
+        self.backoff_factor = 1.5  # OrderTracker poll-interval stretch on 429s
+        self.poll_age_growth = 1.25  # resting orders are polled less often as they age
+        self.poll_max_interval_sec = 2.0
         self.safe_cooldown_sec = 60
 
+        # Marketable-limit offsets (ticks through the touch); replay policies vary these.
+        self.entry_limit_offset_ticks = 2
+        self.exit_aggressive_ticks = 1
+        self.panic_aggressive_ticks = (3, 6, 10)
+
+        # Entry execution mode: SINGLE (one marketable limit) or sliced TWAP / POV.
+        # Signals may override with exec_mode / slices / slice_interval_sec / pov_rate.
+        self.entry_exec_mode = "SINGLE"
+        self.entry_slices = 4
+        self.entry_slice_interval_sec = 10.0
+        self.entry_pov_rate = 0.1
+        self.min_slice_krw = 5000.0  # exchange minimum order notional
+
         self._market_status_cache = {}
 
-        self.shadow_logger = CsvLogger(
+        # Optional OrderBookRecorder: persists every book fetched around entries/exits.
+        self.book_recorder = None
+        # Set on shutdown: sliced entries stop placing new slices.
+        self.draining = False
+
+        # One scheduler for every open order; RunController pumps it each tick.
+        self.order_tracker = OrderTracker(
+            clock=clock,
+            sleep=sleep,
+            max_interval_sec=self.poll_max_interval_sec,
+            rate_limit_backoff=self.backoff_factor,
+            is_rate_limit_error=self._is_rate_limit_error,
+        )
+
+        # Buffered: rows are queued and written by a background flusher, so bursts
+        # (panic exits, partial-fill floods) do not hit the disk on the trading thread.
+        self.shadow_logger = BufferedCsvLogger(
             f"{log_dir}/shadow_entries.csv",
             [
                 "timestamp",
@@ -49,8 +84,9 @@ class ExecutionEngine:
                 "chase_pct",
                 "target_money",
             ],
+            rotate_bytes=LOG_ROTATE_BYTES,
         )
-        self.exec_logger = CsvLogger(
+        self.exec_logger = BufferedCsvLogger(
             f"{log_dir}/execution_events.csv",
             [
                 "timestamp",
@@ -65,6 +101,7 @@ class ExecutionEngine:
                 "order_id",
                 "reason",
             ],
+            rotate_bytes=LOG_ROTATE_BYTES,
         )
 
     def _to_ccxt_symbol(self, symbol):
@@ -185,7 +222,7 @@ class ExecutionEngine:
 
     def _check_market_status(self, exchange_api, ccxt_symbol, force_refresh=False):
         cache_key = ccxt_symbol
-        now = time.time()
+        now = self.order_tracker.now()
         cached = self._market_status_cache.get(cache_key)
         if cached and (not force_refresh) and (now - cached["ts"] <= self.market_status_cache_ttl_sec):
             return cached
@@ -234,7 +271,7 @@ class ExecutionEngine:
         self._market_status_cache[cache_key] = status
         return status
 
-    def _fetch_orderbook(self, exchange_api, ccxt_symbol):
+    def _fetch_orderbook(self, exchange_api, ccxt_symbol, event="BOOK"):
         if not exchange_api or not hasattr(exchange_api, "fetch_order_book"):
             return None
         try:
@@ -243,6 +280,11 @@ class ExecutionEngine:
             return None
         if not ob or "asks" not in ob or "bids" not in ob:
             return None
+        if self.book_recorder is not None:
+            try:
+                self.book_recorder.record(ccxt_symbol, ob, event=event)
+            except Exception as e:
+                logger.warning("[BOOK] record failed %s", e)
         return ob
 
     def _simulate_buy_vwap(self, orderbook, target_money):
@@ -313,59 +355,98 @@ class ExecutionEngine:
             return None
         return exchange_api.fetch_order(order_id, ccxt_symbol)
 
-    def _poll_order(self, exchange_api, order_id, ccxt_symbol, max_time_sec, interval_sec, backoff_factor):
-        deadline = time.time() + max_time_sec
-        interval = max(0.05, interval_sec)
-        rate_limited = False
-        last_order = None
+    def _track_order(self, exchange_api, order_id, ccxt_symbol, timeout_sec, cancel_wait_sec, on_final):
+        """
+        Hands a placed order to the shared OrderTracker and returns its TrackedOrder at
+        once. On timeout the remainder is canceled and followed until the exchange
+        confirms; on_final(tracked) then fires once, from whichever thread pumps.
+        """
+
+        def _on_timeout(tracked):
+            if tracked.cancel_requested:
+                on_final(tracked)  # cancel never confirmed; settle on what filled
+            else:
+                self.order_tracker.cancel(tracked, wait_sec=cancel_wait_sec)
+
+        return self.order_tracker.track(
+            exchange_api,
+            order_id,
+            ccxt_symbol,
+            timeout_sec=timeout_sec,
+            interval_sec=self.poll_interval_sec,
+            growth=self.poll_age_growth,
+            on_fill=on_final,
+            on_cancel=on_final,
+            on_timeout=_on_timeout,
+        )
 
-        while time.time() < deadline:
+    def _order_done(self, exchange_api, symbol, ccxt_symbol, side, started_at, meta, on_done, release_symbol=False):
+        """on_final callback for _track_order: fills -> result, logged and booked, then on_done(result)."""
+
+        def _final(tracked):
             try:
-                order = self._fetch_order(exchange_api, order_id, ccxt_symbol)
-                if order:
-                    last_order = order
-                    status = str(order.get("status", "")).lower()
-                    amount = self._safe_float(order.get("amount"), 0.0)
-                    filled = self._safe_float(order.get("filled"), 0.0)
-                    if status in {"closed", "filled"}:
-                        return {"timeout": False, "order": order, "rate_limited": rate_limited}
-                    if amount > 0 and filled >= amount - 1e-12:
-                        return {"timeout": False, "order": order, "rate_limited": rate_limited}
-                    if status in {"canceled", "cancelled", "rejected", "expired"}:
-                        return {"timeout": False, "order": order, "rate_limited": rate_limited}
+                fills = self._fetch_fills(exchange_api, ccxt_symbol, tracked.order_id, start_ts=started_at)
+                agg = self._aggregate_fills(fills)
+                ok = agg["qty"] > 0.0
+                result = self._compose_result(
+                    ok,
+                    symbol,
+                    side,
+                    reason="FILLED" if ok else "NO_REAL_FILL",
+                    order_id=tracked.order_id,
+                    real_qty=agg["qty"],
+                    real_vwap=agg["vwap"],
+                    amount=agg["amount"],
+                    fee=agg["fee"],
+                    fills=agg["fills"],
+                    rate_limited=tracked.rate_limited,
+                    safe_cooldown=tracked.rate_limited,
+                    meta=meta,
+                )
+                self._book_result(result)
             except Exception as e:
-                if self._is_rate_limit_error(e):
-                    rate_limited = True
-                    interval = min(interval * backoff_factor, 5.0)
-                else:
-                    logger.warning("[ORDER] Poll error %s", e)
-            time.sleep(interval)
-
-        return {"timeout": True, "order": last_order, "rate_limited": rate_limited}
-
-    def _cancel_and_confirm(self, exchange_api, order_id, ccxt_symbol, wait_sec=3.0):
-        if not order_id:
-            return {"canceled": False, "order": None}
+                safe = self._is_rate_limit_error(e)
+                prefix = "ENTRY_ERROR" if side == "buy" else "SELL_ERROR"
+                result = self._compose_result(
+                    False, symbol, side, reason=f"{prefix}:{e}", order_id=tracked.order_id, rate_limited=safe, safe_cooldown=safe
+                )
+            finally:
+                if release_symbol:
+                    with _ACTIVE_LOCK:
+                        _ACTIVE_SYMBOLS.discard(symbol)
+            if on_done is not None:
+                on_done(result)
+
+        return _final
+
+    def _book_result(self, result):
+        """Execution log + budget update for a final result."""
+        self._log_execution(result)
+        if result["ok"] and hasattr(self.budget_mgr, "update_on_trade"):
+            self.budget_mgr.update_on_trade(result["side"], result["symbol"], result["real_vwap"], result["real_qty"], result["fee"])
+
+    def _sliced_done(self, result, on_done):
         try:
-            if hasattr(exchange_api, "cancel_order"):
-                exchange_api.cancel_order(order_id, ccxt_symbol)
-        except Exception:
-            pass
-
-        deadline = time.time() + max(wait_sec, 0.5)
-        last_order = None
-        while time.time() < deadline:
-            try:
-                order = self._fetch_order(exchange_api, order_id, ccxt_symbol)
-                if order:
-                    last_order = order
-                    status = str(order.get("status", "")).lower()
-                    if status in {"canceled", "cancelled", "closed", "filled", "rejected", "expired"}:
-                        return {"canceled": status in {"canceled", "cancelled"}, "order": order}
-            except Exception:
-                pass
-            time.sleep(0.25)
-        return {"canceled": False, "order": last_order}
+            self._book_result(result)
+        finally:
+            with _ACTIVE_LOCK:
+                _ACTIVE_SYMBOLS.discard(result.get("symbol"))
+        if on_done is not None:
+            on_done(result)
+
+    def _await(self, submit):
+        """
+        Blocking form of a submit_* call (tools, replay, panic exit, web test orders):
+        submit(on_done) is pumped through the tracker until its result is in.
+        """
+        box = []
+        pending = submit(box.append)
+        if isinstance(pending, dict):
+            return pending
+        self.order_tracker.wait(until=lambda: bool(box))
+        if box:
+            return box[0]
+        return self._compose_result(False, None, None, reason="ORDER_UNSETTLED", order_id=getattr(pending, "order_id", None))
 
     def _fetch_fills(self, exchange_api, ccxt_symbol, order_id, start_ts):
         fills = []
@@ -476,6 +557,14 @@ class ExecutionEngine:
             pass
 
     def execute_entry(self, signal, current_market_data, exchange_api=None):
+        return self._await(lambda on_done: self.submit_entry(signal, current_market_data, exchange_api=exchange_api, on_done=on_done))
+
+    def submit_entry(self, signal, current_market_data, exchange_api=None, on_done=None):
+        """
+        Runs the entry gates and places the order without waiting on it.
+        Returns the result dict when the entry ends here (gate block, reject, error),
+        else the resting order's TrackedOrder; on_done(result) fires once it settles.
+        """
         symbol = signal.get("symbol")
         if not symbol:
             return self._compose_result(False, symbol, "buy", reason="EMPTY_SYMBOL")
@@ -485,6 +574,7 @@ class ExecutionEngine:
                 return self._compose_result(False, symbol, "buy", reason="ACTIVE_SYMBOL_LOCK")
             _ACTIVE_SYMBOLS.add(symbol)
 
+        pending = None
         try:
             target_money = self._safe_float(signal.get("target_money"), 0.0)
             if target_money <= 0:
@@ -520,11 +610,19 @@ class ExecutionEngine:
             if not market_ok.get("ok", False):
                 return self._compose_result(False, symbol, "buy", reason=market_ok.get("reason", "MARKET_BLOCK"))
 
-            orderbook = self._fetch_orderbook(exchange_api, ccxt_symbol)
+            exec_mode = str(signal.get("exec_mode") or self.entry_exec_mode or "SINGLE").upper()
+            sliced = exec_mode in SLICED_MODES
+
+            orderbook = self._fetch_orderbook(exchange_api, ccxt_symbol, event="ENTRY")
             if not orderbook:
                 return self._compose_result(False, symbol, "buy", reason="ORDERBOOK_UNAVAILABLE")
 
-            sim = self._simulate_buy_vwap(orderbook, target_money)
+            # A sliced entry only takes its first slice from this book; later slices
+            # re-check against the arrival ask.
+            gate_money = target_money
+            if sliced:
+                gate_money = twap_slice_money(target_money, signal.get("slices") or self.entry_slices)
+            sim = self._simulate_buy_vwap(orderbook, gate_money)
             if not sim.get("ok", False):
                 return self._compose_result(False, symbol, "buy", reason=sim.get("reason", "SIM_FAIL"))
 
@@ -538,9 +636,27 @@ class ExecutionEngine:
                     meta={"slippage_pct": sim["slippage_pct"], "projected_vwap": sim["projected_vwap"], "best_ask": sim["best_ask"]},
                 )
 
+            if sliced:
+                job = SlicedEntryExecutor(self)
+                started = job.start(
+                    signal,
+                    symbol,
+                    ccxt_symbol,
+                    target_money,
+                    exchange_api,
+                    exec_mode,
+                    lambda result: self._sliced_done(result, on_done),
+                    orderbook=orderbook,
+                )
+                if isinstance(started, dict):
+                    self._book_result(started)
+                    return started
+                pending = started
+                return pending
+
             best_ask = sim["best_ask"]
             tick = self.get_tick_size(best_ask)
-            limit_price = self.round_to_tick(best_ask + (2.0 * tick), tick, side="buy")
+            limit_price = self.round_to_tick(best_ask + (float(self.entry_limit_offset_ticks) * tick), tick, side="buy")
             if limit_price <= 0:
                 return self._compose_result(False, symbol, "buy", reason="INVALID_LIMIT_PRICE")
 
@@ -550,59 +666,23 @@ class ExecutionEngine:
             if qty <= 0:
                 return self._compose_result(False, symbol, "buy", reason="INVALID_ORDER_QTY")
 
-            order_started_at = time.time()
+            order_started_at = self.order_tracker.now()
             order = self._submit_limit_order(exchange_api, ccxt_symbol, "buy", qty, limit_price, params={})
             order_id = (order or {}).get("id")
             if not order_id:
                 return self._compose_result(False, symbol, "buy", reason="ORDER_ID_MISSING")
 
-            polled = self._poll_order(
-                exchange_api,
-                order_id,
-                ccxt_symbol,
-                max_time_sec=self.entry_timeout_sec,
-                interval_sec=self.poll_interval_sec,
-                backoff_factor=self.backoff_factor,
-            )
-            safe_cooldown = bool(polled.get("rate_limited", False))
-
-            if polled.get("timeout", False):
-                self._cancel_and_confirm(exchange_api, order_id, ccxt_symbol, wait_sec=3.0)
-
-            fills = self._fetch_fills(exchange_api, ccxt_symbol, order_id, start_ts=order_started_at)
-            agg = self._aggregate_fills(fills)
-
-            real_qty = agg["qty"]
-            real_vwap = agg["vwap"]
-            amount = agg["amount"]
-            fee = agg["fee"]
-            ok = real_qty > 0.0
-
-            result = self._compose_result(
-                ok,
-                symbol,
-                "buy",
-                reason="FILLED" if ok else "NO_REAL_FILL",
-                order_id=order_id,
-                real_qty=real_qty,
-                real_vwap=real_vwap,
-                amount=amount,
-                fee=fee,
-                fills=agg["fills"],
-                rate_limited=polled.get("rate_limited", False),
-                safe_cooldown=safe_cooldown,
-                meta={
-                    "limit_price": limit_price,
-                    "best_ask": best_ask,
-                    "projected_vwap": sim["projected_vwap"],
-                    "slippage_pct": sim["slippage_pct"],
-                },
+            meta = {
+                "limit_price": limit_price,
+                "best_ask": best_ask,
+                "projected_vwap": sim["projected_vwap"],
+                "slippage_pct": sim["slippage_pct"],
+            }
+            on_final = self._order_done(
+                exchange_api, symbol, ccxt_symbol, "buy", order_started_at, meta, on_done, release_symbol=True
             )
-            self._log_execution(result)
-
-            if result["ok"] and hasattr(self.budget_mgr, "update_on_trade"):
-                self.budget_mgr.update_on_trade("buy", symbol, result["real_vwap"], result["real_qty"], result["fee"])
-            return result
+            pending = self._track_order(exchange_api, order_id, ccxt_symbol, self.entry_timeout_sec, 3.0, on_final)
+            return pending
 
         except Exception as e:
             safe = self._is_rate_limit_error(e)
@@ -615,12 +695,14 @@ class ExecutionEngine:
                 safe_cooldown=safe,
             )
         finally:
-            with _ACTIVE_LOCK:
-                _ACTIVE_SYMBOLS.discard(symbol)
+            # A resting order keeps the symbol locked until its callback settles it.
+            if pending is None:
+                with _ACTIVE_LOCK:
+                    _ACTIVE_SYMBOLS.discard(symbol)
 
-    def get_best_bid_ask(self, symbol, exchange_api):
+    def get_best_bid_ask(self, symbol, exchange_api, event="QUOTE"):
         ccxt_symbol = self._to_ccxt_symbol(symbol)
-        orderbook = self._fetch_orderbook(exchange_api, ccxt_symbol)
+        orderbook = self._fetch_orderbook(exchange_api, ccxt_symbol, event=event)
         if not orderbook:
             return {"ok": False, "reason": "ORDERBOOK_UNAVAILABLE"}
         bids = orderbook.get("bids", [])
@@ -632,16 +714,24 @@ class ExecutionEngine:
         return {"ok": True, "best_bid": best_bid, "best_ask": best_ask, "orderbook": orderbook}
 
     def create_market_sell_order(self, symbol, qty, exchange_api=None, event_type="EXIT", position_id=None):
+        return self._await(
+            lambda on_done: self.submit_market_sell_order(
+                symbol, qty, exchange_api=exchange_api, event_type=event_type, position_id=position_id, on_done=on_done
+            )
+        )
+
+    def submit_market_sell_order(self, symbol, qty, exchange_api=None, event_type="EXIT", position_id=None, on_done=None):
         # Compatibility method: implemented as marketable-limit sell (never true market).
-        return self.create_marketable_limit_sell_order(
+        return self.submit_marketable_limit_sell_order(
             symbol=symbol,
             qty=qty,
             exchange_api=exchange_api,
-            aggressive_ticks=1,
+            aggressive_ticks=self.exit_aggressive_ticks,
             timeout_sec=self.exit_timeout_sec,
             params=None,
             event_type=event_type,
             position_id=position_id,
+            on_done=on_done,
         )
 
     def create_marketable_limit_sell_order(
@@ -656,6 +746,35 @@ class ExecutionEngine:
         event_type="EXIT",
         position_id=None,
     ):
+        return self._await(
+            lambda on_done: self.submit_marketable_limit_sell_order(
+                symbol,
+                qty,
+                exchange_api=exchange_api,
+                aggressive_ticks=aggressive_ticks,
+                timeout_sec=timeout_sec,
+                params=params,
+                force_refresh_market=force_refresh_market,
+                event_type=event_type,
+                position_id=position_id,
+                on_done=on_done,
+            )
+        )
+
+    def submit_marketable_limit_sell_order(
+        self,
+        symbol,
+        qty,
+        exchange_api=None,
+        aggressive_ticks=1,
+        timeout_sec=3.0,
+        params=None,
+        force_refresh_market=False,
+        event_type="EXIT",
+        position_id=None,
+        on_done=None,
+    ):
+        """Non-blocking sell; same return contract as submit_entry."""
         qty = self._clamp_positive(qty, 0.0)
         if qty <= 0:
             return self._compose_result(False, symbol, "sell", reason="INVALID_QTY")
@@ -666,7 +785,7 @@ class ExecutionEngine:
             if not market_ok.get("ok", False):
                 return self._compose_result(False, symbol, "sell", reason=market_ok.get("reason", "MARKET_BLOCK"))
 
-            ba = self.get_best_bid_ask(symbol, exchange_api)
+            ba = self.get_best_bid_ask(symbol, exchange_api, event=event_type)
             if not ba.get("ok", False):
                 return self._compose_result(False, symbol, "sell", reason=ba.get("reason", "BID_UNAVAILABLE"))
 
@@ -677,56 +796,20 @@ class ExecutionEngine:
             if limit_price <= 0:
                 return self._compose_result(False, symbol, "sell", reason="INVALID_LIMIT_PRICE")
 
-            order_started_at = time.time()
+            order_started_at = self.order_tracker.now()
             order = self._submit_limit_order(exchange_api, ccxt_symbol, "sell", qty, limit_price, params=params or {})
             order_id = (order or {}).get("id")
             if not order_id:
                 return self._compose_result(False, symbol, "sell", reason="ORDER_ID_MISSING")
 
-            polled = self._poll_order(
-                exchange_api,
-                order_id,
-                ccxt_symbol,
-                max_time_sec=max(0.5, timeout_sec),
-                interval_sec=self.poll_interval_sec,
-                backoff_factor=self.backoff_factor,
-            )
-            safe_cooldown = bool(polled.get("rate_limited", False))
-            if polled.get("timeout", False):
-                self._cancel_and_confirm(exchange_api, order_id, ccxt_symbol, wait_sec=2.0)
-
-            fills = self._fetch_fills(exchange_api, ccxt_symbol, order_id, start_ts=order_started_at)
-            agg = self._aggregate_fills(fills)
-            real_qty = agg["qty"]
-            real_vwap = agg["vwap"]
-            amount = agg["amount"]
-            fee = agg["fee"]
-
-            result = self._compose_result(
-                real_qty > 0.0,
-                symbol,
-                "sell",
-                reason="FILLED" if real_qty > 0 else "NO_REAL_FILL",
-                order_id=order_id,
-                real_qty=real_qty,
-                real_vwap=real_vwap,
-                amount=amount,
-                fee=fee,
-                fills=agg["fills"],
-                rate_limited=polled.get("rate_limited", False),
-                safe_cooldown=safe_cooldown,
-                meta={
-                    "limit_price": limit_price,
-                    "best_bid": best_bid,
-                    "event_type": event_type,
-                    "position_id": str(position_id) if position_id is not None else "",
-                },
-            )
-            self._log_execution(result)
-
-            if result["ok"] and hasattr(self.budget_mgr, "update_on_trade"):
-                self.budget_mgr.update_on_trade("sell", symbol, result["real_vwap"], result["real_qty"], result["fee"])
-            return result
+            meta = {
+                "limit_price": limit_price,
+                "best_bid": best_bid,
+                "event_type": event_type,
+                "position_id": str(position_id) if position_id is not None else "",
+            }
+            on_final = self._order_done(exchange_api, symbol, ccxt_symbol, "sell", order_started_at, meta, on_done)
+            return self._track_order(exchange_api, order_id, ccxt_symbol, max(0.5, timeout_sec), 2.0, on_final)
         except Exception as e:
             safe = self._is_rate_limit_error(e)
             return self._compose_result(
@@ -771,12 +854,13 @@ class ExecutionEngine:
 
         remaining = qty
         legs = []
+        ticks_first, ticks_second, ticks_ioc = self.panic_aggressive_ticks
 
         first = self.create_marketable_limit_sell_order(
             symbol=symbol,
             qty=remaining,
             exchange_api=exchange_api,
-            aggressive_ticks=3,
+            aggressive_ticks=ticks_first,
             timeout_sec=3.0,
             params=None,
             force_refresh_market=False,
@@ -789,7 +873,7 @@ class ExecutionEngine:
                 symbol=symbol,
                 qty=remaining,
                 exchange_api=exchange_api,
-                aggressive_ticks=6,
+                aggressive_ticks=ticks_second,
                 timeout_sec=3.0,
                 params=None,
                 force_refresh_market=False,
@@ -812,7 +896,7 @@ class ExecutionEngine:
                 symbol=symbol,
                 qty=remaining,
                 exchange_api=exchange_api,
-                aggressive_ticks=10,
+                aggressive_ticks=ticks_ioc,
                 timeout_sec=2.0,
                 params={"timeInForce": "IOC"},
                 force_refresh_market=False,
@@ -851,6 +935,21 @@ class ExecutionEngine:
             meta={"remaining_qty": remaining, "legs": legs, "halted": False},
         )
 
+    def drain(self):
+        """Shutdown: stop new slices and let open orders settle (fill or cancel)."""
+        self.draining = True
+        self.order_tracker.wait()
+
+    def close(self):
+        """Flushes buffered logs and the order book recorder (call on shutdown)."""
+        for log in (self.shadow_logger, self.exec_logger):
+            try:
+                log.close()
+            except Exception as e:
+                logger.warning("[LOG] close failed %s", e)
+        if self.book_recorder is not None:
+            self.book_recorder.close()
+
     def log_shadow(self, data):
         try:
             self.shadow_logger.log(data)
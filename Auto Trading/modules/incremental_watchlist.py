@@ -0,0 +1,179 @@
+"""
+Incremental last-bar analysis for the web watchlist.
+
+compute_watchlist only reads the last two analyzed rows of every symbol, but
+Strategy.analyze walks the whole history (rolling indicators plus the
+anti-chase/re-entry state machine). IncrementalWatchlist keeps, per symbol:
+
+  - the parquet (mtime, size) stamp: unchanged files are not even re-read
+  - a state-machine checkpoint taken before the last RECOMPUTE_BARS bars
+  - the analyzed last two rows
+
+When a file changes (new bar, or the forming bar updated) only a tail of
+`warmup + new bars` is analyzed, resuming the state machine from the
+checkpoint. The rolling windows are rebuilt from the warmup rows, so the rows
+match a full-history analyze up to float rounding in the rolling sums. A
+params change, a rewritten history or a shorter file falls back to a full pass.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("IncrementalWatchlist")
+
+_OHLCV = ["open", "high", "low", "close", "volume"]
+# The forming bar, the last closed bar, and the bar whose state the *_exec
+# columns of the last closed bar are shifted from.
+RECOMPUTE_BARS = 3
+# Window lengths Strategy.analyze reads (param name, default).
+_WINDOW_PARAMS = [
+    ("breakout_days_A", 7),
+    ("breakout_days", 7),
+    ("trend_ma_fast_B", 20),
+    ("trend_ma_slow_B", 60),
+    ("cooling_box_lookback", 5),
+]
+
+
+def warmup_bars(params):
+    longest = 20  # vol_ma20 / atr14 / rsi14 + 3-bar pullback window
+    for name, default in _WINDOW_PARAMS:
+        try:
+            longest = max(longest, int((params or {}).get(name, default)))
+        except (TypeError, ValueError):
+            longest = max(longest, default)
+    return 2 * longest + 10
+
+
+class IncrementalWatchlist:
+    def __init__(self, data_dir="data", min_rows=100, strategy=None):
+        self.data_dir = data_dir
+        self.min_rows = int(min_rows)
+        self._strategy = strategy
+        self._entries = {}
+        self._params_key = None
+        self._lock = threading.Lock()
+        self.stats = {"reused": 0, "incremental": 0, "full": 0, "removed": 0}
+
+    @property
+    def strategy(self):
+        if self._strategy is None:
+            from strategy import Strategy
+            self._strategy = Strategy()
+        return self._strategy
+
+    def refresh(self, params):
+        """{symbol: last two analyzed rows} for every usable parquet in data_dir."""
+        params = dict(params or {})
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        with self._lock:
+            if params_key != self._params_key:
+                self._entries.clear()
+                self._params_key = params_key
+            seen = set()
+            out = {}
+            for path in glob.glob(os.path.join(self.data_dir, "*.parquet")):
+                sym = os.path.basename(path).replace(".parquet", "")
+                if sym.upper().startswith("GLOBAL_BTC"):
+                    continue
+                seen.add(sym)
+                rows = self._refresh_symbol(sym, path, params)
+                if rows is not None:
+                    out[sym] = rows
+            for sym in set(self._entries) - seen:
+                self._entries.pop(sym, None)
+                self.stats["removed"] += 1
+            return out
+
+    def _refresh_symbol(self, sym, path, params):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._entries.pop(sym, None)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(sym)
+        if entry is not None and entry["stamp"] == stamp:
+            self.stats["reused"] += 1
+            return entry["rows"]
+
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            self._entries.pop(sym, None)
+            return None
+        if df.empty or len(df) <= self.min_rows:
+            # Same cut as data_loader.load_data_map.
+            self._entries[sym] = {"stamp": stamp, "rows": None, "ckpt_idx": None}
+            return None
+
+        n = len(df)
+        ckpt_idx = n - RECOMPUTE_BARS
+        try:
+            if entry is not None and self._prefix_matches(entry, df):
+                analyzed, checkpoint, offset = self._analyze_tail(df, entry, ckpt_idx, params)
+                self.stats["incremental"] += 1
+            else:
+                analyzed = self.strategy.analyze(df, params=params, anti_chase_checkpoint=ckpt_idx)
+                checkpoint, offset = analyzed.attrs.get("anti_chase_checkpoint"), 0
+                self.stats["full"] += 1
+        except Exception as e:
+            logger.debug(f"[WATCH] analyze failed for {sym}: {e}")
+            self._entries.pop(sym, None)
+            return None
+
+        rows = analyzed.iloc[-2:].copy()
+        rows.attrs = {}
+        self._entries[sym] = {
+            "stamp": stamp,
+            "rows": rows,
+            "ckpt_idx": ckpt_idx,
+            "ckpt_state": self._to_absolute(checkpoint, offset),
+            "ckpt_bar": self._bar_key(df, ckpt_idx - 1),
+            "first_bar": self._bar_key(df, 0),
+        }
+        return rows
+
+    @staticmethod
+    def _bar_key(df, idx):
+        if idx < 0:
+            return None
+        row = df.iloc[idx]
+        return tuple([str(row.name)] + [float(row.get(c, np.nan)) for c in _OHLCV])
+
+    def _prefix_matches(self, entry, df):
+        ckpt_idx = entry.get("ckpt_idx")
+        if ckpt_idx is None or entry.get("ckpt_state") is None or len(df) < ckpt_idx + RECOMPUTE_BARS:
+            return False
+        # The checkpoint stands for bars [0, ckpt_idx): its ends must be unchanged.
+        return self._bar_key(df, ckpt_idx - 1) == entry["ckpt_bar"] and self._bar_key(df, 0) == entry["first_bar"]
+
+    def _analyze_tail(self, df, entry, new_ckpt_idx, params):
+        ckpt_idx = entry["ckpt_idx"]
+        offset = max(0, ckpt_idx - warmup_bars(params))
+        seed = dict(entry["ckpt_state"])
+        if seed["cooling_start_idx"] >= 0:
+            # Older cooling starts are clamped; the box never looks back past the warmup rows.
+            seed["cooling_start_idx"] = max(0, seed["cooling_start_idx"] - offset)
+        analyzed = self.strategy.analyze(
+            df.iloc[offset:],
+            params=params,
+            anti_chase_seed=seed,
+            anti_chase_start=ckpt_idx - offset,
+            anti_chase_checkpoint=new_ckpt_idx - offset,
+        )
+        return analyzed, analyzed.attrs.get("anti_chase_checkpoint"), offset
+
+    @staticmethod
+    def _to_absolute(checkpoint, offset):
+        if checkpoint is None:
+            return None
+        state = dict(checkpoint)
+        if state.get("cooling_start_idx", -1) >= 0:
+            state["cooling_start_idx"] = int(state["cooling_start_idx"]) + offset
+        return state
@@ -0,0 +1,255 @@
+"""
+Persistent job queue for web_backend labs/data work.
+
+Jobs are submitted by type; each registered type names a resource class
+("cpu" for tuning/backtests, "io" for market-data fetches) and every class has
+its own concurrency limit. Within a class the highest priority runs first,
+FIFO among equals. A submission of a type that is already queued or running
+returns the existing record instead of piling up duplicates.
+
+Records (QUEUED -> RUNNING -> DONE | FAILED | CANCELLED) are written to
+results/labs/job_queue.json on every transition. On restart, jobs that were
+RUNNING are marked FAILED ("interrupted") and QUEUED jobs are queued again,
+so job arguments must be JSON-serializable.
+
+Cancellation is cooperative: a queued job is dropped at once, a running job is
+flagged and stops at its next check_cancelled() call (job runners call it from
+their progress reporting).
+"""
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from .utils_json import safe_json_dump, safe_json_load
+
+QUEUE_SCHEMA_VERSION = 1
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+DEFAULT_LIMITS = {"cpu": 1, "io": 1}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, path="results/labs/job_queue.json", limits=None, history=200, autostart=True):
+        self.path = Path(path)
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.history = int(history)
+        self.autostart = bool(autostart)
+        self._lock = threading.RLock()
+        self._types = {}
+        self._jobs = {}  # job_id -> record, insertion ordered
+        self._seq = 0
+        self._loaded = False
+
+    def register(self, job_type, fn, resource="cpu", priority=0, id_prefix=None):
+        """`fn(*args, job_id=...)` runs on a worker thread; raising marks the job FAILED."""
+        if resource not in self.limits:
+            raise ValueError(f"Unknown resource class: {resource}")
+        self._types[job_type] = {
+            "fn": fn,
+            "resource": resource,
+            "priority": int(priority),
+            "prefix": id_prefix or job_type,
+        }
+
+    # ----- persistence -----
+    def _save(self):
+        finished = [j for j in self._jobs.values() if j["status"] not in ACTIVE_STATES]
+        for old in finished[: max(0, len(finished) - self.history)]:
+            self._jobs.pop(old["job_id"], None)
+        records = [{k: v for k, v in j.items() if not k.startswith("_")} for j in self._jobs.values()]
+        try:
+            safe_json_dump({"jobs": records}, self.path, indent=2, schema_version=QUEUE_SCHEMA_VERSION)
+        except Exception:
+            pass
+
+    def load(self):
+        """Restores records from disk once; re-queues QUEUED jobs and fails interrupted ones."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            data = safe_json_load(self.path, default=None, schema_version=QUEUE_SCHEMA_VERSION, repair=True)
+            now = datetime.now().isoformat()
+            for rec in (data or {}).get("jobs") or []:
+                if not isinstance(rec, dict) or not rec.get("job_id"):
+                    continue
+                if rec.get("status") == RUNNING:
+                    rec.update(status=FAILED, ended_at=now, error="interrupted by backend restart")
+                elif rec.get("status") == QUEUED and rec.get("job_type") not in self._types:
+                    rec.update(status=CANCELLED, ended_at=now, error="job type no longer registered")
+                rec["_cancel"] = False
+                self._jobs[rec["job_id"]] = rec
+                self._seq = max(self._seq, int(rec.get("seq") or 0))
+            self._save()
+        self._dispatch()
+
+    # ----- submission / control -----
+    def submit(self, job_type, args=(), priority=None, source="api"):
+        """Queues a job; returns (record, created). An active job of the same type is returned as-is."""
+        spec = self._types.get(job_type)
+        if spec is None:
+            raise ValueError(f"Unsupported job type: {job_type}")
+        self.load()
+        with self._lock:
+            for rec in self._jobs.values():
+                if rec["job_type"] == job_type and rec["status"] in ACTIVE_STATES:
+                    if priority is not None and rec["status"] == QUEUED and int(priority) > rec["priority"]:
+                        rec["priority"] = int(priority)
+                        self._save()
+                    return self._public(rec), False
+            self._seq += 1
+            job_id = f"{spec['prefix']}_{int(time.time() * 1000)}"
+            if job_id in self._jobs:
+                job_id = f"{job_id}_{self._seq}"
+            rec = {
+                "job_id": job_id,
+                "job_type": job_type,
+                "resource": spec["resource"],
+                "priority": spec["priority"] if priority is None else int(priority),
+                "seq": self._seq,
+                "source": source,
+                "status": QUEUED,
+                "args": list(args),
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "ended_at": None,
+                "progress_pct": 0.0,
+                "message": "queued",
+                "error": None,
+                "cancel_requested": False,
+                "_cancel": False,
+            }
+            self._jobs[job_id] = rec
+            self._save()
+        self._dispatch()
+        return self.get(job_id), True
+
+    def cancel(self, job_id):
+        """Returns the updated record, or None for unknown/finished jobs."""
+        with self._lock:
+            rec = self._jobs.get(job_id)
+            if rec is None or rec["status"] not in ACTIVE_STATES:
+                return None
+            if rec["status"] == QUEUED:
+                rec.update(status=CANCELLED, ended_at=datetime.now().isoformat(), message="cancelled before start")
+            else:
+                rec["cancel_requested"] = True
+                rec["_cancel"] = True
+                rec["message"] = "cancel requested"
+            self._save()
+            return self._public(rec)
+
+    def report(self, job_id, progress_pct=None, message=None):
+        with self._lock:
+            rec = self._jobs.get(job_id)
+            if rec is None or rec["status"] != RUNNING:
+                return
+            if progress_pct is not None:
+                rec["progress_pct"] = max(0.0, min(100.0, float(progress_pct)))
+            if message is not None:
+                rec["message"] = str(message)
+            rec["updated_at"] = datetime.now().isoformat()
+            self._save()
+
+    def check_cancelled(self, job_id):
+        with self._lock:
+            rec = self._jobs.get(job_id)
+            cancelled = bool(rec and rec.get("_cancel"))
+        if cancelled:
+            raise JobCancelled(f"job {job_id} cancelled")
+
+    # ----- queries -----
+    @staticmethod
+    def _public(rec):
+        return {k: v for k, v in rec.items() if not k.startswith("_")}
+
+    def get(self, job_id):
+        with self._lock:
+            rec = self._jobs.get(job_id)
+            return self._public(rec) if rec else None
+
+    def jobs(self, status=None, job_types=None, limit=50):
+        with self._lock:
+            out = [
+                self._public(r)
+                for r in reversed(list(self._jobs.values()))
+                if (status is None or r["status"] in status)
+                and (job_types is None or r["job_type"] in job_types)
+            ]
+        return out[: max(0, int(limit))]
+
+    def active(self, job_types=None):
+        """Queued and running jobs, running first, then in dispatch order."""
+        rows = self.jobs(status=ACTIVE_STATES, job_types=job_types, limit=10_000)
+        rows.sort(key=lambda r: (r["status"] != RUNNING, -r["priority"], r["seq"]))
+        return rows
+
+    def summary(self):
+        with self._lock:
+            classes = {}
+            for name, limit in self.limits.items():
+                classes[name] = {"limit": limit, "running": 0, "queued": 0}
+            for r in self._jobs.values():
+                if r["status"] in ACTIVE_STATES and r["resource"] in classes:
+                    classes[r["resource"]]["running" if r["status"] == RUNNING else "queued"] += 1
+        return {"classes": classes, "active": self.active(), "recent": self.jobs(limit=20)}
+
+    # ----- execution -----
+    def _dispatch(self):
+        if not self.autostart:
+            return
+        with self._lock:
+            started = []
+            for resource, limit in self.limits.items():
+                running = sum(1 for r in self._jobs.values() if r["resource"] == resource and r["status"] == RUNNING)
+                queued = sorted(
+                    (r for r in self._jobs.values() if r["resource"] == resource and r["status"] == QUEUED),
+                    key=lambda r: (-r["priority"], r["seq"]),
+                )
+                for rec in queued[: max(0, limit - running)]:
+                    rec.update(status=RUNNING, started_at=datetime.now().isoformat(), message="running")
+                    started.append(rec)
+            if started:
+                self._save()
+        for rec in started:
+            try:
+                threading.Thread(target=self._run, args=(rec,), daemon=True, name=f"job-{rec['job_id']}").start()
+            except Exception as e:
+                self._finish(rec, FAILED, error=f"thread start failed: {e}")
+
+    def _run(self, rec):
+        spec = self._types[rec["job_type"]]
+        try:
+            spec["fn"](*rec["args"], job_id=rec["job_id"])
+        except JobCancelled:
+            self._finish(rec, CANCELLED)
+        except Exception as e:
+            self._finish(rec, FAILED, error=str(e), trace=traceback.format_exc())
+        else:
+            self._finish(rec, CANCELLED if rec.get("_cancel") else DONE)
+
+    def _finish(self, rec, status, error=None, trace=None):
+        with self._lock:
+            # Runners that swallow their own exceptions still end up CANCELLED when flagged.
+            if rec.get("_cancel"):
+                status = CANCELLED
+            rec.update(status=status, ended_at=datetime.now().isoformat(), error=error)
+            if status == DONE:
+                rec["progress_pct"] = 100.0
+            if trace:
+                rec["trace"] = trace
+            self._save()
+        self._dispatch()
@@ -1,5 +1,12 @@
+import atexit
 import csv
+import gzip
+import io
 import os
+import shutil
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
 class CsvLogger:
@@ -31,6 +38,211 @@ class CsvLogger:
         except Exception as e:
             print(f"[LoggerError] Failed to write to {self.filepath}: {e}")
 
+class BufferedCsvLogger(CsvLogger):
+    """
+    CsvLogger that keeps file I/O off the caller's thread.
+
+    log() only formats the row and appends it to a bounded in-memory queue; a
+    background thread writes batches when `flush_rows` are queued, every
+    `flush_interval_sec`, and on close()/interpreter exit. A full queue is
+    flushed inline (backpressure) rather than dropping rows.
+
+    Durability:
+      - each batch is one os.write() of whole lines to an O_APPEND fd, and a
+        torn last line left by a crash is truncated when the file is reopened;
+      - the file is fsynced before rotation.
+    Rotation: by size (`rotate_bytes`) and/or calendar day (`rotate_daily`);
+    rotated files are gzip-compressed. An existing file whose header differs
+    from `headers` is rotated aside instead of being appended to.
+    """
+
+    def __init__(
+        self,
+        filepath,
+        headers,
+        flush_rows=256,
+        flush_interval_sec=1.0,
+        max_queue=10000,
+        rotate_bytes=None,
+        rotate_daily=False,
+        compress=True,
+        clock=time.time,
+    ):
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_sec = float(flush_interval_sec)
+        self.max_queue = max(self.flush_rows, int(max_queue))
+        self.rotate_bytes = int(rotate_bytes) if rotate_bytes else None
+        self.rotate_daily = bool(rotate_daily)
+        self.compress = bool(compress)
+        self._clock = clock
+        self._queue = deque()
+        self._queue_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._fd = None
+        self._size = 0
+        self._day = None
+        # Counters (exposed for diagnostics/tests)
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rotations = 0
+        self.inline_flushes = 0
+        super().__init__(filepath, headers)
+        self._thread = threading.Thread(target=self._run, name=f"csvlog:{os.path.basename(filepath)}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ----- file management -----
+    def _header_line(self):
+        buf = io.StringIO()
+        csv.writer(buf).writerow(self.headers)
+        return buf.getvalue()
+
+    def _ensure_file(self):
+        dirname = os.path.dirname(self.filepath)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with self._io_lock:
+            self._open_locked()
+
+    def _open_locked(self):
+        if os.path.exists(self.filepath):
+            self._repair_torn_tail()
+            with open(self.filepath, "r", newline="", encoding="utf-8") as f:
+                existing = f.readline()
+            if existing and existing != self._header_line():
+                # Schema changed: never mix two layouts in one file.
+                self._rotate_locked(suffix="schema")
+        new_file = not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0
+        self._fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if new_file:
+            os.write(self._fd, self._header_line().encode("utf-8"))
+        self._size = os.fstat(self._fd).st_size
+        self._day = datetime.fromtimestamp(self._clock()).strftime("%Y%m%d")
+
+    def _repair_torn_tail(self):
+        size = os.path.getsize(self.filepath)
+        if size == 0:
+            return
+        with open(self.filepath, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            # Walk back to the last complete line and drop the half-written row.
+            pos = size
+            chunk = 4096
+            keep = 0
+            while pos > 0:
+                start = max(0, pos - chunk)
+                f.seek(start)
+                data = f.read(pos - start)
+                idx = data.rfind(b"\n")
+                if idx >= 0:
+                    keep = start + idx + 1
+                    break
+                pos = start
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rotate_locked(self, suffix=None):
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if not os.path.exists(self.filepath):
+            return
+        root, ext = os.path.splitext(self.filepath)
+        stamp = datetime.fromtimestamp(self._clock()).strftime("%Y%m%d-%H%M%S")
+        target = f"{root}.{stamp}{'.' + suffix if suffix else ''}{ext}"
+        n = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{root}.{stamp}{'.' + suffix if suffix else ''}.{n}{ext}"
+            n += 1
+        os.replace(self.filepath, target)
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+            os.remove(target)
+        self.rotations += 1
+
+    def _should_rotate(self, incoming):
+        if self.rotate_daily and datetime.fromtimestamp(self._clock()).strftime("%Y%m%d") != self._day:
+            return True
+        header_len = len(self._header_line().encode("utf-8"))
+        return bool(self.rotate_bytes) and self._size > header_len and self._size + incoming > self.rotate_bytes
+
+    # ----- write path -----
+    def log(self, data_dict):
+        """Formats and enqueues one row (no file I/O on the caller's thread)."""
+        if 'timestamp' in self.headers and 'timestamp' not in data_dict:
+            data_dict['timestamp'] = datetime.now().isoformat()
+        try:
+            buf = io.StringIO()
+            csv.DictWriter(buf, fieldnames=self.headers).writerow(data_dict)
+        except Exception as e:
+            print(f"[LoggerError] Failed to format row for {self.filepath}: {e}")
+            return
+        with self._queue_lock:
+            self._queue.append(buf.getvalue())
+            pending = len(self._queue)
+        if self._closed or pending >= self.max_queue:
+            self.inline_flushes += 1
+            self.flush()
+        elif pending >= self.flush_rows:
+            self._wake.set()
+
+    def flush(self):
+        with self._io_lock:
+            with self._queue_lock:
+                rows = list(self._queue)
+                self._queue.clear()
+            if not rows:
+                return 0
+            try:
+                payload = "".join(rows).encode("utf-8")
+                if self._fd is None or self._should_rotate(len(payload)):
+                    if self._fd is not None:
+                        self._rotate_locked()
+                    self._open_locked()
+                # One write of whole lines: a crash leaves at most a torn tail,
+                # which is repaired on the next open.
+                written = 0
+                while written < len(payload):
+                    written += os.write(self._fd, payload[written:])
+                self._size += len(payload)
+                self.rows_written += len(rows)
+                self.batches_written += 1
+            except Exception as e:
+                print(f"[LoggerError] Failed to write to {self.filepath}: {e}")
+            return len(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval_sec)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[LoggerError] flusher failed for {self.filepath}: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wake.set()
+        if threading.current_thread() is not self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+        self.flush()
+        with self._io_lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
 def get_run_id():
     # Simple YYYYMMDD_HHMM run ID
     return datetime.now().strftime("%Y%m%d_%H%M")
@@ -3,6 +3,7 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 
+from .model_registry import ModelRegistry
 from .utils_json import safe_json_dump
 
 
@@ -12,6 +13,7 @@ class ModelManager:
       models/_active/
       models/_staging/<run_id>/
       models/_archive/<run_id>/
+      models/registry.sqlite3   (index of the above, see ModelRegistry)
     """
 
     ACTIVE_TMP_OLD = "_active_tmp_old"
@@ -23,6 +25,10 @@ class ModelManager:
         self.staging_dir = self.base_dir / "_staging"
         self.archive_dir = self.base_dir / "_archive"
         self._ensure_dirs()
+        try:
+            self.registry = ModelRegistry(self.base_dir)
+        except Exception:
+            self.registry = None  # catalogue is an index only; the directories stay authoritative
         self.recover_if_needed()
 
     def _ensure_dirs(self):
@@ -46,6 +52,14 @@ class ModelManager:
         except Exception:
             return None
 
+    def _record(self, bucket, run_dir):
+        if self.registry is None:
+            return
+        try:
+            self.registry.record(bucket, run_dir)
+        except Exception:
+            pass
+
     def _archive_name(self, base_name: str):
         candidate = self.archive_dir / base_name
         if not candidate.exists():
@@ -88,6 +102,7 @@ class ModelManager:
         safe_json_dump(best_params, run_dir / "best_params.json")
         safe_json_dump(run_summary, run_dir / "run_summary.json")
         safe_json_dump(model_meta, run_dir / "model_meta.json")
+        self._record("staging", run_dir)
         return run_dir
 
     def archive_staging(self, run_id: str):
@@ -96,6 +111,8 @@ class ModelManager:
             return None
         dst = self._archive_name(run_id)
         os.replace(src, dst)
+        self._record("staging", src)
+        self._record("archive", dst)
         return dst
 
     def promote(self, run_id: str, fail_step: str = None):
@@ -132,10 +149,14 @@ class ModelManager:
             raise RuntimeError("Injected failure after moving active to tmp_old")
 
         os.replace(tmp_new, self.active_dir)
+        self._record("staging", src)
+        self._record("active", self.active_dir)
 
         if tmp_old.exists():
             prev_id = self._read_model_id(tmp_old) or f"archived_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            os.replace(tmp_old, self._archive_name(prev_id))
+            dst = self._archive_name(prev_id)
+            os.replace(tmp_old, dst)
+            self._record("archive", dst)
 
     def load_active_params(self):
         path = self.active_dir / "best_params.json"
@@ -0,0 +1,281 @@
+"""
+SQLite catalogue of model runs (models/registry.sqlite3).
+
+ModelManager records a run whenever it writes, archives or promotes one, so
+/api/models pages through an index instead of parsing every run_summary.json
+and model_meta.json in the archive on each request.
+
+Runs moved by hand (or by an older process) are picked up by sync(): it only
+lists a bucket directory when that directory's mtime changed since the last
+sync, and only parses the run directories it has not seen. rebuild() re-scans
+everything (one-shot migration: `python rebuild_model_registry.py`).
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+BUCKETS = ("active", "staging", "archive")
+# Directory mtimes this fresh may still change within the same timestamp tick:
+# such buckets are re-listed on the next sync instead of being trusted.
+RACY_STAMP_NS = 2_000_000_000
+SORT_COLUMNS = {
+    "created_at": "created_ts",
+    "mtime": "mtime_ns",
+    "run_id": "run_id",
+    "bucket": "bucket",
+    "score": "score",
+    "delta": "delta",
+    "roi": "roi",
+    "mdd": "mdd",
+    "trades": "trades",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    bucket TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    dir_name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    created_ts REAL NOT NULL,
+    score REAL, delta REAL, roi REAL, mdd REAL, trades INTEGER,
+    decision TEXT,
+    row_json TEXT NOT NULL,
+    PRIMARY KEY (bucket, dir_name)
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_ts);
+CREATE INDEX IF NOT EXISTS runs_bucket_mtime ON runs (bucket, mtime_ns);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score);
+CREATE TABLE IF NOT EXISTS dir_stamps (bucket TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL);
+"""
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value)
+    except Exception:
+        return float(default)
+
+
+def _metric_val(metrics, key, default=0.0):
+    if not isinstance(metrics, dict):
+        return float(default)
+    try:
+        return float(metrics.get(key, default) or default)
+    except Exception:
+        return float(default)
+
+
+def history_time_key(iso_value):
+    if not iso_value:
+        return 0.0
+    try:
+        text = str(iso_value).replace("Z", "+00:00")
+        return datetime.fromisoformat(text).timestamp()
+    except Exception:
+        return 0.0
+
+
+def build_history_row(run_id, bucket, mtime_iso, summary=None, meta=None):
+    summary = summary or {}
+    meta = meta or {}
+
+    candidate = ((summary.get("candidate") or {}).get("oos_metrics") or {})
+    active = ((summary.get("active_baseline") or {}).get("oos_metrics") or {})
+    gate = summary.get("gate") or {}
+    windows = summary.get("windows") or {}
+
+    decision = str(gate.get("decision") or "").upper()
+    if not decision:
+        if "pass" in gate:
+            decision = "PROMOTE" if bool(gate.get("pass")) else "KEEP_ACTIVE"
+        elif str(bucket).lower() == "archive":
+            decision = "ARCHIVED"
+        elif str(bucket).lower() == "active":
+            decision = "ACTIVE"
+        else:
+            decision = "UNKNOWN"
+
+    reasons = gate.get("reasons")
+    if isinstance(reasons, list):
+        reason = ", ".join([str(x) for x in reasons if str(x)])
+    else:
+        reason = str(gate.get("reason") or reasons or "")
+    if not reason:
+        reason = "-"
+
+    score = _metric_val(candidate, "score", 0.0)
+    active_score = _metric_val(active, "score", 0.0)
+    delta = gate.get("delta")
+    if delta is None:
+        delta = score - active_score
+    delta = _to_float(delta, 0.0)
+
+    positive_weeks = candidate.get("positive_weeks", None)
+    if positive_weeks is None:
+        positive_weeks = (summary.get("candidate") or {}).get("positive_weeks", 0)
+
+    created_at = summary.get("created_at") or meta.get("created_at") or mtime_iso
+
+    return {
+        "run_id": str(run_id or meta.get("model_id") or "-"),
+        "bucket": str(bucket).upper(),
+        "created_at": created_at,
+        "decision": decision,
+        "gate_pass": bool(gate.get("pass")) if "pass" in gate else None,
+        "score": score,
+        "active_score": active_score,
+        "delta": delta,
+        "roi": _metric_val(candidate, "roi", 0.0),
+        "mdd": _metric_val(candidate, "mdd", 0.0),
+        "trades": int(_metric_val(candidate, "trades", 0)),
+        "cost_drop": _metric_val(candidate, "cost_drop", 0.0),
+        "positive_weeks": int(_to_float(positive_weeks, 0)),
+        "negative_weeks": int(_metric_val(candidate, "negative_weeks", 0)),
+        "worst_week": _metric_val(candidate, "worst_week", 0.0),
+        "reason": reason,
+        "oos_start": windows.get("oos_start"),
+        "oos_end": windows.get("oos_end"),
+    }
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    DB_NAME = "registry.sqlite3"
+
+    def __init__(self, base_dir="models", db_path=None):
+        self.base_dir = Path(base_dir)
+        self.db_path = Path(db_path) if db_path else self.base_dir / self.DB_NAME
+        self.bucket_dirs = {
+            "active": self.base_dir / "_active",
+            "staging": self.base_dir / "_staging",
+            "archive": self.base_dir / "_archive",
+        }
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self):
+        con = sqlite3.connect(str(self.db_path), timeout=10.0)
+        con.row_factory = sqlite3.Row
+        return con
+
+    @staticmethod
+    def _mtime_ns(path):
+        try:
+            return Path(path).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _row_for(self, bucket, run_dir):
+        summary = _read_json(run_dir / "run_summary.json")
+        meta = _read_json(run_dir / "model_meta.json")
+        mtime_ns = self._mtime_ns(run_dir) or 0
+        mtime_iso = datetime.fromtimestamp(mtime_ns / 1e9).isoformat()
+        run_id = run_dir.name
+        if bucket == "active":
+            run_id = (meta or {}).get("model_id") or (summary or {}).get("run_id") or run_id
+        row = build_history_row(run_id=run_id, bucket=bucket, mtime_iso=mtime_iso, summary=summary, meta=meta)
+        row["mtime"] = mtime_iso
+        return (
+            bucket,
+            row["run_id"],
+            run_dir.name,
+            mtime_ns,
+            history_time_key(row["created_at"]),
+            row["score"],
+            row["delta"],
+            row["roi"],
+            row["mdd"],
+            row["trades"],
+            row["decision"],
+            json.dumps(row, ensure_ascii=False, default=str),
+        )
+
+    def _upsert(self, con, bucket, run_dir):
+        con.execute("INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", self._row_for(bucket, run_dir))
+
+    def record(self, bucket, run_dir):
+        """Catalogue (or refresh) one run directory after ModelManager touched it."""
+        run_dir = Path(run_dir)
+        with self._lock, closing(self._connect()) as con, con:
+            if bucket == "active":
+                con.execute("DELETE FROM runs WHERE bucket = 'active'")
+            if run_dir.is_dir():
+                self._upsert(con, bucket, run_dir)
+            else:
+                con.execute("DELETE FROM runs WHERE bucket = ? AND dir_name = ?", (bucket, run_dir.name))
+
+    def forget(self, bucket, dir_name):
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute("DELETE FROM runs WHERE bucket = ? AND dir_name = ?", (bucket, dir_name))
+
+    def sync(self):
+        """Cheap consistency pass; returns the number of rows added, refreshed or dropped."""
+        changed = 0
+        with self._lock, closing(self._connect()) as con, con:
+            stamps = {r["bucket"]: r["mtime_ns"] for r in con.execute("SELECT bucket, mtime_ns FROM dir_stamps")}
+            for bucket, path in self.bucket_dirs.items():
+                stamp = self._mtime_ns(path)
+                if stamp is not None and stamps.get(bucket) == stamp:
+                    continue
+                changed += self._sync_bucket(con, bucket, path)
+                if stamp is None or time.time_ns() - stamp < RACY_STAMP_NS:
+                    stamp = -1
+                con.execute("INSERT OR REPLACE INTO dir_stamps VALUES (?, ?)", (bucket, stamp))
+        return changed
+
+    def _sync_bucket(self, con, bucket, path):
+        known = {r["dir_name"]: r["mtime_ns"] for r in con.execute("SELECT dir_name, mtime_ns FROM runs WHERE bucket = ?", (bucket,))}
+        if bucket == "active":
+            found = {path.name: path} if path.is_dir() else {}
+        else:
+            found = {d.name: d for d in path.iterdir() if d.is_dir()} if path.is_dir() else {}
+        changed = 0
+        for name in set(known) - set(found):
+            con.execute("DELETE FROM runs WHERE bucket = ? AND dir_name = ?", (bucket, name))
+            changed += 1
+        for name, run_dir in found.items():
+            if known.get(name) != self._mtime_ns(run_dir):
+                self._upsert(con, bucket, run_dir)
+                changed += 1
+        return changed
+
+    def rebuild(self):
+        with self._lock, closing(self._connect()) as con, con:
+            con.execute("DELETE FROM runs")
+            con.execute("DELETE FROM dir_stamps")
+        self.sync()
+        return self.count()
+
+    def count(self, bucket=None):
+        with closing(self._connect()) as con:
+            if bucket:
+                return con.execute("SELECT COUNT(*) FROM runs WHERE bucket = ?", (bucket,)).fetchone()[0]
+            return con.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def query(self, bucket=None, sort="created_at", descending=True, limit=50, offset=0):
+        """Page of history rows plus the total row count for the filter."""
+        column = SORT_COLUMNS.get(sort, "created_ts")
+        order = "DESC" if descending else "ASC"
+        where, args = "", []
+        if bucket:
+            where, args = "WHERE bucket = ?", [str(bucket).lower()]
+        with closing(self._connect()) as con:
+            total = con.execute(f"SELECT COUNT(*) FROM runs {where}", args).fetchone()[0]
+            rows = con.execute(
+                f"SELECT row_json FROM runs {where} ORDER BY {column} {order}, run_id {order} LIMIT ? OFFSET ?",
+                args + [max(0, int(limit)), max(0, int(offset))],
+            ).fetchall()
+        return [json.loads(r["row_json"]) for r in rows], total
@@ -1,26 +1,65 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 import time
 import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from .utils_json import SCHEMA_VERSION_FIELD, safe_json_dump, safe_json_load
+from .notify_rules import DEFAULT_RULES_PATH, DIGEST, SUPPRESS, NotifyRules
+from .state_journal import StateJournal
+from .utils_json import SCHEMA_VERSION_FIELD, safe_json_load
 
 logger = logging.getLogger("NotifierTelegram")
 
 
 class TelegramNotifier:
+    """
+    Telegram outbox with a background sender.
+
+    emit_event() applies the dedupe cooldown, journals the event (a buffered
+    write; fsynced only for CRITICAL) and hands it to an in-process queue; a
+    dedicated worker thread sends it and records the outcome, so callers (the
+    trading loop) never wait on Telegram and an event survives a crash or exit
+    before its send. close() runs at interpreter exit and from the controller /
+    backend shutdown paths.
+
+    Storage is a StateJournal: `<file_name>` holds the last compacted snapshot and
+    `<file_name>.journal` the per-event changes since. Compaction drops events that
+    were acked (filled/canceled) more than ACKED_RETENTION_SECONDS ago; their
+    dedupe timestamps survive in the snapshot's "dedupe" map.
+
+    Before an event is queued, NotifyRules (notify_rules.json) may suppress it
+    (drop/mute/dedupe), hold it for a digest, or escalate its severity; held
+    digests are journaled under "digests" (restored on load) and emitted by the
+    worker when their window closes.
+
+    Sending keeps the requested->accepted->filled/canceled state machine and its
+    retry backoff. Due events that pile up while the chat is rate limited
+    (min_send_interval_sec between sends, or a 429 retry_after) are coalesced
+    into one message.
+    """
+
     # Outbox state machine (v2)
     STATUS_REQUESTED = "requested"
     STATUS_ACCEPTED = "accepted"
     STATUS_FILLED = "filled"
     STATUS_CANCELED = "canceled"
     STATUS_SUCCESS = {"filled", "SENT", "filled_ok"}
-    CURRENT_SCHEMA_VERSION = 2
+    # v3: events keyed "evt:<id>" at the top level so the journal records one event per change.
+    CURRENT_SCHEMA_VERSION = 3
+    EVENT_KEY_PREFIX = "evt:"
     # Keep dedupe timestamps only for a short retention window to avoid unbounded cache growth.
     DEDUPE_CACHE_TTL_SECONDS = int(timedelta(days=7).total_seconds())
+    ACKED_RETENTION_SECONDS = 3600
+    COMPACT_INTERVAL_SECONDS = 300
+    COMPACT_EVERY_RECORDS = 500
+    MAX_BATCH_EVENTS = 20
+    MAX_MESSAGE_CHARS = 3800  # Telegram caps a message at 4096 chars
+    MAX_RETRY = 10
 
     def __init__(
         self,
@@ -28,6 +67,9 @@ class TelegramNotifier:
         chat_id: str = None,
         storage_dir: str = "results/outbox",
         file_name: str = "telegram_outbox.json",
+        api_base: str = None,
+        min_send_interval_sec: float = 1.0,
+        rules: Optional[NotifyRules] = None,
     ):
         if not bot_token:
             bot_token = os.getenv("TELEGRAM_TOKEN") or os.getenv("TELEGRAM_BOT_TOKEN")
@@ -36,15 +78,38 @@ class TelegramNotifier:
 
         self.bot_token = bot_token
         self.chat_id = chat_id
+        self.api_base = (api_base or os.getenv("TELEGRAM_API_BASE") or "https://api.telegram.org").rstrip("/")
+        self.min_send_interval_sec = float(min_send_interval_sec)
         self.storage_dir = Path(storage_dir)
         self.file_path = self.storage_dir / file_name
 
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.rules = rules if rules is not None else NotifyRules(os.getenv("NOTIFY_RULES_PATH") or DEFAULT_RULES_PATH)
 
         self.outbox: List[Dict] = []
         self.dedupe_cache: Dict[str, float] = {}
 
+        self._lock = threading.RLock()
+        self._pass_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._next_send_ts = 0.0
+        self._journal = StateJournal(
+            self.file_path,
+            schema_version=self.CURRENT_SCHEMA_VERSION,
+            # Compaction is driven by the worker, after acked events are pruned.
+            compact_every=10**9,
+            compact_interval_sec=float("inf"),
+        )
+        self._state: Dict = {}
+        self._last_compact_ts = time.time()
+        # Counters (exposed for diagnostics/tests)
+        self.sends = 0
+        self.coalesced = 0
+
         self.load_outbox()
+        atexit.register(self.close)
 
     @classmethod
     def _coerce_ts(cls, ts_value) -> float:
@@ -111,80 +176,96 @@ class TelegramNotifier:
 
         return []
 
+    @classmethod
+    def _keyed_state(cls, events: List[Dict], dedupe: Optional[Dict] = None) -> Dict:
+        """v1 list / v2 {"events": [...]} -> v3 journal state."""
+        state = {SCHEMA_VERSION_FIELD: cls.CURRENT_SCHEMA_VERSION, "dedupe": dict(dedupe or {})}
+        for i, evt in enumerate(events):
+            evt_id = str(evt.get("id") or f"legacy_{i}")
+            evt["id"] = evt_id
+            state[cls.EVENT_KEY_PREFIX + evt_id] = evt
+        return state
+
     def load_outbox(self):
-        """Loads outbox from JSON file with schema repair fallback."""
-        default = {
-            SCHEMA_VERSION_FIELD: self.CURRENT_SCHEMA_VERSION,
-            "events": [],
-        }
-        data = safe_json_load(
-            self.file_path,
-            default=default,
-            schema_version=self.CURRENT_SCHEMA_VERSION,
-            repair=True,
-            schema_migrations=[self._legacy_event_shape],
-        )
+        """Loads snapshot + journal; v1/v2 JSON outboxes are migrated to the journaled layout."""
+        with self._lock:
+            legacy = safe_json_load(self.file_path, default=None, repair=True)
+            if isinstance(legacy, list) or (isinstance(legacy, dict) and isinstance(legacy.get("events"), list)):
+                state = self._keyed_state(self._legacy_event_shape(legacy))
+                self._journal.load(default={})
+                self._journal.append(state, durable=True)
+                self._journal.compact()
+                logger.info(f"Migrated outbox {self.file_path} to schema {self.CURRENT_SCHEMA_VERSION}.")
+            else:
+                state = self._journal.load(default={SCHEMA_VERSION_FIELD: self.CURRENT_SCHEMA_VERSION, "dedupe": {}})
+                state.setdefault(SCHEMA_VERSION_FIELD, self.CURRENT_SCHEMA_VERSION)
+                state.setdefault("dedupe", {})
+            self._state = state
+            self.rules.restore_digests(state.get("digests"))
+
+            self.outbox = []
+            self.dedupe_cache = {}
+            for key, ts in (state.get("dedupe") or {}).items():
+                self.dedupe_cache[key] = self._coerce_ts(ts)
+
+            now = time.time()
+            for key, evt in state.items():
+                if not key.startswith(self.EVENT_KEY_PREFIX) or not isinstance(evt, dict):
+                    continue
 
-        # Support both legacy list format and current object wrapper.
-        if isinstance(data, list):
-            data = {
-                SCHEMA_VERSION_FIELD: self.CURRENT_SCHEMA_VERSION,
-                "events": self._legacy_event_shape(data),
-            }
-        elif not isinstance(data, dict):
-            data = default
-
-        if not isinstance(data.get("events"), list):
-            data["events"] = self._legacy_event_shape(data)
-
-        self.outbox = []
-        self.dedupe_cache = {}
-
-        now = time.time()
-        for evt in data.get("events", []):
-            if not isinstance(evt, dict):
-                continue
-
-            # Normalize status and fill missing defaults for repaired rows.
-            evt = dict(evt)
-            status = evt.get("status") or self.STATUS_REQUESTED
-            evt["status"] = self._normalize_status(status)
-            evt.setdefault("retry_count", 0)
-            evt.setdefault("next_retry_ts", 0.0)
-            evt.setdefault("last_error", None)
-
-            self.outbox.append(evt)
-
-            dedupe_key = evt.get("dedupe_key")
-            if dedupe_key:
-                ts = self._coerce_ts(evt.get("ts")) or now
-                # 1st-pass behavior: dedupe applies to any in-flight or sent event.
-                # This suppresses duplicate emit during restart windows.
-                if evt["status"] in {self.STATUS_REQUESTED, self.STATUS_ACCEPTED, *self.STATUS_SUCCESS, self.STATUS_CANCELED}:
-                    prev_ts = self.dedupe_cache.get(dedupe_key)
-                    self.dedupe_cache[dedupe_key] = max(prev_ts or 0.0, ts)
-
-        self._trim_dedupe_cache()
-
-        # Persist repaired/migrated structure only when legacy shape was detected.
-        if data.get(SCHEMA_VERSION_FIELD, 1) != self.CURRENT_SCHEMA_VERSION:
-            self.save_outbox()
+                # Normalize status and fill missing defaults for repaired rows.
+                status = evt.get("status") or self.STATUS_REQUESTED
+                evt["status"] = self._normalize_status(status)
+                evt.setdefault("retry_count", 0)
+                evt.setdefault("next_retry_ts", 0.0)
+                evt.setdefault("last_error", None)
 
-        logger.info(f"Loaded {len(self.outbox)} events from outbox (schema={self.CURRENT_SCHEMA_VERSION}).")
+                self.outbox.append(evt)
 
-    def _build_payload(self):
-        return {
-            SCHEMA_VERSION_FIELD: self.CURRENT_SCHEMA_VERSION,
-            "events": self.outbox,
-            "updated_at": time.time(),
-        }
+                dedupe_key = evt.get("dedupe_key")
+                if dedupe_key:
+                    ts = self._coerce_ts(evt.get("ts")) or now
+                    # 1st-pass behavior: dedupe applies to any in-flight or sent event.
+                    # This suppresses duplicate emit during restart windows.
+                    if evt["status"] in {self.STATUS_REQUESTED, self.STATUS_ACCEPTED, *self.STATUS_SUCCESS, self.STATUS_CANCELED}:
+                        prev_ts = self.dedupe_cache.get(dedupe_key)
+                        self.dedupe_cache[dedupe_key] = max(prev_ts or 0.0, ts)
 
-    def save_outbox(self):
-        """Atomically saves outbox to disk."""
+            self.outbox.sort(key=lambda e: (self._coerce_ts(e.get("ts")), str(e.get("id"))))
+            self._trim_dedupe_cache()
+
+        logger.info(f"Loaded {len(self.outbox)} events from outbox (schema={self.CURRENT_SCHEMA_VERSION}).")
+
+    def _journal_events(self, events, durable=False):
+        """Record the current state of `events` (and the dedupe map). Caller holds self._lock."""
+        for evt in events:
+            self._state[self.EVENT_KEY_PREFIX + evt["id"]] = evt
+        self._state["dedupe"] = dict(self.dedupe_cache)
         try:
-            safe_json_dump(self._build_payload(), self.file_path, schema_version=self.CURRENT_SCHEMA_VERSION)
+            self._journal.append(self._state, durable=durable)
         except Exception as e:
-            logger.error(f"Failed to save outbox: {e}")
+            logger.error(f"Failed to journal outbox: {e}")
+
+    def save_outbox(self):
+        """Compacts the outbox: prunes old acked events and rewrites the snapshot."""
+        with self._lock:
+            cutoff = time.time() - self.ACKED_RETENTION_SECONDS
+            keep = []
+            for evt in self.outbox:
+                done = evt.get("status") in {self.STATUS_CANCELED, *self.STATUS_SUCCESS}
+                if done and self._coerce_ts(evt.get("acked_ts") or evt.get("ts")) < cutoff:
+                    self._state.pop(self.EVENT_KEY_PREFIX + evt["id"], None)
+                else:
+                    keep.append(evt)
+            self.outbox = keep
+            self._trim_dedupe_cache()
+            self._state["dedupe"] = dict(self.dedupe_cache)
+            try:
+                self._journal.append(self._state)
+                self._journal.compact()
+            except Exception as e:
+                logger.error(f"Failed to save outbox: {e}")
+            self._last_compact_ts = time.time()
 
     def emit_event(
         self,
@@ -195,27 +276,53 @@ class TelegramNotifier:
         severity: str = "INFO",
         dedupe_key: Optional[str] = None,
         cooldown_min: int = 0,
+        bypass_dedupe: bool = False,
     ):
         """
-        Standard API to enqueue an event.
+        Standard API to enqueue an event; journals it and returns without waiting for the network.
         Types: SYSTEM, WATCH, TRADE, RISK, SUMMARY
+        bypass_dedupe: operator-requested events skip the cooldown and rule dedupe windows.
         """
         now_ts = time.time()
-        self._trim_dedupe_cache()
-        if dedupe_key and cooldown_min > 0:
-            last_ts = self.dedupe_cache.get(dedupe_key)
-            if last_ts:
-                elapsed_min = (now_ts - self._coerce_ts(last_ts)) / 60.0
-                if elapsed_min < cooldown_min:
-                    logger.info(
-                        f"Outbox dedupe skip: {dedupe_key} (Elapsed: {elapsed_min:.1f}m < {cooldown_min}m)"
-                    )
-                    return
-
-        # Reserve dedupe slot immediately to avoid duplicate emits under concurrent calls/restarts.
-        if dedupe_key and cooldown_min > 0:
-            self.dedupe_cache[dedupe_key] = now_ts
-
+        with self._lock:
+            self._trim_dedupe_cache()
+            if dedupe_key and cooldown_min > 0 and not bypass_dedupe:
+                last_ts = self.dedupe_cache.get(dedupe_key)
+                if last_ts:
+                    elapsed_min = (now_ts - self._coerce_ts(last_ts)) / 60.0
+                    if elapsed_min < cooldown_min:
+                        logger.info(
+                            f"Outbox dedupe skip: {dedupe_key} (Elapsed: {elapsed_min:.1f}m < {cooldown_min}m)"
+                        )
+                        return
+
+            decision, severity, rule = self.rules.evaluate(
+                {"event_type": event_type, "exchange": exchange, "severity": severity, "title": title, "message": message},
+                bypass_dedupe=bypass_dedupe,
+            )
+            if decision == SUPPRESS:
+                logger.info(f"Outbox rule skip: {event_type}/{exchange} {title} (rule {rule})")
+                return
+
+            # Reserve dedupe slot immediately to avoid duplicate emits under concurrent calls/restarts.
+            if dedupe_key and cooldown_min > 0:
+                self.dedupe_cache[dedupe_key] = now_ts
+            if decision == DIGEST:
+                # Held events are journaled too, so a restart still delivers the digest.
+                self._state["digests"] = self.rules.held_digests()
+                self._journal_events([], durable=str(severity).upper() == "CRITICAL")
+                self._ensure_worker()
+                return
+            event = self._new_event(event_type, exchange, title, message, severity, dedupe_key)
+            # Journaled before it is queued: a crash or exit cannot lose it.
+            self._journal_events([event], durable=str(severity).upper() == "CRITICAL")
+
+        self._ensure_worker()
+        self._queue.put(event)
+
+    def _new_event(self, event_type, exchange, title, message, severity, dedupe_key=None) -> Dict:
+        """Builds an outbox event and appends it. Caller holds self._lock."""
+        now_ts = time.time()
         event = {
             "id": f"{int(now_ts * 1000)}_{exchange}_{event_type}",
             "ts": datetime.now().isoformat(),
@@ -230,10 +337,22 @@ class TelegramNotifier:
             "next_retry_ts": now_ts,
             "last_error": None,
         }
-
+        if any(e["id"] == event["id"] for e in self.outbox[-self.MAX_BATCH_EVENTS:]):
+            event["id"] += f"_{len(self.outbox)}"
         self.outbox.append(event)
-        self.save_outbox()
-        self.process_outbox()
+        return event
+
+    def _emit_digests(self, force=False):
+        """Queues summary events for NotifyRules digests whose window has closed."""
+        with self._lock:
+            digests = self.rules.pop_digests(force=force)
+            events = [self._new_event(d["event_type"], d["exchange"], d["title"], d["message"], d["severity"]) for d in digests]
+            if events:
+                # One record moves the items from the held digests to the outbox.
+                self._state["digests"] = self.rules.held_digests()
+                self._journal_events(events, durable=any(str(e["severity"]).upper() == "CRITICAL" for e in events))
+            for event in events:
+                self._queue.put(event)
 
     def check_health(self):
         """
@@ -258,59 +377,198 @@ class TelegramNotifier:
             cooldown_min=55,
         )
 
-    def process_outbox(self):
-        """
-        Worker method to process events using requested->accepted->filled/canceled.
-        """
-        now_ts = time.time()
-        dirty = False
-
-        for evt in self.outbox:
-            status = evt.get("status")
-            if status not in {self.STATUS_REQUESTED, self.STATUS_ACCEPTED}:
-                continue
-
-            # Retry wait check (requested/accepted can have backoff)
-            if now_ts < evt.get("next_retry_ts", 0):
-                continue
-
-            evt["status"] = self.STATUS_ACCEPTED
-            dirty = True
-
+    # ----- worker -----
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._worker_loop, name="telegram-outbox", daemon=True)
+            self._worker.start()
+            # Re-armed after an earlier close() (a restarted controller reuses the notifier).
+            atexit.unregister(self.close)
+            atexit.register(self.close)
+
+    def _worker_loop(self):
+        wait = 0.0
+        while not self._stop.is_set():
+            # Sleep until the next retry/rate-limit deadline, or 1s when idle (group commit, compaction).
+            timeout = 1.0 if wait is None else min(max(wait, 0.05), 5.0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            self._emit_digests()
+            # Queued events are already journaled by emit_event; they only wake the sender.
+            markers = []
+            while item is not None:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
             try:
-                self._send_telegram(evt["title"], evt["message"])
-                evt["status"] = self.STATUS_FILLED
-                if evt.get("dedupe_key"):
-                    self.dedupe_cache[evt["dedupe_key"]] = now_ts
+                wait = self.process_outbox()
+                self._maybe_compact()
+                with self._lock:
+                    self._journal.maybe_commit()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                wait = 1.0
+            for marker in markers:
+                marker.set()
+
+    def _maybe_compact(self):
+        due = (
+            self._journal._records_since_compact >= self.COMPACT_EVERY_RECORDS
+            or time.time() - self._last_compact_ts >= self.COMPACT_INTERVAL_SECONDS
+        )
+        if due:
+            self.save_outbox()
 
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything emitted so far has had one send pass."""
+        self._ensure_worker()
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Stops the worker and compacts the outbox (pending events are kept for the next start)."""
+        atexit.unregister(self.close)
+        if self._worker is not None and self._worker.is_alive():
+            self._emit_digests(force=True)
+            self.flush(timeout)
+            self._stop.set()
+            self._queue.put(threading.Event())  # wake the worker out of its wait
+            self._worker.join(timeout)
+        self._worker = None
+        self.save_outbox()
+        with self._lock:
+            try:
+                self._journal.close()
             except Exception as e:
-                evt["retry_count"] = int(evt.get("retry_count", 0)) + 1
-                evt["last_error"] = str(e)
+                logger.error(f"Failed to close outbox journal: {e}")
+
+    # ----- sending -----
+    def _take_batch(self, due: List[Dict]) -> List[Dict]:
+        batch, size = [], 0
+        for evt in due:
+            size += len(evt.get("title") or "") + len(evt.get("message") or "") + 2
+            if batch and (len(batch) >= self.MAX_BATCH_EVENTS or size > self.MAX_MESSAGE_CHARS):
+                break
+            batch.append(evt)
+        return batch
+
+    def _batch_text(self, batch: List[Dict]):
+        if len(batch) == 1:
+            return batch[0]["title"], batch[0]["message"]
+        parts = [f"{evt['title']}\n{evt['message']}" for evt in batch]
+        body = "\n\n".join(parts)[: self.MAX_MESSAGE_CHARS]
+        return f"[OUTBOX] {len(batch)} events", body
+
+    @staticmethod
+    def _retry_after(exc) -> Optional[float]:
+        """Seconds Telegram asked us to wait (HTTP 429), or None for other failures."""
+        resp = getattr(exc, "response", None)
+        if resp is None or getattr(resp, "status_code", None) != 429:
+            return None
+        try:
+            return float(((resp.json() or {}).get("parameters") or {}).get("retry_after"))
+        except Exception:
+            pass
+        try:
+            return float(resp.headers.get("Retry-After"))
+        except Exception:
+            return 5.0
 
-                max_retry = 10
-                if evt["retry_count"] > max_retry:
-                    evt["status"] = self.STATUS_CANCELED
-                    backoff = 0
+    def process_outbox(self) -> Optional[float]:
+        """
+        One send pass using requested->accepted->filled/canceled: due events are sent
+        (coalesced into one message when several are due). Returns the seconds until
+        the next pass is useful, or None when nothing is pending.
+        """
+        with self._pass_lock:
+            now_ts = time.time()
+            with self._lock:
+                pending = [e for e in self.outbox if e.get("status") in {self.STATUS_REQUESTED, self.STATUS_ACCEPTED}]
+                due = [e for e in pending if now_ts >= e.get("next_retry_ts", 0)]
+                if not due:
+                    if not pending:
+                        return None
+                    return max(0.05, min(e.get("next_retry_ts", 0) for e in pending) - now_ts)
+                if now_ts < self._next_send_ts:
+                    return self._next_send_ts - now_ts
+                batch = self._take_batch(due)
+                for evt in batch:
+                    evt["status"] = self.STATUS_ACCEPTED
+                self._journal_events(batch)
+
+            title, text = self._batch_text(batch)
+            error = None
+            try:
+                self._send_telegram(title, text)
+            except Exception as e:
+                error = e
+
+            now_ts = time.time()
+            with self._lock:
+                if error is None:
+                    self.sends += 1
+                    if len(batch) > 1:
+                        self.coalesced += len(batch)
+                    self._next_send_ts = now_ts + self.min_send_interval_sec
+                    for evt in batch:
+                        evt["status"] = self.STATUS_FILLED
+                        evt["acked_ts"] = now_ts
+                        if evt.get("dedupe_key"):
+                            self.dedupe_cache[evt["dedupe_key"]] = now_ts
                 else:
-                    # Exponential-ish backoff, capped at 5m.
-                    if evt["retry_count"] == 1:
-                        backoff = 10
-                    elif evt["retry_count"] == 2:
-                        backoff = 30
-                    elif evt["retry_count"] == 3:
-                        backoff = 60
+                    retry_after = self._retry_after(error)
+                    if retry_after is not None:
+                        # Rate limited: not the event's fault, so no retry is spent.
+                        self._next_send_ts = now_ts + retry_after
+                        for evt in batch:
+                            evt["status"] = self.STATUS_REQUESTED
+                            evt["next_retry_ts"] = self._next_send_ts
+                            evt["last_error"] = f"rate limited: retry after {retry_after:g}s"
+                        logger.warning(f"Telegram rate limit: retry after {retry_after:g}s ({len(batch)} events)")
                     else:
-                        backoff = 300
-                    evt["status"] = self.STATUS_REQUESTED
-                    evt["next_retry_ts"] = now_ts + backoff
-
-                logger.warning(
-                    f"Failed to send {evt.get('id')}: {e}. "
-                    f"Retry in {backoff if evt['status'] != self.STATUS_CANCELED else 0}s"
-                )
-
-        if dirty:
-            self.save_outbox()
+                        for evt in batch:
+                            self._record_failure(evt, error, now_ts)
+                self._journal_events(batch)
+                remaining = [e for e in self.outbox if e.get("status") in {self.STATUS_REQUESTED, self.STATUS_ACCEPTED}]
+            if not remaining:
+                return None
+            next_due = min(e.get("next_retry_ts", 0) for e in remaining)
+            return max(0.0, max(next_due, self._next_send_ts) - now_ts)
+
+    def _record_failure(self, evt, exc, now_ts):
+        evt["retry_count"] = int(evt.get("retry_count", 0)) + 1
+        evt["last_error"] = str(exc)
+
+        if evt["retry_count"] > self.MAX_RETRY:
+            evt["status"] = self.STATUS_CANCELED
+            evt["acked_ts"] = now_ts
+            backoff = 0
+        else:
+            # Exponential-ish backoff, capped at 5m.
+            if evt["retry_count"] == 1:
+                backoff = 10
+            elif evt["retry_count"] == 2:
+                backoff = 30
+            elif evt["retry_count"] == 3:
+                backoff = 60
+            else:
+                backoff = 300
+            evt["status"] = self.STATUS_REQUESTED
+            evt["next_retry_ts"] = now_ts + backoff
+
+        logger.warning(
+            f"Failed to send {evt.get('id')}: {exc}. "
+            f"Retry in {backoff if evt['status'] != self.STATUS_CANCELED else 0}s"
+        )
 
     def _send_telegram(self, title, msg):
         """Physical send via requests"""
@@ -319,7 +577,7 @@ class TelegramNotifier:
             return
 
         text = f"{title}\n\n{msg}"
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        url = f"{self.api_base}/bot{self.bot_token}/sendMessage"
         data = {"chat_id": self.chat_id, "text": text}
 
         resp = requests.post(url, data=data, timeout=5)
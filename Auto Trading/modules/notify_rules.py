@@ -0,0 +1,346 @@
+"""
+Notification rules between TelegramNotifier.emit_event and the outbox.
+
+Rules come from a JSON file (notify_rules.json next to ui_settings.json, or
+$NOTIFY_RULES_PATH) and are re-read when its (mtime_ns, size) stamp changes:
+
+    {
+      "rules": [
+        {
+          "name": "health-check",
+          "match": {"event_type": "SYSTEM", "title": "HEALTH CHECK*"},
+          "fingerprint": ["event_type", "title", "message"],
+          "dedupe_window_sec": 1800,
+          "escalate": [{"count": 5, "window_sec": 3600, "severity": "WARNING"}]
+        },
+        {"name": "watch", "match": {"event_type": "WATCH"}, "digest_window_sec": 300},
+        {"name": "quiet", "match": {"max_severity": "INFO"}, "mute": [{"start": "01:00", "end": "07:00"}]}
+      ]
+    }
+
+The first rule whose `match` accepts the event decides (one pass over the
+rules per event); events no rule matches are delivered unchanged. `match`
+takes event_type / exchange (alias "source") / severity / title as a glob or
+a list of globs, plus min_severity / max_severity. A matched rule applies, in
+order:
+
+  * escalate: tiers of {count, window_sec, severity}; once a fingerprint was
+    seen `count` times within `window_sec` its severity is raised, and the
+    first event of a newly reached tier bypasses dedupe;
+  * action "drop": suppress everything the rule matches;
+  * mute: local-time windows ({start, end, days?}, may wrap midnight) that
+    suppress events below `mute_bypass_severity` (default CRITICAL);
+  * dedupe_window_sec: suppress repeats of a fingerprint delivered within the
+    window (fingerprint = listed event fields, default type/exchange/title);
+  * digest_window_sec: hold events and deliver them as one summary event once
+    the window since the first held event has passed (pop_digests()). Held
+    digests are exported by held_digests() so the notifier can journal them and
+    hand them back through restore_digests() after a restart.
+
+metrics() reports delivered vs suppressed counts, totals and per rule.
+"""
+import fnmatch
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from .utils_json import safe_json_load
+
+logger = logging.getLogger("NotifyRules")
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "notify_rules.json"
+SEVERITY_ORDER = {"DEBUG": 0, "INFO": 1, "WARNING": 2, "ERROR": 3, "CRITICAL": 4}
+DEFAULT_FINGERPRINT = ("event_type", "exchange", "title")
+MATCH_FIELDS = ("event_type", "exchange", "severity", "title")
+DIGEST_MAX_LINES = 20
+
+DELIVER = "deliver"
+SUPPRESS = "suppress"
+DIGEST = "digest"
+
+
+def _severity_rank(value):
+    return SEVERITY_ORDER.get(str(value or "INFO").upper(), SEVERITY_ORDER["INFO"])
+
+
+def _stamp(path):
+    try:
+        st = Path(path).stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _parse_hhmm(value):
+    hh, mm = str(value).split(":", 1)
+    minutes = int(hh) * 60 + int(mm)
+    if not 0 <= minutes < 24 * 60:
+        raise ValueError(f"Invalid time of day: {value}")
+    return minutes
+
+
+class Rule:
+    def __init__(self, spec, index):
+        if not isinstance(spec, dict):
+            raise ValueError(f"rule #{index} must be an object")
+        self.name = str(spec.get("name") or f"rule_{index}")
+        match = dict(spec.get("match") or {})
+        if "source" in match:
+            match.setdefault("exchange", match.pop("source"))
+        self.patterns = {}
+        for field in MATCH_FIELDS:
+            value = match.get(field)
+            if value is None:
+                continue
+            globs = [value] if isinstance(value, str) else list(value)
+            self.patterns[field] = [str(g).upper() for g in globs]
+        self.min_severity = _severity_rank(match["min_severity"]) if "min_severity" in match else None
+        self.max_severity = _severity_rank(match["max_severity"]) if "max_severity" in match else None
+
+        self.action = str(spec.get("action") or DELIVER).lower()
+        if self.action not in (DELIVER, "drop"):
+            raise ValueError(f"rule {self.name}: unknown action {self.action!r}")
+        self.fingerprint = tuple(spec.get("fingerprint") or DEFAULT_FINGERPRINT)
+        self.dedupe_window = float(spec.get("dedupe_window_sec") or 0)
+        self.digest_window = float(spec.get("digest_window_sec") or 0)
+        self.mute_bypass = _severity_rank(spec.get("mute_bypass_severity") or "CRITICAL")
+        self.mutes = []
+        for w in spec.get("mute") or []:
+            days = w.get("days")
+            self.mutes.append((_parse_hhmm(w["start"]), _parse_hhmm(w["end"]), set(days) if days else None))
+        self.tiers = sorted(
+            (
+                (int(t["count"]), float(t["window_sec"]), str(t.get("severity") or "CRITICAL").upper())
+                for t in spec.get("escalate") or []
+            ),
+        )
+        self.history_window = max([self.dedupe_window] + [t[1] for t in self.tiers])
+        self.history_len = max([1] + [t[0] for t in self.tiers])
+
+    def matches(self, event):
+        for field, globs in self.patterns.items():
+            value = str(event.get(field) or "").upper()
+            if not any(fnmatch.fnmatchcase(value, g) for g in globs):
+                return False
+        rank = _severity_rank(event.get("severity"))
+        if self.min_severity is not None and rank < self.min_severity:
+            return False
+        if self.max_severity is not None and rank > self.max_severity:
+            return False
+        return True
+
+    def muted(self, now):
+        if not self.mutes:
+            return False
+        local = datetime.fromtimestamp(now)
+        minute = local.hour * 60 + local.minute
+        for start, end, days in self.mutes:
+            if days is not None and local.weekday() not in days:
+                continue
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return True
+        return False
+
+    def key(self, event):
+        return "|".join(str(event.get(f) or "") for f in self.fingerprint)
+
+
+class NotifyRules:
+    RELOAD_CHECK_SEC = 5.0
+    MAX_FINGERPRINTS = 1024
+
+    def __init__(self, path=None, rules=None, clock=time.time):
+        """`rules` (a config dict) takes precedence over `path`; neither means deliver everything."""
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rules = []
+        self._stamp = None
+        self._checked = None
+        # Per (rule, fingerprint): occurrence times, last delivery, last escalation tier.
+        self._seen = {}
+        self._delivered = {}
+        self._tier = {}
+        self._digests = {}
+        self.totals = {
+            "evaluated": 0,
+            "delivered": 0,
+            "suppressed": 0,
+            "suppressed_by": {"drop": 0, "mute": 0, "dedupe": 0},
+            "digested": 0,
+            "digests_sent": 0,
+            "escalated": 0,
+        }
+        self.per_rule = {}
+        if rules is not None:
+            self._rules = self._compile(rules)
+        else:
+            self._reload(force=True)
+
+    @staticmethod
+    def _compile(config):
+        specs = config.get("rules") if isinstance(config, dict) else config
+        return [Rule(spec, i) for i, spec in enumerate(specs or [])]
+
+    def _reload(self, force=False):
+        if self.path is None:
+            return
+        now = self._clock()
+        if not force and self._checked is not None and now - self._checked < self.RELOAD_CHECK_SEC:
+            return
+        self._checked = now
+        stamp = _stamp(self.path)
+        if stamp == self._stamp and not force:
+            return
+        self._stamp = stamp
+        if stamp is None:
+            self._rules = []
+            return
+        try:
+            self._rules = self._compile(safe_json_load(self.path, default={}))
+            logger.info(f"Loaded {len(self._rules)} notification rules from {self.path}")
+        except Exception as e:
+            # A broken edit keeps the previous rules rather than silently delivering everything.
+            logger.error(f"Invalid notification rules {self.path}: {e}")
+
+    @property
+    def rules(self):
+        return list(self._rules)
+
+    def _rule_stats(self, rule):
+        return self.per_rule.setdefault(
+            rule.name, {"matched": 0, "delivered": 0, "suppressed": 0, "digested": 0, "escalated": 0}
+        )
+
+    def _count(self, rule, outcome, reason=None):
+        stats = self._rule_stats(rule)
+        stats["matched"] += 1
+        stats[outcome] += 1
+        self.totals[outcome] += 1
+        if reason:
+            self.totals["suppressed_by"][reason] += 1
+
+    def _prune(self, now):
+        horizon = max([r.history_window for r in self._rules] + [0.0])
+        stale = [k for k, ts in self._seen.items() if not ts or now - ts[-1] > horizon]
+        for k in stale:
+            self._seen.pop(k, None)
+            self._delivered.pop(k, None)
+            self._tier.pop(k, None)
+
+    def evaluate(self, event, bypass_dedupe=False):
+        """
+        Returns (decision, severity, rule_name); decision is "deliver", "suppress"
+        or "digest" (held for pop_digests). `event` needs event_type, exchange,
+        severity, title and message. bypass_dedupe skips the dedupe window (an
+        operator-requested event); the delivery still counts for later repeats.
+        """
+        with self._lock:
+            self._reload()
+            now = self._clock()
+            self.totals["evaluated"] += 1
+            severity = str(event.get("severity") or "INFO").upper()
+            rule = next((r for r in self._rules if r.matches(event)), None)
+            if rule is None:
+                self.totals["delivered"] += 1
+                return DELIVER, severity, None
+
+            key = (rule.name, rule.key(event))
+            seen = self._seen.get(key)
+            if seen is None:
+                if len(self._seen) >= self.MAX_FINGERPRINTS:
+                    self._prune(now)
+                seen = self._seen[key] = deque(maxlen=rule.history_len)
+            seen.append(now)
+
+            tier = 0
+            for i, (count, window, tier_severity) in enumerate(rule.tiers, start=1):
+                if len(seen) >= count and now - seen[-count] <= window:
+                    tier = i
+                    if _severity_rank(tier_severity) > _severity_rank(severity):
+                        severity = tier_severity
+            escalated = tier > self._tier.get(key, 0)
+            self._tier[key] = tier
+
+            if rule.action == "drop":
+                self._count(rule, "suppressed", "drop")
+                return SUPPRESS, severity, rule.name
+            if _severity_rank(severity) < rule.mute_bypass and rule.muted(now):
+                self._count(rule, "suppressed", "mute")
+                return SUPPRESS, severity, rule.name
+            last = self._delivered.get(key)
+            if rule.dedupe_window and last is not None and now - last < rule.dedupe_window and not (escalated or bypass_dedupe):
+                self._count(rule, "suppressed", "dedupe")
+                return SUPPRESS, severity, rule.name
+            if escalated:
+                self.totals["escalated"] += 1
+                self._rule_stats(rule)["escalated"] += 1
+            self._delivered[key] = now
+
+            if rule.digest_window and not escalated:
+                digest = self._digests.setdefault(rule.name, {"first_ts": now, "window": rule.digest_window, "items": []})
+                digest["items"].append({**event, "severity": severity})
+                self._count(rule, "digested")
+                return DIGEST, severity, rule.name
+            self._count(rule, "delivered")
+            return DELIVER, severity, rule.name
+
+    def pop_digests(self, force=False):
+        """Summary events for digests whose window has passed (all of them when `force`)."""
+        out = []
+        with self._lock:
+            now = self._clock()
+            for name in list(self._digests):
+                digest = self._digests[name]
+                if not force and now - digest["first_ts"] < digest["window"]:
+                    continue
+                del self._digests[name]
+                items = digest["items"]
+                lines = [f"- [{e.get('exchange')}] {e.get('title')}: {e.get('message')}" for e in items[:DIGEST_MAX_LINES]]
+                if len(items) > DIGEST_MAX_LINES:
+                    lines.append(f"... +{len(items) - DIGEST_MAX_LINES} more")
+                types = sorted({str(e.get("event_type")) for e in items})
+                out.append(
+                    {
+                        "event_type": types[0] if len(types) == 1 else "DIGEST",
+                        "exchange": "ALL",
+                        "severity": max((e["severity"] for e in items), key=_severity_rank),
+                        "title": f"DIGEST {name} ({len(items)})",
+                        "message": "\n".join(lines),
+                    }
+                )
+                self.totals["digests_sent"] += 1
+        return out
+
+    def held_digests(self):
+        """JSON-safe copy of the digests still being held, keyed by rule name."""
+        with self._lock:
+            return {
+                name: {"first_ts": d["first_ts"], "window": d["window"], "items": [dict(e) for e in d["items"]]}
+                for name, d in self._digests.items()
+            }
+
+    def restore_digests(self, held):
+        """Puts digests from held_digests() back (after a restart); their windows keep running."""
+        with self._lock:
+            for name, d in (held or {}).items():
+                if not isinstance(d, dict) or not d.get("items"):
+                    continue
+                first_ts = float(d.get("first_ts") or 0.0)
+                digest = self._digests.setdefault(str(name), {"first_ts": first_ts, "window": float(d.get("window") or 0.0), "items": []})
+                digest["first_ts"] = min(digest["first_ts"], first_ts)
+                digest["items"] = [dict(e) for e in d["items"]] + digest["items"]
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "rules": [r.name for r in self._rules],
+                "path": str(self.path) if self.path else None,
+                "totals": {**self.totals, "suppressed_by": dict(self.totals["suppressed_by"])},
+                "per_rule": {k: dict(v) for k, v in self.per_rule.items()},
+                "pending_digests": {k: len(v["items"]) for k, v in self._digests.items()},
+            }
@@ -4,6 +4,7 @@ import random
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 import backtester as backtester_module
@@ -11,6 +12,8 @@ from backtester import Backtester, calculate_advanced_metrics
 from strategy import Strategy
 
 from .labs_autotune import PARAM_SPACE
+from .overfit_stats import selection_bias_report, window_returns
+from .purged_cv import derive_gap_bars
 from .utils_json import safe_json_dump
 
 
@@ -46,13 +49,20 @@ def latest_data_timestamp(raw_dfs: dict):
     return latest
 
 
-def build_split_windows(data_end_ts, train_days=180, oos_days=28, embargo_days=2):
+def build_split_windows(data_end_ts, train_days=180, oos_days=28, embargo_days=2, params=None):
     """
     Inclusive windows anchored to latest data timestamp T.
       OOS:       [T-(oos_days-1), T]
       Embargo:   [oos_start-embargo_days, oos_start-1]
       Training:  [train_end-(train_days-1), train_end], where train_end=oos_start-embargo_days-1
+
+    If params is given, embargo_days is raised to the purge length derived from the
+    strategy's max hold days (see purged_cv) so no training trade can close inside OOS.
     """
+    embargo_required = None
+    if params is not None:
+        embargo_required, _ = derive_gap_bars(params)
+        embargo_days = max(int(embargo_days), int(embargo_required))
     t = _to_timestamp(data_end_ts).normalize()
     oos_end = t
     oos_start = oos_end - timedelta(days=int(oos_days) - 1)
@@ -75,6 +85,7 @@ def build_split_windows(data_end_ts, train_days=180, oos_days=28, embargo_days=2
         "train_days": int(train_days),
         "oos_days": int(oos_days),
         "embargo_days": int(embargo_days),
+        "embargo_days_required": embargo_required,
     }
 
 
@@ -171,8 +182,10 @@ def compute_score(metrics):
     return roi - 0.5 * abs(mdd) - 0.2 * cost_drop
 
 
-def evaluate_params(raw_dfs, params, start_dt, end_dt, include_cost_stress=False):
-    analyzed = _prepare_symbol_dfs(raw_dfs, params)
+def evaluate_params(raw_dfs, params, start_dt, end_dt, include_cost_stress=False, analyzed=None):
+    """analyzed: optional pre-computed Strategy.analyze panel for these params (skips re-analysis)."""
+    if analyzed is None:
+        analyzed = _prepare_symbol_dfs(raw_dfs, params)
     if not analyzed:
         raise RuntimeError("No analyzed symbols after strategy.analyze")
     _validate_lookahead_contract(analyzed)
@@ -221,28 +234,137 @@ def _emit_progress(progress_cb, pct, stage, message):
         pass
 
 
+class CandidateSampler:
+    """
+    Lazy, checkpointable form of generate_candidates: yields the identical sequence
+    (base params first, then unique random draws) and can snapshot/restore its RNG
+    stream so a resumed search draws exactly the remaining candidates.
+    """
+
+    def __init__(self, base_params, n_trials, seed=42):
+        self.base_params = dict(base_params)
+        self.n_trials = int(n_trials)
+        self.rng = random.Random(int(seed))
+        self.space = _candidate_space()
+        self.keys = list(self.space.keys())
+        self.max_unique = 1
+        for k in self.keys:
+            self.max_unique *= max(1, len(self.space[k]))
+        self.emitted = 0
+        self.seen = set()
+
+    def _key(self, cand):
+        return tuple((k, cand.get(k)) for k in self.keys)
+
+    @property
+    def total(self):
+        return max(1, min(self.n_trials, self.max_unique))
+
+    def next(self):
+        if self.emitted == 0:
+            cand = dict(self.base_params)
+            self.seen.add(self._key(cand))
+            self.emitted += 1
+            return cand
+        while self.emitted < self.n_trials and len(self.seen) < self.max_unique:
+            cand = dict(self.base_params)
+            for k in self.keys:
+                cand[k] = self.rng.choice(self.space[k])
+            key = self._key(cand)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            self.emitted += 1
+            return cand
+        return None
+
+    def get_state(self):
+        version, internal, gauss_next = self.rng.getstate()
+        return {
+            "rng": {"version": version, "internal": list(internal), "gauss_next": gauss_next},
+            "seen": [[list(pair) for pair in key] for key in self.seen],
+            "emitted": int(self.emitted),
+        }
+
+    def set_state(self, state):
+        rng = state["rng"]
+        self.rng.setstate((int(rng["version"]), tuple(int(x) for x in rng["internal"]), rng["gauss_next"]))
+        self.seen = {tuple((str(k), v) for k, v in key) for key in state.get("seen", [])}
+        self.emitted = int(state.get("emitted", 0))
+
+
 def generate_candidates(base_params, n_trials, seed=42):
-    rng = random.Random(int(seed))
-    space = _candidate_space()
-    keys = list(space.keys())
-    out = [dict(base_params)]
-    seen = set()
-    seen.add(tuple((k, out[0].get(k)) for k in keys))
-    max_unique = 1
-    for k in keys:
-        max_unique *= max(1, len(space[k]))
-    while len(out) < int(n_trials) and len(seen) < max_unique:
-        cand = dict(base_params)
-        for k in keys:
-            cand[k] = rng.choice(space[k])
-        key = tuple((k, cand.get(k)) for k in keys)
-        if key in seen:
-            continue
-        seen.add(key)
+    sampler = CandidateSampler(base_params, n_trials, seed=seed)
+    out = []
+    while True:
+        cand = sampler.next()
+        if cand is None:
+            break
         out.append(cand)
     return out
 
 
+def _rank_key(row):
+    return (
+        row["metrics"]["score"],
+        -abs(row["metrics"]["mdd"]),  # lower abs drawdown is better
+        -row["metrics"]["trades"],
+        -row["index"],  # deterministic tie order toward earlier candidate
+    )
+
+
+def search_fingerprint(raw_dfs, base_params, train_start, train_end, n_trials, seed, n_windows):
+    """Identity of a candidate search; a checkpoint is only resumed when this matches."""
+    data_sig = []
+    for sym in sorted((raw_dfs or {}).keys()):
+        dates = _extract_index_datetime(raw_dfs[sym])
+        last = dates.max() if not dates.empty else None
+        data_sig.append([str(sym), int(len(dates)), str(last)])
+    payload = {
+        "base_params": base_params,
+        "train_start": str(_to_timestamp(train_start)),
+        "train_end": str(_to_timestamp(train_end)),
+        "n_trials": int(n_trials),
+        "seed": int(seed),
+        "n_windows": int(n_windows),
+        "data": data_sig,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def cycle_fingerprint(
+    raw_dfs,
+    base_params,
+    universe=None,
+    train_days=180,
+    oos_days=28,
+    embargo_days=2,
+    auto_embargo=False,
+    n_trials=30,
+    global_seed=42,
+    overfit_windows=20,
+):
+    """search_fingerprint of the search run_tuning_cycle would start with these arguments."""
+    scoped_raw = select_universe(raw_dfs, universe=universe)
+    windows = build_split_windows(
+        data_end_ts=latest_data_timestamp(scoped_raw),
+        train_days=int(train_days),
+        oos_days=int(oos_days),
+        embargo_days=int(embargo_days),
+        params=base_params if auto_embargo else None,
+    )
+    return search_fingerprint(
+        scoped_raw,
+        base_params,
+        windows["train_start"],
+        windows["train_end"],
+        int(n_trials),
+        int(global_seed),
+        int(overfit_windows),
+    )
+
+
 def find_best_candidate(
     raw_dfs,
     base_params,
@@ -251,33 +373,71 @@ def find_best_candidate(
     n_trials=30,
     seed=42,
     progress_cb=None,
+    n_windows=20,
+    checkpoint=None,
+    evaluator=None,
 ):
-    cands = generate_candidates(base_params, n_trials=n_trials, seed=seed)
+    """
+    checkpoint: optional TuningCheckpoint. Sampler/RNG state and completed trials are
+    persisted after each batch (one write per batch); a matching incomplete session is
+    resumed in place.
+    evaluator: optional EvaluationService; with n_workers > 1 candidates are drawn and
+    evaluated in batches of n_workers, otherwise one at a time.
+    """
+    sampler = CandidateSampler(base_params, n_trials=n_trials, seed=seed)
     ranked = []
-    total = max(1, len(cands))
-    for idx, cand in enumerate(cands):
-        metrics, _ = evaluate_params(raw_dfs, cand, train_start, train_end)
-        ranked.append(
-            {
-                "index": idx,
-                "params": cand,
-                "metrics": metrics,
-            }
-        )
-        if callable(progress_cb):
-            try:
-                progress_cb(int(idx + 1), int(total), metrics)
-            except Exception:
-                pass
-    ranked.sort(
-        key=lambda x: (
-            x["metrics"]["score"],
-            -abs(x["metrics"]["mdd"]),  # lower abs drawdown is better
-            -x["metrics"]["trades"],
-            -x["index"],  # deterministic tie order toward earlier candidate
-        ),
-        reverse=True,
-    )
+    fingerprint = None
+    if checkpoint is not None:
+        fingerprint = search_fingerprint(raw_dfs, base_params, train_start, train_end, n_trials, seed, n_windows)
+        session = checkpoint.load(fingerprint)
+        if session:
+            sampler.set_state(session["sampler"])
+            ranked = list(session.get("completed") or [])
+    total = sampler.total
+    batch_size = evaluator.n_workers if evaluator is not None else 1
+    while True:
+        batch = []
+        while len(batch) < batch_size:
+            cand = sampler.next()
+            if cand is None:
+                break
+            batch.append((sampler.emitted - 1, cand))
+        if not batch:
+            break
+        if evaluator is not None:
+            outputs = evaluator.evaluate_many(raw_dfs, [c for _, c in batch], train_start, train_end)
+        else:
+            outputs = [evaluate_params(raw_dfs, batch[0][1], train_start, train_end)]
+        rows = []
+        for (idx, cand), (metrics, res) in zip(batch, outputs):
+            rows.append(
+                {
+                    "index": idx,
+                    "params": cand,
+                    "metrics": metrics,
+                    # Trial-by-window returns feed the DSR/PBO selection-bias stats.
+                    "window_returns": window_returns(
+                        res.get("trade_list", []) or [], train_start, train_end, n_windows
+                    ).tolist(),
+                }
+            )
+        ranked.extend(rows)
+        if checkpoint is not None:
+            checkpoint.save(
+                fingerprint,
+                sampler.get_state(),
+                ranked,
+                best=max(ranked, key=_rank_key),
+                final=sampler.emitted >= total,
+                trials=len(rows),
+            )
+        for row in rows:
+            if callable(progress_cb):
+                try:
+                    progress_cb(int(row["index"] + 1), int(total), row["metrics"])
+                except Exception:
+                    pass
+    ranked.sort(key=_rank_key, reverse=True)
     return ranked[0], ranked
 
 
@@ -368,7 +528,21 @@ def evaluate_oos_gate(
     min_trades=20,
     delta_min=0.01,
     mdd_cap=-0.15,
+    selection_stats=None,
+    dsr_min=None,
+    pbo_max=None,
+    stability=None,
+    plateau_min=None,
 ):
+    """
+    selection_stats: optional overfit_stats.selection_bias_report() of the search that
+    produced the candidate. dsr_min / pbo_max turn its DSR / PBO into gate criteria
+    (None = record only).
+    stability: optional param_stability.stability_map() of the candidate; plateau_min
+    gates on its plateau_score.
+    Every enabled criterion fails closed: a statistic that is missing from the
+    report counts as a failure, never as a pass.
+    """
     trades = candidate_res.get("trade_list", []) or []
     weekly = _week_buckets_from_trades(trades, _to_timestamp(oos_start))
     positive_weeks = sum(1 for x in weekly if x > 0)
@@ -399,6 +573,38 @@ def evaluate_oos_gate(
     if float(cand.get("mdd", 0.0) or 0.0) < float(mdd_cap):
         legacy_reasons.append("max_dd_fail")
 
+    stats = dict(selection_stats or {})
+    overfit_reasons = []
+    dsr = stats.get("dsr")
+    pbo = stats.get("pbo")
+    if dsr_min is not None and (dsr is None or float(dsr) < float(dsr_min)):
+        overfit_reasons.append(f"DSR < {float(dsr_min):.2f} ({'n/a' if dsr is None else f'{float(dsr):.3f}'})")
+    if pbo_max is not None and (pbo is None or float(pbo) > float(pbo_max)):
+        overfit_reasons.append(f"PBO > {float(pbo_max):.2f} ({'n/a' if pbo is None else f'{float(pbo):.3f}'})")
+    plateau = (stability or {}).get("plateau_score")
+    if plateau_min is not None and (plateau is None or float(plateau) < float(plateau_min)):
+        overfit_reasons.append(
+            f"Plateau < {float(plateau_min):.2f} ({'n/a' if plateau is None else f'{float(plateau):.3f}'})"
+        )
+    if overfit_reasons:
+        if any(r.startswith("DSR") for r in overfit_reasons):
+            legacy_reasons.append("dsr_fail")
+        if any(r.startswith("PBO") for r in overfit_reasons):
+            legacy_reasons.append("pbo_fail")
+        if any(r.startswith("Plateau") for r in overfit_reasons):
+            legacy_reasons.append("plateau_fail")
+        prior_reasons = list(decision.get("fail_reasons") or [])
+        if decision["decision"] == "KEEP_ACTIVE":
+            # Downgraded from KEEP_ACTIVE: keep why it was not promoted either.
+            legacy_reasons.append("delta_min_fail")
+            prior_reasons.append(decision.get("reason", "keep_active"))
+        decision = {
+            **decision,
+            "decision": "FAIL",
+            "reason": ", ".join(prior_reasons + overfit_reasons),
+            "fail_reasons": prior_reasons + overfit_reasons,
+        }
+
     reasons = []
     if decision["decision"] == "FAIL":
         reasons = legacy_reasons + (decision.get("fail_reasons", []) or [decision.get("reason", "gate_fail")])
@@ -419,6 +625,9 @@ def evaluate_oos_gate(
         "weekly_pnl": weekly,
         "worst_week": worst_week,
         "negative_weeks": negative_weeks,
+        "dsr": dsr,
+        "pbo": pbo,
+        "plateau_score": plateau,
     }
 
 
@@ -444,7 +653,26 @@ def run_tuning_cycle(
     promotion_cooldown_hours=24,
     run_id=None,
     progress_cb=None,
+    auto_embargo=False,
+    dsr_min=None,
+    pbo_max=None,
+    overfit_windows=20,
+    pbo_partitions=10,
+    checkpoint=None,
+    plateau_min=None,
+    stability_steps=1,
+    stability_top_k=2,
+    stability_workers=None,
+    evaluator=None,
 ):
+    """
+    evaluator: EvaluationService shared with the caller (its cache then covers the OOS checks).
+    stability_workers: process pool size for the plateau sweep (None = one per spare core).
+    """
+    if evaluator is None:
+        from .evaluation_service import EvaluationService
+
+        evaluator = EvaluationService()
     _emit_progress(progress_cb, 1, "init", "Initializing tuning cycle")
     if not raw_dfs:
         raise RuntimeError("raw_dfs is empty")
@@ -459,6 +687,7 @@ def run_tuning_cycle(
         train_days=int(train_days),
         oos_days=int(oos_days),
         embargo_days=int(embargo_days),
+        params=base_params if auto_embargo else None,
     )
     _emit_progress(progress_cb, 10, "split_ready", "Train/OOS windows computed")
 
@@ -473,6 +702,22 @@ def run_tuning_cycle(
             f"Training candidates {int(done)}/{int(total)}",
         )
 
+    resumed_trials = 0
+    if checkpoint is not None:
+        fingerprint = search_fingerprint(
+            scoped_raw,
+            base_params,
+            windows["train_start"],
+            windows["train_end"],
+            int(n_trials),
+            int(global_seed),
+            int(overfit_windows),
+        )
+        pending = checkpoint.pending(fingerprint)
+        if pending:
+            resumed_trials = int(pending.get("trials_done", 0) or 0)
+            _emit_progress(progress_cb, 10, "resume", f"Resuming tuning session ({resumed_trials} trials done)")
+
     best, ranked = find_best_candidate(
         scoped_raw,
         base_params=base_params,
@@ -481,10 +726,40 @@ def run_tuning_cycle(
         n_trials=int(n_trials),
         seed=int(global_seed),
         progress_cb=_on_candidate_progress,
+        n_windows=int(overfit_windows),
+        checkpoint=checkpoint,
+        evaluator=evaluator,
+    )
+    # windows x trials; the selected candidate is ranked[0] (its column in search order).
+    returns_matrix = np.array([row["window_returns"] for row in sorted(ranked, key=lambda r: r["index"])]).T
+    selection_stats = selection_bias_report(
+        returns_matrix,
+        selected_idx=int(best["index"]),
+        n_partitions=int(pbo_partitions),
     )
     _emit_progress(progress_cb, 62, "candidate_selected", "Best candidate selected")
 
-    cand_oos_metrics, cand_oos_res = evaluate_params(
+    # The neighborhood sweep costs ~2 backtests per PARAM_SPACE key; only run it when gated.
+    stability = None
+    if plateau_min is not None:
+        from .param_stability import default_stability_workers, stability_map
+
+        if stability_workers is None:
+            stability_workers = default_stability_workers()
+        stability = stability_map(
+            scoped_raw,
+            best["params"],
+            windows["train_start"],
+            windows["train_end"],
+            steps=int(stability_steps),
+            top_k=int(stability_top_k),
+            n_workers=int(stability_workers),
+        )
+        plateau = stability.get("plateau_score")
+        plateau_txt = "n/a" if plateau is None else f"{plateau:.2f}"
+        _emit_progress(progress_cb, 64, "stability_done", f"Stability map done (plateau {plateau_txt})")
+
+    cand_oos_metrics, cand_oos_res = evaluator.evaluate(
         scoped_raw,
         best["params"],
         windows["oos_start"],
@@ -497,7 +772,7 @@ def run_tuning_cycle(
     active_params = model_manager.load_active_params() if active_model_id else None
     active_oos_metrics = None
     if active_params is not None:
-        active_oos_metrics, _ = evaluate_params(
+        active_oos_metrics, _ = evaluator.evaluate(
             scoped_raw,
             active_params,
             windows["oos_start"],
@@ -514,6 +789,11 @@ def run_tuning_cycle(
         min_trades=int(oos_min_trades),
         delta_min=float(delta_min),
         mdd_cap=float(mdd_cap),
+        selection_stats=selection_stats,
+        dsr_min=dsr_min,
+        pbo_max=pbo_max,
+        stability=stability,
+        plateau_min=plateau_min,
     )
 
     # Promotion cooldown to reduce noisy churn between consecutive promotions.
@@ -559,6 +839,9 @@ def run_tuning_cycle(
                 "mdd_cap": float(mdd_cap),
                 "delta_min": float(delta_min),
                 "promotion_cooldown_hours": int(promotion_cooldown_hours),
+                "dsr_min": dsr_min,
+                "pbo_max": pbo_max,
+                "plateau_min": plateau_min,
             },
             "invariants": {
                 "signal_lag_gte_1": True,
@@ -584,6 +867,8 @@ def run_tuning_cycle(
             "reason": gate.get("reason"),
             "delta": gate.get("delta"),
         },
+        "selection_bias": selection_stats,
+        "stability": stability,
         "ranking_top5": [
             {
                 "rank": i + 1,
@@ -626,6 +911,14 @@ def run_tuning_cycle(
     else:
         model_manager.archive_staging(run_id)
         result_state = "ARCHIVED"
+    if checkpoint is not None:
+        checkpoint.complete(
+            leaderboard=[
+                {"rank": i + 1, "index": row["index"], "params": row["params"], "metrics": row["metrics"]}
+                for i, row in enumerate(ranked)
+            ],
+            run_id=run_id,
+        )
     _emit_progress(progress_cb, 100, "done", f"Tuning cycle finished ({result_state})")
 
     return {
@@ -646,6 +939,9 @@ def run_tuning_cycle(
         "worst_week": gate.get("worst_week", 0.0),
         "candidate_params": best["params"],
         "active_baseline_params": active_params,
+        "selection_bias": selection_stats,
+        "stability": stability,
+        "resumed_trials": resumed_trials,
     }
 
 
@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger("OrderTracker")
+
+FILLED_STATUSES = {"closed", "filled"}
+CANCELED_STATUSES = {"canceled", "cancelled", "rejected", "expired"}
+
+
+class TrackedOrder:
+    """One exchange order followed by OrderTracker (fields are read-only for callers)."""
+
+    def __init__(self, exchange_api, order_id, ccxt_symbol, now, timeout_sec, interval_sec, growth, callbacks):
+        self.exchange_api = exchange_api
+        self.order_id = order_id
+        self.ccxt_symbol = ccxt_symbol
+        self.created_at = now
+        self.deadline = now + max(0.0, timeout_sec)
+        self.base_interval = interval_sec
+        self.interval = interval_sec
+        self.growth = growth
+        self.next_poll_at = now
+        self.callbacks = callbacks
+        self.phase = "open"  # open | cancel
+        self.status = "open"  # open | filled | canceled | timeout
+        self.polls = 0
+        self.filled = 0.0
+        self.last_order = None
+        self.rate_limited = False
+        self.cancel_requested = False
+        self.done = threading.Event()
+
+    @property
+    def is_done(self):
+        return self.done.is_set()
+
+
+class OrderTracker:
+    """
+    Follows every open order from one scheduler instead of a sleep loop per order.
+
+    Each order is polled on its own schedule: the interval grows by `growth` after
+    every poll without fill progress (orders that rest get polled less and less),
+    resets on a partial fill, and backs off by `rate_limit_backoff` on 429s. The
+    last poll always lands on the deadline.
+
+    poll_due() polls whatever is due and fires callbacks (on_fill / on_partial /
+    on_cancel / on_timeout, each called with the TrackedOrder) and any work
+    deferred with call_later(); the run loop pumps it every tick, so resting
+    orders and multi-step executions never block it. wait() pumps the same
+    scheduler for callers that need a synchronous result. clock/sleep are injectable so a
+    simulated exchange clock drives deterministic tests.
+    """
+
+    def __init__(
+        self,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        max_interval_sec=2.0,
+        rate_limit_backoff=1.5,
+        rate_limit_max_interval_sec=5.0,
+        is_rate_limit_error=None,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self.max_interval_sec = float(max_interval_sec)
+        self.rate_limit_backoff = float(rate_limit_backoff)
+        self.rate_limit_max_interval_sec = float(rate_limit_max_interval_sec)
+        self._is_rate_limit_error = is_rate_limit_error or (lambda e: "429" in str(e) or "rate" in str(e).lower())
+        self._lock = threading.RLock()
+        self._pump_lock = threading.Lock()
+        self._orders = {}
+        self._timers = []  # heap of (due_at, seq, fn): deferred work run by the pump
+        self._timer_seq = itertools.count()
+        # Counters (exposed for diagnostics/tests)
+        self.fetches = 0
+
+    # ----- registration -----
+    def track(self, exchange_api, order_id, ccxt_symbol, timeout_sec, interval_sec=0.3, growth=1.25, **callbacks):
+        tracked = TrackedOrder(
+            exchange_api,
+            order_id,
+            ccxt_symbol,
+            now=self._clock(),
+            timeout_sec=timeout_sec,
+            interval_sec=max(0.05, float(interval_sec)),
+            growth=max(1.0, float(growth)),
+            callbacks=callbacks,
+        )
+        with self._lock:
+            self._orders[id(tracked)] = tracked
+        return tracked
+
+    def cancel(self, tracked, wait_sec=3.0, interval_sec=0.25):
+        """Sends cancel and re-arms tracking until the exchange confirms a final status."""
+        try:
+            if hasattr(tracked.exchange_api, "cancel_order"):
+                tracked.exchange_api.cancel_order(tracked.order_id, tracked.ccxt_symbol)
+        except Exception:
+            pass
+        now = self._clock()
+        with self._lock:
+            tracked.phase = "cancel"
+            tracked.cancel_requested = True
+            tracked.status = "open"
+            tracked.deadline = now + max(wait_sec, 0.5)
+            tracked.base_interval = tracked.interval = max(0.05, float(interval_sec))
+            tracked.growth = 1.0
+            tracked.next_poll_at = now
+            tracked.done.clear()
+            self._orders[id(tracked)] = tracked
+        return tracked
+
+    def call_later(self, delay_sec, fn):
+        """Runs fn() from the pump once `delay_sec` of scheduler time has passed."""
+        with self._lock:
+            heapq.heappush(self._timers, (self._clock() + max(0.0, float(delay_sec)), next(self._timer_seq), fn))
+
+    def now(self):
+        return self._clock()
+
+    def sleep(self, sec):
+        """Scheduler-clock sleep (simulated in tests/replay)."""
+        if sec > 0:
+            self._sleep(sec)
+
+    def open_orders(self):
+        with self._lock:
+            return list(self._orders.values())
+
+    def idle(self):
+        """True when no order is tracked and no deferred work is scheduled."""
+        with self._lock:
+            return not self._orders and not self._timers
+
+    def next_due_in(self):
+        with self._lock:
+            due = [t.next_poll_at for t in self._orders.values()]
+            if self._timers:
+                due.append(self._timers[0][0])
+            if not due:
+                return None
+            return max(0.0, min(due) - self._clock())
+
+    # ----- scheduler -----
+    def poll_due(self):
+        """
+        Polls every order whose next poll is due; returns the orders that settled.
+        Returns [] without polling while another thread is pumping.
+        """
+        if not self._pump_lock.acquire(blocking=False):
+            return []
+        try:
+            return self._poll_due_locked()
+        finally:
+            self._pump_lock.release()
+
+    def _poll_due_locked(self):
+        now = self._clock()
+        with self._lock:
+            due = [t for t in self._orders.values() if t.next_poll_at <= now]
+        settled = []
+        for tracked in due:
+            if self._poll_one(tracked):
+                settled.append(tracked)
+        self._run_due_timers()
+        return settled
+
+    def _run_due_timers(self):
+        while True:
+            with self._lock:
+                if not self._timers or self._timers[0][0] > self._clock():
+                    return
+                _, _, fn = heapq.heappop(self._timers)
+            try:
+                fn()
+            except Exception as e:
+                logger.warning(f"[ORDER] scheduled callback failed: {e}")
+
+    def _poll_one(self, tracked):
+        event = None
+        try:
+            self.fetches += 1
+            order = None
+            if tracked.order_id and tracked.exchange_api is not None and hasattr(tracked.exchange_api, "fetch_order"):
+                order = tracked.exchange_api.fetch_order(tracked.order_id, tracked.ccxt_symbol)
+            tracked.polls += 1
+            progressed = False
+            if order:
+                tracked.last_order = order
+                status = str(order.get("status", "")).lower()
+                amount = self._safe_float(order.get("amount"))
+                filled = self._safe_float(order.get("filled"))
+                progressed = filled > tracked.filled + 1e-12
+                tracked.filled = max(tracked.filled, filled)
+                if status in FILLED_STATUSES or (amount > 0 and filled >= amount - 1e-12):
+                    event = "filled"
+                elif status in CANCELED_STATUSES:
+                    event = "canceled"
+                elif progressed and tracked.phase == "open":
+                    self._fire(tracked, "on_partial")
+            # Fill progress means the book is trading through us: poll eagerly again.
+            tracked.interval = tracked.base_interval if progressed else tracked.interval * tracked.growth
+            tracked.interval = min(tracked.interval, self.max_interval_sec)
+        except Exception as e:
+            if self._is_rate_limit_error(e):
+                tracked.rate_limited = True
+                tracked.interval = min(tracked.interval * self.rate_limit_backoff, self.rate_limit_max_interval_sec)
+            else:
+                logger.warning("[ORDER] Poll error %s", e)
+
+        now = self._clock()
+        if event is None and now >= tracked.deadline:
+            event = "timeout"
+        if event is None:
+            tracked.next_poll_at = min(now + tracked.interval, tracked.deadline)
+            return False
+        self._settle(tracked, event)
+        return True
+
+    def _settle(self, tracked, event):
+        with self._lock:
+            self._orders.pop(id(tracked), None)
+            tracked.status = event
+        tracked.done.set()
+        self._fire(tracked, {"filled": "on_fill", "canceled": "on_cancel", "timeout": "on_timeout"}[event])
+
+    def _fire(self, tracked, name):
+        cb = tracked.callbacks.get(name)
+        if cb is None:
+            return
+        try:
+            cb(tracked)
+        except Exception as e:
+            logger.warning(f"[ORDER] {name} callback failed for {tracked.order_id}: {e}")
+
+    def wait(self, tracked=None, until=None):
+        """
+        Drives the shared scheduler (other orders progress too) until `until()` holds,
+        else until `tracked` settles, else until no order or deferred work is left. For callers
+        outside the run loop that need a synchronous result, and for shutdown drains.
+        """
+        if until is None:
+            if tracked is not None:
+                until = tracked.done.is_set
+            else:
+                until = self.idle
+        while not until():
+            if self._pump_lock.acquire(blocking=False):
+                try:
+                    self._poll_due_locked()
+                    delay = self.next_due_in()
+                finally:
+                    self._pump_lock.release()
+                if until() or delay is None:
+                    break
+                self._sleep(delay)
+            else:
+                # Another thread is pumping; it fires the callbacks we are waiting on.
+                time.sleep(0.05)
+        return tracked
+
+    @staticmethod
+    def _safe_float(value, default=0.0):
+        try:
+            return float(value) if value is not None else default
+        except Exception:
+            return default
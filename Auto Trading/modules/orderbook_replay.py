@@ -0,0 +1,367 @@
+"""
+L2 order book recording and offline execution replay.
+
+OrderBookRecorder persists every book ExecutionEngine fetches (entry, exit,
+quote) as compressed columnar parquet parts, one row per price level:
+
+  ts, symbol, event, side ("bid"/"ask"), level, price, qty
+
+replay_policies() groups recorded books into episodes (same symbol/event,
+consecutive within `episode_gap_sec`) and drives the real ExecutionEngine
+paths (execute_entry, create_marketable_limit_sell_order, execute_panic_exit)
+against a ReplayExchange serving those books, once per execution policy.
+A policy is a dict of ExecutionEngine attribute overrides, e.g.
+{"name": "touch", "entry_limit_offset_ticks": 0, "exit_aggressive_ticks": 1} or
+{"name": "twap4", "entry_exec_mode": "TWAP", "entry_slices": 4}.
+
+Implementation shortfall is measured against the arrival mid of each episode:
+  buy:  (vwap / mid - 1) * 1e4 + fee_bps
+  sell: (1 - vwap / mid) * 1e4 + fee_bps
+Resting (non-marketable) remainders never fill in replay, so fill_ratio is
+reported alongside and conservative policies are not flattered.
+"""
+import copy
+import logging
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger("OrderBookReplay")
+
+BOOK_COLUMNS = ["ts", "symbol", "event", "side", "level", "price", "qty"]
+REPLAY_POLICY_KEYS = {
+    "entry_limit_offset_ticks",
+    "exit_aggressive_ticks",
+    "panic_aggressive_ticks",
+    "max_entry_slippage_pct",
+    "entry_timeout_sec",
+    "exit_timeout_sec",
+    "entry_exec_mode",
+    "entry_slices",
+    "entry_slice_interval_sec",
+    "entry_pov_rate",
+}
+
+
+class OrderBookRecorder:
+    def __init__(self, root_dir="results/orderbooks", depth=15, flush_rows=3000, flush_interval_sec=60.0, clock=time.time):
+        self.root_dir = Path(root_dir)
+        self.depth = max(1, int(depth))
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_sec = float(flush_interval_sec)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rows = []
+        self._last_flush = clock()
+        self.snapshots = 0
+        self.parts_written = 0
+
+    def record(self, symbol, orderbook, event="BOOK", ts=None):
+        ts = float(ts if ts is not None else (orderbook or {}).get("timestamp") or 0.0) or self._clock()
+        if ts > 1e11:  # ccxt timestamps are ms
+            ts = ts / 1000.0
+        rows = []
+        for side, key in (("bid", "bids"), ("ask", "asks")):
+            for level, entry in enumerate(((orderbook or {}).get(key) or [])[: self.depth]):
+                if not isinstance(entry, (list, tuple)) or len(entry) < 2:
+                    continue
+                rows.append((ts, str(symbol), str(event), side, level, float(entry[0]), float(entry[1])))
+        if not rows:
+            return
+        with self._lock:
+            self._rows.extend(rows)
+            self.snapshots += 1
+            due = len(self._rows) >= self.flush_rows or (self._clock() - self._last_flush) >= self.flush_interval_sec
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._last_flush = self._clock()
+        if not rows:
+            return None
+        df = pd.DataFrame.from_records(rows, columns=BOOK_COLUMNS)
+        day = datetime.fromtimestamp(rows[0][0]).strftime("%Y%m%d")
+        out_dir = self.root_dir / day
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"books_{int(rows[0][0] * 1000)}_{self.parts_written:04d}.parquet"
+        df.to_parquet(path, compression="zstd", index=False)
+        self.parts_written += 1
+        return path
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"[BOOK] final flush failed: {e}")
+
+
+def load_snapshots(root_dir="results/orderbooks", symbol=None, event=None, start_ts=None, end_ts=None):
+    """Recorded books as [{"ts", "symbol", "event", "bids", "asks"}, ...] sorted by time."""
+    files = sorted(Path(root_dir).glob("*/*.parquet"))
+    if not files:
+        return []
+    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    if symbol is not None:
+        df = df[df["symbol"] == symbol]
+    if event is not None:
+        events = {event} if isinstance(event, str) else set(event)
+        df = df[df["event"].isin(events)]
+    if start_ts is not None:
+        df = df[df["ts"] >= float(start_ts)]
+    if end_ts is not None:
+        df = df[df["ts"] <= float(end_ts)]
+
+    snapshots = []
+    for (ts, sym, ev), g in df.sort_values(["ts", "side", "level"]).groupby(["ts", "symbol", "event"], sort=True):
+        bids = g[g["side"] == "bid"].sort_values("level")
+        asks = g[g["side"] == "ask"].sort_values("level")
+        snapshots.append(
+            {
+                "ts": float(ts),
+                "symbol": sym,
+                "event": ev,
+                "bids": [[float(p), float(q)] for p, q in zip(bids["price"], bids["qty"])],
+                "asks": [[float(p), float(q)] for p, q in zip(asks["price"], asks["qty"])],
+            }
+        )
+    snapshots.sort(key=lambda s: s["ts"])
+    return snapshots
+
+
+def group_episodes(snapshots, episode_gap_sec=30.0):
+    """Consecutive books of one symbol/event kind ("ENTRY" vs exits) within the gap form one episode."""
+    episodes = []
+    open_by_key = {}
+    for snap in sorted(snapshots, key=lambda s: s["ts"]):
+        kind = "ENTRY" if snap["event"] == "ENTRY" else "EXIT"
+        key = (snap["symbol"], kind)
+        ep = open_by_key.get(key)
+        if ep is None or snap["ts"] - ep["books"][-1]["ts"] > episode_gap_sec:
+            ep = {"symbol": snap["symbol"], "kind": kind, "books": []}
+            episodes.append(ep)
+            open_by_key[key] = ep
+        ep["books"].append(snap)
+    return episodes
+
+
+class _ReplayClock:
+    def __init__(self, t0):
+        self.t = float(t0)
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, dt):
+        self.t += max(0.0, dt)
+
+
+class ReplayExchange:
+    """
+    ccxt-shaped exchange over recorded books. Limit orders take liquidity through
+    their price immediately (levels are depleted for later legs); any remainder
+    rests and never fills. Each fetch_order_book advances to the next recorded
+    book of the episode (sticking at the last one).
+    """
+
+    def __init__(self, books, fee_rate=0.0005, clock=None):
+        self.books = [copy.deepcopy(b) for b in books] or [{"bids": [], "asks": []}]
+        self.fee_rate = float(fee_rate)
+        self.clock = clock or _ReplayClock(self.books[0].get("ts", 0.0))
+        self._cursor = -1
+        self._orders = {}
+        self._fills = {}
+        self._seq = 0
+
+    @property
+    def book(self):
+        return self.books[max(0, self._cursor)]
+
+    def load_markets(self):
+        return {}
+
+    def market(self, symbol):
+        return {"active": True, "state": "ACTIVE", "warning": "NONE"}
+
+    def fetch_order_book(self, symbol, limit=None):
+        self._cursor = min(self._cursor + 1, len(self.books) - 1)
+        book = self.book
+        return {"bids": [list(x) for x in book["bids"]], "asks": [list(x) for x in book["asks"]], "timestamp": book.get("ts")}
+
+    def _match(self, side, qty, price):
+        levels = self.book["asks"] if side == "buy" else self.book["bids"]
+        fills = []
+        remaining = qty
+        for level in levels:
+            px, avail = float(level[0]), float(level[1])
+            through = px <= price if side == "buy" else px >= price
+            if not through or remaining <= 1e-12:
+                break
+            take = min(avail, remaining)
+            if take <= 0:
+                continue
+            level[1] = avail - take
+            remaining -= take
+            fills.append({"amount": take, "price": px, "fee": {"cost": take * px * self.fee_rate}})
+        return fills, remaining
+
+    def create_order(self, symbol, order_type, side, qty, price, params=None):
+        self._seq += 1
+        order_id = f"replay-{self._seq}"
+        fills, remaining = self._match(side, float(qty), float(price))
+        filled = float(qty) - remaining
+        if remaining <= 1e-12:
+            status = "closed"
+        elif str((params or {}).get("timeInForce", "")).upper() == "IOC":
+            status = "canceled"
+        else:
+            status = "open"
+        self._orders[order_id] = {"id": order_id, "symbol": symbol, "side": side, "amount": float(qty), "filled": filled, "status": status}
+        self._fills[order_id] = fills
+        return {"id": order_id}
+
+    def create_limit_buy_order(self, symbol, qty, price, params=None):
+        return self.create_order(symbol, "limit", "buy", qty, price, params)
+
+    def create_limit_sell_order(self, symbol, qty, price, params=None):
+        return self.create_order(symbol, "limit", "sell", qty, price, params)
+
+    def fetch_order(self, order_id, symbol=None):
+        return dict(self._orders[order_id])
+
+    def cancel_order(self, order_id, symbol=None):
+        od = self._orders.get(order_id)
+        if od and od["status"] == "open":
+            od["status"] = "canceled"
+
+    def fetch_open_orders(self, symbol=None):
+        return [dict(o) for o in self._orders.values() if o["status"] == "open" and (symbol is None or o["symbol"] == symbol)]
+
+    def get_fills(self, order_id):
+        return list(self._fills.get(order_id, []))
+
+
+class _ReplayBudget:
+    def get_available_for_bot(self, current_real_krw=None, symbol=None):
+        return float(current_real_krw or 0.0)
+
+    def can_buy(self, required_krw, current_real_krw, symbol=None):
+        return True, "OK"
+
+
+def _mid(book):
+    try:
+        return (float(book["bids"][0][0]) + float(book["asks"][0][0])) / 2.0
+    except Exception:
+        return 0.0
+
+
+def _replay_engine(policy, exchange, log_dir):
+    from .execution_engine import ExecutionEngine
+
+    engine = ExecutionEngine("replay", log_dir, _ReplayBudget(), clock=exchange.clock, sleep=exchange.clock.sleep)
+    for key, value in (policy or {}).items():
+        if key in REPLAY_POLICY_KEYS:
+            setattr(engine, key, tuple(value) if key == "panic_aggressive_ticks" else value)
+    return engine
+
+
+def _shortfall_row(policy_name, action, episode, mid, side, target_qty, res):
+    qty = float(res.get("real_qty") or 0.0)
+    vwap = float(res.get("real_vwap") or 0.0)
+    fee = float(res.get("fee") or 0.0)
+    row = {
+        "policy": policy_name,
+        "action": action,
+        "symbol": episode["symbol"],
+        "ts": episode["books"][0]["ts"],
+        "arrival_mid": mid,
+        "filled_qty": qty,
+        "fill_ratio": (qty / target_qty) if target_qty > 0 else 0.0,
+        "vwap": vwap,
+        "shortfall_bps": None,
+        "reason": res.get("reason"),
+    }
+    if qty > 0 and vwap > 0 and mid > 0:
+        price_bps = (vwap / mid - 1.0) * 1e4 if side == "buy" else (1.0 - vwap / mid) * 1e4
+        row["shortfall_bps"] = price_bps + (fee / (qty * vwap)) * 1e4
+    return row
+
+
+def replay_policies(snapshots, policies, target_money=100000.0, exit_notional=None, fee_rate=0.0005, episode_gap_sec=30.0, log_dir=None):
+    """
+    Replays every recorded episode under each policy.
+    ENTRY episodes run execute_entry(target_money); exit episodes run both the
+    regular marketable-limit exit and execute_panic_exit for `exit_notional`
+    (defaults to target_money) worth of base at the arrival mid.
+    Returns {"rows": [...], "summary": {policy: {action: stats}}}.
+    """
+    episodes = group_episodes(snapshots, episode_gap_sec=episode_gap_sec)
+    exit_notional = float(exit_notional if exit_notional is not None else target_money)
+    tmp = None
+    if log_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        log_dir = tmp.name
+    rows = []
+    try:
+        for policy in policies:
+            name = policy.get("name") or "policy"
+            for ep in episodes:
+                mid = _mid(ep["books"][0])
+                if mid <= 0:
+                    continue
+                symbol = ep["symbol"]
+                if ep["kind"] == "ENTRY":
+                    exchange = ReplayExchange(ep["books"], fee_rate=fee_rate)
+                    engine = _replay_engine(policy, exchange, log_dir)
+                    asks = ep["books"][0]["asks"]
+                    signal = {
+                        "symbol": symbol,
+                        "target_money": target_money,
+                        "spread_bp": 0.0,
+                        "ask_depth_sum": sum(float(p) * float(q) for p, q in asks),
+                        "chase_pct": 0.0,
+                    }
+                    res = engine.execute_entry(signal, {"price": mid, "balance": target_money}, exchange_api=exchange)
+                    engine.close()
+                    rows.append(_shortfall_row(name, "entry", ep, mid, "buy", target_money / mid, res))
+                    continue
+
+                qty = exit_notional / mid
+                exchange = ReplayExchange(ep["books"], fee_rate=fee_rate)
+                engine = _replay_engine(policy, exchange, log_dir)
+                res = engine.create_market_sell_order(symbol, qty, exchange_api=exchange)
+                engine.close()
+                rows.append(_shortfall_row(name, "exit", ep, mid, "sell", qty, res))
+
+                exchange = ReplayExchange(ep["books"], fee_rate=fee_rate)
+                engine = _replay_engine(policy, exchange, log_dir)
+                res = engine.execute_panic_exit(symbol, qty, exchange_api=exchange, unrealized_pnl_pct=0.0)
+                engine.close()
+                rows.append(_shortfall_row(name, "panic", ep, mid, "sell", qty, res))
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    summary = {}
+    for row in rows:
+        stats = summary.setdefault(row["policy"], {}).setdefault(
+            row["action"], {"n": 0, "filled": 0, "fill_ratio": 0.0, "shortfall_bps": []}
+        )
+        stats["n"] += 1
+        stats["fill_ratio"] += row["fill_ratio"]
+        if row["shortfall_bps"] is not None:
+            stats["filled"] += 1
+            stats["shortfall_bps"].append(row["shortfall_bps"])
+    for actions in summary.values():
+        for stats in actions.values():
+            values = stats.pop("shortfall_bps")
+            stats["fill_ratio"] = stats["fill_ratio"] / stats["n"] if stats["n"] else 0.0
+            stats["mean_shortfall_bps"] = float(sum(values) / len(values)) if values else None
+            stats["median_shortfall_bps"] = float(pd.Series(values).median()) if values else None
+    return {"rows": rows, "summary": summary}
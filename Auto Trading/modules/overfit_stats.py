@@ -0,0 +1,185 @@
+"""
+Selection-bias statistics for tuning runs (Bailey & Lopez de Prado).
+
+Input is a trial-by-window return matrix R with shape (T windows, N trials):
+  - deflated_sharpe_ratio: probability that the selected trial's Sharpe beats the
+    Sharpe expected from the best of N unskilled trials.
+  - probability_of_backtest_overfitting: CSCV over S window groups; fraction of
+    IS/OOS splits where the IS-best trial ranks below the OOS median.
+
+Everything is vectorized over trials; CSCV combinations are processed in chunks
+so 1,000 trials x 20 windows stays well under a second.
+"""
+import math
+from itertools import combinations
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+EULER_GAMMA = 0.5772156649015329
+_NORM = NormalDist()
+_CSCV_CHUNK = 2048
+
+
+def _as_matrix(returns_matrix):
+    m = np.asarray(returns_matrix, dtype=float)
+    if m.ndim == 1:
+        m = m.reshape(-1, 1)
+    if m.ndim != 2:
+        raise ValueError("returns_matrix must be 2-D (windows x trials)")
+    return np.nan_to_num(m, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def sharpe_ratios(returns_matrix):
+    """Per-trial (non-annualized) Sharpe ratios over the window axis."""
+    m = _as_matrix(returns_matrix)
+    mu = m.mean(axis=0)
+    sd = m.std(axis=0, ddof=1) if m.shape[0] > 1 else np.zeros(m.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sr = np.where(sd > 1e-12, mu / sd, 0.0)
+    return sr
+
+
+def expected_max_sharpe(n_trials, sharpe_variance):
+    """E[max SR] of n_trials independent unskilled strategies (False Strategy Theorem)."""
+    n = int(n_trials)
+    if n < 2 or sharpe_variance <= 0:
+        return 0.0
+    z1 = _NORM.inv_cdf(1.0 - 1.0 / n)
+    z2 = _NORM.inv_cdf(1.0 - 1.0 / (n * math.e))
+    return math.sqrt(sharpe_variance) * ((1.0 - EULER_GAMMA) * z1 + EULER_GAMMA * z2)
+
+
+def probabilistic_sharpe_ratio(sr, sr_benchmark, n_obs, skew=0.0, kurtosis=3.0):
+    """P[true SR > sr_benchmark] given an observed sr over n_obs windows (non-normal returns)."""
+    if n_obs < 2:
+        return None
+    denom = 1.0 - skew * sr + (kurtosis - 1.0) / 4.0 * sr * sr
+    if denom <= 0:
+        return None
+    z = (sr - sr_benchmark) * math.sqrt(n_obs - 1) / math.sqrt(denom)
+    return float(_NORM.cdf(z))
+
+
+def _moments(x):
+    x = np.asarray(x, dtype=float)
+    sd = x.std()
+    if sd <= 1e-12:
+        return 0.0, 3.0
+    z = (x - x.mean()) / sd
+    return float((z ** 3).mean()), float((z ** 4).mean())
+
+
+def deflated_sharpe_ratio(returns_matrix, selected_idx=None):
+    """
+    DSR of the selected trial (default: highest Sharpe) against the expected max
+    Sharpe of all N trials in the matrix.
+    """
+    m = _as_matrix(returns_matrix)
+    n_obs, n_trials = m.shape
+    sr = sharpe_ratios(m)
+    if selected_idx is None:
+        selected_idx = int(np.argmax(sr))
+    sr_sel = float(sr[selected_idx])
+    sr_var = float(sr.var(ddof=1)) if n_trials > 1 else 0.0
+    sr0 = expected_max_sharpe(n_trials, sr_var)
+    skew, kurt = _moments(m[:, selected_idx])
+    dsr = probabilistic_sharpe_ratio(sr_sel, sr0, n_obs, skew=skew, kurtosis=kurt)
+    return {
+        "dsr": dsr,
+        "sharpe": sr_sel,
+        "sharpe_benchmark": sr0,
+        "sharpe_variance": sr_var,
+        "n_trials": int(n_trials),
+        "n_obs": int(n_obs),
+        "skew": skew,
+        "kurtosis": kurt,
+    }
+
+
+def probability_of_backtest_overfitting(returns_matrix, n_partitions=10):
+    """
+    Combinatorially-symmetric CV. Windows are grouped into n_partitions (even) blocks;
+    for each of C(S, S/2) IS/OOS splits the IS-best trial's OOS relative rank w gives
+    logit(w). PBO = P[logit <= 0].
+    """
+    m = _as_matrix(returns_matrix)
+    n_obs, n_trials = m.shape
+    if n_trials < 2:
+        return {"pbo": None, "n_splits": 0, "n_partitions": 0, "logit_median": None}
+
+    s = min(int(n_partitions), n_obs)
+    s -= s % 2
+    if s < 2:
+        return {"pbo": None, "n_splits": 0, "n_partitions": s, "logit_median": None}
+
+    # Per-group sufficient statistics: count, sum, sum of squares (S x N).
+    groups = np.array_split(np.arange(n_obs), s)
+    cnt = np.array([len(g) for g in groups], dtype=float)
+    sums = np.stack([m[g].sum(axis=0) for g in groups])
+    sqs = np.stack([(m[g] ** 2).sum(axis=0) for g in groups])
+
+    combos = np.array(list(combinations(range(s), s // 2)), dtype=np.intp)
+    membership = np.zeros((len(combos), s), dtype=float)
+    np.put_along_axis(membership, combos, 1.0, axis=1)
+
+    def _sharpe(w):
+        n = w @ cnt
+        sm = w @ sums
+        sq = w @ sqs
+        mu = sm / n[:, None]
+        var = (sq - n[:, None] * mu * mu) / np.maximum(n[:, None] - 1.0, 1.0)
+        sd = np.sqrt(np.maximum(var, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(sd > 1e-12, mu / sd, 0.0)
+
+    logits = np.empty(len(combos))
+    for start in range(0, len(combos), _CSCV_CHUNK):
+        w_is = membership[start:start + _CSCV_CHUNK]
+        perf_is = _sharpe(w_is)
+        perf_oos = _sharpe(1.0 - w_is)
+        best = np.argmax(perf_is, axis=1)
+        best_oos = perf_oos[np.arange(len(best)), best]
+        # Relative rank in (0, 1); ties counted at half weight.
+        below = (perf_oos < best_oos[:, None]).sum(axis=1)
+        ties = (perf_oos == best_oos[:, None]).sum(axis=1)
+        omega = (below + 0.5 * ties) / (n_trials + 1.0)
+        omega = np.clip(omega, 1e-9, 1.0 - 1e-9)
+        logits[start:start + len(best)] = np.log(omega / (1.0 - omega))
+
+    return {
+        "pbo": float((logits <= 0).mean()),
+        "n_splits": int(len(combos)),
+        "n_partitions": int(s),
+        "logit_median": float(np.median(logits)),
+    }
+
+
+def window_returns(trade_list, start, end, n_windows):
+    """Sum trade returns into n_windows equal calendar slices of [start, end] by exit date."""
+    out = np.zeros(int(n_windows))
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    span = max(1, (end - start).days + 1)
+    for t in trade_list or []:
+        exit_dt = t.get("exit_date")
+        if exit_dt is None:
+            continue
+        try:
+            exit_dt = pd.Timestamp(exit_dt).normalize()
+            ret = float(t.get("return", 0.0) or 0.0)
+        except Exception:
+            continue
+        offset = (exit_dt - start).days
+        if offset < 0 or offset >= span:
+            continue
+        out[min(int(n_windows) - 1, offset * int(n_windows) // span)] += ret
+    return out
+
+
+def selection_bias_report(returns_matrix, selected_idx=None, n_partitions=10):
+    """DSR + PBO in one JSON-friendly dict (recorded in the tuning run summary)."""
+    dsr = deflated_sharpe_ratio(returns_matrix, selected_idx=selected_idx)
+    pbo = probability_of_backtest_overfitting(returns_matrix, n_partitions=n_partitions)
+    return {**dsr, **pbo}
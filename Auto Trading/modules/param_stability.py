@@ -0,0 +1,259 @@
+"""
+Sensitivity / stability map around a tuned parameter set.
+
+A winner from find_best_candidate may sit on a narrow spike of the score surface.
+This module scores a structured neighborhood on the same (training) window:
+  - one-at-a-time: each PARAM_SPACE key moved +/- 1..steps grid positions;
+  - pairwise grids: full (2*steps+1)^2 grids for every pair of the top_k most
+    sensitive keys (heat-map data).
+
+plateau_score = share of neighbors whose score stays within `tolerance` of the
+base score (or better); 1.0 = flat plateau, 0.0 = isolated spike.
+
+Strategy.analyze only depends on signal params, so analyzed panels are cached per
+signal-param subset: all execution-only neighbors (stops, sizing, limits) reuse the
+base panel. Evaluations run in a process pool when n_workers > 1.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+
+from .labs_autotune import PARAM_SPACE
+from .oos_tuner import _prepare_symbol_dfs, _to_timestamp, evaluate_params
+
+# PARAM_SPACE keys consumed by Backtester only (not read by Strategy.analyze).
+EXECUTION_ONLY_KEYS = frozenset(
+    {
+        "sl_atr_mult_A",
+        "trail_atr_mult_A",
+        "partial_tp_r_A",
+        "sl_atr_mult_B",
+        "max_entries_per_day",
+        "max_open_positions",
+        "cooldown_days_after_sl",
+        "daily_loss_limit_pct",
+    }
+)
+
+_ANALYSIS_CACHE_SIZE = 4
+_WORKER_PANEL = {}
+_WORKER_WINDOW = (None, None)
+_ANALYSIS_CACHE = {}
+
+
+def signal_key(params):
+    """Cache key of the Strategy.analyze panel: the params minus EXECUTION_ONLY_KEYS."""
+    return json.dumps(
+        {k: v for k, v in params.items() if k not in EXECUTION_ONLY_KEYS},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def params_key(params):
+    """Cache key of one full parameter set."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _init_worker(raw_dfs, start_dt, end_dt):
+    global _WORKER_PANEL, _WORKER_WINDOW
+    _WORKER_PANEL = raw_dfs
+    _WORKER_WINDOW = (start_dt, end_dt)
+    _ANALYSIS_CACHE.clear()
+
+
+def _analyzed_panel(params):
+    key = signal_key(params)
+    analyzed = _ANALYSIS_CACHE.get(key)
+    if analyzed is None:
+        while len(_ANALYSIS_CACHE) >= _ANALYSIS_CACHE_SIZE:
+            _ANALYSIS_CACHE.pop(next(iter(_ANALYSIS_CACHE)))
+        analyzed = _prepare_symbol_dfs(_WORKER_PANEL, params)
+        _ANALYSIS_CACHE[key] = analyzed
+    return analyzed
+
+
+def _eval_task(params):
+    start_dt, end_dt = _WORKER_WINDOW
+    metrics, _ = evaluate_params(_WORKER_PANEL, params, start_dt, end_dt, analyzed=_analyzed_panel(params))
+    return {
+        "score": float(metrics.get("score", 0.0) or 0.0),
+        "roi": float(metrics.get("roi", 0.0) or 0.0),
+        "mdd": float(metrics.get("mdd", 0.0) or 0.0),
+        "trades": int(metrics.get("trades", 0) or 0),
+    }
+
+
+def grid_index(key, value):
+    """Position of value on PARAM_SPACE[key]; off-grid values snap to the nearest point."""
+    grid = PARAM_SPACE[key]
+    if value in grid:
+        return grid.index(value)
+    try:
+        return min(range(len(grid)), key=lambda i: (abs(float(grid[i]) - float(value)), i))
+    except (TypeError, ValueError):
+        return 0
+
+
+def neighbor_values(key, value, steps=1):
+    """[(offset, value)] for grid positions within +/- steps of value (value itself excluded)."""
+    grid = PARAM_SPACE[key]
+    idx = grid_index(key, value)
+    out = []
+    for off in range(-int(steps), int(steps) + 1):
+        j = idx + off
+        if j < 0 or j >= len(grid) or grid[j] == value:
+            continue
+        out.append((off, grid[j]))
+    return out
+
+
+def _axis(key, value, steps):
+    """Heat-map axis: the base value plus its neighbors, ascending."""
+    return sorted({value, *(v for _, v in neighbor_values(key, value, steps))})
+
+
+class _Evaluator:
+    """Deduplicating batch evaluator; keeps results keyed by the full param set."""
+
+    def __init__(self, raw_dfs, start_dt, end_dt, n_workers=1):
+        self.n_workers = max(1, int(n_workers or 1))
+        self.results = {}
+        self._args = (raw_dfs, _to_timestamp(start_dt), _to_timestamp(end_dt))
+        self._pool = None
+
+    def __enter__(self):
+        if self.n_workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers, initializer=_init_worker, initargs=self._args
+            )
+        else:
+            _init_worker(*self._args)
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        else:
+            _ANALYSIS_CACHE.clear()
+
+    def run(self, param_sets):
+        todo = {}
+        for p in param_sets:
+            k = params_key(p)
+            if k not in self.results:
+                todo.setdefault(k, p)
+        # Group by signal subset so each worker chunk mostly hits its analysis cache.
+        ordered = sorted(todo.items(), key=lambda kv: (signal_key(kv[1]), kv[0]))
+        batch = [p for _, p in ordered]
+        if self._pool is not None and batch:
+            chunk = max(1, len(batch) // (self.n_workers * 2))
+            out = list(self._pool.map(_eval_task, batch, chunksize=chunk))
+        else:
+            out = [_eval_task(p) for p in batch]
+        for (k, _), res in zip(ordered, out):
+            self.results[k] = res
+        return [self.results[params_key(p)] for p in param_sets]
+
+
+def default_stability_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def stability_map(
+    raw_dfs,
+    params,
+    start_dt,
+    end_dt,
+    steps=1,
+    top_k=2,
+    tolerance=0.02,
+    keys=None,
+    n_workers=1,
+    progress_cb=None,
+):
+    """
+    Returns a JSON-friendly report:
+      base       : metrics of `params`
+      table      : one row per one-at-a-time neighbor (key, value, offset, score, delta, ...)
+      sensitivity: per key max/mean |delta| and worst drop, sorted most sensitive first
+      heatmaps   : [{x_key, y_key, x, y, z}] score grids for the top_k key pairs (z[row=y][col=x])
+      plateau_score, worst_drop, n_neighbors
+    """
+    base = dict(params)
+    keys = [k for k in (keys or sorted(PARAM_SPACE.keys())) if k in PARAM_SPACE and base.get(k) is not None]
+
+    def _emit(stage, done, total):
+        if callable(progress_cb):
+            try:
+                progress_cb(stage, int(done), int(total))
+            except Exception:
+                pass
+
+    with _Evaluator(raw_dfs, start_dt, end_dt, n_workers=n_workers) as ev:
+        base_metrics = ev.run([base])[0]
+        base_score = base_metrics["score"]
+
+        oat = []
+        for k in keys:
+            for off, v in neighbor_values(k, base.get(k), steps):
+                oat.append((k, off, v, {**base, k: v}))
+        _emit("one_at_a_time", 0, len(oat))
+        oat_metrics = ev.run([p for *_, p in oat])
+        _emit("one_at_a_time", len(oat), len(oat))
+
+        table = []
+        for (k, off, v, _), m in zip(oat, oat_metrics):
+            table.append({"key": k, "value": v, "offset": off, **m, "delta": m["score"] - base_score})
+
+        sensitivity = []
+        for k in keys:
+            deltas = [r["delta"] for r in table if r["key"] == k]
+            if not deltas:
+                continue
+            sensitivity.append(
+                {
+                    "key": k,
+                    "max_abs_delta": max(abs(d) for d in deltas),
+                    "mean_abs_delta": sum(abs(d) for d in deltas) / len(deltas),
+                    "worst_delta": min(deltas),
+                }
+            )
+        sensitivity.sort(key=lambda r: (-r["max_abs_delta"], r["key"]))
+
+        top_keys = [r["key"] for r in sensitivity[: max(0, int(top_k))]]
+        pairs = list(combinations(top_keys, 2))
+        grid_specs = []
+        for xk, yk in pairs:
+            grid_specs.append((xk, yk, _axis(xk, base.get(xk), steps), _axis(yk, base.get(yk), steps)))
+        grid_params = [{**base, xk: xv, yk: yv} for xk, yk, xs, ys in grid_specs for yv, xv in product(ys, xs)]
+        _emit("pairwise", 0, len(grid_params))
+        ev.run(grid_params)
+        _emit("pairwise", len(grid_params), len(grid_params))
+
+        heatmaps = []
+        for xk, yk, xs, ys in grid_specs:
+            z = [[ev.results[params_key({**base, xk: xv, yk: yv})]["score"] for xv in xs] for yv in ys]
+            heatmaps.append(
+                {"x_key": xk, "y_key": yk, "x": xs, "y": ys, "z": z, "base": [base.get(xk), base.get(yk)]}
+            )
+
+        base_key = params_key(base)
+        neighbor_scores = [m["score"] for k, m in ev.results.items() if k != base_key]
+
+    within = [s for s in neighbor_scores if s >= base_score - float(tolerance)]
+    plateau = (len(within) / len(neighbor_scores)) if neighbor_scores else None
+    worst_drop = min((s - base_score for s in neighbor_scores), default=0.0)
+    return {
+        "base": base_metrics,
+        "window": {"start": str(_to_timestamp(start_dt)), "end": str(_to_timestamp(end_dt))},
+        "steps": int(steps),
+        "tolerance": float(tolerance),
+        "table": table,
+        "sensitivity": sensitivity,
+        "heatmaps": heatmaps,
+        "plateau_score": plateau,
+        "worst_drop": float(worst_drop),
+        "n_neighbors": len(neighbor_scores),
+    }
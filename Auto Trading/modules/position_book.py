@@ -0,0 +1,163 @@
+"""
+Per-symbol position slots for RunController.
+
+Each slot is a full runtime-state dict (state machine, qty, idempotency keys, safe
+cooldown, ...) exactly as the single-position controller kept it, so the per-slot
+logic is unchanged; the book only decides which slot is addressed and how many may
+be open at once (mirrors the backtester's max_open_positions).
+
+Persisted layout (runtime_state.json, schema v3):
+  {
+    "_schema_version": 3,
+    "max_positions": N,
+    "primary": "<symbol>",
+    "positions": {"<symbol>": {slot}, ...},
+    ...primary slot fields mirrored at top level for v2 readers (dashboards)...
+  }
+"""
+import time
+
+from .utils_json import SCHEMA_VERSION_FIELD
+
+RUNTIME_STATE_SCHEMA_VERSION = 3
+UNASSIGNED = "_"
+
+# Pruned FLAT slots must outlive the post-exit cooldown kept in `last_exit_ts`.
+FLAT_SLOT_RETAIN_SEC = 24 * 3600
+
+
+def _migrate_v1_to_v2(data):
+    # v1 (unversioned) and v2 share the single-slot layout.
+    if isinstance(data, dict):
+        data = dict(data)
+        data[SCHEMA_VERSION_FIELD] = 2
+    return data
+
+
+def _migrate_v2_to_v3(data):
+    """Wrap the single-slot v2 runtime state into a one-slot book."""
+    if not isinstance(data, dict):
+        return data
+    slot = {k: v for k, v in data.items() if k != SCHEMA_VERSION_FIELD}
+    slot[SCHEMA_VERSION_FIELD] = RUNTIME_STATE_SCHEMA_VERSION
+    key = slot.get("symbol") or UNASSIGNED
+    return {
+        SCHEMA_VERSION_FIELD: RUNTIME_STATE_SCHEMA_VERSION,
+        "max_positions": 1,
+        "primary": key,
+        "positions": {key: slot},
+    }
+
+
+RUNTIME_STATE_MIGRATIONS = [_migrate_v1_to_v2, _migrate_v2_to_v3]
+
+
+class PositionBook:
+    def __init__(self, slot_factory, max_positions=1):
+        """slot_factory(): fresh FLAT slot dict (RunController._default_runtime_state)."""
+        self.slot_factory = slot_factory
+        self.max_positions = max(1, int(max_positions or 1))
+        self.slots = {UNASSIGNED: slot_factory()}
+        self.primary = UNASSIGNED
+
+    @staticmethod
+    def key_for(symbol):
+        return str(symbol) if symbol else UNASSIGNED
+
+    def slot(self, symbol=None):
+        """Slot for symbol (created FLAT on first use); None addresses the primary slot."""
+        key = self.key_for(symbol) if symbol else (self.primary or UNASSIGNED)
+        slot = self.slots.get(key)
+        if slot is None:
+            # An unnamed legacy slot becomes the symbol's slot on first use.
+            unnamed = self.slots.get(UNASSIGNED)
+            if key != UNASSIGNED and unnamed is not None and not unnamed.get("symbol") and not self._is_open(unnamed):
+                slot = self.slots.pop(UNASSIGNED)
+                if self.primary == UNASSIGNED:
+                    self.primary = key
+            else:
+                slot = self.slot_factory()
+            if key != UNASSIGNED:
+                slot["symbol"] = key
+            self.slots[key] = slot
+        return slot
+
+    def get(self, symbol=None):
+        """Existing slot for symbol, else the primary slot. Never creates a slot."""
+        slot = self.slots.get(self.key_for(symbol)) if symbol else None
+        return slot if slot is not None else self.slots[self.primary]
+
+    def symbols(self):
+        return [k for k in self.slots if k != UNASSIGNED]
+
+    @staticmethod
+    def _is_open(slot):
+        try:
+            qty = float(slot.get("position_qty") or 0.0)
+        except Exception:
+            qty = 0.0
+        return slot.get("state", "FLAT") != "FLAT" or qty > 0
+
+    def open_symbols(self):
+        return [k for k, s in self.slots.items() if k != UNASSIGNED and self._is_open(s)]
+
+    def has_capacity(self, symbol):
+        """True when symbol already holds a slot or fewer than max_positions are open."""
+        key = self.key_for(symbol)
+        open_syms = self.open_symbols()
+        return key in open_syms or len(open_syms) < self.max_positions
+
+    def repoint_primary(self):
+        """Primary = most recently entered open slot (legacy single-position view)."""
+        open_syms = self.open_symbols()
+        if not open_syms:
+            return self.primary
+        self.primary = max(open_syms, key=lambda k: float(self.slots[k].get("last_entry_ts") or 0.0))
+        return self.primary
+
+    def prune(self, now_ts=None):
+        """Drop idle FLAT slots (no keys, exit cooldown long over); keeps the primary."""
+        now_ts = float(now_ts if now_ts is not None else time.time())
+        removed = []
+        for key, slot in list(self.slots.items()):
+            if key == self.primary or self._is_open(slot) or slot.get("active_keys"):
+                continue
+            last_exit = slot.get("last_exit_ts")
+            if last_exit is not None and now_ts - float(last_exit) < FLAT_SLOT_RETAIN_SEC:
+                continue
+            self.slots.pop(key, None)
+            removed.append(key)
+        return removed
+
+    def to_dict(self):
+        primary = self.slots.get(self.primary) or self.slot_factory()
+        out = {k: v for k, v in primary.items() if k != SCHEMA_VERSION_FIELD}
+        out.update(
+            {
+                SCHEMA_VERSION_FIELD: RUNTIME_STATE_SCHEMA_VERSION,
+                "max_positions": self.max_positions,
+                "primary": self.primary,
+                "positions": self.slots,
+            }
+        )
+        return out
+
+    def load_dict(self, data, normalize_slot=None):
+        """Replace slots from a v3 dict; normalize_slot(slot) -> slot cleans each one."""
+        positions = (data or {}).get("positions") if isinstance(data, dict) else None
+        slots = {}
+        for key, slot in (positions or {}).items():
+            if not isinstance(slot, dict):
+                continue
+            slot = dict(slot)
+            if normalize_slot is not None:
+                slot = normalize_slot(slot)
+            if key != UNASSIGNED:
+                slot["symbol"] = key
+            slots[str(key)] = slot
+        self.slots = slots
+        primary = (data or {}).get("primary") if isinstance(data, dict) else None
+        self.primary = primary if primary in slots else (next(iter(slots), UNASSIGNED))
+        if self.primary not in self.slots:
+            self.slots[self.primary] = self.slot_factory()
+        return self
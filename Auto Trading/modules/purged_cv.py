@@ -0,0 +1,239 @@
+"""
+Purged / embargoed cross-validation splits for daily-bar strategy tuning.
+
+Adjacent train/test windows leak in two directions:
+  - a training trade opened just before a test block can close inside it
+    (label overlap) -> *purge* `purge_bars` training bars before each test block;
+  - indicators of training bars right after a test block are computed from
+    test-period prices (lookback overlap) -> *embargo* `embargo_bars` training
+    bars after each test block.
+
+Both gaps default to values derived from the strategy params (max hold days
+and max indicator lookback), and can be overridden per call.
+"""
+from dataclasses import dataclass, field
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Signals are computed on bar T and executed on bar T+1 (Strategy *_exec columns).
+SIGNAL_LAG_BARS = 1
+
+# Hard-coded indicator windows in Strategy.analyze (vol_ma20, atr14, rsi14, 3-bar pullback).
+_FIXED_LOOKBACKS = (20, 14 + 1, 14 + 1, 3)
+
+
+class LeakageError(AssertionError):
+    pass
+
+
+def strategy_max_lookback(params=None):
+    """Longest indicator lookback (bars) used by Strategy.analyze for these params."""
+    p = dict(params or {})
+    windows = list(_FIXED_LOOKBACKS)
+    windows.append(int(p.get("trend_ma_slow_B", 60)))
+    windows.append(int(p.get("trend_ma_fast_B", 20)))
+    windows.append(int(p.get("breakout_days_A", 7)) + 1)  # shift(1).rolling(N)
+    windows.append(int(p.get("cooling_box_lookback", 5)))
+    return max(windows)
+
+
+def strategy_max_hold_days(params=None):
+    """Longest time a position may stay open (time stops of strategy A/B)."""
+    p = dict(params or {})
+    return max(int(p.get("time_stop_days_A", 3)), int(p.get("max_hold_days_B", 5)))
+
+
+def derive_gap_bars(params=None):
+    """
+    Returns (purge_bars, embargo_bars):
+      purge_bars   = max hold days + signal lag (trade must close before the test block)
+      embargo_bars = max indicator lookback (train features must not see test prices)
+    """
+    purge = strategy_max_hold_days(params) + SIGNAL_LAG_BARS
+    embargo = strategy_max_lookback(params)
+    return int(purge), int(embargo)
+
+
+def _as_dates(dates):
+    if isinstance(dates, int):
+        return pd.RangeIndex(int(dates))
+    idx = pd.DatetimeIndex(pd.to_datetime(list(dates))).normalize()
+    return idx.unique().sort_values()
+
+
+def _resolve_gaps(purge_bars, embargo_bars, params):
+    d_purge, d_embargo = derive_gap_bars(params)
+    purge = d_purge if purge_bars is None else int(purge_bars)
+    embargo = d_embargo if embargo_bars is None else int(embargo_bars)
+    if purge < 0 or embargo < 0:
+        raise ValueError("purge_bars/embargo_bars must be >= 0")
+    return purge, embargo
+
+
+def _contiguous_ranges(positions):
+    """[3,4,5,9,10] -> [(3,5),(9,10)] (inclusive)."""
+    if len(positions) == 0:
+        return []
+    positions = np.asarray(positions)
+    breaks = np.where(np.diff(positions) != 1)[0]
+    starts = np.concatenate(([positions[0]], positions[breaks + 1]))
+    ends = np.concatenate((positions[breaks], [positions[-1]]))
+    return [(int(s), int(e)) for s, e in zip(starts, ends)]
+
+
+@dataclass
+class PurgedSplit:
+    fold: int
+    test_groups: tuple
+    train_idx: np.ndarray
+    test_idx: np.ndarray
+    dates: pd.Index = field(repr=False)
+    purge_bars: int = 0
+    embargo_bars: int = 0
+
+    def _ranges(self, positions):
+        return [(self.dates[s], self.dates[e]) for s, e in _contiguous_ranges(positions)]
+
+    @property
+    def train_ranges(self):
+        """Contiguous (start, end) training segments, usable as run_portfolio date bounds."""
+        return self._ranges(self.train_idx)
+
+    @property
+    def test_ranges(self):
+        return self._ranges(self.test_idx)
+
+    def to_dict(self):
+        return {
+            "fold": self.fold,
+            "test_groups": list(self.test_groups),
+            "purge_bars": self.purge_bars,
+            "embargo_bars": self.embargo_bars,
+            "train_ranges": [[str(s), str(e)] for s, e in self.train_ranges],
+            "test_ranges": [[str(s), str(e)] for s, e in self.test_ranges],
+            "train_bars": int(len(self.train_idx)),
+            "test_bars": int(len(self.test_idx)),
+        }
+
+
+def _group_bounds(n_bars, n_groups):
+    if n_groups < 2:
+        raise ValueError("n_groups must be >= 2")
+    if n_bars < n_groups:
+        raise ValueError(f"Not enough bars ({n_bars}) for {n_groups} groups")
+    edges = np.linspace(0, n_bars, n_groups + 1).astype(int)
+    return [(int(edges[i]), int(edges[i + 1]) - 1) for i in range(n_groups)]
+
+
+def _build_split(fold, test_groups, bounds, n_bars, dates, purge, embargo):
+    test_mask = np.zeros(n_bars, dtype=bool)
+    drop_mask = np.zeros(n_bars, dtype=bool)
+    for g in test_groups:
+        s, e = bounds[g]
+        test_mask[s:e + 1] = True
+    # Gaps are applied around every contiguous test block (merged adjacent groups share one).
+    for s, e in _contiguous_ranges(np.flatnonzero(test_mask)):
+        drop_mask[max(0, s - purge):s] = True
+        drop_mask[e + 1:min(n_bars, e + 1 + embargo)] = True
+    train_mask = ~(test_mask | drop_mask)
+    return PurgedSplit(
+        fold=fold,
+        test_groups=tuple(test_groups),
+        train_idx=np.flatnonzero(train_mask),
+        test_idx=np.flatnonzero(test_mask),
+        dates=dates,
+        purge_bars=purge,
+        embargo_bars=embargo,
+    )
+
+
+def purged_kfold(dates, n_splits=5, purge_bars=None, embargo_bars=None, params=None):
+    """
+    K contiguous test folds; training = everything else minus purge/embargo gaps.
+    `dates` is a sequence of bar timestamps (deduplicated/sorted) or a bar count.
+    """
+    idx = _as_dates(dates)
+    purge, embargo = _resolve_gaps(purge_bars, embargo_bars, params)
+    bounds = _group_bounds(len(idx), int(n_splits))
+    return [
+        _build_split(k, (k,), bounds, len(idx), idx, purge, embargo)
+        for k in range(int(n_splits))
+    ]
+
+
+def combinatorial_purged_kfold(dates, n_groups=6, n_test_groups=2, purge_bars=None, embargo_bars=None, params=None):
+    """
+    Combinatorial purged CV: every C(n_groups, n_test_groups) choice of test groups.
+    Each group appears in C(n_groups-1, n_test_groups-1) test sets, yielding that many
+    backtest paths.
+    """
+    n_groups = int(n_groups)
+    n_test_groups = int(n_test_groups)
+    if not 1 <= n_test_groups < n_groups:
+        raise ValueError("n_test_groups must be in [1, n_groups)")
+    idx = _as_dates(dates)
+    purge, embargo = _resolve_gaps(purge_bars, embargo_bars, params)
+    bounds = _group_bounds(len(idx), n_groups)
+    return [
+        _build_split(k, groups, bounds, len(idx), idx, purge, embargo)
+        for k, groups in enumerate(combinations(range(n_groups), n_test_groups))
+    ]
+
+
+def _trade_interval(trade, dates):
+    entry = trade.get("entry_date")
+    exit_ = trade.get("exit_date") or entry
+    if entry is None:
+        return None
+    if isinstance(dates, pd.DatetimeIndex):
+        s = dates.searchsorted(pd.Timestamp(entry).normalize(), side="left")
+        e = dates.searchsorted(pd.Timestamp(exit_).normalize(), side="right") - 1
+    else:
+        s, e = int(entry), int(exit_)
+    return int(s), int(e)
+
+
+def find_leaks(trade_list, split):
+    """Trades whose [entry, exit] interval touches both the training set and the test set."""
+    n_bars = len(split.dates)
+    train_mask = np.zeros(n_bars, dtype=bool)
+    test_mask = np.zeros(n_bars, dtype=bool)
+    train_mask[split.train_idx] = True
+    test_mask[split.test_idx] = True
+    train_cum = np.concatenate(([0], np.cumsum(train_mask)))
+    test_cum = np.concatenate(([0], np.cumsum(test_mask)))
+
+    leaks = []
+    for trade in trade_list or []:
+        iv = _trade_interval(trade, split.dates)
+        if iv is None:
+            continue
+        s, e = max(0, iv[0]), min(n_bars - 1, iv[1])
+        if e < s:
+            continue
+        in_train = train_cum[e + 1] - train_cum[s] > 0
+        in_test = test_cum[e + 1] - test_cum[s] > 0
+        if in_train and in_test:
+            leaks.append({
+                "fold": split.fold,
+                "symbol": trade.get("symbol"),
+                "entry_date": str(split.dates[s]),
+                "exit_date": str(split.dates[e]),
+            })
+    return leaks
+
+
+def assert_no_leakage(trade_list, splits):
+    """Raises LeakageError when any trade interval straddles a train/test boundary."""
+    leaks = []
+    for split in splits:
+        leaks.extend(find_leaks(trade_list, split))
+    if leaks:
+        first = leaks[0]
+        raise LeakageError(
+            f"{len(leaks)} trade(s) straddle a train/test boundary "
+            f"(e.g. fold {first['fold']} {first['symbol']} {first['entry_date']} -> {first['exit_date']})"
+        )
+    return True
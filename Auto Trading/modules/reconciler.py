@@ -0,0 +1,245 @@
+"""
+Local-vs-exchange reconciliation for RunController.
+
+ReconciliationEngine compares each local position slot with exchange truth
+(open orders, the balance map and fills seen since the previous pass) and
+returns typed ReconDiff records:
+
+  ORPHAN_ORDER      open exchange order the slot does not reference, or an
+                    open order on a symbol the bot holds no slot for
+  MISSING_FILL      local qty differs from the balance and new fills explain it
+  SIZE_MISMATCH     local qty/state disagree with the balance, no explaining fills
+  UNKNOWN_POSITION  balance held for a slot the bot thinks is flat, no fills
+  STALE_PENDING     slot stuck ENTRY/EXIT_PENDING with no open order left
+  BALANCE_UNAVAILABLE  no usable balance snapshot (read failed or came back
+                    empty); always report-only, the slot is left untouched
+
+Every diff carries the resolution configured for its kind (RESOLUTION_POLICY
+defaults, overridable per kind):
+  adopt_exchange  make local state match the exchange
+  cancel          cancel the order (ORPHAN_ORDER only)
+  report          audit only
+The engine never mutates state: RunController applies the resolutions and
+appends the pass (diffs + actions) to an audit JSONL.
+
+FillCursor keeps a per-symbol `since` cursor over fetch_my_trades, so periodic
+passes only download fills newer than the last one seen.
+"""
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger("Reconciler")
+
+ORPHAN_ORDER = "ORPHAN_ORDER"
+MISSING_FILL = "MISSING_FILL"
+SIZE_MISMATCH = "SIZE_MISMATCH"
+UNKNOWN_POSITION = "UNKNOWN_POSITION"
+STALE_PENDING = "STALE_PENDING"
+BALANCE_UNAVAILABLE = "BALANCE_UNAVAILABLE"
+
+RESOLUTIONS = {"adopt_exchange", "cancel", "report"}
+RESOLUTION_POLICY = {
+    ORPHAN_ORDER: "adopt_exchange",  # a pending slot follows its live order; others are reported
+    MISSING_FILL: "adopt_exchange",
+    SIZE_MISMATCH: "adopt_exchange",
+    UNKNOWN_POSITION: "adopt_exchange",
+    STALE_PENDING: "adopt_exchange",
+}
+
+PENDING_STATES = {"ENTRY_PENDING", "EXIT_PENDING"}
+
+
+@dataclass
+class ReconDiff:
+    kind: str
+    symbol: str
+    local: Dict[str, Any] = field(default_factory=dict)
+    exchange: Dict[str, Any] = field(default_factory=dict)
+    detail: str = ""
+    resolution: str = "report"
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class FillCursor:
+    """Incremental fill reader: one fetch_my_trades(since=cursor) per symbol and pass."""
+
+    def __init__(self, lookback_sec=3600.0, clock=time.time):
+        self.lookback_sec = float(lookback_sec)
+        self._clock = clock
+        self._since = {}
+        self._seen = {}
+        self.fetches = 0
+
+    @staticmethod
+    def _trade_id(tr):
+        tid = tr.get("id")
+        if tid is not None:
+            return str(tid)
+        return f"{tr.get('order')}:{tr.get('timestamp')}:{tr.get('amount')}:{tr.get('price')}"
+
+    def poll(self, exchange_api, ccxt_symbol, limit=200):
+        """Fills for ccxt_symbol newer than the cursor (first pass: `lookback_sec`)."""
+        if exchange_api is None or not hasattr(exchange_api, "fetch_my_trades"):
+            return []
+        since = self._since.get(ccxt_symbol)
+        if since is None:
+            since = int(max(0.0, self._clock() - self.lookback_sec) * 1000)
+        try:
+            trades = exchange_api.fetch_my_trades(ccxt_symbol, since=since, limit=limit)
+        except Exception as e:
+            logger.warning(f"[RECON] fill fetch failed for {ccxt_symbol}: {e}")
+            return []
+        self.fetches += 1
+        if not isinstance(trades, list):
+            trades = []
+        seen = self._seen.get(ccxt_symbol, set())
+        new = []
+        cursor = since
+        for tr in sorted(trades, key=lambda t: int(t.get("timestamp") or 0)):
+            ts = int(tr.get("timestamp") or 0)
+            tid = self._trade_id(tr)
+            if ts < since or (ts == since and tid in seen):
+                continue
+            new.append(tr)
+            cursor = max(cursor, ts)
+        # Trades sharing the cursor millisecond are remembered so the next
+        # inclusive `since` query does not report them twice.
+        boundary = {self._trade_id(t) for t in trades if int(t.get("timestamp") or 0) == cursor}
+        self._seen[ccxt_symbol] = boundary | (seen if cursor == since else set())
+        self._since[ccxt_symbol] = cursor
+        return new
+
+
+class ReconciliationEngine:
+    def __init__(self, policy=None, qty_tolerance=1e-12):
+        self.policy = dict(RESOLUTION_POLICY)
+        self.policy.update(policy or {})
+        self.qty_tolerance = float(qty_tolerance)
+
+    def resolution_for(self, kind):
+        action = str(self.policy.get(kind, "report"))
+        if action not in RESOLUTIONS or (action == "cancel" and kind != ORPHAN_ORDER):
+            return "report"
+        return action
+
+    def _make(self, kind, symbol, local, exchange, detail):
+        return ReconDiff(kind, symbol, local, exchange, detail, self.resolution_for(kind))
+
+    @staticmethod
+    def _local(slot):
+        return {
+            "state": slot.get("state", "FLAT"),
+            "position_qty": float(slot.get("position_qty") or 0.0),
+            "last_order_id": slot.get("last_order_id"),
+        }
+
+    def balance_unavailable(self, symbol, slot, detail="balance read failed or empty"):
+        """Report-only diff for a slot the pass could not check (never adopted, whatever the policy)."""
+        return ReconDiff(BALANCE_UNAVAILABLE, symbol, self._local(slot), {}, detail, "report")
+
+    def lowers_position(self, slot, diffs):
+        """True when applying `diffs` would shrink or drop the slot's local quantity."""
+        local_qty = float(slot.get("position_qty") or 0.0)
+        for d in diffs:
+            if d.resolution != "adopt_exchange" or "position_qty" not in d.exchange:
+                continue
+            if float(d.exchange["position_qty"] or 0.0) < local_qty - self.qty_tolerance:
+                return True
+        return False
+
+    def diff_slot(self, symbol, slot, open_orders, exchange_qty, fills=None, skip_pending=False):
+        """Diffs for one slot. open_orders: adapter-normalized orders for `symbol`."""
+        local = self._local(slot)
+        state, local_qty = local["state"], local["position_qty"]
+        if skip_pending and state in PENDING_STATES:
+            return []  # an order is in flight on another thread
+
+        if open_orders:
+            if state in PENDING_STATES:
+                order = open_orders[0]
+                expected = "EXIT_PENDING" if str(order.get("side", "")).lower() == "sell" else "ENTRY_PENDING"
+                if str(order.get("id")) != str(slot.get("last_order_id")) or state != expected:
+                    return [
+                        self._make(
+                            ORPHAN_ORDER,
+                            symbol,
+                            local,
+                            {"order_id": order.get("id"), "side": order.get("side"), "state": expected},
+                            "pending slot does not reference the live order",
+                        )
+                    ]
+                return []  # order still working: balances settle later
+            diffs = [
+                self._make(
+                    ORPHAN_ORDER,
+                    symbol,
+                    local,
+                    {"order_id": o.get("id"), "side": o.get("side"), "remaining": o.get("remaining")},
+                    f"open order while slot is {state}",
+                )
+                for o in open_orders
+            ]
+        else:
+            diffs = []
+            if state in PENDING_STATES:
+                return [self._make(STALE_PENDING, symbol, local, {"position_qty": exchange_qty}, "pending with no open order")]
+
+        exchange = {"position_qty": exchange_qty}
+        delta = exchange_qty - local_qty
+        if abs(delta) <= self.qty_tolerance:
+            desired = "IN_POSITION" if exchange_qty > 0 else "FLAT"
+            if state in {"FLAT", "IN_POSITION"} and state != desired:
+                diffs.append(self._make(SIZE_MISMATCH, symbol, local, exchange, f"state {state} with qty {exchange_qty}"))
+            return diffs
+
+        fills = list(fills or [])
+        net = 0.0
+        buy_qty = buy_cost = 0.0
+        for tr in fills:
+            amount = float(tr.get("amount") or 0.0)
+            if str(tr.get("side", "buy")).lower() == "sell":
+                net -= amount
+            else:
+                net += amount
+                buy_qty += amount
+                buy_cost += amount * float(tr.get("price") or 0.0)
+        tol = max(self.qty_tolerance, 1e-9 * max(1.0, abs(exchange_qty)))
+        if fills and abs(local_qty + net - exchange_qty) <= tol:
+            exchange.update({"fills": len(fills), "net_fill_qty": net, "buy_vwap": (buy_cost / buy_qty) if buy_qty > 0 else None})
+            diffs.append(self._make(MISSING_FILL, symbol, local, exchange, f"{len(fills)} fill(s) not applied locally"))
+        elif local_qty <= self.qty_tolerance and exchange_qty > 0:
+            diffs.append(self._make(UNKNOWN_POSITION, symbol, local, exchange, "balance held while slot is flat"))
+        else:
+            diffs.append(self._make(SIZE_MISMATCH, symbol, local, exchange, f"local {local_qty} vs exchange {exchange_qty}"))
+        return diffs
+
+    def untracked_orders(self, open_orders, tracked_symbols):
+        tracked = set(tracked_symbols)
+        return [
+            self._make(
+                ORPHAN_ORDER,
+                o.get("symbol"),
+                {},
+                {"order_id": o.get("id"), "side": o.get("side"), "remaining": o.get("remaining")},
+                "open order on a symbol without a position slot",
+            )
+            for o in open_orders
+            if o.get("symbol") not in tracked
+        ]
+
+
+def append_audit(path, report):
+    """Appends one reconciliation pass to the audit JSONL (best effort)."""
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, default=str) + "\n")
+    except Exception as e:
+        logger.warning(f"[RECON] audit write failed: {e}")
@@ -4,14 +4,51 @@ import time
 import json
 import threading
 import math
+import functools
+import inspect
+import contextlib
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
-from .utils_json import safe_json_dump, safe_json_load, SCHEMA_VERSION_FIELD
+from . import reconciler
+from .balance_snapshot import BalanceSnapshotCache
+from .position_book import PositionBook, RUNTIME_STATE_MIGRATIONS, RUNTIME_STATE_SCHEMA_VERSION
+from .state_journal import StateJournal
+from .status_shm import StatusChannel, segment_name_for
+from .utils_json import SCHEMA_VERSION_FIELD
 
 logger = logging.getLogger("RunController")
 
+
+def _slot_scoped(fn):
+    """
+    Runs a per-position method against the slot of the symbol it is called for
+    (`symbol` / `symbol_override` argument, else `signal["symbol"]`). Calls
+    without a symbol keep addressing the enclosing slot (or the primary one).
+    """
+    # Argument positions are resolved once here; calls only index args/kwargs.
+    params = list(inspect.signature(fn).parameters)
+    positions = {name: params.index(name) - 1 for name in ("symbol", "symbol_override", "signal") if name in params}
+
+    def _arg(name, args, kwargs):
+        if name in kwargs:
+            return kwargs[name]
+        idx = positions.get(name)
+        return args[idx] if idx is not None and 0 <= idx < len(args) else None
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        symbol = _arg("symbol", args, kwargs) or _arg("symbol_override", args, kwargs)
+        if not symbol:
+            signal = _arg("signal", args, kwargs)
+            if isinstance(signal, dict):
+                symbol = signal.get("symbol")
+        with self._position_slot(symbol):
+            return fn(self, *args, **kwargs)
+
+    return wrapper
+
 class RunController:
     MODE_LIVE = "LIVE"
     MODE_PAPER = "PAPER"
@@ -26,7 +63,7 @@ class RunController:
     STATE_EXIT_PENDING = "EXIT_PENDING"
     STATE_SAFE_COOLDOWN = "SAFE_COOLDOWN"
 
-    RUNTIME_STATE_SCHEMA_VERSION = 2
+    RUNTIME_STATE_SCHEMA_VERSION = RUNTIME_STATE_SCHEMA_VERSION
     DAILY_RISK_STATE_SCHEMA_VERSION = 2
 
     @staticmethod
@@ -35,7 +72,18 @@ class RunController:
         v = str(value or "").strip().lower()
         return v if v in allowed else "unknown"
 
-    def __init__(self, adapter, ledger, watch_engine, notifier, mode=MODE_PAPER, disable_strategy: bool = False, execution_engine=None):
+    # Max balance snapshot age (sec) per runtime state; pending orders always read fresh.
+    DEFAULT_BALANCE_STALENESS_SEC = {
+        STATE_FLAT: 10.0,
+        STATE_ENTRY_PENDING: 0.0,
+        STATE_IN_POSITION: 2.0,
+        STATE_EXIT_PENDING: 0.0,
+        STATE_SAFE_COOLDOWN: 2.0,
+    }
+    # Reconciliation re-reads an older balance snapshot before it may lower a held position.
+    RECONCILE_CONFIRM_MAX_AGE_SEC = 1.0
+
+    def __init__(self, adapter, ledger, watch_engine, notifier, mode=MODE_PAPER, disable_strategy: bool = False, execution_engine=None, balance_staleness_sec=None, max_positions: int = 1, clock=None, sleep=None):
         self.adapter = adapter
         self.ledger = ledger
         self.watch_engine = watch_engine
@@ -44,21 +92,59 @@ class RunController:
         self.running = False
         self.disable_strategy = disable_strategy
         self.execution_engine = execution_engine
+        # Injectable clock/sleep: position timers run on simulated time in sim sessions.
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+        self.loop_interval_sec = 1.0
+        self._last_strategy_tick = 0.0
 
         # Persistent Trade State (P0)
         self.runtime_state_path = Path("results/runtime_state.json")
+        # Append-only journals replace a full fsynced rewrite per save; the JSON
+        # files remain as periodically compacted snapshots.
+        self.runtime_journal = StateJournal(
+            self.runtime_state_path,
+            schema_version=self.RUNTIME_STATE_SCHEMA_VERSION,
+            nested=("positions",),  # a slot change journals that slot only
+        )
         self.state_lock = threading.RLock()
         self.cooldown_min = 15
         self.idempotency_ttl_candles = 2
         self.safe_cooldown_default_sec = 60
         self.panic_halt_sec = 3600
-        self.runtime_state = self._load_runtime_state()
+        # One state machine per symbol; `runtime_state` resolves to the slot in scope.
+        self._slot_ctx = threading.local()
+        self.position_book = PositionBook(self._default_runtime_state, max_positions=max_positions)
+        self._load_runtime_state()
         self._startup_reconciled = False
 
+        # Exchange reconciliation: typed diffs, per-kind resolution policy, audit JSONL.
+        self.reconciler = reconciler.ReconciliationEngine()
+        self.fill_cursor = reconciler.FillCursor(clock=self._clock)
+        self.reconcile_interval_sec = 60.0
+        self.reconcile_audit_path = Path("results/logs/reconcile_audit.jsonl")
+        self.last_reconcile_report = None
+        self._last_reconcile_ts = 0.0
+
+        # Balance snapshot: risk checks and IPC status share one cached read.
+        self.balance_staleness_sec = dict(self.DEFAULT_BALANCE_STALENESS_SEC)
+        self.balance_staleness_sec.update(balance_staleness_sec or {})
+        self.balance_cache = BalanceSnapshotCache(self._fetch_balance_map, clock=clock or time.monotonic)
+
         # Virtual capital cap settings (optional): loaded from UI settings (KRW)
         self._capital_cap_cache = None
         self._capital_cap_loaded_ts = 0.0
 
+        # Status IPC: hot fields go to shared memory every tick; the JSON file is
+        # a low-frequency fallback (and the only channel if shm is unavailable).
+        self.runtime_status_path = Path("results/runtime_status.json")
+        self.status_shm_enabled = True
+        self.status_json_interval_sec = 15.0
+        self._status_channel = None
+        self._status_channel_failed = False
+        self._status_json_last_ts = 0.0
+        self._status_json_last_state = None
+
         # Telemetry
         self.last_tick_ts = None
         self.last_error = None
@@ -76,6 +162,7 @@ class RunController:
         self.consecutive_losses = 0
         self.max_consecutive_losses = 3
         self.daily_state_path = Path("results/daily_risk_state.json")
+        self.daily_journal = StateJournal(self.daily_state_path, schema_version=self.DAILY_RISK_STATE_SCHEMA_VERSION)
         self.daily_risk_state = self._load_daily_risk_state()
         
         # Register cleanup
@@ -167,12 +254,7 @@ class RunController:
             "updated_at": time.time(),
         }
 
-        data = safe_json_load(
-            self.daily_state_path,
-            default=default,
-            schema_version=self.DAILY_RISK_STATE_SCHEMA_VERSION,
-            repair=True,
-        )
+        data = self.daily_journal.load(default=default, repair=True)
 
         if not isinstance(data, dict):
             data = default
@@ -191,11 +273,7 @@ class RunController:
     def _save_daily_risk_state(self):
         try:
             self.daily_risk_state["updated_at"] = time.time()
-            safe_json_dump(
-                self.daily_risk_state,
-                self.daily_state_path,
-                schema_version=self.DAILY_RISK_STATE_SCHEMA_VERSION,
-            )
+            self.daily_journal.append(self.daily_risk_state)
         except Exception as e:
             logger.error(f"[RISK] Failed to save daily risk state: {e}")
 
@@ -404,16 +482,19 @@ class RunController:
         return cancelled
 
     def _force_flatten_position_best_effort(self):
-        try:
-            state = self._get_runtime_state()
-            symbol = state.get("symbol")
-            qty = float(state.get("position_qty") or 0.0)
-            if symbol and qty > 0:
-                self.process_exit_signal(symbol=symbol, qty=qty, reason="EMERGENCY_DAILY_DD")
-                return True
-        except Exception as e:
-            logger.error(f"[RISK] force flatten failed: {e}")
-        return False
+        flattened = False
+        with self.state_lock:
+            symbols = self.position_book.open_symbols()
+        for symbol in symbols:
+            try:
+                with self._position_slot(symbol):
+                    qty = float(self._get_runtime_state().get("position_qty") or 0.0)
+                if qty > 0:
+                    self.process_exit_signal(symbol=symbol, qty=qty, reason="EMERGENCY_DAILY_DD", blocking=True)
+                    flattened = True
+            except Exception as e:
+                logger.error(f"[RISK] force flatten failed ({symbol}): {e}")
+        return flattened
 
     def check_risk_limits(self):
         """Evaluates true daily drawdown on mark-to-market equity."""
@@ -620,6 +701,9 @@ class RunController:
         logger.info(msg)
         if self.notifier:
             self.notifier.emit_event("SYSTEM", "ALL", "BOT STOPPED", msg)
+        self._commit_state_journals(close=True)
+        self._close_execution_engine()
+        self._close_notifier()
         
         # Release Lock
         self._release_lock()
@@ -649,15 +733,44 @@ class RunController:
             "partial_tp_done_position_id": None,
         }
 
+    @property
+    def runtime_state(self):
+        """State-machine slot of the position in scope (primary slot outside any scope)."""
+        stack = getattr(self._slot_ctx, "stack", None)
+        return self.position_book.get(stack[-1] if stack else None)
+
+    @contextlib.contextmanager
+    def _position_slot(self, symbol=None):
+        """
+        Address `symbol`'s slot for the duration of the block (nested scopes inherit).
+        Entering a scope is what opens a slot for a new symbol; reads never do.
+        """
+        stack = getattr(self._slot_ctx, "stack", None)
+        if stack is None:
+            stack = self._slot_ctx.stack = []
+        key = symbol or (stack[-1] if stack else None)
+        with self.state_lock:
+            slot = self.position_book.slot(key)
+        stack.append(key)
+        try:
+            yield slot
+        finally:
+            stack.pop()
+
     def _load_runtime_state(self):
-        default = self._default_runtime_state()
-        data = safe_json_load(
-            self.runtime_state_path,
-            default=default,
-            schema_version=self.RUNTIME_STATE_SCHEMA_VERSION,
+        data = self.runtime_journal.load(
+            default={},
             repair=True,
+            schema_migrations=RUNTIME_STATE_MIGRATIONS,
         )
+        with self.state_lock:
+            self.position_book.load_dict(data, normalize_slot=self._normalize_runtime_slot)
+        # Re-journal normalized slots and the top-level mirror (no-op when unchanged).
+        self._save_runtime_state()
+        return self.position_book
 
+    def _normalize_runtime_slot(self, data):
+        default = self._default_runtime_state()
         if not isinstance(data, dict):
             data = default
 
@@ -731,7 +844,7 @@ class RunController:
         if not isinstance(active_keys, dict):
             active_keys = {}
         cleaned_keys = {}
-        now = time.time()
+        now = self._clock()
         for key, meta in active_keys.items():
             if not isinstance(meta, dict):
                 continue
@@ -754,16 +867,42 @@ class RunController:
 
         return data
 
-    def _save_runtime_state(self):
+    def _save_runtime_state(self, durable: bool = False):
+        """durable=True fsyncs before returning (required before an order is sent)."""
         try:
-            safe_json_dump(
-                self.runtime_state,
-                self.runtime_state_path,
-                schema_version=self.RUNTIME_STATE_SCHEMA_VERSION,
-            )
+            with self.state_lock:
+                snapshot = self.position_book.to_dict()
+            self.runtime_journal.append(snapshot, durable=durable)
         except Exception as e:
             logger.error(f"[STATE] Failed to write runtime_state: {e}")
 
+    def _commit_state_journals(self, close: bool = False):
+        for journal in (self.runtime_journal, self.daily_journal):
+            try:
+                if close:
+                    journal.close()
+                else:
+                    journal.maybe_commit()
+            except Exception as e:
+                logger.error(f"[STATE] Journal commit failed ({journal.snapshot_path}): {e}")
+
+    def _close_execution_engine(self):
+        if self.execution_engine is not None and hasattr(self.execution_engine, "close"):
+            try:
+                self.execution_engine.close()
+            except Exception as e:
+                logger.error(f"[STATE] execution engine close failed: {e}")
+
+    def _close_notifier(self):
+        # Sends what is still queued and compacts the outbox; a restart re-arms the worker.
+        close = getattr(self.notifier, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"[NOTIFY] notifier close failed: {e}")
+
     def _update_runtime_state(self, **kwargs):
         with self.state_lock:
             self.runtime_state.update(kwargs)
@@ -795,9 +934,16 @@ class RunController:
                 return False
 
             self.runtime_state["state"] = next_state
-            self._save_runtime_state()
+            if next_state == self.STATE_FLAT:
+                self._release_slot_capital()
+                self.position_book.repoint_primary()
+            # Pending states precede an order: they must hit disk before it is sent.
+            self._save_runtime_state(durable=next_state in (self.STATE_ENTRY_PENDING, self.STATE_EXIT_PENDING))
             logger.info(f"[STATE] {cur} -> {next_state} ({reason})")
-            return True
+        # Leaving a pending state means an order filled or failed: balances moved.
+        if cur in (self.STATE_ENTRY_PENDING, self.STATE_EXIT_PENDING):
+            self.balance_cache.invalidate()
+        return True
 
     def _reconcile_transition(self, target_state, context="reconcile"):
         """
@@ -890,14 +1036,14 @@ class RunController:
             except Exception:
                 continue
 
-        now = time.time()
+        now = self._clock()
         return int(math.floor(now / timeframe_sec) * timeframe_sec)
 
     def _build_idempotency_key(self, symbol, timeframe, candle_ts, side):
         return f"{symbol}_{timeframe}_{int(candle_ts)}_{side}"
 
     def _purge_expired_active_keys(self, now_ts=None):
-        now_ts = self._safe_float(now_ts, time.time())
+        now_ts = self._safe_float(now_ts, self._clock())
         with self.state_lock:
             active = self.runtime_state.get("active_keys")
             if not isinstance(active, dict):
@@ -923,7 +1069,7 @@ class RunController:
     def _claim_active_key(self, key, timeframe_sec, ttl_candles=None):
         ttl_candles = int(ttl_candles or self.idempotency_ttl_candles)
         ttl_candles = max(1, ttl_candles)
-        now_ts = time.time()
+        now_ts = self._clock()
         expire_ts = now_ts + (max(1, int(timeframe_sec)) * ttl_candles)
         with self.state_lock:
             self._purge_expired_active_keys(now_ts=now_ts)
@@ -942,7 +1088,7 @@ class RunController:
             return True
 
     def _next_position_id(self, symbol: str, entry_ts=None):
-        ts = self._safe_float(entry_ts, time.time())
+        ts = self._safe_float(entry_ts, self._clock())
         ts_ms = int(max(0.0, ts) * 1000)
         raw_symbol = str(symbol or "UNKNOWN").upper()
         safe_symbol = raw_symbol.replace("/", "-").replace("_", "-")
@@ -961,7 +1107,7 @@ class RunController:
             existing = self.runtime_state.get("position_id")
             if existing:
                 return str(existing)
-            entry_ts = self.runtime_state.get("last_entry_ts") or time.time()
+            entry_ts = self.runtime_state.get("last_entry_ts") or self._clock()
 
         new_id = self._next_position_id(symbol or self.runtime_state.get("symbol"), entry_ts=entry_ts)
         with self.state_lock:
@@ -978,14 +1124,14 @@ class RunController:
             if self.runtime_state.get("state") != self.STATE_SAFE_COOLDOWN:
                 return False
             until = self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0)
-        return time.time() < until
+        return self._clock() < until
 
     def _release_safe_cooldown_if_due(self):
         with self.state_lock:
             if self.runtime_state.get("state") != self.STATE_SAFE_COOLDOWN:
                 return
             until = self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0)
-            if time.time() < until:
+            if self._clock() < until:
                 return
             target = self.STATE_IN_POSITION if self._safe_float(self.runtime_state.get("position_qty"), 0.0) > 0 else self.STATE_FLAT
         self._transition_state(target, reason="safe_cooldown_expired")
@@ -1002,7 +1148,7 @@ class RunController:
             elif cur == self.STATE_EXIT_PENDING:
                 prev = self.STATE_IN_POSITION if qty > 0 else self.STATE_FLAT
             self.runtime_state["cooldown_prev_state"] = prev
-            self.runtime_state["safe_cooldown_until"] = time.time() + cooldown_sec
+            self.runtime_state["safe_cooldown_until"] = self._clock() + cooldown_sec
             self._save_runtime_state()
 
         # Transition with guard
@@ -1010,6 +1156,122 @@ class RunController:
             self._transition_state(self.STATE_SAFE_COOLDOWN, reason=reason)
         logger.warning(f"[COOLDOWN] SAFE_COOLDOWN entered for {cooldown_sec}s ({reason})")
 
+    # ===== Multi-symbol position slots =====
+    def _allocate_slot_capital(self, symbol):
+        """Reserve this slot's share of bot capital (multi-position runs only)."""
+        if self.position_book.max_positions <= 1 or not self.ledger or not hasattr(self.ledger, "allocate"):
+            return None
+        try:
+            amount = self._safe_float(self.ledger.allocate(symbol, self.position_book.max_positions), 0.0)
+        except Exception as e:
+            logger.warning(f"[ENTRY] capital allocation failed for {symbol}: {e}")
+            return None
+        with self.state_lock:
+            self.runtime_state["allocated_krw"] = amount
+        return amount
+
+    def _release_slot_capital(self):
+        with self.state_lock:
+            symbol = self.runtime_state.get("symbol")
+            had_allocation = self.runtime_state.pop("allocated_krw", None) is not None
+        if had_allocation and symbol and self.ledger and hasattr(self.ledger, "release"):
+            try:
+                self.ledger.release(symbol)
+            except Exception as e:
+                logger.warning(f"[STATE] capital release failed for {symbol}: {e}")
+
+    def _maintain_position_slots(self):
+        """Per-slot runtime hygiene (idempotency keys, safe cooldown), then prune idle slots."""
+        with self.state_lock:
+            keys = list(self.position_book.slots)
+        for key in keys:
+            with self._position_slot(key):
+                self._purge_expired_active_keys()
+                self._release_safe_cooldown_if_due()
+        with self.state_lock:
+            if self.position_book.prune():
+                self._save_runtime_state()
+
+    def _pump_order_tracker(self):
+        """Advance tracked orders (fill/partial/cancel callbacks) without blocking the loop."""
+        tracker = getattr(self.execution_engine, "order_tracker", None)
+        if tracker is None:
+            return
+        try:
+            tracker.poll_due()
+        except Exception as e:
+            logger.warning(f"[ORDER] tracker pump failed: {e}")
+
+    def _place_order(self, symbol, label, blocking, sync_call, submit_call, finish):
+        """
+        Sends an order for `symbol`'s slot and hands its result to finish(order_res).
+        submit_call(on_done) leaves resting work on the engine's tracker: last_order_id
+        is recorded, the slot stays *_PENDING and finish runs from the tracker pump once
+        the order settles. blocking=True (or an engine without submit_*) waits instead.
+        """
+        if blocking or submit_call is None:
+            try:
+                order_res = sync_call()
+            except Exception as e:
+                logger.error(f"[{label}] Order error: {e}")
+                order_res = None
+            return finish(order_res)
+
+        try:
+            pending = submit_call(lambda order_res: self._finish_pending_order(symbol, label, finish, order_res))
+        except Exception as e:
+            logger.error(f"[{label}] Order error: {e}")
+            pending = None
+        if pending is None or isinstance(pending, dict):
+            return finish(pending)
+        with self.state_lock:
+            self.runtime_state["last_order_id"] = pending.order_id
+            self._save_runtime_state()
+        logger.info(f"[{label}] {symbol} order {pending.order_id} resting; settles on the tracker pump")
+        return {"ok": True, "pending": True, "reason": "ORDER_PENDING", "symbol": symbol, "order_id": pending.order_id}
+
+    def _finish_pending_order(self, symbol, label, finish, order_res):
+        """Tracker callback: books a settled order inside its position slot."""
+        try:
+            with self._position_slot(symbol):
+                finish(order_res)
+        except Exception as e:
+            logger.error(f"[{label}] completing {symbol} order failed: {e}")
+
+    def _drain_order_tracker(self):
+        """Shutdown: let resting orders settle (fill or cancel) so no slot is left pending."""
+        tracker = getattr(self.execution_engine, "order_tracker", None)
+        if tracker is None or tracker.idle():
+            return
+        logger.info(f"[ORDER] settling {len(tracker.open_orders())} open order(s) before shutdown")
+        try:
+            self.execution_engine.drain()
+        except Exception as e:
+            logger.warning(f"[ORDER] tracker drain failed: {e}")
+
+    def _loop_sleep_sec(self):
+        """Loop pause, shortened so the next due order poll is not late."""
+        tracker = getattr(self.execution_engine, "order_tracker", None)
+        due_in = tracker.next_due_in() if tracker is not None else None
+        if due_in is None:
+            return self.loop_interval_sec
+        return min(self.loop_interval_sec, max(0.05, due_in))
+
+    def _position_summaries(self):
+        with self.state_lock:
+            slots = [s for k, s in self.position_book.slots.items() if k in self.position_book.open_symbols()]
+            return [
+                {
+                    "symbol": s.get("symbol"),
+                    "state": s.get("state"),
+                    "position_qty": self._safe_float(s.get("position_qty"), 0.0),
+                    "avg_entry_price": self._safe_float(s.get("avg_entry_price"), 0.0),
+                    "position_id": s.get("position_id"),
+                    "allocated_krw": s.get("allocated_krw"),
+                }
+                for s in slots
+            ]
+
     def _to_ccxt_symbol(self, symbol: str) -> str:
         if not symbol:
             return symbol
@@ -1047,7 +1309,19 @@ class RunController:
             return self.adapter.client
         return self.adapter
 
-    def _get_balance_map(self):
+    def _balance_budget_sec(self):
+        # The shared snapshot must satisfy the strictest open slot.
+        with self.state_lock:
+            states = [s.get("state", self.STATE_FLAT) for s in self.position_book.slots.values()]
+        states = states or [self.STATE_FLAT]
+        return min(self._safe_float(self.balance_staleness_sec.get(state), 0.0) for state in states)
+
+    def _get_balance_map(self, max_age_sec=None):
+        if max_age_sec is None:
+            max_age_sec = self._balance_budget_sec()
+        return self.balance_cache.get(max_age_sec)
+
+    def _fetch_balance_map(self):
         try:
             if hasattr(self.adapter, "get_balances"):
                 return self.adapter.get_balances() or {}
@@ -1099,85 +1373,185 @@ class RunController:
         if not last_exit_ts or last_symbol != symbol:
             return False
         try:
-            return (time.time() - float(last_exit_ts)) < (self.cooldown_min * 60)
+            return (self._clock() - float(last_exit_ts)) < (self.cooldown_min * 60)
         except Exception:
             return False
 
+    @_slot_scoped
     def _reconcile_state_once(self, context="reconcile", symbol_override=None):
         symbol = symbol_override or self.runtime_state.get("symbol")
         if not symbol:
             return
+        orders, balances = self._reconcile_snapshot(context)
+        diffs, actions = self._reconcile_slot(symbol, context, orders, balances, symbol_override=symbol_override)
+        self._record_reconcile_report(context, [symbol], diffs, actions)
 
-        open_order = None
+    def reconcile(self, context="periodic", symbols=None, skip_pending=False):
+        """
+        Full reconciliation pass over `symbols` (default: every position slot) plus
+        open orders on symbols without a slot. Returns the audit report.
+        """
+        with self.state_lock:
+            if symbols is not None:
+                scopes = [(s, s) for s in symbols]
+            elif self.position_book.symbols():
+                scopes = [(s, s) for s in self.position_book.symbols()]
+            else:
+                legacy = self.runtime_state.get("symbol")  # unnamed primary slot
+                scopes = [(legacy, None)] if legacy else []
+        symbols = [s for s, _ in scopes]
+        orders, balances = self._reconcile_snapshot(context)
+        diffs, actions = [], []
+        for symbol, scope in scopes:
+            with self._position_slot(scope):
+                d, a = self._reconcile_slot(symbol, context, orders, balances, skip_pending=skip_pending)
+            diffs.extend(d)
+            actions.extend(a)
+        if balances is None:
+            # Pass skipped: each slot carries a report-only BALANCE_UNAVAILABLE entry.
+            return self._record_reconcile_report(context, symbols, diffs, actions)
+        for diff in self.reconciler.untracked_orders(orders, symbols):
+            diffs.append(diff)
+            actions.append(self._apply_reconcile_diff(diff, context))
+        return self._record_reconcile_report(context, symbols, diffs, actions)
+
+    def _reconcile_snapshot(self, context):
+        orders = []
         try:
             if hasattr(self.adapter, "get_open_orders"):
-                orders = self.adapter.get_open_orders() or []
-                for order in orders:
-                    if order.get("symbol") == symbol:
-                        open_order = order
-                        break
+                orders = list(self.adapter.get_open_orders() or [])
         except Exception as e:
             logger.warning(f"[STATE] Open order check failed ({context}): {e}")
-
-        if open_order:
-            transition_target = None
-            with self.state_lock:
-                current = self.runtime_state.get("state")
-                if current in [self.STATE_ENTRY_PENDING, self.STATE_EXIT_PENDING]:
-                    side = str(open_order.get("side", "")).lower()
-                    new_state = self.STATE_EXIT_PENDING if side == "sell" else self.STATE_ENTRY_PENDING
-                    self.runtime_state["last_order_id"] = open_order.get("id", self.runtime_state.get("last_order_id"))
-                    self._save_runtime_state()
-                    transition_target = new_state
-            if transition_target is not None:
-                self._transition_state(transition_target, reason=f"reconcile_open_order:{context}", allow_same=True)
-                logger.info(f"[STATE] Reconcile ({context}): open order detected -> {transition_target}")
-                return
-
         try:
-            qty = self._get_position_qty(symbol)
+            balances = self._get_balance_map()
         except Exception as e:
-            logger.warning(f"[STATE] Reconcile failed ({context}): {e}")
-            return
+            logger.warning(f"[STATE] Reconcile balance read failed ({context}): {e}")
+            balances = None
+        if not balances:
+            # BalanceSnapshotCache.get returns {} for a failed read: diffing against it
+            # would read every held position as zero and flatten it.
+            logger.warning(f"[STATE] Reconcile ({context}): balances unavailable, pass skipped")
+            balances = None
+        return orders, balances
+
+    def _reconcile_slot(self, symbol, context, orders, balances, symbol_override=None, skip_pending=False):
+        """Diffs the slot in scope against the exchange snapshot and applies the resolutions."""
+        with self.state_lock:
+            slot = dict(self.runtime_state)
+        if balances is None:
+            return [self.reconciler.balance_unavailable(symbol, slot)], ["reported"]
+        fills = self.fill_cursor.poll(self._resolve_exchange_api(), self._to_ccxt_symbol(symbol))
+        symbol_orders = [o for o in orders if o.get("symbol") == symbol]
+        base = self._base_from_symbol(symbol)
+        exchange_qty = max(0.0, self._extract_qty(balances, base))
+        diffs = self.reconciler.diff_slot(symbol, slot, symbol_orders, exchange_qty, fills=fills, skip_pending=skip_pending)
+        age = self.balance_cache.age_sec()
+        if self.reconciler.lowers_position(slot, diffs) and (age is None or age > self.RECONCILE_CONFIRM_MAX_AGE_SEC):
+            # Only a fresh, successful read may shrink or drop a held position.
+            balances = self._get_balance_map(max_age_sec=self.RECONCILE_CONFIRM_MAX_AGE_SEC)
+            if not balances:
+                logger.warning(f"[STATE] Reconcile ({context}): {symbol} balance re-read failed, slot kept")
+                return [self.reconciler.balance_unavailable(symbol, slot, "balance re-read failed")], ["reported"]
+            exchange_qty = max(0.0, self._extract_qty(balances, base))
+            diffs = self.reconciler.diff_slot(symbol, slot, symbol_orders, exchange_qty, fills=fills, skip_pending=skip_pending)
+        actions = []
+        for diff in diffs:
+            actions.append(self._apply_reconcile_diff(diff, context, symbol_override=symbol_override))
+            if diff.kind == reconciler.ORPHAN_ORDER and actions[-1] == "adopted":
+                break  # the slot now follows its live order; balances settle later
+        return diffs, actions
+
+    def _apply_reconcile_diff(self, diff, context, symbol_override=None):
+        if diff.resolution == "report":
+            return "reported"
+        if diff.kind == reconciler.ORPHAN_ORDER:
+            order_id = diff.exchange.get("order_id")
+            if diff.resolution == "cancel":
+                try:
+                    self._resolve_exchange_api().cancel_order(order_id, self._to_ccxt_symbol(diff.symbol))
+                    logger.warning(f"[STATE] Reconcile ({context}): cancelled orphan order {order_id} ({diff.symbol})")
+                    return "cancelled"
+                except Exception as e:
+                    logger.warning(f"[STATE] Reconcile ({context}): cancel {order_id} failed: {e}")
+                    return "cancel_failed"
+            target = diff.exchange.get("state")
+            if not target:
+                return "reported"  # only a pending slot can adopt a live order
+            with self.state_lock:
+                self.runtime_state["last_order_id"] = order_id or self.runtime_state.get("last_order_id")
+                self._save_runtime_state()
+            self._transition_state(target, reason=f"reconcile_open_order:{context}", allow_same=True)
+            logger.info(f"[STATE] Reconcile ({context}): open order detected -> {target}")
+            return "adopted"
 
+        qty = self._safe_float(diff.exchange.get("position_qty"), 0.0)
         transition_target = None
-        prev_state = None
         with self.state_lock:
-            current = self.runtime_state.get("state")
-            prev_state = current
+            prev_state = self.runtime_state.get("state")
             desired = self.STATE_IN_POSITION if qty > 0 else self.STATE_FLAT
             cooldown_active = (
-                current == self.STATE_SAFE_COOLDOWN
-                and time.time() < self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0)
+                prev_state == self.STATE_SAFE_COOLDOWN
+                and self._clock() < self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0)
             )
-
             saved_qty = self._safe_float(self.runtime_state.get("position_qty"), 0.0)
-            qty_mismatch = abs(saved_qty - (qty if qty > 0 else 0.0)) > 1e-12
-            should_update = (
-                current in [self.STATE_ENTRY_PENDING, self.STATE_EXIT_PENDING]
-                or (current != desired and not cooldown_active)
-                or qty_mismatch
-            )
-            if should_update:
-                self.runtime_state["position_qty"] = qty if qty > 0 else 0.0
-                if qty <= 0:
-                    self.runtime_state["avg_entry_price"] = 0.0
-                    self.runtime_state["tp_stage"] = 0
-                    self.runtime_state["entry_candle_idx"] = None
-                    self.runtime_state["last_tp_candle_ts"] = None
-                    self.runtime_state["peak_vol_ratio"] = 0.0
-                    self.runtime_state["liq_collapse_bars"] = 0
-                    self.runtime_state["position_id"] = None
-                    self.runtime_state["partial_tp_done_position_id"] = None
-                if symbol_override:
-                    self.runtime_state["symbol"] = symbol_override
-                self._save_runtime_state()
-                transition_target = desired
+            if cooldown_active and abs(saved_qty - qty) <= 1e-12:
+                return "skipped_cooldown"
+            self.runtime_state["position_qty"] = qty
+            if qty <= 0:
+                self.runtime_state["avg_entry_price"] = 0.0
+                self.runtime_state["tp_stage"] = 0
+                self.runtime_state["entry_candle_idx"] = None
+                self.runtime_state["last_tp_candle_ts"] = None
+                self.runtime_state["peak_vol_ratio"] = 0.0
+                self.runtime_state["liq_collapse_bars"] = 0
+                self.runtime_state["position_id"] = None
+                self.runtime_state["partial_tp_done_position_id"] = None
+            elif diff.exchange.get("buy_vwap") and self._safe_float(self.runtime_state.get("avg_entry_price"), 0.0) <= 0:
+                self.runtime_state["avg_entry_price"] = float(diff.exchange["buy_vwap"])
+            if symbol_override:
+                self.runtime_state["symbol"] = symbol_override
+            self._save_runtime_state()
+            transition_target = desired
+
+        if prev_state != self.STATE_SAFE_COOLDOWN:
+            self._reconcile_transition(transition_target, context=context)
+        logger.info(f"[STATE] Reconcile ({context}): {diff.kind} {prev_state} -> {transition_target} qty={qty}")
+        return "adopted"
+
+    def _record_reconcile_report(self, context, symbols, diffs, actions):
+        report = {
+            "ts": self._clock(),
+            "context": context,
+            "symbols": list(symbols),
+            "fill_fetches": self.fill_cursor.fetches,
+            "diffs": [dict(d.to_dict(), action=a) for d, a in zip(diffs, actions)],
+        }
+        self.last_reconcile_report = report
+        if diffs or context == "startup":
+            reconciler.append_audit(self.reconcile_audit_path, report)
+        return report
+
+    def _reconcile_status(self):
+        report = self.last_reconcile_report
+        if not report:
+            return None
+        kinds = {}
+        for d in report["diffs"]:
+            kinds[d["kind"]] = kinds.get(d["kind"], 0) + 1
+        return {"ts": report["ts"], "context": report["context"], "diffs": len(report["diffs"]), "kinds": kinds}
 
-        if transition_target is not None:
-            if not (prev_state == self.STATE_SAFE_COOLDOWN and transition_target != self.STATE_SAFE_COOLDOWN):
-                self._reconcile_transition(transition_target, context=context)
-            logger.info(f"[STATE] Reconcile ({context}): {prev_state} -> {transition_target} qty={qty}")
+    def _reconcile_periodic(self):
+        if self.reconcile_interval_sec <= 0:
+            return
+        now = self._clock()
+        if now - self._last_reconcile_ts < self.reconcile_interval_sec:
+            return
+        self._last_reconcile_ts = now
+        try:
+            # Pending slots have an order in flight on another thread: leave them be.
+            self.reconcile(context="periodic", skip_pending=True)
+        except Exception as e:
+            logger.warning(f"[STATE] Periodic reconcile failed: {e}")
 
     def _build_market_snapshot(self, symbol: str, exchange_api=None):
         exchange_api = self._resolve_exchange_api(exchange_api)
@@ -1212,7 +1586,13 @@ class RunController:
                             exchange_balance_krw=current_real_krw,
                             symbol=symbol,
                         )
-                        return float(info.get("available_for_bot", 0.0) or 0.0)
+                        available = float(info.get("available_for_bot", 0.0) or 0.0)
+                        # Multi-position runs size each entry from its slot's reservation.
+                        if self.controller.position_book.max_positions > 1:
+                            allocated = self.controller.runtime_state.get("allocated_krw")
+                            if allocated is not None:
+                                available = min(available, float(allocated or 0.0))
+                        return available
                     except Exception:
                         return float(current_real_krw or 0.0)
 
@@ -1231,15 +1611,27 @@ class RunController:
             run_id = datetime.now().strftime("runtime_%Y%m%d_%H%M%S")
             log_dir = "results/logs"
             Path(log_dir).mkdir(parents=True, exist_ok=True)
-            self.execution_engine = ExecutionEngine(run_id, log_dir, _BudgetStub(self), notifier=self.notifier)
+            self.execution_engine = ExecutionEngine(
+                run_id, log_dir, _BudgetStub(self), notifier=self.notifier, clock=self._clock, sleep=self._sleep
+            )
+            # L2 books around live entries/exits, for offline execution replay.
+            try:
+                from .orderbook_replay import OrderBookRecorder
+
+                self.execution_engine.book_recorder = OrderBookRecorder("results/orderbooks")
+            except Exception as e:
+                logger.warning(f"[STATE] order book recorder unavailable: {e}")
             return True
         except Exception as e:
             logger.error(f"[STATE] Failed to init ExecutionEngine: {e}")
             return False
 
-    def process_entry_signal(self, signal: dict, current_market_data: dict = None, exchange_api=None):
+    @_slot_scoped
+    def process_entry_signal(self, signal: dict, current_market_data: dict = None, exchange_api=None, blocking: bool = False):
         """
         Entry path with state machine + persistence.
+        The order rests on the shared tracker: the slot stays ENTRY_PENDING and the
+        fill is booked from the loop's tracker pump (blocking=True waits for it).
         """
         if not signal:
             return None
@@ -1257,7 +1649,7 @@ class RunController:
 
         with self.state_lock:
             state = self.runtime_state.get("state")
-            if state == self.STATE_SAFE_COOLDOWN and time.time() < self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0):
+            if state == self.STATE_SAFE_COOLDOWN and self._clock() < self._safe_float(self.runtime_state.get("safe_cooldown_until"), 0.0):
                 logger.warning(f"[ENTRY] BLOCK: SAFE_COOLDOWN active (symbol={symbol})")
                 return None
             if state != self.STATE_FLAT:
@@ -1266,6 +1658,12 @@ class RunController:
             if self._cooldown_active(symbol):
                 logger.warning(f"[ENTRY] BLOCK: post-exit cooldown active for {symbol}")
                 return None
+            if not self.position_book.has_capacity(symbol):
+                logger.warning(
+                    f"[ENTRY] BLOCK: max_positions={self.position_book.max_positions} reached "
+                    f"(open={self.position_book.open_symbols()}, symbol={symbol})"
+                )
+                return None
 
         if self._active_key_exists(entry_key):
             logger.warning(f"[ENTRY] BLOCK: idempotency key active ({entry_key})")
@@ -1280,6 +1678,7 @@ class RunController:
             self._save_runtime_state()
         if not self._transition_state(self.STATE_ENTRY_PENDING, reason=f"entry_signal:{symbol}"):
             return None
+        self._allocate_slot_capital(symbol)
 
         if not self._ensure_execution_engine():
             self._transition_state(self.STATE_FLAT, reason="entry_engine_init_fail")
@@ -1298,22 +1697,26 @@ class RunController:
             self._transition_state(self.STATE_FLAT, reason="entry_snapshot_fail")
             return None
 
-        try:
-            order_res = self.execution_engine.execute_entry(
-                signal,
-                current_market_data,
-                exchange_api=exchange_api
-            )
-        except Exception as e:
-            logger.error(f"[ENTRY] Order error: {e}")
-            order_res = None
+        engine = self.execution_engine
+        submit = None
+        if hasattr(engine, "submit_entry"):
+            submit = lambda on_done: engine.submit_entry(signal, current_market_data, exchange_api=exchange_api, on_done=on_done)
+        return self._place_order(
+            symbol,
+            "ENTRY",
+            blocking,
+            lambda: engine.execute_entry(signal, current_market_data, exchange_api=exchange_api),
+            submit,
+            lambda order_res: self._finish_entry(signal, symbol, candle_ts, timeframe_sec, order_res),
+        )
 
+    def _finish_entry(self, signal, symbol, candle_ts, timeframe_sec, order_res):
         if order_res and bool(order_res.get("ok", False)):
             real_qty = self._safe_float(order_res.get("real_qty"), 0.0)
             real_vwap = self._safe_float(order_res.get("real_vwap"), 0.0)
             fee = self._safe_float(order_res.get("fee"), 0.0)
             if real_qty > 0:
-                now_ts = time.time()
+                now_ts = self._clock()
                 position_id = self._next_position_id(symbol, entry_ts=now_ts)
                 with self.state_lock:
                     self.runtime_state.update({
@@ -1334,6 +1737,8 @@ class RunController:
                     self._save_runtime_state()
                 order_res["position_id"] = position_id
                 self._transition_state(self.STATE_IN_POSITION, reason=f"entry_filled:{symbol}")
+                with self.state_lock:
+                    self.position_book.repoint_primary()
                 if bool(order_res.get("safe_cooldown", False)):
                     self._enter_safe_cooldown(
                         reason="entry_rate_limit",
@@ -1361,9 +1766,11 @@ class RunController:
             self._transition_state(self.STATE_FLAT, reason="entry_fail_recover")
         return None
 
-    def process_exit_signal(self, symbol: str = None, qty=None, exchange_api=None, reason: str = None):
+    @_slot_scoped
+    def process_exit_signal(self, symbol: str = None, qty=None, exchange_api=None, reason: str = None, blocking: bool = False):
         """
         Exit path with real market sell execution.
+        Non-blocking like process_entry_signal: the slot stays EXIT_PENDING until the sell settles.
         """
         self._release_safe_cooldown_if_due()
 
@@ -1414,23 +1821,29 @@ class RunController:
             self._transition_state(fallback, reason="exit_invalid_qty")
             return None
 
-        try:
-            order_res = self.execution_engine.create_market_sell_order(
-                symbol,
-                qty,
-                exchange_api=exchange_api,
-                event_type="EXIT",
-                position_id=active_position_id,
+        engine = self.execution_engine
+        submit = None
+        if hasattr(engine, "submit_market_sell_order"):
+            submit = lambda on_done: engine.submit_market_sell_order(
+                symbol, qty, exchange_api=exchange_api, event_type="EXIT", position_id=active_position_id, on_done=on_done
             )
-        except Exception as e:
-            logger.error(f"[EXIT] Order error: {e}")
-            order_res = None
+        return self._place_order(
+            symbol,
+            "EXIT",
+            blocking,
+            lambda: engine.create_market_sell_order(
+                symbol, qty, exchange_api=exchange_api, event_type="EXIT", position_id=active_position_id
+            ),
+            submit,
+            lambda order_res: self._finish_exit(symbol, reason, prev_state, order_res),
+        )
 
+    def _finish_exit(self, symbol, reason, prev_state, order_res):
         if order_res and bool(order_res.get("ok", False)):
             sold_qty = self._safe_float(order_res.get("real_qty"), 0.0)
             sold_fee = self._safe_float(order_res.get("fee"), 0.0)
             if sold_qty > 0:
-                now_ts = time.time()
+                now_ts = self._clock()
                 final_state = self.STATE_IN_POSITION
                 with self.state_lock:
                     active_position_id = self.runtime_state.get("position_id")
@@ -1486,6 +1899,7 @@ class RunController:
             self._transition_state(fallback, reason="exit_fail_recover")
         return None
 
+    @_slot_scoped
     def _get_unrealized_pnl_pct(self, symbol: str, exchange_api=None):
         if not symbol or not self._ensure_execution_engine():
             return 0.0
@@ -1501,6 +1915,7 @@ class RunController:
             return 0.0
         return (best_bid - avg_entry) / avg_entry
 
+    @_slot_scoped
     def process_tp_signal(
         self,
         symbol: str = None,
@@ -1509,6 +1924,7 @@ class RunController:
         expected_stage: int = None,
         signal: dict = None,
         exchange_api=None,
+        blocking: bool = False,
     ):
         """
         Bid-based partial TP with duplicate guard and idempotency key.
@@ -1584,27 +2000,36 @@ class RunController:
         if not self._transition_state(self.STATE_EXIT_PENDING, reason=f"tp_stage_{expected_stage}:{symbol}"):
             return None
 
-        try:
-            order_res = self.execution_engine.create_marketable_limit_sell_order(
-                symbol=symbol,
-                qty=sell_qty,
-                exchange_api=exchange_api,
-                aggressive_ticks=1,
-                timeout_sec=3.0,
-                params=None,
-                force_refresh_market=False,
-                event_type="Partial_TP",
-                position_id=str(position_id),
-            )
-        except Exception as e:
-            logger.error(f"[TP] Sell error: {e}")
-            order_res = None
+        engine = self.execution_engine
+        sell_kwargs = dict(
+            symbol=symbol,
+            qty=sell_qty,
+            exchange_api=exchange_api,
+            aggressive_ticks=1,
+            timeout_sec=3.0,
+            params=None,
+            force_refresh_market=False,
+            event_type="Partial_TP",
+            position_id=str(position_id),
+        )
+        submit = None
+        if hasattr(engine, "submit_marketable_limit_sell_order"):
+            submit = lambda on_done: engine.submit_marketable_limit_sell_order(**sell_kwargs, on_done=on_done)
+        return self._place_order(
+            symbol,
+            "TP",
+            blocking,
+            lambda: engine.create_marketable_limit_sell_order(**sell_kwargs),
+            submit,
+            lambda order_res: self._finish_tp(symbol, position_id, expected_stage, candle_ts, order_res),
+        )
 
+    def _finish_tp(self, symbol, position_id, expected_stage, candle_ts, order_res):
         if order_res and bool(order_res.get("ok", False)):
             sold_qty = self._safe_float(order_res.get("real_qty"), 0.0)
             sold_fee = self._safe_float(order_res.get("fee"), 0.0)
             if sold_qty > 0:
-                now_ts = time.time()
+                now_ts = self._clock()
                 final_state = self.STATE_IN_POSITION
                 with self.state_lock:
                     cur_qty = self._safe_float(self.runtime_state.get("position_qty"), 0.0)
@@ -1648,7 +2073,8 @@ class RunController:
             self._transition_state(self.STATE_IN_POSITION if has_position else self.STATE_FLAT, reason="tp_fail_recover")
         return None
 
-    def update_liquidity_ratio(self, current_vol_ratio: float):
+    @_slot_scoped
+    def update_liquidity_ratio(self, current_vol_ratio: float, symbol: str = None):
         """
         Track peak volume ratio after entry and count consecutive collapse bars.
         """
@@ -1666,6 +2092,7 @@ class RunController:
             self._save_runtime_state()
             return dict(self.runtime_state)
 
+    @_slot_scoped
     def process_panic_exit(self, symbol: str = None, exchange_api=None, hard_loss_cap: float = -0.05):
         """
         Panic exit when liquidity collapse persists for 2 bars.
@@ -1729,7 +2156,7 @@ class RunController:
                 self.runtime_state["last_order_id"] = order_res.get("order_id")
                 if remain_qty <= 1e-12:
                     final_state = self.STATE_FLAT
-                    self.runtime_state["last_exit_ts"] = time.time()
+                    self.runtime_state["last_exit_ts"] = self._clock()
                     self.runtime_state["avg_entry_price"] = 0.0
                     self.runtime_state["entry_candle_idx"] = None
                     self.runtime_state["tp_stage"] = 0
@@ -1752,6 +2179,7 @@ class RunController:
         self._transition_state(self.STATE_IN_POSITION if has_position else self.STATE_FLAT, reason="panic_fail_recover")
         return None
 
+    @_slot_scoped
     def process_time_stop(
         self,
         symbol: str = None,
@@ -1843,9 +2271,34 @@ class RunController:
             self.last_error = str(e)
             self.last_error_ts = time.time()
 
+    def _publish_status_shm(self, hot):
+        if self._status_channel is None:
+            if not self.status_shm_enabled or self._status_channel_failed:
+                return False
+            try:
+                self._status_channel = StatusChannel(segment_name_for(self.runtime_status_path))
+            except Exception as e:
+                logger.warning(f"[IPC] shared-memory status unavailable, JSON only: {e}")
+                self._status_channel_failed = True
+                return False
+        try:
+            self._status_channel.publish(hot)
+            return True
+        except Exception as e:
+            logger.warning(f"[IPC] shared-memory status publish failed: {e}")
+            return False
+
+    def _close_status_channel(self):
+        if self._status_channel is not None:
+            self._status_channel.close()
+            self._status_channel = None
+
     def _write_runtime_status(self, error=None):
         """
-        Writes atomic JSON status for Launcher Dashboard.
+        Publishes status for Launcher Dashboard / backends.
+        Hot fields go to the shared-memory channel on every call; the atomic JSON
+        snapshot is rewritten every `status_json_interval_sec`, on status changes
+        and errors, or on every call when shared memory is unavailable.
         """
         import json
         import os
@@ -1886,7 +2339,8 @@ class RunController:
         last_error = str(error) if error else self.last_error
         last_error_ts = time.time() if error else self.last_error_ts
 
-        virtual = self._compute_available_for_bot(exchange_balance_krw=self._get_krw_balance())
+        krw_balance = self._get_krw_balance()
+        virtual = self._compute_available_for_bot(exchange_balance_krw=krw_balance)
 
         status_data = {
             'ts': time.time(),
@@ -1914,22 +2368,88 @@ class RunController:
                 'exchange': virtual.get('exchange', None),
                 'selected_cap_krw': virtual.get('selected_cap_krw', virtual.get('cap_krw', None)),
             },
+            'balance_snapshot': self.balance_cache.stats(budget_sec=self._balance_budget_sec()),
+            'max_positions': self.position_book.max_positions,
+            'positions': self._position_summaries(),
+            'reconcile': self._reconcile_status(),
             'last_tick_ts': self.last_tick_ts,
             'last_error': last_error,
             'last_error_ts': last_error_ts
         }
         
+        with self.state_lock:
+            primary = dict(self.runtime_state)
+            open_positions = len(self.position_book.open_symbols())
+        hot = {
+            'ts': status_data['ts'],
+            'pid': status_data['pid'],
+            'mode': self.mode,
+            'status': current_state,
+            'state': primary.get('state'),
+            'symbol': primary.get('symbol'),
+            'position_qty': primary.get('position_qty'),
+            'avg_entry_price': primary.get('avg_entry_price'),
+            'equity': status_data['equity'],
+            'pnl_pct': status_data['pnl_pct'],
+            'krw_balance': krw_balance,
+            'available_for_bot': virtual.get('available_for_bot', 0.0),
+            'regime': regime,
+            'btc_price': btc_price,
+            'open_positions': open_positions,
+            'max_positions': self.position_book.max_positions,
+            'last_tick_ts': self.last_tick_ts,
+            'last_error_ts': last_error_ts,
+            'last_error': last_error,
+        }
+        published = self._publish_status_shm(hot)
+
+        json_due = (
+            not published
+            or bool(error)
+            or current_state != self._status_json_last_state
+            or (status_data['ts'] - self._status_json_last_ts) >= self.status_json_interval_sec
+        )
+        if not json_due:
+            return
+
         try:
-            target_path = Path("results/runtime_status.json")
+            target_path = self.runtime_status_path
             tmp_path = target_path.with_suffix('.tmp')
             
             with open(tmp_path, 'w') as f:
                 json.dump(status_data, f)
             
             os.replace(tmp_path, target_path)
+            self._status_json_last_ts = status_data['ts']
+            self._status_json_last_state = current_state
         except Exception as e:
             logger.error(f"[IPC] Failed to write status: {e}")
 
+    def _loop_once(self):
+        """
+        One pass of the main loop. Returns False when a risk limit stopped the bot.
+        """
+        # Runtime hygiene for persistent execution controls.
+        self._maintain_position_slots()
+        self._pump_order_tracker()
+        self._reconcile_periodic()
+
+        # 1. Update Strategy (Throttle, 1 minute)
+        if not self.disable_strategy and self._clock() - self._last_strategy_tick > 60:
+            self._execute_strategy()
+            self._last_strategy_tick = self._clock()
+
+        # 2. Check Safety & Limits (Every loop)
+        if not self.check_risk_limits():
+            logger.warning("[RunController] Risk Limit Triggered. Stopping Loop.")
+            self.running = False
+            return False
+
+        # 3. IPC Update
+        self._write_runtime_status()
+        self._commit_state_journals()
+        return True
+
     def run(self):
         """
         Main Trading Loop.
@@ -1942,34 +2462,17 @@ class RunController:
 
         if not self._startup_reconciled:
             try:
-                self._reconcile_state_once(context="startup")
+                self.reconcile(context="startup")
             finally:
                 self._startup_reconciled = True
-        
-        last_tick = 0
-        tick_interval = 60 # 1 minute
+                self._last_reconcile_ts = self._clock()
         
         try:
             while self.running:
-                # Runtime hygiene for persistent execution controls.
-                self._purge_expired_active_keys()
-                self._release_safe_cooldown_if_due()
-
-                # 1. Update Strategy (Throttle)
-                if not self.disable_strategy and time.time() - last_tick > tick_interval:
-                    self._execute_strategy()
-                    last_tick = time.time()
-                
-                # 2. Check Safety & Limits (Every second)
-                if not self.check_risk_limits():
-                    logger.warning("[RunController] Risk Limit Triggered. Stopping Loop.")
-                    self.running = False
+                if not self._loop_once():
                     break
-                
-                # 3. IPC Update
-                self._write_runtime_status()
-                time.sleep(1) 
-                
+                self._sleep(self._loop_sleep_sec())
+
         except Exception as e:
             import traceback
             tb = traceback.format_exc()
@@ -1988,7 +2491,12 @@ class RunController:
             
         finally:
             logger.info("[RunController] Loop STOPPED.")
+            self._drain_order_tracker()
             self._write_runtime_status()
+            self._close_status_channel()
+            self._commit_state_journals(close=True)
+            self._close_execution_engine()
+            self._close_notifier()
             # Ensure lock is released even if stop() wasn't called
             self._release_lock()
 
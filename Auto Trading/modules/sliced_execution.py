@@ -0,0 +1,211 @@
+"""
+Sliced entry execution (TWAP / participation-of-volume) for ExecutionEngine.
+
+Instead of one marketable limit for the full size, the budget is worked in
+slices. Each slice:
+  1. re-reads the book and prices a marketable limit `entry_limit_offset_ticks`
+     through the best ask (engine tick helpers),
+  2. stops if the ask ran more than max_entry_slippage_pct above arrival,
+  3. rests up to the slice timeout on the shared OrderTracker, which then
+     cancels the unfilled remainder (engine._track_order); it is re-quoted
+     (replaced) in the next slice.
+Fills of every slice are aggregated with _aggregate_fills.
+
+Nothing here sleeps: each slice is placed from a tracker callback and the next
+one is deferred with OrderTracker.call_later, so the run loop's tracker pump
+drives the whole schedule.
+
+TWAP: remaining budget / remaining slices, one slice every interval.
+POV : pov_rate x market volume traded since the previous slice (fetch_trades),
+      falling back to the TWAP size when trades are unavailable.
+"""
+import logging
+
+logger = logging.getLogger("SlicedExecution")
+
+SLICED_MODES = {"TWAP", "POV"}
+
+
+def twap_slice_money(remaining_money, slices_left):
+    return remaining_money / max(1, int(slices_left))
+
+
+def pov_slice_money(remaining_money, market_volume, price, pov_rate):
+    return min(remaining_money, max(0.0, float(market_volume)) * float(price) * max(0.0, float(pov_rate)))
+
+
+class SlicedEntryExecutor:
+    """One sliced entry, advanced by tracker callbacks; `order_id` is the latest slice's order."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.order_id = None
+
+    def _market_volume(self, exchange_api, ccxt_symbol, since_ts):
+        """Base volume traded since since_ts, or None when trades are unavailable."""
+        if not exchange_api or not hasattr(exchange_api, "fetch_trades"):
+            return None
+        try:
+            trades = exchange_api.fetch_trades(ccxt_symbol, since=int(since_ts * 1000)) or []
+        except Exception as e:
+            logger.warning(f"[SLICE] fetch_trades failed: {e}")
+            return None
+        total = 0.0
+        for tr in trades:
+            ts = tr.get("timestamp")
+            if ts is not None and float(ts) / 1000.0 < since_ts:
+                continue
+            total += self.engine._safe_float(tr.get("amount"), 0.0)
+        return total
+
+    def start(self, signal, symbol, ccxt_symbol, target_money, exchange_api, mode, on_done, orderbook=None):
+        """
+        Places the first slice (on `orderbook` when the caller already fetched it).
+        Returns the result dict when the entry ends right away, else self;
+        on_done(result) fires once the last slice settles.
+        """
+        eng = self.engine
+        self.clock = eng.order_tracker
+        self.symbol = symbol
+        self.ccxt_symbol = ccxt_symbol
+        self.exchange_api = exchange_api
+        self.on_done = on_done
+        self.mode = str(mode).upper()
+        self.slices = max(1, int(signal.get("slices") or eng.entry_slices))
+        self.interval = max(0.0, eng._safe_float(signal.get("slice_interval_sec"), eng.entry_slice_interval_sec))
+        self.pov_rate = eng._safe_float(signal.get("pov_rate"), eng.entry_pov_rate)
+        self.max_slip = eng._safe_float(signal.get("max_entry_slippage_pct"), eng.max_entry_slippage_pct)
+        self.slice_timeout = max(0.5, min(eng.entry_timeout_sec, self.interval or eng.entry_timeout_sec))
+        # POV may need more than `slices` rounds to work the size; bound the schedule.
+        self.max_rounds = self.slices if self.mode == "TWAP" else self.slices * 4
+
+        self.fee_buffer = 0.998
+        self.started = self.clock.now()
+        self.arrival_ask = None
+        self.remaining_money = target_money
+        self.all_fills = []
+        self.slice_log = []
+        self.rate_limited = False
+        self.stop_reason = None
+        self.last_slice_ts = self.started - self.interval
+        self.round = 0
+        self.slice_started_at = None
+        self.result = None
+        self._first_book = orderbook
+
+        self._in_start = True
+        try:
+            self._next_slice()
+        finally:
+            self._in_start = False
+        return self.result if self.result is not None else self
+
+    def _next_slice(self):
+        """Places the next slice (tracked) or defers/ends the schedule."""
+        eng = self.engine
+        i = self.round
+        if i >= self.max_rounds or (self.remaining_money < eng.min_slice_krw and i > 0):
+            return self._finish()
+        if getattr(eng, "draining", False):
+            self.stop_reason = "DRAINING"
+            return self._finish()
+        self.round += 1
+
+        orderbook, self._first_book = self._first_book, None
+        if orderbook is None:
+            orderbook = eng._fetch_orderbook(self.exchange_api, self.ccxt_symbol, event="ENTRY")
+        asks = (orderbook or {}).get("asks") or []
+        best_ask = eng._safe_float(asks[0][0], 0.0) if asks and len(asks[0]) >= 1 else 0.0
+        if best_ask <= 0:
+            self.stop_reason = "ORDERBOOK_UNAVAILABLE"
+            return self._finish()
+        if self.arrival_ask is None:
+            self.arrival_ask = best_ask
+        elif best_ask > self.arrival_ask * (1.0 + self.max_slip):
+            self.stop_reason = f"SLICE_PRICE_RUNAWAY({best_ask}>{self.arrival_ask})"
+            return self._finish()
+
+        now = self.clock.now()
+        if self.mode == "POV":
+            volume = self._market_volume(self.exchange_api, self.ccxt_symbol, self.last_slice_ts)
+            if volume is None:
+                slice_money = twap_slice_money(self.remaining_money, max(1, self.slices - i))
+            else:
+                slice_money = pov_slice_money(self.remaining_money, volume, best_ask, self.pov_rate)
+        else:
+            slice_money = twap_slice_money(self.remaining_money, self.slices - i)
+        self.last_slice_ts = now
+        # Never leave an unfillable dust remainder behind.
+        if self.remaining_money - slice_money < eng.min_slice_krw:
+            slice_money = self.remaining_money
+        if slice_money < eng.min_slice_krw and slice_money < self.remaining_money:
+            self.slice_log.append({"slice": i, "skipped": True, "slice_money": slice_money})
+            self.clock.call_later(self.interval, self._next_slice)
+            return None
+
+        tick = eng.get_tick_size(best_ask)
+        limit_price = eng.round_to_tick(best_ask + (float(eng.entry_limit_offset_ticks) * tick), tick, side="buy")
+        qty = eng._clamp_positive(slice_money * self.fee_buffer / limit_price, 0.0)
+        if qty <= 0:
+            return self._finish()
+
+        try:
+            order = eng._submit_limit_order(self.exchange_api, self.ccxt_symbol, "buy", qty, limit_price, params={})
+        except Exception as e:
+            self.rate_limited = self.rate_limited or eng._is_rate_limit_error(e)
+            self.stop_reason = f"SLICE_ORDER_ERROR:{e}"
+            return self._finish()
+        order_id = (order or {}).get("id")
+        if not order_id:
+            self.stop_reason = "ORDER_ID_MISSING"
+            return self._finish()
+        self.order_id = order_id
+        self.slice_started_at = now
+        self.slice_log.append({"slice": i, "order_id": order_id, "limit_price": limit_price, "slice_money": slice_money})
+        # Timeout cancels the resting remainder; the next slice re-quotes it.
+        return eng._track_order(self.exchange_api, order_id, self.ccxt_symbol, self.slice_timeout, 2.0, self._slice_settled)
+
+    def _slice_settled(self, tracked):
+        eng = self.engine
+        self.rate_limited = self.rate_limited or tracked.rate_limited
+        fills = eng._fetch_fills(self.exchange_api, self.ccxt_symbol, tracked.order_id, start_ts=self.slice_started_at)
+        agg = eng._aggregate_fills(fills)
+        self.all_fills.extend(fills)
+        self.remaining_money = max(0.0, self.remaining_money - agg["amount"] - agg["fee"])
+        self.slice_log[-1].update({"filled_qty": agg["qty"], "vwap": agg["vwap"]})
+        if self.rate_limited:
+            self.stop_reason = "RATE_LIMITED"
+            return self._finish()
+        if self.remaining_money < eng.min_slice_krw:
+            return self._finish()
+        next_at = self.started + self.round * self.interval
+        self.clock.call_later(next_at - self.clock.now(), self._next_slice)
+
+    def _finish(self):
+        eng = self.engine
+        agg = eng._aggregate_fills(self.all_fills)
+        ok = agg["qty"] > 0.0
+        self.result = eng._compose_result(
+            ok,
+            self.symbol,
+            "buy",
+            reason=("FILLED" if ok else "NO_REAL_FILL") + (f":{self.stop_reason}" if self.stop_reason else ""),
+            order_id=self.order_id,
+            real_qty=agg["qty"],
+            real_vwap=agg["vwap"],
+            amount=agg["amount"],
+            fee=agg["fee"],
+            fills=agg["fills"],
+            rate_limited=self.rate_limited,
+            safe_cooldown=self.rate_limited,
+            meta={
+                "exec_mode": self.mode,
+                "arrival_ask": self.arrival_ask,
+                "slices": self.slice_log,
+                "unfilled_money": self.remaining_money,
+            },
+        )
+        # Ended inside start(): the caller takes the dict as the return value.
+        if not self._in_start:
+            self.on_done(self.result)
+        return None
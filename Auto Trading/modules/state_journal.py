@@ -0,0 +1,283 @@
+"""
+Append-only journal for small, frequently updated JSON state (runtime/daily risk state).
+
+Layout next to the snapshot file `<name>.json`:
+  <name>.json          last compacted snapshot (safe_json_dump; carries `_journal_seq`)
+  <name>.json.journal  records appended since that snapshot
+
+Record = 8-byte header (payload length, crc32, big-endian) + UTF-8 JSON payload
+{"seq": n, "set": {changed keys}, "del": [removed keys]}. Only changed keys are
+written. Keys listed in `nested` (dicts of sub-records, e.g. runtime_state's
+"positions") are diffed one level deeper into {"set_in": {key: {changed subkeys}},
+"del_in": {key: [removed subkeys]}}, so one changed slot is one small record.
+Records are written to the OS on append and fsynced once per group
+commit (every `group_commit_sec`, or immediately for durable=True appends).
+Compaction rewrites the snapshot and truncates the journal.
+
+Recovery loads the snapshot and replays records with seq > `_journal_seq`,
+stopping at the first torn/corrupt record (which is truncated away). Schema
+migrations (safe_json_load contract) run on the replayed state, which is then
+compacted so the journal never mixes schema versions.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from .utils_json import CustomJSONEncoder, SCHEMA_VERSION_FIELD, safe_json_dump, safe_json_load
+
+logger = logging.getLogger("StateJournal")
+
+JOURNAL_SEQ_FIELD = "_journal_seq"
+_HEADER = struct.Struct(">II")
+_MAX_RECORD_BYTES = 16 * 1024 * 1024
+
+
+def _encode_record(payload):
+    body = json.dumps(payload, cls=CustomJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body), zlib.crc32(body) & 0xFFFFFFFF) + body
+
+
+def _iter_records(raw):
+    """Yields (end_offset, payload) for each intact record; stops at the first bad one."""
+    pos = 0
+    while pos + _HEADER.size <= len(raw):
+        length, crc = _HEADER.unpack_from(raw, pos)
+        start = pos + _HEADER.size
+        end = start + length
+        if length > _MAX_RECORD_BYTES or end > len(raw):
+            return
+        body = raw[start:end]
+        if zlib.crc32(body) & 0xFFFFFFFF != crc:
+            return
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except Exception:
+            return
+        yield end, payload
+        pos = end
+
+
+def _journal_path(snapshot_path):
+    p = Path(snapshot_path)
+    return p.with_suffix(p.suffix + ".journal")
+
+
+def _replay(snapshot_path, default=None, repair=False):
+    """Returns (state, last_seq, valid_journal_bytes, journal_size)."""
+    state = safe_json_load(snapshot_path, default=None, repair=repair)
+    if not isinstance(state, dict):
+        state = dict(default or {})
+    state = dict(state)
+    seq = int(state.pop(JOURNAL_SEQ_FIELD, 0) or 0)
+
+    jpath = _journal_path(snapshot_path)
+    try:
+        raw = jpath.read_bytes()
+    except FileNotFoundError:
+        return state, seq, 0, 0
+    except Exception as e:
+        logger.warning(f"[JOURNAL] unreadable {jpath}: {e}")
+        return state, seq, 0, 0
+
+    valid = 0
+    for end, rec in _iter_records(raw):
+        valid = end
+        rec_seq = int(rec.get("seq", 0) or 0)
+        if rec_seq <= seq:
+            continue  # already folded into the snapshot
+        state.update(rec.get("set") or {})
+        for key in rec.get("del") or []:
+            state.pop(key, None)
+        for key, sub in (rec.get("set_in") or {}).items():
+            target = state.get(key)
+            state[key] = {**(target if isinstance(target, dict) else {}), **sub}
+        for key, gone in (rec.get("del_in") or {}).items():
+            target = state.get(key)
+            if isinstance(target, dict):
+                state[key] = {k: v for k, v in target.items() if k not in gone}
+        seq = rec_seq
+    return state, seq, valid, len(raw)
+
+
+def read_journaled_state(snapshot_path, default=None):
+    """Read-only view of the latest state (snapshot + journal) for other processes."""
+    state, _, _, _ = _replay(snapshot_path, default=default)
+    return state
+
+
+class StateJournal:
+    def __init__(
+        self,
+        snapshot_path,
+        schema_version=None,
+        group_commit_sec=1.0,
+        compact_every=300,
+        compact_interval_sec=30.0,
+        clock=time.monotonic,
+        nested=(),
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = _journal_path(self.snapshot_path)
+        self.schema_version = schema_version
+        self.group_commit_sec = float(group_commit_sec)
+        self.compact_every = max(1, int(compact_every))
+        self.compact_interval_sec = float(compact_interval_sec)
+        self._clock = clock
+        self.nested = frozenset(nested)
+        self._lock = threading.RLock()
+        self._fh = None
+        self._seq = 0
+        self._last = {}
+        self._unsynced_since = None
+        self._records_since_compact = 0
+        self._last_compact = clock()
+        # Counters (exposed for diagnostics/tests)
+        self.appends = 0
+        self.fsyncs = 0
+        self.compactions = 0
+
+    # ----- recovery -----
+    def load(self, default=None, repair=True, schema_migrations=None):
+        """
+        Snapshot + journal replay. Drops a torn tail so later appends stay parseable.
+        schema_migrations: ordered by old version like safe_json_load (index 0 = v1 -> v2).
+        """
+        with self._lock:
+            state, seq, valid, size = _replay(self.snapshot_path, default=default, repair=repair)
+            if valid < size:
+                logger.warning(f"[JOURNAL] truncating torn tail of {self.journal_path} ({size - valid} bytes)")
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(valid)
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._seq = seq
+            self._last = dict(state)
+            try:
+                migrated = self._migrate(state, schema_migrations or [])
+            except Exception as e:
+                logger.error(f"[JOURNAL] migration failed for {self.snapshot_path}: {e}")
+                migrated = dict(default or {})
+            if migrated is not state:
+                state = migrated
+                self._last = json.loads(json.dumps(state, cls=CustomJSONEncoder))
+                self.compact()
+            return state
+
+    def _migrate(self, state, migrations):
+        if self.schema_version is None or not state:
+            return state
+        current = state.get(SCHEMA_VERSION_FIELD, 1)
+        if not isinstance(current, int) or current >= self.schema_version:
+            return state
+        data = state
+        while current < self.schema_version and 0 <= current - 1 < len(migrations):
+            data = migrations[current - 1](data)
+            current += 1
+        if data is not state:
+            logger.info(f"[JOURNAL] migrated {self.snapshot_path} to schema v{current}")
+        return data
+
+    # ----- write path -----
+    def _open(self):
+        if self._fh is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.journal_path, "ab")
+        return self._fh
+
+    def append(self, state, durable=False):
+        """
+        Journal the keys of `state` that changed since the last append.
+        durable=True fsyncs before returning (and commits any pending records with it).
+        """
+        # JSON round-trip: compares what would be persisted and detaches nested values
+        # from later in-place mutation by the caller.
+        current = json.loads(json.dumps(state, cls=CustomJSONEncoder))
+        with self._lock:
+            changed, nested_set, nested_del = {}, {}, {}
+            for k, v in current.items():
+                old = self._last.get(k)
+                if k in self.nested and isinstance(v, dict) and isinstance(old, dict):
+                    sub = {sk: sv for sk, sv in v.items() if sk not in old or old[sk] != sv}
+                    gone = [sk for sk in old if sk not in v]
+                    if sub:
+                        nested_set[k] = sub
+                    if gone:
+                        nested_del[k] = gone
+                elif k not in self._last or old != v:
+                    changed[k] = v
+            removed = [k for k in self._last if k not in current]
+            if changed or removed or nested_set or nested_del:
+                self._seq += 1
+                rec = {"seq": self._seq, "set": changed}
+                if removed:
+                    rec["del"] = removed
+                if nested_set:
+                    rec["set_in"] = nested_set
+                if nested_del:
+                    rec["del_in"] = nested_del
+                fh = self._open()
+                fh.write(_encode_record(rec))
+                fh.flush()  # visible to readers / survives a process crash
+                self._last = current
+                self.appends += 1
+                self._records_since_compact += 1
+                if self._unsynced_since is None:
+                    self._unsynced_since = self._clock()
+            if durable:
+                self.commit()
+            else:
+                self.maybe_commit()
+
+    def commit(self):
+        """Group commit: one fsync covers every record written since the last commit."""
+        with self._lock:
+            if self._unsynced_since is not None and self._fh is not None:
+                os.fsync(self._fh.fileno())
+                self.fsyncs += 1
+            self._unsynced_since = None
+            if self._records_since_compact >= self.compact_every or (
+                self._records_since_compact > 0 and self._clock() - self._last_compact >= self.compact_interval_sec
+            ):
+                self.compact()
+
+    def maybe_commit(self):
+        with self._lock:
+            due = self._unsynced_since is not None and self._clock() - self._unsynced_since >= self.group_commit_sec
+            if due or (
+                self._records_since_compact > 0 and self._clock() - self._last_compact >= self.compact_interval_sec
+            ):
+                self.commit()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot, then truncate the journal."""
+        with self._lock:
+            snap = dict(self._last)
+            snap[JOURNAL_SEQ_FIELD] = self._seq
+            safe_json_dump(snap, self.snapshot_path, schema_version=self.schema_version)
+            # Snapshot is durable first: a crash before truncation only replays
+            # records whose seq is already covered, which are skipped.
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            with open(self.journal_path, "wb") as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self._records_since_compact = 0
+            self._last_compact = self._clock()
+            self._unsynced_since = None
+            self.compactions += 1
+
+    def close(self):
+        with self._lock:
+            if self._records_since_compact > 0:
+                self.compact()
+            elif self._unsynced_since is not None:
+                self.commit()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
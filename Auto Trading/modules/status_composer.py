@@ -0,0 +1,129 @@
+"""
+Memoized assembly of the backend status payload.
+
+build_status used to re-read every source on each call: settings JSON, lock
+file, journaled runtime state, labs/data JSON and the crash-log tail. Each of
+those is now a StatusSection with its own cache:
+
+  * within `ttl` seconds of the last check the cached value is returned as-is;
+  * after that the section's source files are stat'ed and the value is only
+    rebuilt when one of their (mtime_ns, size) stamps changed;
+  * sections without source files are rebuilt once their TTL expires.
+
+Builds are single-flight per section, so concurrent dashboard clients wait for
+the one build in progress instead of repeating it. StatusComposer.memo() adds
+the same treatment for the whole assembled payload. Per-section counters and
+build times are reported by timings() (served at /api/v1/status/timings).
+"""
+import threading
+import time
+from pathlib import Path
+
+
+def _stamp(path):
+    try:
+        st = Path(path).stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class StatusSection:
+    def __init__(self, name, build, ttl=1.0, sources=(), clock=time.monotonic):
+        self.name = name
+        self._build = build
+        self.ttl = float(ttl)
+        self.sources = tuple(Path(p) for p in sources)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value = None
+        self._stamps = None
+        self._checked = None
+        self.builds = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._checked = None
+
+    def get(self, max_age=None):
+        ttl = self.ttl if max_age is None else float(max_age)
+        with self._lock:
+            now = self._clock()
+            if self._checked is not None and now - self._checked < ttl:
+                self.hits += 1
+                return self._value
+            stamps = tuple(_stamp(p) for p in self.sources)
+            if self._checked is not None and self.sources and stamps == self._stamps:
+                self._checked = now
+                self.revalidated += 1
+                return self._value
+            t0 = time.perf_counter()
+            try:
+                value = self._build()
+            except Exception:
+                # Keep serving the last good value; retry after the next TTL.
+                self.errors += 1
+                self._checked = now
+                return self._value
+            finally:
+                elapsed = (time.perf_counter() - t0) * 1000.0
+                self.builds += 1
+                self.last_ms = elapsed
+                self.max_ms = max(self.max_ms, elapsed)
+                self.total_ms += elapsed
+            self._value = value
+            self._stamps = stamps
+            self._checked = now
+            return value
+
+    def timings(self):
+        with self._lock:
+            age = None if self._checked is None else max(0.0, self._clock() - self._checked)
+            return {
+                "ttl_sec": self.ttl,
+                "sources": [str(p) for p in self.sources],
+                "builds": self.builds,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "errors": self.errors,
+                "last_ms": round(self.last_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "avg_ms": round(self.total_ms / self.builds, 3) if self.builds else 0.0,
+                "age_sec": age,
+            }
+
+
+class StatusComposer:
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._sections = {}
+
+    def section(self, name, build, ttl=1.0, sources=()):
+        sec = StatusSection(name, build, ttl=ttl, sources=sources, clock=self._clock)
+        self._sections[name] = sec
+        return sec
+
+    def get(self, name, max_age=None):
+        return self._sections[name].get(max_age=max_age)
+
+    def memo(self, name, build, ttl):
+        """Section for a payload whose builder is a closure over the caller's arguments."""
+        sec = self._sections.get(name)
+        if sec is None:
+            return self.section(name, build, ttl=ttl)
+        sec._build = build  # a rebuild uses the latest caller's arguments
+        return sec
+
+    def invalidate(self, name=None):
+        for sec_name, sec in self._sections.items():
+            if name is None or sec_name == name:
+                sec.invalidate()
+
+    def timings(self):
+        return {name: sec.timings() for name, sec in self._sections.items()}
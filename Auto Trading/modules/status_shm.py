@@ -0,0 +1,284 @@
+"""
+Shared-memory runtime status channel (seqlock).
+
+RunController publishes the hot status fields every tick into a fixed-layout
+shared-memory segment; the backends and the TUI read them without touching the
+disk. results/runtime_status.json stays as the full, low-frequency fallback
+(watchlist, virtual capital, per-position detail) for readers on other hosts
+or when shared memory is unavailable.
+
+Layout (little endian):
+  header: magic "RSTS", version u16, body size u16, sequence u64
+  body  : STATUS_FIELDS packed with one struct
+
+Seqlock protocol (single writer):
+  writer: seq += 1 (odd) -> write body -> seq += 1 (even)
+  reader: s1 = seq; odd -> retry; copy body; s2 = seq; s1 != s2 -> retry
+A reader never blocks the writer and never sees a half-written body.
+
+The segment name is derived from the absolute status-file path, so the writer
+and readers of one install meet without configuration.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import time
+from pathlib import Path
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover - platforms without shared memory
+    resource_tracker = None
+    shared_memory = None
+
+logger = logging.getLogger("StatusShm")
+
+# Segments this process writes. The resource tracker keeps one registration per
+# name per process, so an in-process reader must leave it to the writer.
+_OWNED_SEGMENTS = set()
+
+MAGIC = b"RSTS"
+LAYOUT_VERSION = 1
+
+# (name, struct format). Strings are UTF-8, NUL padded and truncated to fit.
+STATUS_FIELDS = [
+    ("ts", "d"),
+    ("heartbeat", "Q"),
+    ("pid", "I"),
+    ("mode", "8s"),
+    ("status", "12s"),
+    ("state", "24s"),
+    ("symbol", "24s"),
+    ("position_qty", "d"),
+    ("avg_entry_price", "d"),
+    ("equity", "d"),
+    ("pnl_pct", "d"),
+    ("krw_balance", "d"),
+    ("available_for_bot", "d"),
+    ("regime", "16s"),
+    ("btc_price", "d"),
+    ("open_positions", "I"),
+    ("max_positions", "I"),
+    ("last_tick_ts", "d"),
+    ("last_error_ts", "d"),
+    ("last_error", "160s"),
+]
+
+_HEADER = struct.Struct("<4sHHQ")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_BODY = struct.Struct("<" + "".join(fmt for _, fmt in STATUS_FIELDS))
+SEGMENT_SIZE = _HEADER.size + _BODY.size
+
+
+def segment_name_for(status_path):
+    digest = hashlib.sha1(str(Path(status_path).resolve()).encode("utf-8")).hexdigest()[:12]
+    return f"at_status_{digest}"
+
+
+def _pack_value(fmt, value):
+    if fmt.endswith("s"):
+        size = int(fmt[:-1])
+        raw = str(value if value is not None else "").encode("utf-8")[:size]
+        return raw
+    if fmt == "d":
+        try:
+            return float(value) if value is not None else math.nan
+        except (TypeError, ValueError):
+            return math.nan
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _unpack_value(fmt, value):
+    if fmt.endswith("s"):
+        text = value.rstrip(b"\x00").decode("utf-8", errors="ignore")
+        return text or None
+    if fmt == "d":
+        return None if math.isnan(value) else value
+    return value
+
+
+class StatusChannel:
+    """Writer side. One per RunController process."""
+
+    def __init__(self, name):
+        self.name = name
+        self.writes = 0
+        self._shm = None
+        self._closed = False
+        if shared_memory is None:
+            raise OSError("multiprocessing.shared_memory unavailable")
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+        except FileExistsError:
+            # Left behind by a crashed writer: reuse it if the layout matches.
+            shm = shared_memory.SharedMemory(name=name)
+            if shm.size < SEGMENT_SIZE or bytes(shm.buf[:4]) != MAGIC:
+                shm.close()
+                shm.unlink()
+                shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+            self._shm = shm
+        _OWNED_SEGMENTS.add(self._shm._name)
+        _HEADER.pack_into(self._shm.buf, 0, MAGIC, LAYOUT_VERSION, _BODY.size, 0)
+        atexit.register(self.close)
+
+    def publish(self, status):
+        if self._closed:
+            return
+        buf = self._shm.buf
+        seq = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+        if seq % 2:
+            seq += 1  # a previous writer died mid-update
+        self.writes += 1
+        values = dict(status or {})
+        values["heartbeat"] = self.writes
+        body = _BODY.pack(*[_pack_value(fmt, values.get(name)) for name, fmt in STATUS_FIELDS])
+        _SEQ.pack_into(buf, _SEQ_OFFSET, seq + 1)
+        buf[_HEADER.size:SEGMENT_SIZE] = body
+        _SEQ.pack_into(buf, _SEQ_OFFSET, seq + 2)
+
+    def close(self, unlink=True):
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        try:
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+        except Exception as e:
+            logger.debug(f"[STATUS] shm close failed: {e}")
+        _OWNED_SEGMENTS.discard(self._shm._name)
+
+
+class StatusReader:
+    """Reader side. Attaches lazily and re-attaches when the segment goes stale."""
+
+    def __init__(self, name, reattach_after_sec=2.0, clock=time.time):
+        self.name = name
+        self.reattach_after_sec = float(reattach_after_sec)
+        self._clock = clock
+        self._shm = None
+        self._last_attach_try = 0.0
+        self.retries = 0
+
+    def _attach(self):
+        now = self._clock()
+        if now - self._last_attach_try < 1.0:
+            return self._shm is not None
+        self._last_attach_try = now
+        self._detach()
+        if shared_memory is None:
+            return False
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except (FileNotFoundError, OSError, ValueError):
+            return False
+        if os.name == "posix" and resource_tracker is not None and shm._name not in _OWNED_SEGMENTS:
+            # Readers in other processes must not unlink the writer's segment when they exit.
+            try:
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        if shm.size < SEGMENT_SIZE:
+            shm.close()
+            return False
+        self._shm = shm
+        return True
+
+    def _detach(self):
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except Exception:
+                pass
+            self._shm = None
+
+    def _read_once(self, max_spins):
+        buf = self._shm.buf
+        magic, version, size, _ = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or size != _BODY.size:
+            return None
+        for _ in range(max_spins):
+            s1 = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+            if s1 % 2:
+                self.retries += 1
+                continue
+            body = bytes(buf[_HEADER.size:SEGMENT_SIZE])
+            s2 = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+            if s1 != s2:
+                self.retries += 1
+                continue
+            if s1 == 0:
+                return None  # created, never published
+            raw = _BODY.unpack(body)
+            return {name: _unpack_value(fmt, v) for (name, fmt), v in zip(STATUS_FIELDS, raw)}
+        return None
+
+    def read(self, max_spins=1000):
+        """Latest consistent snapshot, or None when no writer has published."""
+        if self._shm is None and not self._attach():
+            return None
+        snap = self._read_once(max_spins)
+        stale = snap is None or (self._clock() - (snap.get("ts") or 0.0)) > self.reattach_after_sec
+        if stale and self._attach():
+            snap = self._read_once(max_spins) or snap
+        return snap
+
+    def close(self):
+        self._detach()
+
+
+_READERS = {}
+_JSON_CACHE = {}
+
+
+def read_runtime_status(status_path, json_recheck_sec=1.0):
+    """
+    Runtime status for dashboards: the JSON fallback (re-read only when its
+    mtime changes, checked at most every `json_recheck_sec`) with the fresher
+    shared-memory hot fields merged on top.
+    """
+    path = Path(status_path)
+    key = str(path)
+    now = time.time()
+    cached = _JSON_CACHE.get(key)
+    if cached is None or now - cached["checked"] >= json_recheck_sec:
+        try:
+            st = path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if cached is None or cached["stamp"] != stamp:
+            data = {}
+            if stamp is not None:
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except Exception:
+                    data = dict((cached or {}).get("data") or {})
+            cached = {"stamp": stamp, "data": data if isinstance(data, dict) else {}}
+        cached["checked"] = now
+        _JSON_CACHE[key] = cached
+    status = dict(cached["data"])
+
+    reader = _READERS.get(key)
+    if reader is None:
+        reader = _READERS[key] = StatusReader(segment_name_for(path))
+    try:
+        hot = reader.read()
+    except Exception as e:
+        logger.debug(f"[STATUS] shm read failed: {e}")
+        hot = None
+    if hot and (hot.get("ts") or 0.0) >= float(status.get("ts") or 0.0):
+        status.update(hot)
+        status["source"] = "shm"
+    elif status:
+        status["source"] = "json"
+    return status
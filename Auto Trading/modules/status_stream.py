@@ -0,0 +1,188 @@
+"""
+Server-Sent Events fan-out for backend status.
+
+heartbeat_loop already builds the status once per second; it publishes each
+payload to a StatusBroadcaster instead of every dashboard re-running
+build_status on its own poll. The broadcaster strips fields that change on
+every tick (heartbeat counters, ages), diffs the rest against the previous
+snapshot and queues one JSON merge patch (RFC 7386: changed keys, removed keys
+as null) per change to every subscriber.
+
+Each subscriber owns a bounded queue. A client that falls behind is not
+allowed to grow it: its pending patches are dropped and its next event is a
+full snapshot of the latest state ("drop to latest"). Idle streams get a
+heartbeat comment so proxies and clients can detect dead connections.
+
+next_event() blocks a thread. Async servers instead subscribe with `notify`, a
+callback run (from the publishing thread) whenever the client may have an event,
+and poll next_event(timeout=0) when woken.
+
+Wire format:
+  event: snapshot | patch
+  id: <publish sequence>
+  data: <json>
+"""
+import copy
+import json
+import threading
+import time
+from collections import deque
+
+# Paths (tuples of keys) that change on every publish and carry no state.
+VOLATILE_FIELDS = (
+    ("backend", "last_heartbeat"),
+    ("backend", "uptime_sec"),
+    ("runtime_age_sec",),
+    ("runtime", "ts"),
+    ("runtime", "heartbeat"),
+)
+
+_MISSING = object()
+
+
+def merge_patch(old, new):
+    """RFC 7386 patch turning `old` into `new` (None when equal)."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None if old == new else new
+    patch = {}
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    for key, value in new.items():
+        prev = old.get(key, _MISSING)
+        if prev is _MISSING:
+            patch[key] = value
+        elif isinstance(prev, dict) and isinstance(value, dict):
+            sub = merge_patch(prev, value)
+            if sub is not None:
+                patch[key] = sub
+        elif prev != value:
+            patch[key] = value
+    return patch or None
+
+
+def apply_merge_patch(target, patch):
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    out = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            out.pop(key, None)
+        else:
+            out[key] = apply_merge_patch(out.get(key), value)
+    return out
+
+
+def strip_volatile(snapshot, fields=VOLATILE_FIELDS):
+    for path in fields:
+        node = snapshot
+        for key in path[:-1]:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, dict):
+            node.pop(path[-1], None)
+    return snapshot
+
+
+class StreamClient:
+    def __init__(self, broadcaster, max_queue, notify=None):
+        self._broadcaster = broadcaster
+        self._events = deque()
+        self.max_queue = int(max_queue)
+        self.notify = notify
+        self.resync = True  # first event is always a snapshot
+        self.dropped = 0
+        self.closed = False
+
+    def _wake(self):
+        # Called with the broadcaster lock held; must not block (e.g. loop.call_soon_threadsafe).
+        if self.notify is not None:
+            try:
+                self.notify()
+            except Exception:
+                pass  # the waiting side is gone (closed event loop)
+
+    def _offer(self, event):
+        # Called with the broadcaster lock held.
+        if self.resync:
+            return
+        if len(self._events) >= self.max_queue:
+            self.dropped += len(self._events)
+            self._events.clear()
+            self.resync = True
+            return
+        self._events.append(event)
+
+    def next_event(self, timeout):
+        """(kind, seq, data) or None when nothing happened within `timeout` (send a heartbeat)."""
+        b = self._broadcaster
+        deadline = time.monotonic() + timeout
+        with b._cond:
+            while not self.closed:
+                if self.resync and b._snapshot is not None:
+                    self.resync = False
+                    self._events.clear()
+                    return ("snapshot", b._seq, b._snapshot)
+                if self._events:
+                    return self._events.popleft()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                b._cond.wait(remaining)
+        return None
+
+
+class StatusBroadcaster:
+    def __init__(self, max_queue=32, volatile_fields=VOLATILE_FIELDS):
+        self.max_queue = int(max_queue)
+        self.volatile_fields = tuple(volatile_fields)
+        self._cond = threading.Condition()
+        self._clients = set()
+        self._snapshot = None
+        self._seq = 0
+        self.published = 0
+        self.patches = 0
+
+    def publish(self, status):
+        """Publishes one status payload; returns the patch queued to clients (None if unchanged)."""
+        # JSON round trip: plain comparable values, and no aliasing with the caller's dicts.
+        snapshot = strip_volatile(json.loads(json.dumps(status, default=str)), self.volatile_fields)
+        with self._cond:
+            self.published += 1
+            prev = self._snapshot
+            self._snapshot = snapshot
+            if prev is None:
+                self._cond.notify_all()
+                for client in self._clients:
+                    client._wake()
+                return None
+            patch = merge_patch(prev, snapshot)
+            if patch is None:
+                return None
+            self._seq += 1
+            self.patches += 1
+            event = ("patch", self._seq, patch)
+            for client in self._clients:
+                client._offer(event)
+                client._wake()
+            self._cond.notify_all()
+            return patch
+
+    def subscribe(self, max_queue=None, notify=None):
+        client = StreamClient(self, max_queue or self.max_queue, notify=notify)
+        with self._cond:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._cond:
+            client.closed = True
+            self._clients.discard(client)
+            self._cond.notify_all()
+            client._wake()
+
+    def client_count(self):
+        with self._cond:
+            return len(self._clients)
+
+
+def format_sse(kind, seq, data):
+    return f"event: {kind}\nid: {seq}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
@@ -0,0 +1,162 @@
+"""
+File watcher for the status stream.
+
+StatusFileWatcher.wait() blocks until one of the watched files changed (or the
+timeout / wake() fires) and returns the changed paths. A change is a new
+(mtime_ns, size) stamp, so atomic replaces, in-place rewrites, creation and
+deletion all count, and a burst of writes to one file is reported once.
+
+On Linux the parent directories are watched with inotify (through libc, no
+extra dependency); directories are watched rather than files because the
+status writers replace files with os.replace. Paths whose directory cannot
+be watched, and every path on other platforms, fall back to stat polling
+every `poll_sec`.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger("StatusWatcher")
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+_EVENT = struct.Struct("iIII")
+
+
+def _stamp(path):
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class StatusFileWatcher:
+    def __init__(self, paths, poll_sec=0.25, use_inotify=True):
+        self.paths = [Path(p) for p in paths]
+        self.poll_sec = float(poll_sec)
+        self._stamps = {p: _stamp(p) for p in self.paths}
+        self._wake = threading.Event()
+        self._fd = None
+        self._wake_r = self._wake_w = None
+        self._by_wd = {}  # wd -> {file name: path}
+        self._polled = list(self.paths)
+        if use_inotify:
+            self._init_inotify()
+        self.mode = "inotify" if self._fd is not None else "poll"
+
+    def _init_inotify(self):
+        libc = _load_libc()
+        if libc is None:
+            return
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.info(f"inotify unavailable (errno {ctypes.get_errno()}); polling status files")
+            return
+        polled, by_dir = [], {}
+        for path in self.paths:
+            by_dir.setdefault(path.parent, []).append(path)
+        for directory, paths in by_dir.items():
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(directory)), WATCH_MASK)
+            if wd < 0:
+                polled.extend(paths)
+                continue
+            self._by_wd.setdefault(wd, {}).update({p.name: p for p in paths})
+        if not self._by_wd:
+            os.close(fd)
+            return
+        self._fd = fd
+        self._polled = polled
+        self._wake_r, self._wake_w = os.pipe()
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        hits, offset = set(), 0
+        while offset + _EVENT.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            path = self._by_wd.get(wd, {}).get(os.fsdecode(name))
+            if path is not None:
+                hits.add(path)
+        return hits
+
+    def _changed(self, paths):
+        changed = set()
+        for path in paths:
+            stamp = _stamp(path)
+            if stamp != self._stamps.get(path):
+                self._stamps[path] = stamp
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout):
+        """Changed paths; empty after `timeout` seconds or a wake() without changes."""
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        while True:
+            changed = self._changed(self._polled)
+            if changed:
+                return changed
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            step = min(remaining, self.poll_sec) if self._polled else remaining
+            if self._fd is None:
+                if self._wake.wait(step):
+                    self._wake.clear()
+                    return set()
+                continue
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [], step)
+            if self._wake_r in ready:
+                os.read(self._wake_r, 4096)
+                return self._changed(self._read_events()) if self._fd in ready else set()
+            if self._fd in ready:
+                changed = self._changed(self._read_events())
+                if changed:
+                    return changed
+
+    def wake(self):
+        """Makes a blocked wait() return early."""
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+        else:
+            self._wake.set()
+
+    def close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._fd = self._wake_r = self._wake_w = None
@@ -0,0 +1,99 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+from .utils_json import safe_json_dump, safe_json_load
+
+SESSION_SCHEMA_VERSION = 1
+
+
+class TuningCheckpoint:
+    """
+    Crash-safe session file for a candidate search.
+
+    Holds the sampler (RNG) state, every completed trial and the current best, written
+    atomically every `every_n_trials` trials. A session stays `running` until
+    complete() is called, so a killed worker can resume from the last checkpoint and
+    draw the remaining trials from the same RNG stream.
+
+    `owner` names the producer (e.g. "trainer", "labs"). Each producer keeps its own
+    file, and a session is only offered for resume to the owner that wrote it.
+    """
+
+    def __init__(self, path="results/labs/tuning_session.json", every_n_trials=1, owner=None):
+        self.path = Path(path)
+        self.every_n_trials = max(1, int(every_n_trials))
+        self.owner = owner
+        self._since_save = 0
+        self._started_at = None
+
+    def _read(self):
+        data = safe_json_load(self.path, default=None, schema_version=SESSION_SCHEMA_VERSION, repair=True)
+        return data if isinstance(data, dict) else None
+
+    def pending(self, fingerprint=None):
+        """
+        Incomplete session left behind by an interrupted run of this owner (or None).
+        With `fingerprint`, only a session of that exact search counts.
+        """
+        data = self._read()
+        if not data or data.get("status") != "running":
+            return None
+        if self.owner is not None and data.get("owner") != self.owner:
+            return None
+        if fingerprint is not None and data.get("fingerprint") != fingerprint:
+            return None
+        return data
+
+    def load(self, fingerprint):
+        data = self.pending(fingerprint)
+        if not data:
+            return None
+        self._started_at = data.get("started_at")
+        return data
+
+    def save(self, fingerprint, sampler_state, completed, best=None, final=False, trials=1):
+        """Records `trials` newly completed trials; writes once every_n_trials have accumulated."""
+        self._since_save += max(1, int(trials))
+        if not final and self._since_save < self.every_n_trials:
+            return False
+        now = datetime.now().isoformat()
+        self._started_at = self._started_at or now
+        payload = {
+            "status": "running",
+            "owner": self.owner,
+            "fingerprint": fingerprint,
+            "pid": os.getpid(),
+            "started_at": self._started_at,
+            "updated_at": now,
+            "trials_done": len(completed),
+            "sampler": sampler_state,
+            "completed": completed,
+            "best": best,
+        }
+        safe_json_dump(payload, self.path, indent=None, schema_version=SESSION_SCHEMA_VERSION)
+        self._since_save = 0
+        return True
+
+    def complete(self, leaderboard=None, run_id=None):
+        data = self._read() or {}
+        data.update(
+            {
+                "status": "complete",
+                "completed_at": datetime.now().isoformat(),
+                "run_id": run_id,
+            }
+        )
+        if leaderboard is not None:
+            data["leaderboard"] = leaderboard
+        # Trial payloads are only needed while resumable.
+        data.pop("sampler", None)
+        data.pop("completed", None)
+        safe_json_dump(data, self.path, indent=None, schema_version=SESSION_SCHEMA_VERSION)
+        self._started_at = None
+
+    def clear(self):
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception:
+            pass
@@ -3,7 +3,10 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from .oos_tuner import run_tuning_cycle
+from .evaluation_service import EvaluationService
+from .oos_tuner import cycle_fingerprint, run_tuning_cycle
+from .single_instance_lock import SingleInstanceLock
+from .tuning_checkpoint import TuningCheckpoint
 from .utils_json import safe_json_dump
 
 
@@ -14,11 +17,16 @@ class TuningWorker:
         lock_path="results/locks/trainer.lock",
         cooldown_minutes_on_boot=15,
         cadence_days=7,
+        session_path=None,
+        checkpoint_every_n_trials=1,
     ):
         self.state_path = Path(state_path)
         self.lock_path = Path(lock_path)
         self.cooldown_minutes_on_boot = int(cooldown_minutes_on_boot)
         self.cadence_days = int(cadence_days)
+        if session_path is None:
+            session_path = self.state_path.with_name("trainer_session.json")
+        self.checkpoint = TuningCheckpoint(session_path, every_n_trials=checkpoint_every_n_trials, owner="trainer")
 
     def _load_state(self):
         if not self.state_path.exists():
@@ -42,7 +50,7 @@ class TuningWorker:
     def _save_state(self, state):
         safe_json_dump(state, self.state_path)
 
-    def _acquire_lock(self):
+    def _acquire_lock(self, _retry=True):
         self.lock_path.parent.mkdir(parents=True, exist_ok=True)
         try:
             fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
@@ -50,8 +58,19 @@ class TuningWorker:
             os.close(fd)
             return True
         except FileExistsError:
+            # A killed worker leaves its lock behind; reclaim it once if the owner is gone.
+            if _retry and self._lock_is_stale():
+                self._release_lock()
+                return self._acquire_lock(_retry=False)
             return False
 
+    def _lock_is_stale(self):
+        try:
+            pid = int(self.lock_path.read_text(encoding="utf-8").strip() or 0)
+        except Exception:
+            return False
+        return not SingleInstanceLock._pid_alive(pid)
+
     def _release_lock(self):
         try:
             self.lock_path.unlink(missing_ok=True)
@@ -71,9 +90,11 @@ class TuningWorker:
     def _next_due(self, now):
         return now + timedelta(days=self.cadence_days)
 
-    def run_if_due(self, run_fn, sleep_fn=time.sleep):
+    def run_if_due(self, run_fn, sleep_fn=time.sleep, resume_fingerprint=None):
         """
         run_fn: callable with no args, should return dict containing optional active_model_id.
+        resume_fingerprint: search fingerprint run_fn would start; an interrupted session
+        only overrides the schedule when it belongs to that search.
         """
         if not self._acquire_lock():
             return {"ok": False, "skipped": "locked"}
@@ -82,7 +103,9 @@ class TuningWorker:
             now = datetime.now()
             state = self._load_state()
             due = self._parse_dt(state.get("next_due_at"))
-            if due is not None and now < due:
+            # An interrupted session of the same search is resumed regardless of schedule.
+            pending = self.checkpoint.pending(resume_fingerprint)
+            if due is not None and now < due and pending is None:
                 return {"ok": True, "skipped": "not_due", "next_due_at": due.isoformat()}
 
             cooldown_sec = max(0, int(self.cooldown_minutes_on_boot) * 60)
@@ -100,11 +123,23 @@ class TuningWorker:
                 state["active_model_id"] = result.get("active_model_id")
             self._save_state(state)
 
-            return {"ok": True, "result": result, "state": state}
+            return {"ok": True, "result": result, "state": state, "resumed": pending is not None}
         finally:
             self._release_lock()
 
 
+def _optional_float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _optional_int(value):
+    if value is None or value == "":
+        return None
+    return max(1, int(value))
+
+
 def run_weekly_tuning_once(
     worker: TuningWorker,
     raw_dfs,
@@ -124,13 +159,31 @@ def run_weekly_tuning_once(
             train_days=int(settings.get("tuning_train_days", 180)),
             oos_days=int(settings.get("tuning_oos_days", 28)),
             embargo_days=int(settings.get("tuning_embargo_days", 2)),
+            auto_embargo=bool(settings.get("tuning_auto_embargo", False)),
             n_trials=int(settings.get("tuning_trials", 30)),
             oos_min_trades=int(settings.get("tuning_oos_min_trades", 20)),
             mdd_cap=float(settings.get("tuning_mdd_cap", -0.15)),
             delta_min=float(settings.get("tuning_delta_min", 0.01)),
             promotion_cooldown_hours=int(settings.get("tuning_promotion_cooldown_hours", 24)),
+            dsr_min=_optional_float(settings.get("tuning_dsr_min")),
+            pbo_max=_optional_float(settings.get("tuning_pbo_max")),
+            plateau_min=_optional_float(settings.get("tuning_plateau_min")),
+            stability_workers=_optional_int(settings.get("tuning_stability_workers")),
+            checkpoint=worker.checkpoint,
+            evaluator=EvaluationService(n_workers=int(settings.get("tuning_eval_workers", 1) or 1)),
         )
         cycle["active_model_id"] = model_manager.active_model_id()
         return cycle
 
-    return worker.run_if_due(_runner)
+    fingerprint = cycle_fingerprint(
+        raw_dfs,
+        base_params,
+        universe=universe,
+        train_days=int(settings.get("tuning_train_days", 180)),
+        oos_days=int(settings.get("tuning_oos_days", 28)),
+        embargo_days=int(settings.get("tuning_embargo_days", 2)),
+        auto_embargo=bool(settings.get("tuning_auto_embargo", False)),
+        n_trials=int(settings.get("tuning_trials", 30)),
+        global_seed=int(settings.get("tuning_seed", 42)),
+    )
+    return worker.run_if_due(_runner, resume_fingerprint=fingerprint)
@@ -0,0 +1,29 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from modules.model_registry import ModelRegistry
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild models/registry.sqlite3 from the model directories.")
+    parser.add_argument("--models-dir", default=str(ROOT_DIR / "models"))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    registry = ModelRegistry(base_dir=args.models_dir)
+    total = registry.rebuild()
+    print(json.dumps({
+        "ok": True,
+        "db": str(registry.db_path),
+        "runs": total,
+        "by_bucket": {b: registry.count(b) for b in ("active", "staging", "archive")},
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
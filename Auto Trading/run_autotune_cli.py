@@ -41,6 +41,7 @@ def main():
     parser.add_argument("--trials", type=int, default=20, help="Number of trials")
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--output", type=str, default="autotune_runs", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Fold worker processes (default: auto, 1 = sequential)")
     
     args = parser.parse_args()
     
@@ -128,6 +129,7 @@ def main():
     print(f"   Group: {args.group}")
     print(f"   Trials: {args.trials}")
     print(f"   Seed: {args.seed}")
+    print(f"   Workers: {args.workers or 'auto'}")
     print(f"   Output: {args.output}\n")
     
     try:
@@ -154,7 +156,7 @@ def main():
                 last_p = current_pct
             pbar.set_postfix_str(msg)
             
-        run_dir = tuner.run_process(args.group, num_trials=args.trials, seed=args.seed, callback=progress_handler)
+        run_dir = tuner.run_process(args.group, num_trials=args.trials, seed=args.seed, callback=progress_handler, n_workers=args.workers)
         
         pbar.update(100 - last_p)
         pbar.close()
@@ -47,7 +47,13 @@ class Strategy:
         rs = gain / (loss + 1e-9) # Add a small epsilon to prevent division by zero
         return 100 - (100 / (1 + rs))
 
-    def analyze(self, df, btc_df=None, params=None):
+    def analyze(self, df, btc_df=None, params=None, anti_chase_seed=None, anti_chase_start=0, anti_chase_checkpoint=None):
+        """
+        Incremental callers (watchlist) pass a bar tail: rows before
+        `anti_chase_start` only warm up the rolling indicators, the anti-chase
+        state machine resumes there from `anti_chase_seed`, and the state before
+        row `anti_chase_checkpoint` is returned in df.attrs["anti_chase_checkpoint"].
+        """
         if df.empty: return df
         if params is None: params = {}
         
@@ -191,12 +197,16 @@ class Strategy:
         vol_ma_s = pd.to_numeric(df['vol_ma20'], errors='coerce').to_numpy()
         ts_s = pd.to_datetime(df['datetime'], errors='coerce')
 
-        state = "NORMAL"
-        peak_price = np.nan
-        cooling_start_idx = -1
-        rearmed_expires_at = None
+        seed = anti_chase_seed or {}
+        state = seed.get("state", "NORMAL")
+        peak_price = seed.get("peak_price", np.nan)
+        cooling_start_idx = seed.get("cooling_start_idx", -1)
+        rearmed_expires_at = seed.get("rearmed_expires_at")
+        checkpoint = None
 
-        for i in range(n):
+        for i in range(max(0, int(anti_chase_start)), n):
+            if i == anti_chase_checkpoint:
+                checkpoint = {"state": state, "peak_price": peak_price, "cooling_start_idx": cooling_start_idx, "rearmed_expires_at": rearmed_expires_at}
             cp = close_s[i]
             hp = high_s[i]
             gp = gap_s[i]
@@ -291,6 +301,11 @@ class Strategy:
             pump_state[i] = state
             penalty_factor[i] = state_penalty.get(state, 1.0)
 
+        if anti_chase_checkpoint is not None:
+            if checkpoint is None:
+                checkpoint = {"state": state, "peak_price": peak_price, "cooling_start_idx": cooling_start_idx, "rearmed_expires_at": rearmed_expires_at}
+            df.attrs["anti_chase_checkpoint"] = checkpoint
+
         df['pump_state'] = pump_state
         df['penalty_factor'] = penalty_factor
         df['anti_chase_block'] = anti_chase_block
@@ -0,0 +1,170 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import unittest
+from dataclasses import MISSING, fields, is_dataclass
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules import api_contract
+from modules.api_contract import FASTAPI, WEB, ContractError, check_response, parse_request, shape
+
+try:
+    import uvicorn
+except ImportError:  # fastapi backend cannot be served
+    uvicorn = None
+
+
+def _bad_body(schema):
+    """A body that violates `schema`: a missing required field, else a wrongly typed one."""
+    for f in fields(schema):
+        if f.default is MISSING and f.default_factory is MISSING:
+            return {}, f.name
+    for f in fields(schema):
+        if f.type in (int, float, bool):
+            return {f.name: "not-a-number" if f.type is not bool else "maybe"}, f.name
+    return None, None
+
+
+class TestContractParsing(unittest.TestCase):
+    def test_request_coercion_and_errors(self):
+        req = parse_request(api_contract.ManualRoundtripRequest, {"hold_seconds": "12", "krw_notional": 6000, "extra": 1})
+        self.assertEqual((req.hold_seconds, req.krw_notional, req.symbol), (12, 6000.0, "KRW-XRP"))
+        self.assertTrue(parse_request(api_contract.CancelOrdersRequest, {"all": "true"}).all)
+        self.assertEqual(parse_request(api_contract.CancelOrdersRequest, {"order_id": 123}).order_id, "123")
+
+        with self.assertRaises(ContractError) as ctx:
+            parse_request(api_contract.ManualRoundtripRequest, {"hold_seconds": 1.5})
+        self.assertEqual(ctx.exception.field, "hold_seconds")
+        with self.assertRaises(ContractError):
+            parse_request(api_contract.JobCancelRequest, {})
+        with self.assertRaises(ContractError):
+            api_contract.parse_body(api_contract.ROUTES[("POST", "/api/panic")], b"{not json")
+
+    def test_response_checks(self):
+        ok = {"ok": True, "message": "m", "manual_roundtrip": {}, "extra": 1}
+        self.assertEqual(check_response(api_contract.RoundtripResponse, ok), [])
+        self.assertEqual(
+            check_response(api_contract.RoundtripResponse, {"ok": "yes", "message": "m"}),
+            ["ok: expected bool, got str", "manual_roundtrip: missing"],
+        )
+        self.assertEqual(shape(api_contract.TimingsResponse, {"ts": 1, "sections": {}}), {"ts": "number", "sections": "dict"})
+
+
+class _Servers:
+    """web_backend's stdlib server and fastapi_backend's app, each on an ephemeral local port."""
+
+    def __init__(self):
+        cwd = os.getcwd()
+        try:
+            import web_backend  # both backends chdir to the project root on import
+            import fastapi_backend
+        finally:
+            os.chdir(cwd)
+        self.wb, self.fb = web_backend, fastapi_backend
+        web_backend.Handler.service = web_backend.BotService()
+        web_backend.Handler.state = web_backend.BackendState()
+        self.web = ThreadingHTTPServer(("127.0.0.1", 0), web_backend.Handler)
+        threading.Thread(target=self.web.serve_forever, daemon=True).start()
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.api_port = sock.getsockname()[1]
+        config = uvicorn.Config(fastapi_backend.app, log_level="warning", log_config=None, lifespan="off")
+        self.api = uvicorn.Server(config)
+        self._api_thread = threading.Thread(target=self.api.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._api_thread.start()
+        deadline = time.time() + 10
+        while not self.api.started and time.time() < deadline:
+            time.sleep(0.02)
+        self.ports = {WEB: self.web.server_address[1], FASTAPI: self.api_port}
+
+    def close(self):
+        self.web.shutdown()
+        self.web.server_close()
+        self.api.should_exit = True
+        self._api_thread.join(timeout=5)
+
+    def call(self, server, method, path, body=None, raw=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.ports[server], timeout=10)
+        try:
+            payload = raw if raw is not None else (json.dumps(body).encode() if body is not None else None)
+            headers = {"Content-Type": "application/json"} if payload is not None else {}
+            conn.request(method, path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+            return resp.status, json.loads(data), resp.getheader("X-API-Version")
+        finally:
+            conn.close()
+
+
+@unittest.skipIf(uvicorn is None, "uvicorn not installed")
+class TestApiContract(unittest.TestCase):
+    """Generated below: one probe test per route with a `probe`, one bad-body test per typed request."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = _Servers()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servers.close()
+
+    def _check_probe(self, route):
+        answers = {}
+        for server in route.servers:
+            body = route.probe if route.method == "POST" else None
+            status, payload, version = self.servers.call(server, route.method, route.path, body=body)
+            self.assertEqual(version, api_contract.API_VERSION, server)
+            if status < 400:
+                self.assertEqual(check_response(route.response, payload), [], f"{server} {route.path}: {payload}")
+            else:
+                self.assertTrue("error" in payload or "message" in payload, f"{server} {route.path}: {payload}")
+            answers[server] = (status, shape(route.response, payload))
+        if len(answers) > 1:
+            self.assertEqual(answers[WEB], answers[FASTAPI])
+
+    def _check_bad_body(self, route, body, field_name):
+        answers = {}
+        for server in route.servers:
+            status, payload, _ = self.servers.call(server, route.method, route.path, body=body)
+            self.assertEqual(status, 400, f"{server}: {payload}")
+            self.assertEqual(payload["field"], field_name)
+            answers[server] = payload
+            status, payload, _ = self.servers.call(server, route.method, route.path, raw=b"{oops")
+            self.assertEqual((status, payload["error"]), (400, "invalid JSON body"))
+        self.assertEqual(len({json.dumps(a, sort_keys=True) for a in answers.values()}), 1)
+
+    def test_unknown_route_is_404_on_web(self):
+        status, payload, _ = self.servers.call(WEB, "GET", "/api/nope")
+        self.assertEqual((status, payload), (404, {"error": "Not found"}))
+        status, _, _ = self.servers.call(WEB, "GET", "/api/v1/status?x=1")
+        self.assertEqual(status, 200)
+
+
+def _generate():
+    for route in api_contract.ROUTES.values():
+        slug = route.name
+        if route.probe is not None:
+            setattr(TestApiContract, f"test_probe_{slug}", lambda self, r=route: self._check_probe(r))
+        if is_dataclass(route.request):
+            body, field_name = _bad_body(route.request)
+            if body is not None:
+                setattr(
+                    TestApiContract,
+                    f"test_bad_body_{slug}",
+                    lambda self, r=route, b=body, f=field_name: self._check_bad_body(r, b, f),
+                )
+
+
+_generate()
+
+
+if __name__ == "__main__":
+    unittest.main()
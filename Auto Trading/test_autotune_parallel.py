@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import autotune
+from autotune import AutoTuner, DISQUALIFIED_SCORE
+
+
+def _make_df(days=200, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp("2026-02-01"), periods=days, freq="D")
+    close = 10000 + np.cumsum(rng.normal(0, 120, size=days))
+    open_ = close * (1 + rng.normal(0, 0.002, size=days))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.01, 0.005, size=days)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.01, 0.005, size=days)))
+    vol = np.abs(rng.normal(1000, 400, size=days)) * 1e4
+    return pd.DataFrame(
+        {"datetime": dates, "open": open_, "high": high, "low": low, "close": close, "volume": vol}
+    )
+
+
+def _read_leaderboard(run_dir):
+    df = pd.read_csv(os.path.join(run_dir, "leaderboard.csv"))
+    return df.sort_values("trial_id")[["trial_id", "score", "total_return", "trades"]].reset_index(drop=True)
+
+
+class TestAutoTuneParallel(unittest.TestCase):
+    def setUp(self):
+        self.raw = {
+            "KRW-AAA": _make_df(seed=3),
+            "KRW-BBB": _make_df(seed=5),
+            "USDT_KRW": _make_df(seed=9),
+        }
+        self.base_params = {"min_turnover_krw": 0, "universe_top_n": 0}
+
+    def test_parallel_matches_sequential(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            seq = AutoTuner(self.raw, self.base_params, output_dir=os.path.join(tmp, "seq"))
+            par = AutoTuner(self.raw, self.base_params, output_dir=os.path.join(tmp, "par"))
+            # Relax min-trades so folds produce real (non-disqualified) scores to compare.
+            seq.calculate_min_trades = par.calculate_min_trades = lambda start, end: 0
+            progress = []
+            seq_dir = seq.run_process("A", num_trials=3, seed=7, n_workers=1)
+            par_dir = par.run_process("A", num_trials=3, seed=7, n_workers=2, callback=lambda p, m: progress.append(p))
+
+            pd.testing.assert_frame_equal(_read_leaderboard(seq_dir), _read_leaderboard(par_dir))
+            self.assertAlmostEqual(progress[-1], 1.0)
+
+            # Output layout unchanged
+            for name in ["run_config.json", "leaderboard.csv", "best_params.json", "next_params.csv"]:
+                self.assertTrue(os.path.exists(os.path.join(par_dir, name)), name)
+            for t_idx in range(3):
+                trial_dir = Path(par_dir) / f"trial_{t_idx:04d}"
+                self.assertTrue((trial_dir / "final_trades.csv").exists())
+                self.assertTrue((trial_dir / "events.csv").exists())
+
+            cfg = json.loads(Path(par_dir, "run_config.json").read_text())
+            self.assertEqual(cfg["n_workers"], 2)
+
+    def test_early_abort_disqualifies_trial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tuner = AutoTuner(self.raw, self.base_params, output_dir=tmp)
+            # Folds of ~50 days need >= 10 trades; synthetic data cannot meet that.
+            tuner.calculate_min_trades = lambda start, end: 10_000
+            run_dir = tuner.run_process("A", num_trials=2, seed=1, n_workers=2)
+            board = pd.read_csv(os.path.join(run_dir, "leaderboard.csv"))
+            self.assertTrue((board["score"] == DISQUALIFIED_SCORE).all())
+            self.assertTrue(board["diagnosis"].str.contains("FoldConstraintFail").all())
+
+    def test_one_task_and_one_analyze_pass_per_trial(self):
+        submitted = []
+
+        class _CountingPool(autotune.ProcessPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(fn.__name__)
+                return super().submit(fn, *args, **kwargs)
+
+        analyze = autotune._analyze_panel
+        calls = []
+        with tempfile.TemporaryDirectory() as tmp:
+            par = AutoTuner(self.raw, self.base_params, output_dir=os.path.join(tmp, "par"))
+            with patch.object(autotune, "ProcessPoolExecutor", _CountingPool):
+                par.run_process("A", num_trials=3, seed=7, n_workers=2)
+            self.assertEqual(submitted, ["_run_trial_task"] * 3)
+
+            seq = AutoTuner(self.raw, self.base_params, output_dir=os.path.join(tmp, "seq"))
+            with patch.object(autotune, "_analyze_panel", side_effect=lambda *a: calls.append(1) or analyze(*a)):
+                seq.run_process("A", num_trials=3, seed=7, n_workers=1)
+            self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
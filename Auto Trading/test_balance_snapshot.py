@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.balance_snapshot import BalanceSnapshotCache
+from modules.capital_ledger import CapitalLedger
+from modules.run_controller import RunController
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestBalanceSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+
+        self.adapter = MagicMock()
+        self.adapter.get_balances.return_value = {"KRW": 100000.0, "XRP": 0.0}
+        ledger = MagicMock(spec=CapitalLedger)
+        ledger.get_state.return_value = {"baseline_seed": 100000, "equity": 100000, "roi_pct": 0.0}
+        watch = MagicMock()
+        watch.current_regime = "NEUTRAL"
+        watch.last_btc_price = 0.0
+        watch.watchlist = []
+        self.controller = RunController(self.adapter, ledger, watch, MagicMock(), mode="PAPER")
+        self.controller.status_json_interval_sec = 0.0  # assertions read the JSON snapshot
+        self.clock = _Clock()
+        self.controller.balance_cache._clock = self.clock
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _loop(self, seconds):
+        for _ in range(seconds):
+            self.controller.check_risk_limits()
+            self.controller._write_runtime_status()
+            self.clock.t += 1.0
+
+    def test_flat_budget_cuts_rest_calls(self):
+        self._loop(30)
+        # Uncached: 2 fetches per 1s tick (risk baseline + status) = 60.
+        self.assertEqual(self.adapter.get_balances.call_count, 3)
+        stats = self.controller.balance_cache.stats()
+        self.assertEqual(stats["fetch_calls"], 3)
+        self.assertEqual(stats["cache_hits"], 57)
+
+        status = json.loads(Path("results/runtime_status.json").read_text())
+        snap = status["balance_snapshot"]
+        self.assertEqual(snap["budget_sec"], 10.0)
+        self.assertEqual(snap["fetch_calls"], 3)
+        self.assertLess(snap["age_sec"], 10.0)
+
+    def test_in_position_budget_and_fill_invalidation(self):
+        c = self.controller
+        c.runtime_state["state"] = c.STATE_IN_POSITION
+        self._loop(10)
+        self.assertEqual(self.adapter.get_balances.call_count, 5)
+
+        # Entering and leaving EXIT_PENDING (a fill) forces the next read to refetch.
+        c._get_balance_map()
+        before = self.adapter.get_balances.call_count
+        self.assertTrue(c._transition_state(c.STATE_EXIT_PENDING, reason="test"))
+        c._get_balance_map()  # pending: always fresh
+        self.assertTrue(c._transition_state(c.STATE_FLAT, reason="exit_filled:test"))
+        c._get_balance_map()
+        self.assertEqual(self.adapter.get_balances.call_count, before + 2)
+        self.assertEqual(c.balance_cache.invalidations, 1)
+
+    def test_failed_reads_are_not_cached(self):
+        calls = []
+
+        def _fetch():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("429")
+            return {"KRW": 1.0}
+
+        cache = BalanceSnapshotCache(_fetch, clock=self.clock)
+        self.assertEqual(cache.get(10.0), {})
+        self.assertIsNone(cache.age_sec())
+        self.assertEqual(cache.get(10.0), {"KRW": 1.0})
+        self.assertEqual(cache.get(10.0), {"KRW": 1.0})
+        self.assertEqual((cache.fetch_calls, cache.fetch_errors, cache.cache_hits), (2, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
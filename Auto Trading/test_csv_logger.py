@@ -0,0 +1,128 @@
+import csv
+import gzip
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.logger_utils import BufferedCsvLogger
+
+HEADERS = ["timestamp", "symbol", "qty"]
+T0 = 1_700_000_000.0
+
+
+class _Clock:
+    def __init__(self, t=T0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestBufferedCsvLogger(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.path = self.dir / "events.csv"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _logger(self, **kw):
+        kw.setdefault("flush_interval_sec", 60.0)
+        log = BufferedCsvLogger(str(self.path), HEADERS, **kw)
+        self.addCleanup(log.close)
+        return log
+
+    def test_burst_is_queued_then_flushed_on_close(self):
+        log = self._logger(flush_rows=1000)
+        for i in range(200):
+            log.log({"timestamp": i, "symbol": "KRW-XRP", "qty": i})
+        # Nothing but the header has hit the disk yet.
+        self.assertEqual(_rows(self.path), [])
+        log.close()
+        rows = _rows(self.path)
+        self.assertEqual(len(rows), 200)
+        self.assertEqual(rows[-1]["qty"], "199")
+        self.assertEqual(log.batches_written, 1)
+
+    def test_background_flush_on_batch_size(self):
+        log = self._logger(flush_rows=10)
+        for i in range(10):
+            log.log({"timestamp": i, "symbol": "A", "qty": i})
+        deadline = time.time() + 2.0
+        while log.rows_written < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(_rows(self.path)), 10)
+        self.assertEqual(log.inline_flushes, 0)
+
+    def test_full_queue_flushes_inline(self):
+        log = self._logger(flush_rows=5, max_queue=5)
+        log._closed = True  # park the flusher so only backpressure can write
+        log._wake.set()
+        log._thread.join(timeout=2.0)
+        log._closed = False
+        for i in range(5):
+            log.log({"timestamp": i, "symbol": "A", "qty": i})
+        self.assertEqual(log.inline_flushes, 1)
+        self.assertEqual(len(_rows(self.path)), 5)
+
+    def test_size_rotation_gzips_old_file(self):
+        log = self._logger(flush_rows=1, rotate_bytes=200)
+        for i in range(20):
+            log.log({"timestamp": i, "symbol": "KRW-XRP", "qty": "x" * 20})
+            log.flush()
+        log.close()
+        archives = sorted(self.dir.glob("events.*.csv.gz"))
+        self.assertEqual(len(archives), log.rotations)
+        self.assertGreater(log.rotations, 0)
+        total = len(_rows(self.path))
+        for arc in archives:
+            with gzip.open(arc, "rt", newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.assertTrue(rows)
+            total += len(rows)
+        self.assertEqual(total, 20)
+        self.assertLessEqual(self.path.stat().st_size, 200)
+
+    def test_daily_rotation(self):
+        clock = _Clock()
+        log = self._logger(rotate_daily=True, compress=False, clock=clock)
+        log.log({"timestamp": 1, "symbol": "A", "qty": 1})
+        log.flush()
+        clock.t += 86400
+        log.log({"timestamp": 2, "symbol": "A", "qty": 2})
+        log.flush()
+        archives = list(self.dir.glob("events.*.csv"))
+        self.assertEqual(len(archives), 1)
+        self.assertEqual([r["qty"] for r in _rows(archives[0])], ["1"])
+        self.assertEqual([r["qty"] for r in _rows(self.path)], ["2"])
+
+    def test_schema_change_rotates_aside(self):
+        self.path.write_text("timestamp,symbol\n1,A\n", encoding="utf-8")
+        log = self._logger(compress=False)
+        log.log({"timestamp": 2, "symbol": "B", "qty": 3})
+        log.close()
+        old = list(self.dir.glob("events.*.schema.csv"))
+        self.assertEqual(len(old), 1)
+        self.assertEqual(old[0].read_text(encoding="utf-8"), "timestamp,symbol\n1,A\n")
+        self.assertEqual(_rows(self.path), [{"timestamp": "2", "symbol": "B", "qty": "3"}])
+
+    def test_torn_tail_is_repaired_on_open(self):
+        self.path.write_text("timestamp,symbol,qty\r\n1,A,1\r\n2,A,", encoding="utf-8")
+        log = self._logger()
+        log.log({"timestamp": 3, "symbol": "A", "qty": 3})
+        log.close()
+        self.assertEqual([r["qty"] for r in _rows(self.path)], ["1", "3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
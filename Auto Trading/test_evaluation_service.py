@@ -0,0 +1,99 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules import oos_tuner
+from modules.evaluation_service import EvaluationService
+from modules.oos_tuner import build_split_windows, evaluate_params, find_best_candidate, latest_data_timestamp
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SYMBOLS = ("UPBIT_KRW-BTC", "UPBIT_KRW-ETH", "UPBIT_KRW-XRP")
+
+BASE_PARAMS = {
+    "enable_strategy_A": True,
+    "enable_strategy_B": True,
+    "trigger_vol_A": 2.0,
+    "breakout_days_A": 7,
+    "close_confirm_pct_A": 0.005,
+    "rsi_ceiling_A": 75,
+    "entry_delay_bars_A": 1,
+    "trend_ma_fast_B": 20,
+    "trend_ma_slow_B": 60,
+    "rsi_entry_B": 45,
+    "allocation_A_pct": 60,
+    "allocation_B_pct": 40,
+    "max_entries_per_day": 2,
+    "max_open_positions": 3,
+    "cooldown_days_after_sl": 5,
+    "daily_loss_limit_pct": 2.0,
+    "min_turnover_krw": 1_000_000,
+    "universe_top_n": 0,
+    "sl_atr_mult_A": 1.8,
+    "trail_atr_mult_A": 2.5,
+    "partial_tp_r_A": 1.2,
+    "time_stop_days_A": 3,
+    "sl_atr_mult_B": 1.4,
+    "partial_tp_r_B": 1.0,
+    "max_hold_days_B": 5,
+}
+
+
+@unittest.skipUnless(all((DATA_DIR / f"{s}.parquet").exists() for s in SYMBOLS), "bundled data missing")
+class TestEvaluationServiceParity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.raw = {s: pd.read_parquet(DATA_DIR / f"{s}.parquet") for s in SYMBOLS}
+        cls.w = build_split_windows(latest_data_timestamp(cls.raw), train_days=180, oos_days=28, embargo_days=2)
+
+    def test_matches_evaluate_params_and_caches(self):
+        svc = EvaluationService()
+        w = self.w
+        stop_variant = {**BASE_PARAMS, "sl_atr_mult_A": 2.2}  # execution-only: shares the analyzed panel
+        expected = []
+        for params in (BASE_PARAMS, stop_variant):
+            want, want_res = evaluate_params(self.raw, params, w["train_start"], w["train_end"], include_cost_stress=True)
+            got, got_res = svc.evaluate(self.raw, params, w["train_start"], w["train_end"], include_cost_stress=True)
+            self.assertEqual(got, want)
+            self.assertEqual(got_res["trade_list"], want_res["trade_list"])
+            self.assertGreater(got["trades"], 0)
+            expected.append(want)
+        self.assertEqual(svc.stats["panels"], 1)
+
+        with patch.object(oos_tuner, "evaluate_params", side_effect=AssertionError("re-evaluated")):
+            again, _ = svc.evaluate(self.raw, BASE_PARAMS, w["train_start"], w["train_end"], include_cost_stress=True)
+        self.assertEqual(again, expected[0])
+        again["score"] = 99.0  # callers get copies
+        cached, _ = svc.evaluate(self.raw, BASE_PARAMS, w["train_start"], w["train_end"], include_cost_stress=True)
+        self.assertNotEqual(cached["score"], 99.0)
+        self.assertEqual(svc.stats["hits"], 2)
+
+        # Different data is a different cache entry.
+        trimmed = {s: df.iloc[:-5] for s, df in self.raw.items()}
+        svc.evaluate(trimmed, BASE_PARAMS, w["train_start"], w["train_end"], include_cost_stress=True)
+        self.assertEqual(svc.stats["misses"], 3)
+
+    def test_search_parity_sequential_and_parallel(self):
+        w = self.w
+        ref_best, ref_ranked = find_best_candidate(self.raw, BASE_PARAMS, w["train_start"], w["train_end"], n_trials=4, seed=42)
+        for workers in (1, 2):
+            best, ranked = find_best_candidate(
+                self.raw,
+                BASE_PARAMS,
+                w["train_start"],
+                w["train_end"],
+                n_trials=4,
+                seed=42,
+                evaluator=EvaluationService(n_workers=workers),
+            )
+            self.assertEqual(best["params"], ref_best["params"])
+            self.assertEqual([r["metrics"] for r in ranked], [r["metrics"] for r in ref_ranked])
+            self.assertEqual([r["window_returns"] for r in ranked], [r["window_returns"] for r in ref_ranked])
+
+
+if __name__ == "__main__":
+    unittest.main()
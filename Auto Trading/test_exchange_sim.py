@@ -0,0 +1,196 @@
+import math
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.capital_ledger import CapitalLedger
+from modules.exchange_sim import (
+    ExchangeSimulator,
+    SimInsufficientFunds,
+    SimOrderRejected,
+    run_sim_session,
+)
+from modules.order_tracker import OrderTracker
+from modules.run_controller import RunController
+
+T0 = 1_700_006_400.0  # bar-aligned
+
+
+def _bars(n=1440, bar_sec=60, base=1000.0):
+    rows = []
+    for i in range(n):
+        o = base * (1.0 + 0.02 * math.sin(i / 60.0))
+        c = base * (1.0 + 0.02 * math.sin((i + 1) / 60.0))
+        rows.append({"timestamp": int((T0 + i * bar_sec) * 1000), "open": o, "high": max(o, c) * 1.001, "low": min(o, c) * 0.999, "close": c, "volume": 500.0})
+    return pd.DataFrame(rows)
+
+
+def _flat_bars(n=10, price=1000.0):
+    return pd.DataFrame(
+        [{"timestamp": int((T0 + i * 60) * 1000), "open": price, "high": price, "low": price, "close": price, "volume": 100.0} for i in range(n)]
+    )
+
+
+class TestExchangeSimulator(unittest.TestCase):
+    def test_price_path_and_ohlcv(self):
+        sim = ExchangeSimulator({"KRW-XRP": _bars(n=3)})
+        self.assertEqual(sim.clock(), T0)
+        bar = sim.paths["XRP/KRW"]
+        self.assertAlmostEqual(sim.mid("XRP/KRW"), bar.open[0])
+        sim.clock.advance_to(T0 + 60)
+        self.assertAlmostEqual(sim.mid("XRP/KRW"), bar.close[0])
+        candles = sim.fetch_ohlcv("KRW-XRP", timeframe="1m")
+        self.assertEqual(len(candles), 2)  # one closed bar + the forming bar
+        self.assertEqual(candles[0][4], bar.close[0])
+        self.assertEqual(len(sim.fetch_ohlcv("KRW-XRP", timeframe="1d")), 1)
+
+    def test_partial_fills_rest_then_cancel_releases_funds(self):
+        sim = ExchangeSimulator({"XRP/KRW": _flat_bars()}, balances={"KRW": 1_000_000.0}, fill_ratio=0.5, fee_rate=0.0)
+        ask = sim.fetch_order_book("XRP/KRW")["asks"][0][0]
+        order = sim.create_limit_buy_order("XRP/KRW", 100.0, ask)
+        self.assertEqual(order["status"], "open")
+        self.assertAlmostEqual(order["filled"], 50.0)
+        sim.clock.sleep(5.0)  # next book: the resting remainder keeps matching
+        self.assertAlmostEqual(sim.fetch_order(order["id"])["filled"], 75.0)
+        sim.cancel_order(order["id"])
+        bal = sim.get_balances()
+        self.assertAlmostEqual(bal["KRW"]["used"], 0.0)
+        self.assertAlmostEqual(bal["XRP"]["total"], 87.5)
+        self.assertAlmostEqual(bal["KRW"]["total"], 1_000_000.0 - 87.5 * ask)
+        self.assertEqual(len(sim.get_fills(order["id"])), 3)
+
+    def test_rejects_and_rate_limits(self):
+        sim = ExchangeSimulator({"XRP/KRW": _flat_bars()}, balances={"KRW": 10_000.0}, rate_limit_per_sec=3, latency_sec=0.0)
+        with self.assertRaises(SimOrderRejected):
+            sim.create_limit_buy_order("XRP/KRW", 1.0, 1000.0)  # under min notional
+        with self.assertRaises(SimInsufficientFunds):
+            sim.create_limit_buy_order("XRP/KRW", 100.0, 1000.0)
+        sim.fetch_ticker("XRP/KRW")
+        with self.assertRaisesRegex(Exception, "429"):
+            sim.fetch_ticker("XRP/KRW")
+        sim.clock.sleep(1.0)
+        self.assertIn("last", sim.fetch_ticker("XRP/KRW"))
+
+        flaky = ExchangeSimulator({"XRP/KRW": _flat_bars()}, reject_rate=0.5, seed=7)
+        outcomes = []
+        for _ in range(20):
+            try:
+                flaky.create_limit_sell_order("XRP/KRW", 10.0, 2000.0)
+                outcomes.append("ok")
+            except SimInsufficientFunds:
+                outcomes.append("funds")
+            except SimOrderRejected:
+                outcomes.append("reject")
+        self.assertIn("reject", outcomes)
+        self.assertEqual(flaky.rejects, 20)  # no XRP: the rest fail on funds
+
+    def test_engine_recovers_from_rate_limits(self):
+        from modules.execution_engine import ExecutionEngine
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sim = ExchangeSimulator({"XRP/KRW": _flat_bars()}, rate_limit_per_sec=2)
+            budget = MagicMock()
+            budget.get_available_for_bot.return_value = 1e9
+            budget.can_buy.return_value = (True, "OK")
+            engine = ExecutionEngine("t", tmp, budget, clock=sim.clock, sleep=sim.clock.sleep)
+            self.assertIsInstance(engine.order_tracker, OrderTracker)
+            signal = {"symbol": "KRW-XRP", "target_money": 50000.0, "ask_depth_sum": 1e9}
+            res = engine.execute_entry(signal, {"price": 1000.0, "balance": 1e6}, exchange_api=sim)
+            engine.close()
+        self.assertTrue(res["ok"])
+        self.assertGreater(sim.rate_limited, 0)
+        sim.clock.sleep(1.0)
+        self.assertAlmostEqual(sim.get_balances()["XRP"]["total"], res["real_qty"])
+
+
+class TestSimulatedSession(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_orders_settle_on_the_loop_pump(self):
+        sim = ExchangeSimulator({"KRW-XRP": _bars()}, balances={"KRW": 1_000_000.0}, latency_sec=0.05)
+        controller = RunController(
+            sim, CapitalLedger("UPBIT", 1_000_000), MagicMock(), MagicMock(),
+            disable_strategy=True, clock=sim.clock, sleep=sim.clock.sleep,
+        )
+        controller.cooldown_min = 0
+        controller._ensure_execution_engine()
+        signal = {"symbol": "KRW-XRP", "timeframe": "1m", "candle_ts": T0, "target_money": 100000.0,
+                  "spread_bp": 0.0, "ask_depth_sum": 1e9, "chase_pct": 0.0}
+
+        res = controller.process_entry_signal(signal)
+        self.assertTrue(res["pending"])
+        slot = controller.position_book.slot("KRW-XRP")
+        self.assertEqual(slot["state"], controller.STATE_ENTRY_PENDING)
+        self.assertEqual(slot["last_order_id"], res["order_id"])
+        while slot["state"] == controller.STATE_ENTRY_PENDING:
+            sim.clock.sleep(controller._loop_sleep_sec())
+            controller._pump_order_tracker()
+        self.assertEqual(slot["state"], controller.STATE_IN_POSITION)
+        self.assertGreater(slot["position_qty"], 0.0)
+
+        res = controller.process_exit_signal(symbol="KRW-XRP", qty="ALL", reason="test")
+        self.assertTrue(res["pending"])
+        self.assertEqual(slot["state"], controller.STATE_EXIT_PENDING)
+        # Stopping drains the resting sell instead of leaving the slot pending.
+        controller._drain_order_tracker()
+        self.assertEqual(slot["state"], controller.STATE_FLAT)
+        self.assertEqual(sim.fetch_open_orders(), [])
+        controller._close_execution_engine()
+
+    def test_full_day_runs_in_seconds(self):
+        sim = ExchangeSimulator({"KRW-XRP": _bars()}, balances={"KRW": 1_000_000.0}, latency_sec=0.05)
+        watch = MagicMock()
+        watch.current_regime = "NEUTRAL"
+        watch.last_btc_price = 0.0
+        watch.watchlist = []
+        controller = RunController(
+            sim, CapitalLedger("UPBIT", 1_000_000), watch, MagicMock(),
+            disable_strategy=True, clock=sim.clock, sleep=sim.clock.sleep,
+        )
+        controller.cooldown_min = 0
+
+        def strategy(c, s, now):
+            state = c.runtime_state.get("state")
+            if state == c.STATE_FLAT and int(now) % 1800 < 60:
+                signal = {"symbol": "KRW-XRP", "timeframe": "1m", "candle_ts": now, "target_money": 100000.0,
+                          "spread_bp": 0.0, "ask_depth_sum": 1e9, "chase_pct": 0.0}
+                c.process_entry_signal(signal)
+            elif state == c.STATE_IN_POSITION and now - c.runtime_state.get("last_entry_ts", now) >= 600:
+                c.process_exit_signal(symbol="KRW-XRP", qty="ALL", reason="sim_time_stop")
+
+        started = time.perf_counter()
+        summary = run_sim_session(controller, sim, strategy=strategy, step_sec=60.0)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 60.0)
+        self.assertGreaterEqual(summary["end_ts"] - summary["start_ts"], 86400.0 - 120.0)
+        self.assertGreaterEqual(summary["steps"], 1400)
+        buys = [t for t in sim._trades if t["side"] == "buy"]
+        sells = [t for t in sim._trades if t["side"] == "sell"]
+        self.assertGreaterEqual(len(buys), 40)
+        self.assertEqual(len(buys), len(sells))
+        self.assertEqual(sim.fetch_open_orders(), [])
+        self.assertEqual(controller.runtime_state.get("state"), controller.STATE_FLAT)
+        # Round trips only pay spread and fees on a mean-reverting path.
+        self.assertLess(summary["equity"], summary["start_equity"])
+        self.assertGreater(summary["equity"], summary["start_equity"] * 0.95)
+
+
+if __name__ == "__main__":
+    unittest.main()
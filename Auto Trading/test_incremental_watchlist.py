@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.incremental_watchlist import IncrementalWatchlist
+from strategy import Strategy
+
+COMPARE = [
+    "close", "turnover", "score_exec", "tag_exec", "atr_exec", "signal_buy_exec",
+    "pump_state_exec", "penalty_factor_exec", "anti_chase_reason_exec", "reentry_reason_exec",
+    "pump_state", "anti_chase_reason", "reentry_reason", "rsi", "vol_ma20",
+]
+
+
+def _bars(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = [100.0]
+    for i in range(1, n):
+        shock = 0.25 if i % 37 == 0 else rng.normal(0.002, 0.03)  # periodic pumps drive the state machine
+        close.append(max(1.0, close[-1] * (1.0 + shock)))
+    close = np.array(close)
+    open_ = np.r_[close[0], close[:-1]] * (1.0 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1.0 + rng.uniform(0, 0.03, n))
+    low = np.minimum(open_, close) * (1.0 - rng.uniform(0, 0.03, n))
+    volume = rng.uniform(1000, 5000, n) * np.where(np.arange(n) % 37 == 0, 6.0, 1.0)
+    dt = pd.date_range("2024-01-01", periods=n, freq="D")
+    return pd.DataFrame({"datetime": dt, "open": open_, "high": high, "low": low, "close": close, "volume": volume})
+
+
+class TestIncrementalWatchlist(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "UPBIT_KRW-XRP.parquet"
+        self.engine = IncrementalWatchlist(data_dir=self._tmp.name)
+        self.params = {"trend_ma_slow_B": 60}
+
+    def _write(self, df):
+        df.to_parquet(self.path)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # distinct stamp per write
+
+    def _assert_matches_full(self, df, rows):
+        full = Strategy().analyze(df, params=self.params).iloc[-2:]
+        self.assertEqual(list(rows.index), list(full.index))
+        for col in COMPARE:
+            for a, b in zip(rows[col], full[col]):
+                if isinstance(b, (float, np.floating)):
+                    self.assertTrue(np.isclose(a, b, rtol=1e-9, equal_nan=True), (col, a, b))
+                else:
+                    self.assertEqual(a, b, col)
+
+    def test_matches_full_analyze_bar_by_bar(self):
+        bars = _bars(300)
+        self._write(bars.iloc[:200])
+        self._assert_matches_full(bars.iloc[:200], self.engine.refresh(self.params)["UPBIT_KRW-XRP"])
+        states = set()
+        for n in range(201, 300):
+            # The forming bar is rewritten once before the next bar appears.
+            forming = bars.iloc[:n].copy()
+            forming.iloc[-1, forming.columns.get_loc("close")] *= 0.99
+            for df in (forming, bars.iloc[:n]):
+                self._write(df)
+                rows = self.engine.refresh(self.params)["UPBIT_KRW-XRP"]
+                self._assert_matches_full(df, rows)
+                states.add(rows["pump_state"].iloc[-1])
+        self.assertEqual(self.engine.stats["full"], 1)
+        self.assertGreater(self.engine.stats["incremental"], 190)
+        self.assertTrue({"PUMPED", "COOLING"} <= states)
+
+    def test_reuse_fallbacks_and_removal(self):
+        bars = _bars(300)
+        self._write(bars)
+        first = self.engine.refresh(self.params)
+        self.assertIs(self.engine.refresh(self.params)["UPBIT_KRW-XRP"], first["UPBIT_KRW-XRP"])
+        self.assertEqual(self.engine.stats["reused"], 1)
+
+        # Rewritten history and changed params both force a full pass.
+        edited = bars.copy()
+        edited.iloc[0, edited.columns.get_loc("close")] *= 1.5
+        self._write(edited)
+        self._assert_matches_full(edited, self.engine.refresh(self.params)["UPBIT_KRW-XRP"])
+        self.params = {"trend_ma_slow_B": 40}
+        self._assert_matches_full(edited, self.engine.refresh(self.params)["UPBIT_KRW-XRP"])
+        self.assertEqual(self.engine.stats["full"], 3)
+
+        self._write(bars.iloc[:50])  # below the loader's row cut
+        self.assertEqual(self.engine.refresh(self.params), {})
+        self.path.unlink()
+        self.engine.refresh(self.params)
+        self.assertEqual(self.engine.stats["removed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
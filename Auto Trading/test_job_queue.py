@@ -0,0 +1,116 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.job_queue import JobQueue
+
+
+def _wait(pred, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "job_queue.json"
+        self.gates = {}
+        self.order = []
+
+    def _runner(self, name):
+        queue = self.queue
+
+        def _fn(*args, job_id):
+            self.order.append(name)
+            gate = self.gates.setdefault(name, threading.Event())
+            while not gate.wait(0.01):
+                queue.report(job_id, 50, "working")
+                queue.check_cancelled(job_id)
+            if args and args[0] == "boom":
+                raise RuntimeError("boom")
+
+        return _fn
+
+    def _make(self, **kwargs):
+        self.queue = JobQueue(path=self.path, **kwargs)
+        self.queue.register("evolution", self._runner("evolution"), resource="cpu", priority=0, id_prefix="evo")
+        self.queue.register("backtest", self._runner("backtest"), resource="cpu", priority=10, id_prefix="bt")
+        self.queue.register("data_update", self._runner("data_update"), resource="io", id_prefix="data")
+        return self.queue
+
+    def _status(self, job_id):
+        return self.queue.get(job_id)["status"]
+
+    def test_priorities_limits_and_dedupe(self):
+        q = self._make()
+        evo, created = q.submit("evolution", args=[{"seed": 1}])
+        self.assertTrue(created)
+        self.assertTrue(_wait(lambda: self._status(evo["job_id"]) == "RUNNING"))
+        data, _ = q.submit("data_update")  # other resource class runs alongside
+        self.assertTrue(_wait(lambda: self._status(data["job_id"]) == "RUNNING"))
+
+        bt, _ = q.submit("backtest")
+        again, created = q.submit("evolution")
+        self.assertEqual((again["job_id"], created), (evo["job_id"], False))
+        self.assertEqual(self._status(bt["job_id"]), "QUEUED")
+        self.assertEqual(q.summary()["classes"]["cpu"], {"limit": 1, "running": 1, "queued": 1})
+
+        self.gates["evolution"].set()
+        self.assertTrue(_wait(lambda: self._status(bt["job_id"]) == "RUNNING"))
+        self.assertEqual(q.get(bt["job_id"])["progress_pct"], 0.0)
+        self.assertTrue(_wait(lambda: q.get(bt["job_id"])["progress_pct"] == 50))
+        self.gates["backtest"].set()
+        self.gates["data_update"].set()
+        self.assertTrue(_wait(lambda: not q.active()))
+        self.assertEqual(self._status(evo["job_id"]), "DONE")
+        self.assertEqual(self.order[:2], ["evolution", "data_update"])
+
+    def test_cancel_and_failure(self):
+        q = self._make()
+        running, _ = q.submit("evolution")
+        self.assertTrue(_wait(lambda: self._status(running["job_id"]) == "RUNNING"))
+        queued, _ = q.submit("backtest")
+        self.assertEqual(q.cancel(queued["job_id"])["status"], "CANCELLED")
+        self.assertEqual(q.cancel(running["job_id"])["cancel_requested"], True)
+        self.assertTrue(_wait(lambda: self._status(running["job_id"]) == "CANCELLED"))
+        self.assertNotIn("backtest", self.order)
+        self.assertIsNone(q.cancel(running["job_id"]))
+
+        self.gates["backtest"] = threading.Event()
+        self.gates["backtest"].set()
+        failed, _ = q.submit("backtest", args=["boom"])
+        self.assertTrue(_wait(lambda: self._status(failed["job_id"]) == "FAILED"))
+        self.assertEqual(q.get(failed["job_id"])["error"], "boom")
+
+    def test_restart_requeues_and_marks_interrupted(self):
+        q = self._make(autostart=False)
+        a, _ = q.submit("evolution", args=[{"seed": 7}])
+        b, _ = q.submit("data_update")
+        records = json.loads(self.path.read_text())["jobs"]
+        for rec in records:
+            if rec["job_id"] == a["job_id"]:
+                rec["status"] = "RUNNING"  # the process died mid-run
+        self.path.write_text(json.dumps({"jobs": records, "_schema_version": 1}))
+
+        q2 = self._make()
+        q2.load()
+        self.assertEqual(q2.get(a["job_id"])["status"], "FAILED")
+        self.assertIn("interrupted", q2.get(a["job_id"])["error"])
+        self.assertTrue(_wait(lambda: q2.get(b["job_id"])["status"] == "RUNNING"))
+        self.gates["data_update"].set()
+        self.assertTrue(_wait(lambda: q2.get(b["job_id"])["status"] == "DONE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.model_manager import ModelManager
+from modules.model_registry import ModelRegistry
+
+
+def _summary(score, created_at, passed=False):
+    return {
+        "created_at": created_at,
+        "candidate": {"oos_metrics": {"score": score, "roi": score / 10.0, "trades": 5}},
+        "active_baseline": {"oos_metrics": {"score": 0.5}},
+        "gate": {"pass": passed, "reasons": ["score_delta"]},
+    }
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base = Path(self._tmp.name) / "models"
+        self.mm = ModelManager(base_dir=self.base)
+
+    def _stage(self, run_id, score, day):
+        self.mm.write_staging_artifacts(run_id, {}, _summary(score, f"2026-02-{day:02d}T00:00:00"), {"model_id": run_id})
+
+    def test_manager_keeps_catalogue_current(self):
+        reg = self.mm.registry
+        self._stage("run_a", 1.0, 1)
+        self._stage("run_b", 2.0, 2)
+        self._stage("run_c", 3.0, 3)
+        self.assertEqual(reg.count("staging"), 3)
+
+        self.mm.archive_staging("run_a")
+        self.mm.promote("run_b")
+        self.mm.promote("run_c")  # run_b moves to the archive
+        self.assertEqual(reg.count("staging"), 0)
+        self.assertEqual(sorted(r["run_id"] for r in reg.query(bucket="archive")[0]), ["run_a", "run_b"])
+        [active], _ = reg.query(bucket="active")
+        self.assertEqual((active["run_id"], active["decision"]), ("run_c", "KEEP_ACTIVE"))
+        self.assertEqual(reg.sync(), 0)
+
+    def test_sorted_paginated_queries(self):
+        for i, score in enumerate([0.3, 2.5, 1.1, 0.9, 4.0]):
+            self._stage(f"run_{i}", score, i + 1)
+            self.mm.archive_staging(f"run_{i}")
+        page, total = self.mm.registry.query(sort="score", limit=2)
+        self.assertEqual(total, 5)
+        self.assertEqual([r["score"] for r in page], [4.0, 2.5])
+        page, _ = self.mm.registry.query(sort="score", limit=2, offset=2)
+        self.assertEqual([r["score"] for r in page], [1.1, 0.9])
+        page, _ = self.mm.registry.query(sort="created_at", descending=False, limit=1)
+        self.assertEqual(page[0]["run_id"], "run_0")
+        self.assertEqual(page[0]["reason"], "score_delta")
+        page, _ = self.mm.registry.query(sort="DROP TABLE runs", limit=1)  # unknown sort keys fall back
+        self.assertEqual(page[0]["run_id"], "run_4")
+
+    def test_sync_and_rebuild_pick_up_external_changes(self):
+        reg = self.mm.registry
+        self._stage("run_a", 1.0, 1)
+        self.mm.archive_staging("run_a")
+        reg.sync()
+
+        # Directories copied in by hand (e.g. from another host).
+        ext = self.base / "_archive" / "run_ext"
+        ext.mkdir()
+        (ext / "run_summary.json").write_text(json.dumps(_summary(9.0, "2026-03-01T00:00:00", passed=True)))
+        self.assertEqual(reg.sync(), 1)
+        [top], _ = reg.query(sort="score", limit=1)
+        self.assertEqual((top["run_id"], top["decision"]), ("run_ext", "PROMOTE"))
+
+        # Settled, unchanged bucket directories are not listed again.
+        for bucket in ("_staging", "_archive"):
+            os.utime(self.base / bucket, (1_700_000_000, 1_700_000_000))
+        reg.sync()
+        with patch.object(Path, "iterdir", side_effect=AssertionError("rescanned")):
+            self.assertEqual(reg.sync(), 0)
+
+        os.rename(ext, self.base / "_archive" / "run_ext2")
+        self.assertEqual(reg.sync(), 2)
+        self.assertEqual(reg.count("archive"), 2)
+
+        os.remove(reg.db_path)
+        fresh = ModelRegistry(self.base)
+        self.assertEqual(fresh.count(), 0)
+        self.assertEqual(fresh.rebuild(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
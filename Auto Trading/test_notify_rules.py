@@ -0,0 +1,176 @@
+import atexit
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.notifier_telegram import TelegramNotifier
+from modules.notify_rules import NotifyRules
+
+
+class _Clock:
+    def __init__(self, ts):
+        self.ts = ts
+
+    def __call__(self):
+        return self.ts
+
+
+def _evt(event_type="SYSTEM", exchange="ALL", title="HEALTH CHECK", severity="INFO", message="m"):
+    return {"event_type": event_type, "exchange": exchange, "severity": severity, "title": title, "message": message}
+
+
+class TestNotifyRules(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock(datetime(2026, 3, 2, 12, 0).timestamp())  # a Monday, local noon
+
+    def test_dedupe_and_escalation(self):
+        rules = NotifyRules(
+            rules={
+                "rules": [
+                    {
+                        "name": "health",
+                        "match": {"event_type": "SYSTEM", "title": "HEALTH*"},
+                        "dedupe_window_sec": 600,
+                        "escalate": [{"count": 3, "window_sec": 300, "severity": "WARNING"}],
+                    }
+                ]
+            },
+            clock=self.clock,
+        )
+        decisions = []
+        for _ in range(4):
+            decisions.append(rules.evaluate(_evt())[:2])
+            self.clock.ts += 60
+        self.assertEqual(
+            decisions,
+            [("deliver", "INFO"), ("suppress", "INFO"), ("deliver", "WARNING"), ("suppress", "WARNING")],
+        )
+        self.assertEqual(rules.evaluate(_evt(event_type="TRADE"))[0], "deliver")  # no rule matches
+
+        m = rules.metrics()
+        self.assertEqual(m["totals"]["delivered"], 3)
+        self.assertEqual(m["totals"]["suppressed_by"]["dedupe"], 2)
+        self.assertEqual(m["per_rule"]["health"], {"matched": 4, "delivered": 2, "suppressed": 2, "digested": 0, "escalated": 1})
+
+        self.clock.ts += 3600  # quiet for long enough: dedupe window and tier both reset
+        self.assertEqual(rules.evaluate(_evt())[:2], ("deliver", "INFO"))
+
+    def test_mute_drop_and_digest(self):
+        rules = NotifyRules(
+            rules={
+                "rules": [
+                    {"name": "noise", "match": {"source": ["BITHUMB"]}, "action": "drop"},
+                    {"name": "watch", "match": {"event_type": "WATCH"}, "digest_window_sec": 300},
+                    {"name": "night", "match": {"max_severity": "WARNING"}, "mute": [{"start": "23:00", "end": "07:00"}]},
+                ]
+            },
+            clock=self.clock,
+        )
+        self.assertEqual(rules.evaluate(_evt(exchange="bithumb"))[0], "suppress")
+        self.assertEqual(rules.evaluate(_evt(event_type="RISK"))[0], "deliver")
+        self.clock.ts = datetime(2026, 3, 2, 23, 30).timestamp()
+        self.assertEqual(rules.evaluate(_evt(event_type="RISK"))[0], "suppress")
+        self.assertEqual(rules.evaluate(_evt(event_type="RISK", severity="CRITICAL"))[0], "deliver")
+
+        for i in range(3):
+            self.assertEqual(rules.evaluate(_evt(event_type="WATCH", title=f"sig {i}"))[0], "digest")
+        self.assertEqual(rules.pop_digests(), [])
+        self.clock.ts += 301
+        (digest,) = rules.pop_digests()
+        self.assertEqual((digest["event_type"], digest["title"]), ("WATCH", "DIGEST watch (3)"))
+        self.assertEqual(digest["message"].count("\n"), 2)
+        self.assertEqual(rules.metrics()["totals"]["digests_sent"], 1)
+        self.assertEqual(rules.metrics()["totals"]["suppressed_by"], {"drop": 1, "mute": 1, "dedupe": 0})
+
+    def test_file_reload_keeps_previous_rules_on_bad_edit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "notify_rules.json"
+            path.write_text(json.dumps({"rules": [{"name": "a", "match": {"event_type": "X"}, "action": "drop"}]}))
+            rules = NotifyRules(path, clock=self.clock)
+            self.assertEqual(rules.evaluate(_evt(event_type="X"))[0], "suppress")
+
+            path.write_text(json.dumps({"rules": [{"name": "b", "action": "explode"}]}))
+            os.utime(path, ns=(0, 10**9))
+            self.clock.ts += NotifyRules.RELOAD_CHECK_SEC
+            self.assertEqual(rules.evaluate(_evt(event_type="X"))[0], "suppress")
+            self.assertEqual(rules.metrics()["rules"], ["a"])
+
+            path.write_text(json.dumps({"rules": []}))
+            self.clock.ts += NotifyRules.RELOAD_CHECK_SEC
+            self.assertEqual(rules.evaluate(_evt(event_type="X"))[0], "deliver")
+
+    def test_message_fingerprint_and_dedupe_bypass(self):
+        rules = NotifyRules(
+            rules={
+                "rules": [
+                    {
+                        "name": "health-check",
+                        "match": {"event_type": "SYSTEM", "title": "HEALTH CHECK*"},
+                        "fingerprint": ["event_type", "title", "message"],
+                        "dedupe_window_sec": 1800,
+                    }
+                ]
+            },
+            clock=self.clock,
+        )
+        self.assertEqual(rules.evaluate(_evt(message="Overall: OK"))[0], "deliver")
+        self.assertEqual(rules.evaluate(_evt(message="Overall: OK"))[0], "suppress")
+        self.assertEqual(rules.evaluate(_evt(message="Overall: WARN"))[0], "deliver")  # status changed
+        self.assertEqual(rules.evaluate(_evt(message="Overall: OK"), bypass_dedupe=True)[0], "deliver")
+        self.assertEqual(rules.evaluate(_evt(message="Overall: OK"))[0], "suppress")
+
+    def test_held_digests_survive_a_restart(self):
+        config = {"rules": [{"name": "watch", "match": {"event_type": "WATCH"}, "digest_window_sec": 3600}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            first = TelegramNotifier(bot_token="", chat_id="", storage_dir=tmp, rules=NotifyRules(rules=config))
+            first.emit_event("WATCH", "UPBIT", "BUY CANDIDATE", "KRW-BTC")
+            first.emit_event("WATCH", "UPBIT", "BUY CANDIDATE", "KRW-ETH")
+            # Crash: no close(), the worker just stops.
+            atexit.unregister(first.close)
+            first._stop.set()
+            first._worker.join(timeout=5)
+
+            second = TelegramNotifier(bot_token="", chat_id="", storage_dir=tmp, rules=NotifyRules(rules=config))
+            self.assertEqual(second.rules.metrics()["pending_digests"], {"watch": 2})
+            second.emit_event("WATCH", "UPBIT", "BUY CANDIDATE", "KRW-XRP")
+            second.close()
+            self.assertEqual(len(second.outbox), 1)
+            self.assertIn("DIGEST watch (3)", second.outbox[0]["title"])
+            self.assertIn("KRW-BTC", second.outbox[0]["message"])
+
+            third = TelegramNotifier(bot_token="", chat_id="", storage_dir=tmp, rules=NotifyRules(rules=config))
+            self.assertEqual(third.rules.metrics()["pending_digests"], {})
+            third.close()
+
+    def test_notifier_applies_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rules = NotifyRules(
+                rules={
+                    "rules": [
+                        {"name": "watch", "match": {"event_type": "WATCH"}, "digest_window_sec": 3600},
+                        {"name": "health", "match": {"title": "HEALTH*"}, "dedupe_window_sec": 3600},
+                    ]
+                }
+            )
+            notifier = TelegramNotifier(bot_token="", chat_id="", storage_dir=tmp, rules=rules)
+            for _ in range(3):
+                notifier.emit_event("SYSTEM", "ALL", "HEALTH CHECK", "flap")
+            notifier.emit_event("WATCH", "UPBIT", "BUY CANDIDATE", "KRW-BTC")
+            notifier.emit_event("WATCH", "UPBIT", "BUY CANDIDATE", "KRW-ETH")
+            self.assertTrue(notifier.flush())
+            self.assertEqual([e["message"] for e in notifier.outbox], ["flap"])
+
+            notifier.close()  # pending digests are sent on shutdown
+            self.assertEqual(len(notifier.outbox), 2)
+            self.assertIn("DIGEST watch (2)", notifier.outbox[1]["title"])
+            self.assertIn("KRW-ETH", notifier.outbox[1]["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import json
 import tempfile
+import time
 import unittest
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -11,6 +12,11 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parent))
 
 from modules.model_manager import ModelManager
+from modules.overfit_stats import (
+    deflated_sharpe_ratio,
+    probability_of_backtest_overfitting,
+    selection_bias_report,
+)
 from modules.oos_tuner import (
     build_split_windows,
     evaluate_oos_gate,
@@ -143,6 +149,66 @@ class TestOOSPipeline(unittest.TestCase):
         self.assertFalse(weak_weekly_gate["pass"])
         self.assertTrue(any("weekly_robustness_fail" in r for r in weak_weekly_gate["reasons"]))
 
+    def test_selection_bias_stats(self):
+        rng = np.random.default_rng(5)
+        noise = rng.normal(0, 0.01, size=(20, 200))
+        # Pure noise: the IS winner is no better than a coin flip OOS.
+        self.assertGreater(probability_of_backtest_overfitting(noise)["pbo"], 0.3)
+        self.assertLess(deflated_sharpe_ratio(noise)["dsr"], 0.95)
+
+        skilled = noise.copy()
+        skilled[:, 0] += 0.02
+        self.assertLess(probability_of_backtest_overfitting(skilled)["pbo"], 0.05)
+        self.assertGreater(deflated_sharpe_ratio(skilled, selected_idx=0)["dsr"], 0.95)
+
+        big = rng.normal(0, 0.01, size=(20, 1000))
+        t0 = time.perf_counter()
+        rep = selection_bias_report(big, n_partitions=16)
+        self.assertLess(time.perf_counter() - t0, 5.0)
+        self.assertEqual(rep["n_splits"], 12870)
+        self.assertEqual(rep["n_trials"], 1000)
+
+    def test_gate_overfit_criteria(self):
+        oos_start = pd.Timestamp("2026-01-05")
+        trades = [
+            {"exit_date": oos_start + timedelta(days=d), "return": 0.02}
+            for d in (1, 8, 15, 22)
+        ]
+        kwargs = dict(
+            candidate_metrics={"score": 0.20, "trades": 40, "mdd": -0.05},
+            candidate_res={"trade_list": trades},
+            active_metrics=None,
+            oos_start=oos_start,
+            min_trades=20,
+            delta_min=0.0,
+        )
+        stats = {"dsr": 0.40, "pbo": 0.70}
+        recorded = evaluate_oos_gate(**kwargs, selection_stats=stats)
+        self.assertTrue(recorded["pass"])
+        self.assertEqual(recorded["pbo"], 0.70)
+
+        gated = evaluate_oos_gate(**kwargs, selection_stats=stats, dsr_min=0.95, pbo_max=0.5)
+        self.assertFalse(gated["pass"])
+        self.assertIn("dsr_fail", gated["reasons"])
+        self.assertIn("pbo_fail", gated["reasons"])
+
+        # Missing statistics fail closed for both criteria.
+        missing = evaluate_oos_gate(**kwargs, selection_stats={}, dsr_min=0.95, pbo_max=0.5)
+        self.assertEqual(missing["decision"], "FAIL")
+        self.assertIn("dsr_fail", missing["reasons"])
+        self.assertIn("pbo_fail", missing["reasons"])
+
+        # A KEEP_ACTIVE downgraded to FAIL keeps its own reason.
+        kept = evaluate_oos_gate(
+            **{**kwargs, "active_metrics": dict(kwargs["candidate_metrics"]), "delta_min": 0.5},
+            selection_stats=stats,
+            pbo_max=0.5,
+        )
+        self.assertEqual(kept["decision"], "FAIL")
+        self.assertIn("delta_min_fail", kept["reasons"])
+        self.assertTrue(any(r.startswith("Delta Insufficient") for r in kept["reasons"]))
+        self.assertIn("pbo_fail", kept["reasons"])
+
     def test_atomic_promotion_recovery(self):
         with tempfile.TemporaryDirectory() as tmp:
             base = Path(tmp) / "models"
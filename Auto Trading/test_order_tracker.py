@@ -0,0 +1,175 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.execution_engine import ExecutionEngine
+from modules.order_tracker import OrderTracker
+
+
+class _SimClock:
+    """Exchange clock: sleep() advances time instantly."""
+
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, dt):
+        self.t += max(0.0, dt)
+
+
+class _SimExchange:
+    """Orders fill along a scripted (elapsed_sec, filled_qty) schedule on the sim clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.orders = {}
+        self.fetch_calls = 0
+        self.rate_limit_until = 0.0
+
+    def add(self, order_id, amount, schedule):
+        self.orders[order_id] = {"amount": amount, "schedule": schedule, "t0": self.clock(), "canceled_at": None}
+
+    def fetch_order(self, order_id, symbol):
+        self.fetch_calls += 1
+        if self.clock() < self.rate_limit_until:
+            raise RuntimeError("429 Too Many Requests")
+        od = self.orders[order_id]
+        elapsed = self.clock() - od["t0"]
+        filled = 0.0
+        for at, qty in od["schedule"]:
+            if elapsed >= at and (od["canceled_at"] is None or at <= od["canceled_at"] - od["t0"]):
+                filled = qty
+        if filled >= od["amount"]:
+            status = "closed"
+        elif od["canceled_at"] is not None and self.clock() >= od["canceled_at"] + 0.5:
+            status = "canceled"
+        else:
+            status = "open"
+        return {"id": order_id, "amount": od["amount"], "filled": filled, "status": status}
+
+    def cancel_order(self, order_id, symbol):
+        self.orders[order_id]["canceled_at"] = self.clock()
+
+
+class TestOrderTracker(unittest.TestCase):
+    def setUp(self):
+        self.clock = _SimClock()
+        self.exchange = _SimExchange(self.clock)
+        self.tracker = OrderTracker(clock=self.clock, sleep=self.clock.sleep, max_interval_sec=2.0)
+        self.events = []
+
+    def _callbacks(self):
+        return {
+            name: (lambda t, name=name: self.events.append((name, t.order_id, t.filled, round(self.clock() - 1000.0, 3))))
+            for name in ("on_fill", "on_partial", "on_cancel", "on_timeout")
+        }
+
+    def test_partial_fills_then_fill(self):
+        self.exchange.add("A", 3.0, [(1.0, 1.0), (4.0, 2.0), (6.0, 3.0)])
+        tracked = self.tracker.track(self.exchange, "A", "XRP/KRW", timeout_sec=10.0, interval_sec=0.3, **self._callbacks())
+        self.tracker.wait(tracked)
+
+        self.assertEqual(tracked.status, "filled")
+        self.assertEqual([e[0] for e in self.events], ["on_partial", "on_partial", "on_fill"])
+        self.assertEqual([e[2] for e in self.events], [1.0, 2.0, 3.0])
+        # A fixed 0.3s sleep loop polls 20 times before the 6s fill.
+        self.assertLess(self.exchange.fetch_calls, 20)
+        # Fill is noticed within one (capped) interval.
+        self.assertLessEqual(self.events[-1][3], 6.0 + 2.0)
+
+    def test_poll_interval_backs_off_with_age(self):
+        self.exchange.add("A", 1.0, [])
+        tracked = self.tracker.track(self.exchange, "A", "XRP/KRW", timeout_sec=30.0, interval_sec=0.3, growth=1.5)
+        gaps = []
+        last = self.clock()
+        for _ in range(6):
+            self.clock.t = tracked.next_poll_at
+            self.tracker.poll_due()
+            gaps.append(round(self.clock() - last, 4))
+            last = self.clock()
+        self.assertEqual(gaps[:4], [0.0, 0.45, 0.675, 1.0125])
+        self.assertEqual(tracked.interval, 2.0)  # capped
+
+    def test_timeout_then_cancel_confirm(self):
+        self.exchange.add("A", 2.0, [(1.0, 0.5)])
+        tracked = self.tracker.track(self.exchange, "A", "XRP/KRW", timeout_sec=3.0, interval_sec=0.3, **self._callbacks())
+        self.tracker.wait(tracked)
+        self.assertEqual(tracked.status, "timeout")
+        self.assertEqual(self.clock() - 1000.0, 3.0)  # last poll lands on the deadline
+
+        self.tracker.cancel(tracked, wait_sec=3.0)
+        self.tracker.wait(tracked)
+        self.assertEqual(tracked.status, "canceled")
+        self.assertEqual(tracked.filled, 0.5)
+        self.assertEqual([e[0] for e in self.events], ["on_partial", "on_timeout", "on_cancel"])
+
+    def test_one_scheduler_for_many_orders(self):
+        self.exchange.add("A", 1.0, [(2.0, 1.0)])
+        self.exchange.add("B", 1.0, [(5.0, 1.0)])
+        self.tracker.track(self.exchange, "A", "XRP/KRW", timeout_sec=10.0, **self._callbacks())
+        self.tracker.track(self.exchange, "B", "ETH/KRW", timeout_sec=10.0, **self._callbacks())
+
+        # The run loop pumps once per tick and never blocks on either order.
+        for _ in range(10):
+            self.tracker.poll_due()
+            self.clock.sleep(1.0)
+        self.assertEqual([(e[0], e[1]) for e in self.events], [("on_fill", "A"), ("on_fill", "B")])
+        self.assertEqual(self.tracker.open_orders(), [])
+
+    def test_rate_limit_backoff(self):
+        self.exchange.add("A", 1.0, [(3.0, 1.0)])
+        self.exchange.rate_limit_until = self.clock() + 1.0
+        tracked = self.tracker.track(self.exchange, "A", "XRP/KRW", timeout_sec=10.0, interval_sec=0.3)
+        self.tracker.wait(tracked)
+        self.assertTrue(tracked.rate_limited)
+        self.assertEqual(tracked.status, "filled")
+
+
+class TestExecutionEngineTracking(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.clock = _SimClock()
+        self.exchange = _SimExchange(self.clock)
+        self.engine = ExecutionEngine("t", self._tmp.name, MagicMock())
+        self.engine.order_tracker = OrderTracker(clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_track_order_returns_at_once_and_settles_from_the_pump(self):
+        self.exchange.add("A", 2.0, [(0.5, 1.0)])
+        settled = []
+        tracked = self.engine._track_order(self.exchange, "A", "XRP/KRW", 3.0, 3.0, settled.append)
+        self.assertFalse(tracked.is_done)
+        self.assertEqual(self.exchange.fetch_calls, 0)
+
+        # The loop pumps once per tick; timeout sends the cancel and keeps tracking.
+        while not settled:
+            self.engine.order_tracker.poll_due()
+            self.clock.sleep(0.25)
+        self.assertEqual(settled, [tracked])
+        self.assertTrue(tracked.cancel_requested)
+        self.assertEqual(tracked.status, "canceled")
+        self.assertEqual(tracked.last_order["filled"], 1.0)
+        self.assertFalse(tracked.rate_limited)
+        self.assertEqual(self.engine.order_tracker.open_orders(), [])
+
+    def test_sync_wrapper_waits_for_the_final_result(self):
+        self.exchange.add("B", 2.0, [(0.6, 2.0)])
+        res = self.engine._await(
+            lambda on_done: self.engine._track_order(
+                self.exchange, "B", "XRP/KRW", 3.0, 3.0, lambda t: on_done({"ok": True, "status": t.status})
+            )
+        )
+        self.assertEqual(res, {"ok": True, "status": "filled"})
+        self.assertGreaterEqual(self.clock() - 1000.0, 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
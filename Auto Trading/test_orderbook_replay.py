@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.execution_engine import ExecutionEngine
+from modules.order_tracker import OrderTracker
+from modules.orderbook_replay import (
+    OrderBookRecorder,
+    ReplayExchange,
+    group_episodes,
+    load_snapshots,
+    replay_policies,
+)
+
+T0 = 1_700_000_000.0
+
+
+def _book(shift=0.0):
+    return {
+        "bids": [[499 + shift, 50.0], [498 + shift, 50.0], [497 + shift, 200.0]],
+        "asks": [[501 + shift, 40.0], [502 + shift, 40.0], [503 + shift, 500.0]],
+    }
+
+
+class TestOrderBookReplay(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "orderbooks"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _record_session(self):
+        rec = OrderBookRecorder(self.root, depth=10)
+        rec.record("XRP/KRW", _book(), event="ENTRY", ts=T0)
+        rec.record("XRP/KRW", _book(1), event="QUOTE", ts=T0 + 600)
+        rec.record("XRP/KRW", _book(2), event="EXIT", ts=T0 + 601)
+        rec.close()
+        return rec
+
+    def test_recorder_round_trip(self):
+        rec = self._record_session()
+        self.assertEqual((rec.snapshots, rec.parts_written), (3, 1))
+        parts = list(self.root.glob("*/*.parquet"))
+        self.assertEqual(len(parts), 1)
+
+        snaps = load_snapshots(self.root)
+        self.assertEqual([s["event"] for s in snaps], ["ENTRY", "QUOTE", "EXIT"])
+        self.assertEqual(snaps[0]["asks"], _book()["asks"])
+        self.assertEqual(snaps[2]["bids"][0], [501.0, 50.0])
+        self.assertEqual(len(load_snapshots(self.root, event="ENTRY")), 1)
+
+        episodes = group_episodes(snaps)
+        self.assertEqual([(e["kind"], len(e["books"])) for e in episodes], [("ENTRY", 1), ("EXIT", 2)])
+
+    def test_engine_records_books_it_fetches(self):
+        engine = ExecutionEngine("t", self._tmp.name, MagicMock(get_available_for_bot=MagicMock(return_value=1e9), can_buy=MagicMock(return_value=(True, "OK"))))
+        exchange = ReplayExchange([dict(_book(), ts=T0)])
+        engine.order_tracker = OrderTracker(clock=exchange.clock, sleep=exchange.clock.sleep)
+        engine.book_recorder = OrderBookRecorder(self.root)
+        signal = {"symbol": "KRW-XRP", "target_money": 10000, "ask_depth_sum": 1e9}
+        res = engine.execute_entry(signal, {"price": 500.0, "balance": 1e9}, exchange_api=exchange)
+        self.assertTrue(res["ok"])
+        engine.book_recorder.close()
+        self.assertEqual([s["event"] for s in load_snapshots(self.root)], ["ENTRY"])
+
+    def test_policies_report_shortfall(self):
+        self._record_session()
+        snaps = load_snapshots(self.root)
+        policies = [
+            {"name": "touch", "entry_limit_offset_ticks": 0},
+            {"name": "through", "entry_limit_offset_ticks": 5, "panic_aggressive_ticks": [1, 2, 3]},
+        ]
+        report = replay_policies(snaps, policies, target_money=50000.0, log_dir=self._tmp.name)
+        self.assertEqual(len(report["rows"]), 2 * 3)  # entry + exit + panic per policy
+
+        touch = report["summary"]["touch"]["entry"]
+        through = report["summary"]["through"]["entry"]
+        # Limit at the touch only takes the first ask level; through the book fills.
+        self.assertLess(touch["fill_ratio"], 0.5)
+        self.assertGreater(through["fill_ratio"], 0.95)
+        self.assertLess(touch["mean_shortfall_bps"], through["mean_shortfall_bps"])
+        # Buying at/above the ask costs at least half the spread vs the arrival mid.
+        self.assertGreater(touch["mean_shortfall_bps"], 19.0)
+
+        exit_stats = report["summary"]["touch"]["exit"]
+        self.assertAlmostEqual(exit_stats["fill_ratio"], 1.0)
+        self.assertGreater(exit_stats["mean_shortfall_bps"], 0.0)
+        self.assertEqual(report["summary"]["through"]["panic"]["n"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules import param_stability
+from modules.oos_tuner import build_split_windows, evaluate_oos_gate
+from modules.param_stability import neighbor_values, stability_map
+from modules.tuning_worker import TuningWorker, run_weekly_tuning_once
+from test_oos_pipeline import _make_df
+
+PARAMS = {
+    "trigger_vol_A": 2.0,
+    "rsi_entry_B": 45,
+    "sl_atr_mult_A": 1.8,
+    "max_open_positions": 4,
+    "cooldown_days_after_sl": 5,
+    "min_turnover_krw": 0,
+    "universe_top_n": 0,
+}
+KEYS = ["trigger_vol_A", "sl_atr_mult_A", "max_open_positions", "cooldown_days_after_sl"]
+
+
+class TestParamStability(unittest.TestCase):
+    def setUp(self):
+        self.raw = {"UPBIT_KRW-ETH": _make_df(days=280, seed=11)}
+        self.w = build_split_windows(pd.Timestamp("2026-02-01"), train_days=180, oos_days=28, embargo_days=2)
+
+    def test_neighbor_values(self):
+        self.assertEqual(neighbor_values("trigger_vol_A", 2.0), [(-1, 1.5), (1, 2.5)])
+        self.assertEqual(neighbor_values("trigger_vol_A", 1.5, steps=2), [(1, 2.0), (2, 2.5)])
+        # Off-grid values snap to the nearest grid point.
+        self.assertEqual(neighbor_values("max_entries_per_day", 2.2), [(-1, 1), (0, 2), (1, 3)])
+
+    def test_map_shape_and_parallel_parity(self):
+        seq = stability_map(self.raw, PARAMS, self.w["train_start"], self.w["train_end"], keys=KEYS, top_k=2)
+        par = stability_map(self.raw, PARAMS, self.w["train_start"], self.w["train_end"], keys=KEYS, top_k=2, n_workers=2)
+        self.assertEqual(seq, par)
+
+        self.assertEqual(len(seq["table"]), 8)
+        self.assertEqual({r["key"] for r in seq["sensitivity"]}, set(KEYS))
+        self.assertEqual(len(seq["heatmaps"]), 1)
+        hm = seq["heatmaps"][0]
+        self.assertEqual(len(hm["z"]), len(hm["y"]))
+        self.assertTrue(all(len(row) == len(hm["x"]) for row in hm["z"]))
+        # OAT neighbors + 4 grid corners, base excluded.
+        self.assertEqual(seq["n_neighbors"], 12)
+        self.assertGreaterEqual(seq["plateau_score"], 0.0)
+        self.assertLessEqual(seq["plateau_score"], 1.0)
+
+    def test_execution_only_neighbors_reuse_analysis(self):
+        calls = []
+        real = param_stability._prepare_symbol_dfs
+
+        def _counting(raw_dfs, params):
+            calls.append(params)
+            return real(raw_dfs, params)
+
+        param_stability._prepare_symbol_dfs = _counting
+        try:
+            stability_map(
+                self.raw,
+                PARAMS,
+                self.w["train_start"],
+                self.w["train_end"],
+                keys=["sl_atr_mult_A", "max_open_positions"],
+            )
+        finally:
+            param_stability._prepare_symbol_dfs = real
+        self.assertEqual(len(calls), 1)
+
+    def test_gate_plateau(self):
+        oos_start = pd.Timestamp("2026-01-05")
+        trades = [{"exit_date": oos_start + pd.Timedelta(days=d), "return": 0.02} for d in (1, 8, 15, 22)]
+        kwargs = dict(
+            candidate_metrics={"score": 0.20, "trades": 40, "mdd": -0.05},
+            candidate_res={"trade_list": trades},
+            active_metrics=None,
+            oos_start=oos_start,
+            min_trades=20,
+            delta_min=0.0,
+            stability={"plateau_score": 0.25},
+        )
+        self.assertTrue(evaluate_oos_gate(**kwargs)["pass"])
+        gated = evaluate_oos_gate(**kwargs, plateau_min=0.6)
+        self.assertFalse(gated["pass"])
+        self.assertIn("plateau_fail", gated["reasons"])
+        self.assertEqual(gated["plateau_score"], 0.25)
+
+    def test_stability_workers_setting_reaches_tuning_cycle(self):
+        seen = {}
+
+        def _cycle(**kwargs):
+            seen.update(kwargs)
+            return {}
+
+        def _run(settings):
+            with tempfile.TemporaryDirectory() as tmp:
+                worker = TuningWorker(
+                    state_path=Path(tmp) / "trainer_state.json",
+                    lock_path=Path(tmp) / "trainer.lock",
+                    cooldown_minutes_on_boot=0,
+                )
+                mm = MagicMock(**{"active_model_id.return_value": None})
+                run_weekly_tuning_once(worker, self.raw, PARAMS, mm, settings, universe=None)
+
+        with patch("modules.tuning_worker.run_tuning_cycle", _cycle), \
+                patch("modules.tuning_worker.cycle_fingerprint", return_value="fp"):
+            _run({"tuning_stability_workers": "3"})
+            self.assertEqual(seen["stability_workers"], 3)
+            _run({})
+            self.assertIsNone(seen["stability_workers"])  # run_tuning_cycle sizes the pool
+
+
+if __name__ == "__main__":
+    unittest.main()
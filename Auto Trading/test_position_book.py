@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.capital_ledger import CapitalLedger
+from modules.run_controller import RunController
+from modules.state_journal import read_journaled_state
+from modules.utils_json import SCHEMA_VERSION_FIELD
+
+
+class _FakeExecution:
+    def __init__(self):
+        self.entries = []
+        self.sells = []
+
+    def execute_entry(self, signal, market_data, exchange_api=None):
+        self.entries.append(signal["symbol"])
+        return {"ok": True, "real_qty": 2.0, "real_vwap": 1000.0, "fee": 1.0, "order_id": f"b{len(self.entries)}"}
+
+    def create_market_sell_order(self, symbol, qty, exchange_api=None, **kwargs):
+        self.sells.append((symbol, qty))
+        return {"ok": True, "real_qty": qty, "real_vwap": 1010.0, "fee": 1.0, "order_id": f"s{len(self.sells)}"}
+
+
+class TestPositionBook(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+
+        self.balances = {"KRW": 100000.0}
+        self.adapter = MagicMock()
+        self.adapter.get_balances.side_effect = lambda: dict(self.balances)
+        self.adapter.get_open_orders.return_value = []
+        self.ledger = CapitalLedger("UPBIT", 100000)
+        self.engine = _FakeExecution()
+        self.watch = MagicMock()
+        self.watch.current_regime = "NEUTRAL"
+        self.watch.last_btc_price = 0.0
+        self.watch.watchlist = []
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _controller(self, max_positions=2):
+        c = RunController(
+            self.adapter,
+            self.ledger,
+            self.watch,
+            MagicMock(),
+            mode="PAPER",
+            execution_engine=self.engine,
+            max_positions=max_positions,
+        )
+        c.cooldown_min = 0
+        return c
+
+    def _enter(self, c, symbol, candle_ts=1_700_000_000):
+        signal = {"symbol": symbol, "timeframe": "1m", "candle_ts": candle_ts}
+        res = c.process_entry_signal(signal, current_market_data={"price": 1000.0, "balance": 100000.0})
+        if res:
+            self.balances[symbol.split("-")[-1]] = 2.0
+        return res
+
+    def test_reading_runtime_state_does_not_open_slots(self):
+        c = self._controller()
+        before = dict(c.position_book.slots)
+        c._slot_ctx.stack = ["KRW-NEW"]
+        try:
+            self.assertIs(c.runtime_state, c.position_book.get())  # unknown symbol: primary slot
+        finally:
+            c._slot_ctx.stack = []
+        self.assertEqual(c.position_book.slots, before)
+        with c._position_slot("KRW-NEW") as slot:
+            self.assertIs(c.runtime_state, slot)
+        self.assertIn("KRW-NEW", c.position_book.slots)
+
+    def test_migrates_v2_runtime_state(self):
+        v2 = {
+            SCHEMA_VERSION_FIELD: 2,
+            "state": "IN_POSITION",
+            "symbol": "KRW-XRP",
+            "position_qty": 3.0,
+            "avg_entry_price": 500.0,
+            "active_keys": {},
+            "position_id": "KRW-XRP-1",
+            "position_seq": 1,
+        }
+        Path("results/runtime_state.json").write_text(json.dumps(v2), encoding="utf-8")
+
+        c = self._controller()
+        self.assertEqual(c.position_book.symbols(), ["KRW-XRP"])
+        self.assertEqual(c.runtime_state["state"], c.STATE_IN_POSITION)
+        self.assertEqual(c.runtime_state["position_qty"], 3.0)
+
+        snap = read_journaled_state(c.runtime_state_path)
+        self.assertEqual(snap[SCHEMA_VERSION_FIELD], 3)
+        self.assertEqual(snap["primary"], "KRW-XRP")
+        self.assertEqual(snap["positions"]["KRW-XRP"]["position_qty"], 3.0)
+        # Top-level mirror keeps single-position readers working.
+        self.assertEqual(snap["state"], "IN_POSITION")
+
+    def test_concurrent_positions_and_capacity(self):
+        c = self._controller(max_positions=2)
+        self.assertTrue(self._enter(c, "KRW-XRP"))
+        self.assertTrue(self._enter(c, "KRW-ETH"))
+        self.assertIsNone(self._enter(c, "KRW-SOL"))
+        self.assertEqual(self.engine.entries, ["KRW-XRP", "KRW-ETH"])
+        self.assertEqual(sorted(c.position_book.open_symbols()), ["KRW-ETH", "KRW-XRP"])
+
+        # Each slot has its own state machine, position id and idempotency key.
+        xrp = c.position_book.slot("KRW-XRP")
+        eth = c.position_book.slot("KRW-ETH")
+        self.assertEqual((xrp["state"], eth["state"]), (c.STATE_IN_POSITION, c.STATE_IN_POSITION))
+        self.assertNotEqual(xrp["position_id"], eth["position_id"])
+        self.assertEqual(len(xrp["active_keys"]), 1)
+        self.assertEqual(len(eth["active_keys"]), 1)
+        self.assertIsNone(self._enter(c, "KRW-XRP"))  # already in position
+
+        # Equal capital shares reserved through the ledger.
+        self.assertEqual(self.ledger.allocations, {"KRW-XRP": 50000.0, "KRW-ETH": 50000.0})
+        self.assertEqual(xrp["allocated_krw"], 50000.0)
+
+        res = c.process_exit_signal(symbol="KRW-XRP", qty="ALL", reason="test")
+        self.assertTrue(res and res.get("ok"))
+        self.assertEqual(xrp["state"], c.STATE_FLAT)
+        self.assertEqual(eth["state"], c.STATE_IN_POSITION)
+        self.assertNotIn("KRW-XRP", self.ledger.allocations)
+        self.assertEqual(c.position_book.primary, "KRW-ETH")
+
+        # Freed capacity admits a new symbol.
+        self.assertTrue(self._enter(c, "KRW-SOL"))
+        self.assertEqual(sorted(c.position_book.open_symbols()), ["KRW-ETH", "KRW-SOL"])
+
+    def test_recovery_restores_every_slot(self):
+        c = self._controller(max_positions=2)
+        self._enter(c, "KRW-XRP")
+        self._enter(c, "KRW-ETH")
+
+        recovered = self._controller(max_positions=2)
+        self.assertEqual(sorted(recovered.position_book.open_symbols()), ["KRW-ETH", "KRW-XRP"])
+        for symbol in ("KRW-XRP", "KRW-ETH"):
+            slot = recovered.position_book.slot(symbol)
+            self.assertEqual(slot["state"], recovered.STATE_IN_POSITION)
+            self.assertEqual(slot["position_qty"], 2.0)
+
+        recovered._write_runtime_status()
+        status_positions = json.loads(Path("results/runtime_status.json").read_text())["positions"]
+        self.assertEqual(sorted(p["symbol"] for p in status_positions), ["KRW-ETH", "KRW-XRP"])
+
+    def test_single_position_default_unchanged(self):
+        c = self._controller(max_positions=1)
+        self.assertTrue(self._enter(c, "KRW-XRP"))
+        self.assertIsNone(self._enter(c, "KRW-ETH"))
+        self.assertEqual(self.ledger.allocations, {})
+        self.assertEqual(c.runtime_state["symbol"], "KRW-XRP")
+
+
+if __name__ == "__main__":
+    unittest.main()
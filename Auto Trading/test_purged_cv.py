@@ -0,0 +1,73 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.oos_tuner import build_split_windows
+from modules.purged_cv import (
+    LeakageError,
+    assert_no_leakage,
+    combinatorial_purged_kfold,
+    derive_gap_bars,
+    find_leaks,
+    purged_kfold,
+)
+
+
+DATES = pd.date_range("2025-01-01", periods=300, freq="D")
+
+
+class TestPurgedCV(unittest.TestCase):
+    def test_derived_gaps(self):
+        purge, embargo = derive_gap_bars({"time_stop_days_A": 3, "max_hold_days_B": 5, "trend_ma_slow_B": 60})
+        self.assertEqual(purge, 6)
+        self.assertEqual(embargo, 60)
+
+    def test_purged_kfold_gaps(self):
+        splits = purged_kfold(DATES, n_splits=5, purge_bars=6, embargo_bars=10)
+        self.assertEqual(len(splits), 5)
+        # Test folds tile the whole range exactly once.
+        all_test = np.sort(np.concatenate([s.test_idx for s in splits]))
+        np.testing.assert_array_equal(all_test, np.arange(len(DATES)))
+
+        mid = splits[2]
+        t0, t1 = mid.test_idx.min(), mid.test_idx.max()
+        train = set(mid.train_idx.tolist())
+        self.assertFalse(train & set(range(t0 - 6, t0)))  # purged
+        self.assertFalse(train & set(range(t1 + 1, t1 + 11)))  # embargoed
+        self.assertIn(t0 - 7, train)
+        self.assertIn(t1 + 11, train)
+        self.assertEqual(len(mid.train_ranges), 2)
+
+    def test_combinatorial_count(self):
+        splits = combinatorial_purged_kfold(DATES, n_groups=6, n_test_groups=2, params={})
+        self.assertEqual(len(splits), 15)
+        for s in splits:
+            self.assertFalse(set(s.train_idx.tolist()) & set(s.test_idx.tolist()))
+
+    def test_leakage_checker(self):
+        split = purged_kfold(DATES, n_splits=5, purge_bars=6, embargo_bars=10)[1]
+        test_start = split.test_ranges[0][0]
+        straddle = {"symbol": "KRW-XRP", "entry_date": test_start - pd.Timedelta(days=8), "exit_date": test_start + pd.Timedelta(days=1)}
+        clean = {"symbol": "KRW-ETH", "entry_date": test_start - pd.Timedelta(days=20), "exit_date": test_start - pd.Timedelta(days=15)}
+        self.assertEqual(len(find_leaks([straddle, clean], split)), 1)
+        self.assertTrue(assert_no_leakage([clean], [split]))
+        with self.assertRaises(LeakageError):
+            assert_no_leakage([straddle, clean], [split])
+
+    def test_split_windows_auto_embargo(self):
+        t = pd.Timestamp("2026-02-01")
+        w = build_split_windows(t, train_days=180, oos_days=28, embargo_days=2, params={"max_hold_days_B": 5})
+        self.assertEqual(w["embargo_days"], 6)
+        self.assertEqual(w["train_end"], w["oos_start"] - pd.Timedelta(days=7))
+        # Explicit larger embargo wins.
+        w = build_split_windows(t, embargo_days=10, params={"max_hold_days_B": 5})
+        self.assertEqual(w["embargo_days"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.capital_ledger import CapitalLedger
+from modules.reconciler import (
+    BALANCE_UNAVAILABLE,
+    MISSING_FILL,
+    ORPHAN_ORDER,
+    SIZE_MISMATCH,
+    STALE_PENDING,
+    UNKNOWN_POSITION,
+    FillCursor,
+    ReconciliationEngine,
+)
+from modules.run_controller import RunController
+
+
+def _trade(tid, ts, side="buy", amount=1.0, price=100.0):
+    return {"id": tid, "timestamp": ts, "side": side, "amount": amount, "price": price}
+
+
+class TestReconciliationEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReconciliationEngine()
+
+    def test_diff_kinds(self):
+        flat = {"state": "FLAT", "position_qty": 0.0}
+        held = {"state": "IN_POSITION", "position_qty": 5.0}
+        self.assertEqual(self.engine.diff_slot("KRW-XRP", held, [], 5.0), [])
+
+        [d] = self.engine.diff_slot("KRW-XRP", flat, [], 3.0)
+        self.assertEqual((d.kind, d.resolution), (UNKNOWN_POSITION, "adopt_exchange"))
+
+        [d] = self.engine.diff_slot("KRW-XRP", flat, [], 3.0, fills=[_trade("t1", 1, amount=3.0, price=200.0)])
+        self.assertEqual(d.kind, MISSING_FILL)
+        self.assertEqual(d.exchange["buy_vwap"], 200.0)
+
+        [d] = self.engine.diff_slot("KRW-XRP", held, [], 2.0)
+        self.assertEqual(d.kind, SIZE_MISMATCH)
+
+        [d] = self.engine.diff_slot("KRW-XRP", {"state": "EXIT_PENDING", "position_qty": 5.0}, [], 0.0)
+        self.assertEqual(d.kind, STALE_PENDING)
+
+        order = {"id": "o1", "symbol": "KRW-XRP", "side": "sell"}
+        diffs = self.engine.diff_slot("KRW-XRP", held, [order], 5.0)
+        self.assertEqual([d.kind for d in diffs], [ORPHAN_ORDER])
+        [d] = self.engine.diff_slot("KRW-XRP", {"state": "ENTRY_PENDING", "last_order_id": "o0"}, [order], 0.0)
+        self.assertEqual((d.kind, d.exchange["state"]), (ORPHAN_ORDER, "EXIT_PENDING"))
+        self.assertEqual(self.engine.diff_slot("KRW-XRP", {"state": "EXIT_PENDING", "last_order_id": "o1"}, [order], 5.0), [])
+
+        [d] = self.engine.untracked_orders([order, {"id": "o2", "symbol": "KRW-ETH"}], ["KRW-XRP"])
+        self.assertEqual((d.symbol, d.kind), ("KRW-ETH", ORPHAN_ORDER))
+
+    def test_policy_overrides(self):
+        engine = ReconciliationEngine(policy={ORPHAN_ORDER: "cancel", SIZE_MISMATCH: "report", STALE_PENDING: "cancel"})
+        self.assertEqual(engine.resolution_for(ORPHAN_ORDER), "cancel")
+        self.assertEqual(engine.resolution_for(SIZE_MISMATCH), "report")
+        self.assertEqual(engine.resolution_for(STALE_PENDING), "report")  # cancel only applies to orders
+        self.assertEqual(engine.resolution_for(UNKNOWN_POSITION), "adopt_exchange")
+
+    def test_fill_cursor_only_returns_new_fills(self):
+        api = MagicMock()
+        cursor = FillCursor(lookback_sec=60, clock=lambda: 1000.0)
+        api.fetch_my_trades.return_value = [_trade("a", 950_000), _trade("b", 960_000)]
+        self.assertEqual([t["id"] for t in cursor.poll(api, "XRP/KRW")], ["a", "b"])
+        self.assertEqual(api.fetch_my_trades.call_args.kwargs["since"], 940_000)
+
+        # Inclusive `since`: the boundary trade comes back and is dropped.
+        api.fetch_my_trades.return_value = [_trade("b", 960_000), _trade("c", 960_000), _trade("d", 970_000)]
+        self.assertEqual([t["id"] for t in cursor.poll(api, "XRP/KRW")], ["c", "d"])
+        self.assertEqual(api.fetch_my_trades.call_args.kwargs["since"], 960_000)
+        api.fetch_my_trades.return_value = [_trade("d", 970_000)]
+        self.assertEqual(cursor.poll(api, "XRP/KRW"), [])
+        self.assertEqual(cursor.fetches, 3)
+
+
+class TestControllerReconcile(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+        self.balances = {"KRW": 50000.0}
+        self.orders = []
+        self.adapter = MagicMock()
+        self.adapter.get_balances.side_effect = lambda: dict(self.balances)
+        self.adapter.get_open_orders.side_effect = lambda: list(self.orders)
+        self.adapter.client.fetch_my_trades.return_value = []
+        watch = MagicMock()
+        watch.current_regime = "NEUTRAL"
+        watch.last_btc_price = 0.0
+        watch.watchlist = []
+        self.controller = RunController(
+            self.adapter, CapitalLedger("UPBIT", 100000), watch, MagicMock(),
+            balance_staleness_sec={s: 0.0 for s in RunController.DEFAULT_BALANCE_STALENESS_SEC}, max_positions=3,
+        )
+        self.controller.status_shm_enabled = False
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _set(self, symbol, **fields):
+        with self.controller._position_slot(symbol):
+            self.controller.runtime_state.update(fields)
+
+    def _get(self, symbol):
+        with self.controller._position_slot(symbol):
+            return dict(self.controller.runtime_state)
+
+    def test_adopts_exchange_and_writes_audit(self):
+        self._set("KRW-XRP", state="IN_POSITION", position_qty=5.0, avg_entry_price=100.0)
+        self._set("KRW-ETH", state="FLAT", position_qty=0.0)
+        self.balances.update({"XRP": 0.0, "ETH": 2.0})
+        self.orders.append({"id": "x9", "symbol": "KRW-SOL", "side": "buy"})
+
+        report = self.controller.reconcile(context="periodic")
+        kinds = sorted((d["symbol"], d["kind"], d["action"]) for d in report["diffs"])
+        self.assertEqual(kinds, [
+            ("KRW-ETH", UNKNOWN_POSITION, "adopted"),
+            ("KRW-SOL", ORPHAN_ORDER, "reported"),
+            ("KRW-XRP", SIZE_MISMATCH, "adopted"),
+        ])
+        self.assertEqual(self._get("KRW-XRP")["state"], "FLAT")
+        self.assertEqual(self._get("KRW-XRP")["avg_entry_price"], 0.0)
+        self.assertEqual(self._get("KRW-ETH")["state"], "IN_POSITION")
+        self.assertEqual(self._get("KRW-ETH")["position_qty"], 2.0)
+
+        lines = Path("results/logs/reconcile_audit.jsonl").read_text().splitlines()
+        self.assertEqual(json.loads(lines[-1])["context"], "periodic")
+        self.assertEqual(self.controller._reconcile_status()["kinds"][ORPHAN_ORDER], 1)
+
+        # In sync: nothing to audit.
+        self.orders.clear()
+        self.controller.reconcile(context="periodic")
+        self.assertEqual(len(Path("results/logs/reconcile_audit.jsonl").read_text().splitlines()), 1)
+
+    def test_report_and_cancel_policies(self):
+        self.controller.reconciler = ReconciliationEngine(policy={SIZE_MISMATCH: "report", ORPHAN_ORDER: "cancel"})
+        self._set("KRW-XRP", state="IN_POSITION", position_qty=5.0)
+        self.balances["XRP"] = 4.0
+        self.orders.append({"id": "o7", "symbol": "KRW-XRP", "side": "sell"})
+        report = self.controller.reconcile()
+        self.assertEqual(sorted(d["action"] for d in report["diffs"]), ["cancelled", "reported"])
+        self.adapter.client.cancel_order.assert_called_once_with("o7", "XRP/KRW")
+        self.assertEqual(self._get("KRW-XRP")["position_qty"], 5.0)
+
+    def test_periodic_pass_skips_pending_and_is_throttled(self):
+        now = [1000.0]
+        self.controller._clock = lambda: now[0]
+        self._set("KRW-XRP", state="ENTRY_PENDING", position_qty=0.0)
+        self.balances["XRP"] = 3.0
+        self.controller._reconcile_periodic()
+        self.assertEqual(self.controller.last_reconcile_report["diffs"], [])
+        self.assertEqual(self._get("KRW-XRP")["state"], "ENTRY_PENDING")
+
+        # Failure paths still reconcile a pending slot straight away.
+        self.controller._reconcile_state_once(context="entry_fail", symbol_override="KRW-XRP")
+        self.assertEqual(self._get("KRW-XRP")["state"], "IN_POSITION")
+        self.assertEqual(self.controller.last_reconcile_report["diffs"][0]["kind"], STALE_PENDING)
+
+        calls = self.adapter.get_open_orders.call_count
+        now[0] += 30.0
+        self.controller._reconcile_periodic()
+        self.assertEqual(self.adapter.get_open_orders.call_count, calls)
+        now[0] += 31.0
+        self.controller._reconcile_periodic()
+        self.assertEqual(self.adapter.get_open_orders.call_count, calls + 1)
+
+    def test_failed_balance_read_leaves_positions_alone(self):
+        self._set("KRW-XRP", state="IN_POSITION", position_qty=5.0, avg_entry_price=100.0, position_id="p1")
+        self.adapter.get_balances.side_effect = RuntimeError("502 Bad Gateway")
+        self.adapter.client.fetch_balance.side_effect = RuntimeError("502 Bad Gateway")
+
+        report = self.controller.reconcile(context="periodic")
+        self.assertEqual(
+            [(d["kind"], d["resolution"], d["action"]) for d in report["diffs"]],
+            [(BALANCE_UNAVAILABLE, "report", "reported")],
+        )
+        slot = self._get("KRW-XRP")
+        self.assertEqual(
+            (slot["state"], slot["position_qty"], slot["avg_entry_price"], slot["position_id"]),
+            ("IN_POSITION", 5.0, 100.0, "p1"),
+        )
+        lines = Path("results/logs/reconcile_audit.jsonl").read_text().splitlines()
+        self.assertEqual(json.loads(lines[-1])["diffs"][0]["kind"], BALANCE_UNAVAILABLE)
+
+        # An empty map is no better than an exception.
+        self.adapter.get_balances.side_effect = lambda: {}
+        self.controller.reconcile(context="periodic")
+        self.assertEqual(self._get("KRW-XRP")["position_qty"], 5.0)
+
+    def test_lowering_a_position_needs_a_fresh_read(self):
+        now = [1000.0]
+        self.controller.balance_cache._clock = lambda: now[0]
+        self._set("KRW-XRP", state="IN_POSITION", position_qty=5.0)
+        self.balances["XRP"] = 5.0
+        self.assertEqual(self.controller._get_balance_map(max_age_sec=60.0)["XRP"], 5.0)
+
+        # The cached snapshot says 0 but is too old to drop the position on; the re-read fails.
+        self.controller.balance_cache._balances["XRP"] = 0.0
+        now[0] += 5.0
+        self.adapter.get_balances.side_effect = RuntimeError("timeout")
+        self.adapter.client.fetch_balance.side_effect = RuntimeError("timeout")
+        orders, balances = [], self.controller.balance_cache.get(60.0)
+        diffs, actions = self.controller._reconcile_slot("KRW-XRP", "periodic", orders, balances)
+        self.assertEqual([d.kind for d in diffs], [BALANCE_UNAVAILABLE])
+        self.assertEqual(self._get("KRW-XRP")["position_qty"], 5.0)
+
+        # A fresh successful read that confirms the sell is adopted.
+        self.balances["XRP"] = 0.0
+        self.adapter.get_balances.side_effect = lambda: dict(self.balances)
+        report = self.controller.reconcile(context="periodic")
+        self.assertEqual([d["action"] for d in report["diffs"]], ["adopted"])
+        self.assertEqual(self._get("KRW-XRP")["state"], "FLAT")
+
+
+if __name__ == "__main__":
+    unittest.main()
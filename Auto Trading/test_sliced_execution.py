@@ -0,0 +1,129 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.execution_engine import ExecutionEngine
+from modules.order_tracker import OrderTracker
+from modules.orderbook_replay import ReplayExchange
+from modules.sliced_execution import pov_slice_money, twap_slice_money
+
+T0 = 1_700_000_000.0
+
+
+def _books(n, asks, bid=499.0):
+    return [{"ts": T0 + i, "bids": [[bid, 1000.0]], "asks": [list(a) for a in asks]} for i in range(n)]
+
+
+class _TradingReplayExchange(ReplayExchange):
+    """Fake book that also prints `volume_per_sec` of market trades (for POV)."""
+
+    def __init__(self, books, volume_per_sec, **kw):
+        super().__init__(books, **kw)
+        self.volume_per_sec = volume_per_sec
+
+    def fetch_trades(self, symbol, since=None, limit=None):
+        since_s = (since or 0) / 1000.0
+        elapsed = max(0.0, self.clock() - since_s)
+        return [{"timestamp": int(self.clock() * 1000), "amount": self.volume_per_sec * elapsed, "price": 501.0}]
+
+
+class TestSlicedExecution(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        budget = MagicMock()
+        budget.get_available_for_bot.return_value = 1e9
+        budget.can_buy.return_value = (True, "OK")
+        self.engine = ExecutionEngine("t", self._tmp.name, budget)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self, exchange, **signal_kw):
+        self.engine.order_tracker = OrderTracker(clock=exchange.clock, sleep=exchange.clock.sleep)
+        signal = {"symbol": "KRW-XRP", "target_money": 50000.0, "ask_depth_sum": 1e9}
+        signal.update(signal_kw)
+        return self.engine.execute_entry(signal, {"price": 500.0, "balance": 1e9}, exchange_api=exchange)
+
+    def test_schedule_helpers(self):
+        self.assertEqual(twap_slice_money(30000.0, 3), 10000.0)
+        self.assertEqual(pov_slice_money(30000.0, market_volume=100.0, price=500.0, pov_rate=0.1), 5000.0)
+        self.assertEqual(pov_slice_money(3000.0, market_volume=100.0, price=500.0, pov_rate=0.1), 3000.0)
+
+    def test_twap_beats_walking_the_book(self):
+        thin = [[501.0, 40.0], [502.0, 40.0], [520.0, 1000.0]]
+        self.engine.entry_limit_offset_ticks = 20
+        self.engine.max_entry_slippage_pct = 0.05
+        single = self._run(ReplayExchange(_books(1, thin)))
+
+        exchange = ReplayExchange(_books(4, thin))
+        twap = self._run(exchange, exec_mode="TWAP", slices=4, slice_interval_sec=10.0)
+        self.assertTrue(twap["ok"])
+        self.assertEqual(twap["exec_mode"], "TWAP")
+        self.assertEqual(len(twap["slices"]), 4)
+        # Each 12.5k slice fits the top levels of a refreshed book.
+        self.assertLess(twap["real_vwap"], single["real_vwap"])
+        self.assertAlmostEqual(twap["real_qty"], sum(s["filled_qty"] for s in twap["slices"]))
+        self.assertAlmostEqual(exchange.clock() - T0, 30.0)  # slices on a 10s schedule
+
+    def test_unfilled_remainder_is_canceled_and_requoted(self):
+        exchange = ReplayExchange(_books(6, [[501.0, 10.0], [530.0, 1000.0]]))
+        self.engine.entry_limit_offset_ticks = 0
+        self.engine.max_entry_slippage_pct = 0.1  # first slice walks into the 530 level
+        res = self._run(exchange, exec_mode="TWAP", slices=3, slice_interval_sec=5.0)
+
+        orders = [exchange.fetch_order(s["order_id"]) for s in res["slices"]]
+        self.assertEqual([o["status"] for o in orders], ["canceled"] * 3)
+        self.assertEqual([s["filled_qty"] for s in res["slices"]], [10.0, 10.0, 10.0])
+        # Later slices carry the unfilled budget of earlier ones.
+        self.assertGreater(res["slices"][1]["slice_money"], res["slices"][0]["slice_money"])
+        self.assertGreater(res["unfilled_money"], 0.0)
+        self.assertAlmostEqual(res["real_qty"], 30.0)
+
+    def test_pov_sizes_slices_from_market_volume(self):
+        exchange = _TradingReplayExchange(_books(12, [[501.0, 1000.0]]), volume_per_sec=5.0)
+        res = self._run(exchange, exec_mode="POV", slices=4, slice_interval_sec=10.0, pov_rate=0.2)
+        sizes = [s["slice_money"] for s in res["slices"]]
+        # 0.2 x (5/s x 10s) x 501 per slice.
+        self.assertAlmostEqual(sizes[1], 0.2 * 50.0 * 501.0)
+        self.assertAlmostEqual(res["amount"] + res["fee"] + res["unfilled_money"], 50000.0, delta=200.0)
+
+    def test_first_slice_passes_the_slippage_gate(self):
+        exchange = ReplayExchange(_books(4, [[501.0, 10.0], [530.0, 1000.0]]))
+        res = self._run(exchange, exec_mode="TWAP", slices=3, slice_interval_sec=5.0)
+        self.assertFalse(res["ok"])
+        self.assertIn("SLIPPAGE_BLOCK", res["reason"])
+        self.assertEqual(exchange._orders, {})
+
+    def test_slices_are_driven_by_the_tracker_pump(self):
+        exchange = ReplayExchange(_books(4, [[501.0, 1000.0]]))
+        self.engine.order_tracker = OrderTracker(clock=exchange.clock, sleep=self.fail)
+        signal = {"symbol": "KRW-XRP", "target_money": 50000.0, "ask_depth_sum": 1e9,
+                  "exec_mode": "TWAP", "slices": 4, "slice_interval_sec": 10.0}
+        done = []
+        pending = self.engine.submit_entry(signal, {"price": 500.0, "balance": 1e9}, exchange_api=exchange, on_done=done.append)
+        self.assertNotIsInstance(pending, dict)
+        self.assertEqual(exchange.clock(), T0)  # first slice placed, nothing waited on
+        self.assertEqual(len(exchange._orders), 1)
+
+        while not done:
+            exchange.clock.sleep(1.0)
+            self.engine.order_tracker.poll_due()
+        self.assertTrue(done[0]["ok"])
+        self.assertEqual(len(done[0]["slices"]), 4)
+        self.assertAlmostEqual(exchange.clock() - T0, 30.0, delta=1.0)  # last fill seen on the next pump
+        self.assertTrue(self.engine.order_tracker.idle())
+
+    def test_price_runaway_stops_slicing(self):
+        books = _books(1, [[501.0, 40.0]]) + _books(3, [[530.0, 1000.0]], bid=529.0)
+        res = self._run(ReplayExchange(books), exec_mode="TWAP", slices=4, slice_interval_sec=1.0)
+        self.assertTrue(res["ok"])
+        self.assertIn("SLICE_PRICE_RUNAWAY", res["reason"])
+        self.assertEqual(len(res["slices"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,7 @@ class TestStage2(unittest.TestCase):
         self.notifier._send_telegram = MagicMock()
 
     def tearDown(self):
+        self.notifier.close()
         if self.test_dir.exists():
             shutil.rmtree(self.test_dir)
 
@@ -39,12 +40,14 @@ class TestStage2(unittest.TestCase):
 
         # 1. First Emit (Success)
         self.notifier.emit_event("SYSTEM", "ALL", "Hello", "World", dedupe_key=key, cooldown_min=1)
+        self.assertTrue(self.notifier.flush())
         self.assertEqual(len(self.notifier.outbox), 1)
         self.assertEqual(self.notifier.outbox[0]["status"], "filled")
         self.assertEqual(self.notifier._send_telegram.call_count, 1)
 
         # 2. Second Emit (Within cooldown) -> Ignored
         self.notifier.emit_event("SYSTEM", "ALL", "Hello", "Again", dedupe_key=key, cooldown_min=1)
+        self.assertTrue(self.notifier.flush())
         self.assertEqual(len(self.notifier.outbox), 1)
         self.assertEqual(self.notifier._send_telegram.call_count, 1)
 
@@ -55,6 +58,7 @@ class TestStage2(unittest.TestCase):
         self.notifier._send_telegram.side_effect = [Exception("Network Down"), None]
 
         self.notifier.emit_event("RISK", "UPBIT", "Crash", "Help")
+        self.assertTrue(self.notifier.flush())
         evt = self.notifier.outbox[0]
         self.assertEqual(evt["status"], "requested")
         self.assertEqual(evt["retry_count"], 1)
@@ -71,6 +75,7 @@ class TestStage2(unittest.TestCase):
     def test_file_persistence(self):
         """Verify reload from disk with schema wrapper and recovery"""
         self.notifier.emit_event("WATCH", "BITHUMB", "Eye", "See")
+        self.notifier.close()
 
         # Create new instance (simulate restart)
         new_notifier = TelegramNotifier(
@@ -85,8 +90,8 @@ class TestStage2(unittest.TestCase):
 
         # Confirm schema version is stored
         saved = json.loads((self.test_dir / "outbox_test.json").read_text(encoding="utf-8"))
-        self.assertEqual(saved.get("_schema_version"), 2)
-        self.assertIn("events", saved)
+        self.assertEqual(saved.get("_schema_version"), 3)
+        self.assertEqual([v["message"] for k, v in saved.items() if k.startswith("evt:")], ["See"])
 
     def test_legacy_outbox_compat(self):
         """Verify legacy list-form outbox loads with migration."""
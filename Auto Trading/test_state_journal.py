@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.capital_ledger import CapitalLedger
+from modules.run_controller import RunController
+from modules.state_journal import JOURNAL_SEQ_FIELD, StateJournal, read_journaled_state
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestStateJournal(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "state.json"
+        self.clock = _Clock()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _journal(self, **kw):
+        kw.setdefault("compact_every", 1000)
+        kw.setdefault("compact_interval_sec", 1e9)
+        return StateJournal(self.path, schema_version=2, clock=self.clock, **kw)
+
+    def test_group_commit_and_replay(self):
+        j = self._journal(group_commit_sec=1.0)
+        j.load(default={})
+        for i in range(20):
+            j.append({"tick": i, "state": "FLAT", "keys": {"a": i % 3}})
+            self.clock.t += 0.25
+        # 20 records, one fsync per elapsed second instead of one per write.
+        self.assertEqual(j.appends, 20)
+        self.assertLessEqual(j.fsyncs, 5)
+        self.assertFalse(self.path.exists())  # no snapshot yet; journal only
+
+        state = self._journal().load(default={})
+        self.assertEqual(state, {"tick": 19, "state": "FLAT", "keys": {"a": 1}})
+        self.assertEqual(read_journaled_state(self.path), state)
+
+    def test_unchanged_state_is_not_journaled(self):
+        j = self._journal()
+        j.load(default={})
+        j.append({"a": 1})
+        j.append({"a": 1})
+        self.assertEqual(j.appends, 1)
+
+    def test_nested_keys_journal_only_changed_subrecords(self):
+        j = self._journal(nested=("positions",))
+        j.load(default={})
+        slot = {"state": "FLAT", "qty": 0.0, "keys": {"k" + str(i): i for i in range(50)}}
+        j.append({"primary": "A", "positions": {"A": dict(slot), "B": dict(slot)}})
+        size = self.path.with_suffix(".json.journal").stat().st_size
+        j.append({"primary": "A", "positions": {"A": {**slot, "qty": 1.0}, "B": dict(slot)}})
+        grown = self.path.with_suffix(".json.journal").stat().st_size - size
+        self.assertLess(grown, size * 0.6)  # slot A only, not the whole book
+        j.append({"primary": "A", "positions": {"A": {**slot, "qty": 1.0}}})
+
+        expected = {"primary": "A", "positions": {"A": {**slot, "qty": 1.0}}}
+        self.assertEqual(self._journal().load(default={}), expected)
+        j.compact()
+        compacted = read_journaled_state(self.path)
+        compacted.pop("_schema_version", None)
+        self.assertEqual(compacted, expected)
+
+    def test_durable_append_fsyncs_immediately(self):
+        j = self._journal(group_commit_sec=60.0)
+        j.load(default={})
+        j.append({"state": "FLAT"})
+        self.assertEqual(j.fsyncs, 0)
+        j.append({"state": "ENTRY_PENDING"}, durable=True)
+        self.assertEqual(j.fsyncs, 1)
+
+    def test_torn_tail_is_dropped(self):
+        j = self._journal()
+        j.load(default={})
+        j.append({"state": "FLAT", "qty": 0.0})
+        j.append({"state": "IN_POSITION", "qty": 1.5})
+        j.commit()
+        size = j.journal_path.stat().st_size
+        with open(j.journal_path, "ab") as f:
+            f.write(b"\x00\x00\x01\x00\xde\xad")  # half-written header + body
+
+        j2 = self._journal()
+        self.assertEqual(j2.load(default={}), {"state": "IN_POSITION", "qty": 1.5})
+        self.assertEqual(j2.journal_path.stat().st_size, size)
+        j2.append({"state": "FLAT", "qty": 0.0})
+        self.assertEqual(read_journaled_state(self.path)["state"], "FLAT")
+
+    def test_corrupt_record_stops_replay(self):
+        j = self._journal()
+        j.load(default={})
+        j.append({"v": 1})
+        j.append({"v": 2})
+        raw = bytearray(j.journal_path.read_bytes())
+        raw[-2] ^= 0xFF  # flip a payload byte of the last record -> crc mismatch
+        j.journal_path.write_bytes(bytes(raw))
+        self.assertEqual(self._journal().load(default={}), {"v": 1})
+
+    def test_compaction(self):
+        j = self._journal(compact_every=3)
+        j.load(default={})
+        for i in range(7):
+            j.append({"i": i}, durable=True)
+        self.assertEqual(j.compactions, 2)
+        snap = json.loads(self.path.read_text(encoding="utf-8"))
+        self.assertEqual(snap["i"], 5)
+        self.assertEqual(snap[JOURNAL_SEQ_FIELD], 6)
+        self.assertEqual(read_journaled_state(self.path)["i"], 6)
+        j.close()
+        self.assertEqual(j.journal_path.stat().st_size, 0)
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8"))["i"], 6)
+
+
+class TestRunControllerJournal(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+        self.adapter = MagicMock()
+        self.adapter.get_balances.return_value = {"KRW": 100000.0}
+        self.ledger = MagicMock(spec=CapitalLedger)
+        self.ledger.get_state.return_value = {"baseline_seed": 100000, "equity": 100000, "roi_pct": 0.0}
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _controller(self):
+        return RunController(self.adapter, self.ledger, MagicMock(), MagicMock(), mode="PAPER")
+
+    def test_ticks_group_commit_and_pending_is_durable(self):
+        c = self._controller()
+        for _ in range(30):
+            c.check_risk_limits()
+        # Each tick journals daily risk state; none of them forces an fsync.
+        self.assertGreaterEqual(c.daily_journal.appends, 30)
+        self.assertLessEqual(c.daily_journal.fsyncs, 1)
+
+        before = c.runtime_journal.fsyncs
+        self.assertTrue(c._transition_state(c.STATE_ENTRY_PENDING, reason="test"))
+        self.assertEqual(c.runtime_journal.fsyncs, before + 1)
+        self.assertEqual(read_journaled_state(c.runtime_state_path)["state"], c.STATE_ENTRY_PENDING)
+
+        c.runtime_state["position_qty"] = 2.0
+        c._transition_state(c.STATE_IN_POSITION, reason="entry_filled:test")
+        # A fresh controller recovers the journaled state (no compaction happened).
+        recovered = self._controller()
+        self.assertEqual(recovered.runtime_state["state"], c.STATE_IN_POSITION)
+        self.assertEqual(recovered.runtime_state["position_qty"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
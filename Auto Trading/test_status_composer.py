@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.status_composer import StatusComposer
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStatusComposer(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "labs_status.json"
+        self.clock = _Clock()
+        self.composer = StatusComposer(clock=self.clock)
+        self.reads = 0
+
+    def _read(self):
+        self.reads += 1
+        return json.loads(self.path.read_text())
+
+    def _write(self, data, bump_ns):
+        self.path.write_text(json.dumps(data))
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+    def test_ttl_and_file_stamp_invalidation(self):
+        self._write({"stage": "idle"}, 0)
+        sec = self.composer.section("labs", self._read, ttl=1.0, sources=[self.path])
+        self.assertEqual(sec.get(), {"stage": "idle"})
+        self.clock.now += 0.5
+        sec.get()
+        self.clock.now += 5.0  # TTL expired, file unchanged: stat only
+        sec.get()
+        self.assertEqual(self.reads, 1)
+
+        self._write({"stage": "tuning"}, 1_000_000)
+        self.assertEqual(sec.get(), {"stage": "idle"})  # still within the TTL of the last check
+        self.clock.now += 1.0
+        self.assertEqual(sec.get(), {"stage": "tuning"})
+        self.assertEqual(sec.get(max_age=0), {"stage": "tuning"})
+
+        t = self.composer.timings()["labs"]
+        self.assertEqual((t["builds"], t["hits"], t["revalidated"]), (2, 2, 2))
+
+        self.path.unlink()  # a failing build keeps the last good value
+        self.clock.now += 1.0
+        self.assertEqual(sec.get(), {"stage": "tuning"})
+        self.assertEqual(self.composer.timings()["labs"]["errors"], 1)
+
+    def test_sections_without_sources_rebuild_per_ttl(self):
+        values = iter(range(100))
+        sec = self.composer.section("runtime", lambda: next(values), ttl=0.25)
+        self.assertEqual([sec.get(), sec.get()], [0, 0])
+        self.clock.now += 0.25
+        self.assertEqual(sec.get(), 1)
+        self.composer.invalidate("runtime")
+        self.assertEqual(sec.get(), 2)
+
+    def test_concurrent_callers_share_one_build(self):
+        composer = StatusComposer()
+        builds = []
+
+        def _slow_build(tag):
+            builds.append(tag)
+            time.sleep(0.05)
+            return {"tag": tag}
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def _client(i):
+            barrier.wait()
+            results.append(composer.memo("status", lambda: _slow_build(i), ttl=1.0).get())
+
+        threads = [threading.Thread(target=_client, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+        self.assertEqual(composer.timings()["status"]["hits"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules import status_shm
+from modules.capital_ledger import CapitalLedger
+from modules.run_controller import RunController
+from modules.status_shm import (
+    StatusChannel,
+    StatusReader,
+    _SEQ,
+    _SEQ_OFFSET,
+    read_runtime_status,
+    segment_name_for,
+)
+
+
+class TestStatusChannel(unittest.TestCase):
+    def setUp(self):
+        self.name = f"at_test_{uuid.uuid4().hex[:10]}"
+        self.channel = StatusChannel(self.name)
+        self.reader = StatusReader(self.name)
+        self.addCleanup(self.channel.close)
+        self.addCleanup(self.reader.close)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.reader.read())  # nothing published yet
+        self.channel.publish({"ts": time.time(), "status": "RUNNING", "symbol": "KRW-XRP", "equity": 123.5, "last_tick_ts": None, "last_error": "x" * 500})
+        snap = self.reader.read()
+        self.assertEqual(snap["status"], "RUNNING")
+        self.assertEqual(snap["symbol"], "KRW-XRP")
+        self.assertEqual(snap["equity"], 123.5)
+        self.assertIsNone(snap["last_tick_ts"])
+        self.assertEqual(len(snap["last_error"]), 160)
+        self.assertEqual(snap["heartbeat"], 1)
+
+    @unittest.skipUnless(os.name == "posix", "resource tracker is posix-only")
+    def test_in_process_reader_keeps_writer_registration(self):
+        # The tracker holds one registration per name; dropping it here would make
+        # the writer's unlink fail and leak the segment after a crash.
+        with patch.object(status_shm.resource_tracker, "unregister") as unregister:
+            self.assertIsNone(self.reader.read())
+        unregister.assert_not_called()
+
+    def test_reader_never_sees_torn_writes(self):
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                self.channel.publish({"ts": time.time(), "equity": float(i), "pnl_pct": float(i), "symbol": f"S{i}"})
+
+        t = threading.Thread(target=writer)
+        t.start()
+        try:
+            seen = 0
+            deadline = time.time() + 0.5
+            while time.time() < deadline:
+                snap = self.reader.read()
+                if snap is None:
+                    continue
+                self.assertEqual(snap["equity"], snap["pnl_pct"])
+                self.assertEqual(snap["symbol"], f"S{int(snap['equity'])}")
+                seen += 1
+        finally:
+            stop.set()
+            t.join()
+        self.assertGreater(seen, 100)
+
+    def test_odd_sequence_means_write_in_progress(self):
+        self.channel.publish({"ts": time.time(), "status": "RUNNING"})
+        self.assertEqual(self.reader.read()["status"], "RUNNING")
+        seq = _SEQ.unpack_from(self.channel._shm.buf, _SEQ_OFFSET)[0]
+        _SEQ.pack_into(self.channel._shm.buf, _SEQ_OFFSET, seq + 1)
+        self.assertIsNone(self.reader._read_once(max_spins=10))
+        self.assertEqual(self.reader.retries, 10)
+        # The next publish recovers from a writer that died mid-update.
+        self.channel.publish({"ts": time.time(), "status": "STOPPED"})
+        self.assertEqual(self.reader.read()["status"], "STOPPED")
+
+
+class TestRuntimeStatusPublishing(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        Path("results/locks").mkdir(parents=True)
+        adapter = MagicMock()
+        adapter.get_balances.return_value = {"KRW": 50000.0}
+        adapter.get_open_orders.return_value = []
+        watch = MagicMock()
+        watch.current_regime = "NEUTRAL"
+        watch.last_btc_price = 0.0
+        watch.watchlist = []
+        self.controller = RunController(adapter, CapitalLedger("UPBIT", 100000), watch, MagicMock())
+        self.addCleanup(self.controller._close_status_channel)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_json_is_low_frequency_fallback(self):
+        path = Path("results/runtime_status.json")
+        self.controller.running = True
+        self.controller._write_runtime_status()
+        first = json.loads(path.read_text())
+        for _ in range(5):
+            self.controller._write_runtime_status()
+        self.assertEqual(json.loads(path.read_text())["ts"], first["ts"])
+        self.assertEqual(self.controller._status_channel.writes, 6)
+
+        status = read_runtime_status(path)
+        self.assertEqual(status["source"], "shm")
+        self.assertEqual(status["status"], "RUNNING")
+        self.assertEqual(status["state"], "FLAT")
+        self.assertEqual(status["krw_balance"], 50000.0)
+        self.assertGreater(status["ts"], first["ts"])
+        self.assertIn("virtual_capital", status)  # JSON-only fields still merged in
+
+        # A status change is written through immediately.
+        self.controller.running = False
+        self.controller._write_runtime_status()
+        self.assertEqual(json.loads(path.read_text())["status"], "STOPPED")
+
+    def test_json_only_when_shm_unavailable(self):
+        self.controller._close_status_channel()
+        self.controller.status_shm_enabled = False
+        path = Path("results/runtime_status.json")
+        self.controller._write_runtime_status()
+        ts1 = json.loads(path.read_text())["ts"]
+        self.controller._write_runtime_status()
+        self.assertGreater(json.loads(path.read_text())["ts"], ts1)
+        self.assertEqual(segment_name_for(path), segment_name_for(path.resolve()))
+
+
+if __name__ == "__main__":
+    unittest.main()
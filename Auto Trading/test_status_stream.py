@@ -0,0 +1,141 @@
+import http.client
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.status_stream import StatusBroadcaster, apply_merge_patch, merge_patch
+
+
+def _status(equity=1.0, state="FLAT", tick=0):
+    return {
+        "backend": {"ok": True, "pid": 1, "uptime_sec": float(tick), "last_heartbeat": 1000.0 + tick},
+        "runtime": {"ts": 1000.0 + tick, "heartbeat": tick, "equity": equity},
+        "runtime_state": {"state": state, "symbol": "KRW-XRP"},
+        "runtime_age_sec": 0.1 * tick,
+        "watchlist_ranked": [{"symbol": "KRW-XRP", "score": 1.0}],
+    }
+
+
+class TestStatusBroadcaster(unittest.TestCase):
+    def test_merge_patch_round_trip(self):
+        old = {"a": 1, "b": {"c": 2, "d": 3}, "e": [1, 2], "gone": True}
+        new = {"a": 1, "b": {"c": 5, "d": 3}, "e": [1, 2, 3], "f": {"g": 1}}
+        patch = merge_patch(old, new)
+        self.assertEqual(patch, {"b": {"c": 5}, "e": [1, 2, 3], "f": {"g": 1}, "gone": None})
+        self.assertEqual(apply_merge_patch(old, patch), new)
+        self.assertIsNone(merge_patch(new, json.loads(json.dumps(new))))
+
+    def test_only_changed_fields_are_queued(self):
+        hub = StatusBroadcaster()
+        client = hub.subscribe()
+        hub.publish(_status(tick=0))
+        kind, _, snap = client.next_event(timeout=0.1)
+        self.assertEqual(kind, "snapshot")
+        self.assertNotIn("uptime_sec", snap["backend"])
+
+        for tick in range(1, 5):
+            self.assertIsNone(hub.publish(_status(tick=tick)))  # heartbeat-only churn
+        self.assertIsNone(client.next_event(timeout=0.05))
+
+        hub.publish(_status(equity=2.0, state="IN_POSITION", tick=6))
+        kind, seq, patch = client.next_event(timeout=0.1)
+        self.assertEqual((kind, seq), ("patch", 1))
+        self.assertEqual(patch, {"runtime": {"equity": 2.0}, "runtime_state": {"state": "IN_POSITION"}})
+        self.assertEqual(apply_merge_patch(snap, patch), hub._snapshot)
+
+    def test_slow_client_drops_to_latest_snapshot(self):
+        hub = StatusBroadcaster(max_queue=4)
+        slow = hub.subscribe()
+        fast = hub.subscribe()
+        hub.publish(_status(equity=0.0))
+        self.assertEqual(slow.next_event(0.1)[0], "snapshot")
+        self.assertEqual(fast.next_event(0.1)[0], "snapshot")
+        for i in range(1, 11):
+            hub.publish(_status(equity=float(i)))
+            self.assertEqual(fast.next_event(0.1)[2], {"runtime": {"equity": float(i)}})
+        self.assertLessEqual(len(slow._events), 4)
+        kind, seq, snap = slow.next_event(0.1)
+        self.assertEqual((kind, seq), ("snapshot", 10))
+        self.assertEqual(snap["runtime"]["equity"], 10.0)
+        self.assertGreater(slow.dropped, 0)
+        hub.unsubscribe(slow)
+        hub.unsubscribe(fast)
+        self.assertEqual(hub.client_count(), 0)
+
+
+class TestStreamEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cwd = os.getcwd()
+        try:
+            import web_backend  # chdirs to the project root on import
+        finally:
+            os.chdir(cwd)
+        cls.wb = web_backend
+
+    def setUp(self):
+        self.hub = StatusBroadcaster(max_queue=8)
+        self._orig = (self.wb.STATUS_STREAM, self.wb.STREAM_HEARTBEAT_SEC)
+        self.wb.STATUS_STREAM = self.hub
+        self.wb.STREAM_HEARTBEAT_SEC = 0.2
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.wb.Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.wb.STATUS_STREAM, self.wb.STREAM_HEARTBEAT_SEC = self._orig
+
+    def _read_event(self, resp):
+        event = {}
+        while True:
+            line = resp.fp.readline().decode("utf-8")
+            if line == "":
+                raise EOFError
+            line = line.rstrip("\n")
+            if not line:
+                if event:
+                    return event
+                continue
+            field, _, value = line.partition(":")
+            event.setdefault(field or "comment", value.strip())
+
+    def test_stream_over_http(self):
+        self.hub.publish(_status(equity=1.0))
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        conn.request("GET", "/api/v1/stream")
+        resp = conn.getresponse()
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.getheader("Content-Type"), "text/event-stream")
+
+        self.assertEqual(self._read_event(resp), {"retry": "2000"})
+        event = self._read_event(resp)
+        self.assertEqual(event["event"], "snapshot")
+        state = json.loads(event["data"])
+
+        self.assertIn("heartbeat", self._read_event(resp)["comment"])  # idle stream
+
+        self.hub.publish(_status(equity=3.0, tick=9))
+        event = self._read_event(resp)
+        self.assertEqual((event["event"], event["id"]), ("patch", "1"))
+        state = apply_merge_patch(state, json.loads(event["data"]))
+        self.assertEqual(state["runtime"]["equity"], 3.0)
+
+        resp.close()
+        conn.close()
+        deadline = time.time() + 5
+        while self.hub.client_count() and time.time() < deadline:
+            self.hub.publish(_status(equity=time.time()))  # the next write notices the disconnect
+            time.sleep(0.05)
+        self.assertEqual(self.hub.client_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
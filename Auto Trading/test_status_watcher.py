@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.status_watcher import StatusFileWatcher
+
+try:
+    _cwd = os.getcwd()
+    import fastapi_backend
+except ImportError:  # fastapi not installed
+    fastapi_backend = None
+finally:
+    os.chdir(_cwd)
+
+
+def _replace(path, payload):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload))
+    os.replace(tmp, path)
+
+
+class TestStatusFileWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "runtime_status.json"
+
+    def _check(self, use_inotify):
+        watcher = StatusFileWatcher([self.path, Path(self._tmp.name) / "locks" / "bot.lock"], poll_sec=0.05, use_inotify=use_inotify)
+        self.addCleanup(watcher.close)
+        threading.Timer(0.1, _replace, args=(self.path, {"phase": "RUNNING"})).start()
+        start = time.monotonic()
+        self.assertEqual(watcher.wait(5.0), {self.path})
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual(watcher.wait(0.1), set())  # already reported
+
+        threading.Timer(0.1, watcher.wake).start()
+        start = time.monotonic()
+        self.assertEqual(watcher.wait(5.0), set())
+        self.assertLess(time.monotonic() - start, 2.0)
+
+        self.path.unlink()
+        self.assertEqual(watcher.wait(1.0), {self.path})
+        return watcher
+
+    def test_polling(self):
+        self.assertEqual(self._check(use_inotify=False).mode, "poll")
+
+    def test_inotify_when_available(self):
+        watcher = self._check(use_inotify=True)
+        if sys.platform.startswith("linux"):
+            self.assertEqual(watcher.mode, "inotify")
+
+
+class _FileBackedService:
+    def __init__(self, path):
+        self.path = path
+        self.extra = {}
+
+    def stream_status(self):
+        return {**json.loads(self.path.read_text()), **self.extra}
+
+
+@unittest.skipIf(fastapi_backend is None, "fastapi not installed")
+class TestStatusStreamPublisher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "runtime_status.json"
+        _replace(self.path, {"phase": "STOPPED", "running": False})
+        self.service = _FileBackedService(self.path)
+        # Long refresh: anything arriving quickly came from the watcher or poke().
+        self.pub = fastapi_backend.StatusStreamPublisher(self.service, paths=[self.path], refresh_sec=30.0)
+        self.addCleanup(self.pub.stop)
+
+    def test_file_change_and_poke_reach_subscribers(self):
+        a, b = self.pub.subscribe(), self.pub.subscribe()
+        for client in (a, b):
+            self.assertEqual(client.next_event(2.0)[0::2], ("snapshot", {"phase": "STOPPED", "running": False}))
+
+        _replace(self.path, {"phase": "RUNNING", "running": True})
+        for client in (a, b):
+            self.assertEqual(client.next_event(2.0)[0::2], ("patch", {"phase": "RUNNING", "running": True}))
+        self.assertEqual(self.pub.builds, 2)  # one build per change, shared by both clients
+
+        self.service.extra = {"pending": {"mode": "LIVE"}}
+        self.pub.poke()
+        self.assertEqual(a.next_event(2.0)[0::2], ("patch", {"pending": {"mode": "LIVE"}}))
+
+    def test_sse_endpoint(self):
+        async def _read(n):
+            with patch.object(fastapi_backend, "status_stream", self.pub):
+                response = await fastapi_backend.status_event_stream()
+                chunks = []
+                async for chunk in response.body_iterator:
+                    chunks.append(chunk)
+                    if len(chunks) == 2:
+                        _replace(self.path, {"phase": "RUNNING", "running": False})
+                    if len(chunks) == n:
+                        break
+                await response.body_iterator.aclose()
+            return chunks
+
+        chunks = asyncio.run(_read(3))
+        self.assertEqual(chunks[0], b"retry: 2000\n\n")
+        self.assertTrue(chunks[1].startswith(b"event: snapshot\n"))
+        self.assertIn(b'data: {"phase":"RUNNING"}', chunks[2])
+        self.assertEqual(self.pub.broadcaster.client_count(), 0)
+
+    def test_many_subscribers_share_the_loop(self):
+        n = 50  # more than anyio's default 40 threadpool workers
+
+        async def _read(client_id, ready):
+            response = await fastapi_backend.status_event_stream()
+            chunks = []
+            async for chunk in response.body_iterator:
+                chunks.append(chunk)
+                if len(chunks) == 2:
+                    ready.append(client_id)
+                if len(chunks) == 3:
+                    break
+            await response.body_iterator.aclose()
+            return chunks
+
+        async def _run():
+            ready = []
+            with patch.object(fastapi_backend, "status_stream", self.pub), patch.object(
+                fastapi_backend, "run_in_threadpool", side_effect=AssertionError("stream used a worker thread")
+            ):
+                tasks = [asyncio.create_task(_read(i, ready)) for i in range(n)]
+                while len(ready) < n:
+                    await asyncio.sleep(0.01)
+                _replace(self.path, {"phase": "RUNNING", "running": True})
+                return await asyncio.wait_for(asyncio.gather(*tasks), 10.0)
+
+        results = asyncio.run(_run())
+        self.assertEqual(len(results), n)
+        for chunks in results:
+            self.assertIn(b'data: {"phase":"RUNNING","running":true}', chunks[2])
+        self.assertEqual(self.pub.broadcaster.client_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules.notifier_telegram import TelegramNotifier
+from modules.state_journal import read_journaled_state
+
+
+class _StubTelegram(BaseHTTPRequestHandler):
+    """POST /bot<token>/sendMessage; replies 429 while `rate_limited` > 0, sleeps `delay` seconds."""
+
+    def do_POST(self):
+        srv = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        text = parse_qs(body).get("text", [""])[0]
+        time.sleep(srv.delay)
+        with srv.lock:
+            if srv.rate_limited > 0:
+                srv.rate_limited -= 1
+                srv.rejected += 1
+                status, payload = 429, {"ok": False, "parameters": {"retry_after": srv.retry_after}}
+            else:
+                srv.texts.append(text)
+                status, payload = 200, {"ok": True}
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def _wait(pred, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTelegramOutboxWorker(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubTelegram)
+        self.server.lock = threading.Lock()
+        self.server.texts = []
+        self.server.delay = 0.0
+        self.server.rate_limited = 0
+        self.server.rejected = 0
+        self.server.retry_after = 0.3
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.notifiers = []
+
+    def tearDown(self):
+        for n in self.notifiers:
+            n.close()
+
+    def _make(self, **kwargs):
+        kwargs.setdefault("min_send_interval_sec", 0.3)
+        n = TelegramNotifier(
+            bot_token="TEST",
+            chat_id="1",
+            storage_dir=self._tmp.name,
+            api_base=f"http://127.0.0.1:{self.server.server_address[1]}",
+            **kwargs,
+        )
+        self.notifiers.append(n)
+        return n
+
+    def _pending(self, n):
+        return [e for e in n.outbox if e["status"] in {n.STATUS_REQUESTED, n.STATUS_ACCEPTED}]
+
+    def test_burst_is_coalesced_under_rate_limit(self):
+        n = self._make()
+        n.emit_event("SYSTEM", "ALL", "first", "m0")
+        self.assertTrue(_wait(lambda: len(self.server.texts) == 1))
+        for i in range(1, 6):
+            n.emit_event("TRADE", "UPBIT", f"fill {i}", f"m{i}")
+        self.assertTrue(_wait(lambda: not self._pending(n)))
+
+        self.assertEqual(len(self.server.texts), 2)
+        self.assertTrue(self.server.texts[1].startswith("[OUTBOX] 5 events"))
+        for i in range(1, 6):
+            self.assertIn(f"m{i}", self.server.texts[1])
+        self.assertEqual((n.sends, n.coalesced), (2, 5))
+
+    def test_429_honours_retry_after_without_spending_retries(self):
+        self.server.rate_limited = 2
+        n = self._make(min_send_interval_sec=0.0)
+        start = time.time()
+        n.emit_event("RISK", "UPBIT", "Crash", "Help", severity="CRITICAL")
+        self.assertTrue(_wait(lambda: not self._pending(n)))
+
+        self.assertEqual(self.server.rejected, 2)
+        self.assertGreaterEqual(time.time() - start, 0.6)
+        evt = n.outbox[0]
+        self.assertEqual((evt["status"], evt["retry_count"]), (n.STATUS_FILLED, 0))
+
+    def test_emit_does_not_wait_for_slow_api(self):
+        self.server.delay = 0.5
+        n = self._make()
+        start = time.time()
+        for i in range(3):
+            n.emit_event("WATCH", "UPBIT", f"sig {i}", "x")
+        self.assertLess(time.time() - start, 0.2)
+        self.assertTrue(_wait(lambda: not self._pending(n)))
+
+    def test_emit_journals_before_the_worker_runs(self):
+        self.server.rate_limited = 100
+        self.server.retry_after = 60
+        n = self._make()
+        fsyncs = n._journal.fsyncs
+        n.emit_event("RISK", "UPBIT", "Crash", "Help", severity="CRITICAL")
+        # Already on disk (and fsynced) when emit_event returns: a crash now keeps it.
+        self.assertGreater(n._journal.fsyncs, fsyncs)
+        state = read_journaled_state(n.file_path)
+        events = [v for k, v in state.items() if k.startswith(n.EVENT_KEY_PREFIX)]
+        self.assertEqual([e["message"] for e in events], ["Help"])
+
+    def test_compaction_drops_acked_and_keeps_pending(self):
+        n = self._make(min_send_interval_sec=0.0)
+        n.emit_event("SYSTEM", "ALL", "sent", "old", dedupe_key="k-sent", cooldown_min=5)
+        self.assertTrue(n.flush())
+        self.assertEqual(n.outbox[0]["status"], n.STATUS_FILLED)
+        n.outbox[0]["acked_ts"] = time.time() - n.ACKED_RETENTION_SECONDS - 1
+
+        self.server.rate_limited = 100
+        self.server.retry_after = 60
+        n.emit_event("SYSTEM", "ALL", "stuck", "pending")
+        self.assertTrue(_wait(lambda: self.server.rejected >= 1))
+        n.close()
+
+        snapshot = json.loads(n.file_path.read_text())
+        events = [v for k, v in snapshot.items() if k.startswith(n.EVENT_KEY_PREFIX)]
+        self.assertEqual([e["message"] for e in events], ["pending"])
+        self.assertIn("k-sent", snapshot["dedupe"])
+        self.assertEqual(Path(str(n.file_path) + ".journal").read_text().strip(), "")
+
+        again = self._make()
+        self.assertEqual([e["message"] for e in self._pending(again)], ["pending"])
+        again.emit_event("SYSTEM", "ALL", "sent", "dup", dedupe_key="k-sent", cooldown_min=5)
+        self.assertEqual(len(again.outbox), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import json
+import subprocess
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from modules import oos_tuner
+from modules.model_manager import ModelManager
+from modules.oos_tuner import CandidateSampler, generate_candidates
+from modules.tuning_checkpoint import TuningCheckpoint
+from modules.tuning_worker import TuningWorker, run_weekly_tuning_once
+from test_oos_pipeline import _make_df
+
+HERE = Path(__file__).resolve().parent
+N_TRIALS = 6
+CRASH_AFTER = 3
+
+BASE_PARAMS = {
+    "enable_strategy_A": True,
+    "enable_strategy_B": True,
+    "trigger_vol_A": 2.0,
+    "breakout_days_A": 7,
+    "trend_ma_fast_B": 20,
+    "trend_ma_slow_B": 60,
+    "rsi_entry_B": 45,
+    "min_turnover_krw": 0,
+    "universe_top_n": 0,
+    "time_stop_days_A": 3,
+    "max_hold_days_B": 5,
+}
+SETTINGS = {"tuning_trials": N_TRIALS, "tuning_seed": 42, "tuning_oos_min_trades": 0}
+
+
+def _worker(root):
+    root = Path(root)
+    return TuningWorker(
+        state_path=root / "labs" / "trainer_state.json",
+        lock_path=root / "locks" / "trainer.lock",
+        cooldown_minutes_on_boot=0,
+    )
+
+
+def _run_session(root, crash_after=None):
+    """One weekly tuning run; with crash_after, the process dies hard mid-search."""
+    if crash_after is not None:
+        real_eval = oos_tuner.evaluate_params
+        calls = {"n": 0}
+
+        def _eval(*args, **kwargs):
+            if calls["n"] >= crash_after:
+                import os
+                os._exit(137)
+            calls["n"] += 1
+            return real_eval(*args, **kwargs)
+
+        oos_tuner.evaluate_params = _eval
+    raw = {"UPBIT_KRW-ETH": _make_df(days=280, seed=11)}
+    mm = ModelManager(base_dir=Path(root) / "models")
+    return run_weekly_tuning_once(_worker(root), raw, BASE_PARAMS, mm, SETTINGS, universe=list(raw))
+
+
+def _session(root):
+    return json.loads((Path(root) / "labs" / "trainer_session.json").read_text(encoding="utf-8"))
+
+
+class TestTuningCheckpoint(unittest.TestCase):
+    def test_sampler_state_roundtrip(self):
+        ref = list(generate_candidates(BASE_PARAMS, n_trials=8, seed=3))
+        s = CandidateSampler(BASE_PARAMS, n_trials=8, seed=3)
+        head = [s.next() for _ in range(3)]
+        state = json.loads(json.dumps(s.get_state()))
+        resumed = CandidateSampler(BASE_PARAMS, n_trials=8, seed=3)
+        resumed.set_state(state)
+        tail = []
+        while (c := resumed.next()) is not None:
+            tail.append(c)
+        self.assertEqual(head + tail, ref)
+
+    def test_crash_resume_matches_uninterrupted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            clean_root = Path(tmp) / "clean"
+            crash_root = Path(tmp) / "crash"
+
+            clean = _run_session(clean_root)
+            self.assertTrue(clean["ok"])
+            self.assertFalse(clean["resumed"])
+
+            code = (
+                "import sys; sys.path.insert(0, %r)\n"
+                "import test_tuning_checkpoint as t\n"
+                "t._run_session(%r, crash_after=%d)\n"
+            ) % (str(HERE), str(crash_root), CRASH_AFTER)
+            proc = subprocess.run([sys.executable, "-c", code], cwd=str(HERE), timeout=300)
+            self.assertEqual(proc.returncode, 137)
+
+            # Killed worker leaves an orphaned lock and a running session behind.
+            self.assertTrue((crash_root / "locks" / "trainer.lock").exists())
+            worker = _worker(crash_root)
+            pending = worker.checkpoint.pending()
+            self.assertIsNotNone(pending)
+            self.assertEqual(pending["trials_done"], CRASH_AFTER)
+
+            # Not due by schedule, but the interrupted session still resumes.
+            worker.state_path.write_text(
+                json.dumps({"next_due_at": (datetime.now() + timedelta(days=3)).isoformat()}),
+                encoding="utf-8",
+            )
+            resumed = _run_session(crash_root)
+            self.assertTrue(resumed["ok"])
+            self.assertTrue(resumed["resumed"])
+            self.assertEqual(resumed["result"]["resumed_trials"], CRASH_AFTER)
+            self.assertFalse((crash_root / "locks" / "trainer.lock").exists())
+
+            a, b = _session(clean_root), _session(crash_root)
+            self.assertEqual(a["status"], "complete")
+            self.assertEqual(b["status"], "complete")
+            self.assertEqual(len(b["leaderboard"]), N_TRIALS)
+            self.assertEqual(a["leaderboard"], b["leaderboard"])
+            self.assertIsNone(worker.checkpoint.pending())
+
+    def test_batched_search_saves_once_per_batch(self):
+        class _Evaluator:
+            n_workers = 4
+
+            def evaluate_many(self, raw_dfs, param_sets, start, end):
+                return [({"score": float(i), "mdd": 0.0, "trades": 0}, {"trade_list": []}) for i, _ in enumerate(param_sets)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = TuningCheckpoint(Path(tmp) / "session.json", owner="trainer")
+            writes = []
+            real_save = checkpoint.save
+            checkpoint.save = lambda *a, **kw: writes.append(kw.get("trials")) or real_save(*a, **kw)
+            raw = {"UPBIT_KRW-ETH": _make_df(days=60, seed=3)}
+            _, ranked = oos_tuner.find_best_candidate(
+                raw, BASE_PARAMS, "2025-12-10", "2026-02-01", n_trials=10, seed=1,
+                checkpoint=checkpoint, evaluator=_Evaluator(),
+            )
+            self.assertEqual(len(ranked), 10)
+            self.assertEqual(writes, [4, 4, 2])
+            self.assertEqual(json.loads(checkpoint.path.read_text(encoding="utf-8"))["trials_done"], 10)
+
+    def test_foreign_or_stale_session_is_not_resumed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            worker = _worker(tmp)
+            TuningCheckpoint(worker.checkpoint.path, owner="labs").save("fp-labs", {}, [], final=True)
+            self.assertIsNone(worker.checkpoint.pending())
+
+            worker.checkpoint.save("fp-old", {}, [], final=True)
+            self.assertIsNotNone(worker.checkpoint.pending())
+            self.assertIsNone(worker.checkpoint.pending("fp-new"))
+            worker.state_path.write_text(
+                json.dumps({"next_due_at": (datetime.now() + timedelta(days=3)).isoformat()}),
+                encoding="utf-8",
+            )
+            out = worker.run_if_due(lambda: self.fail("not due"), resume_fingerprint="fp-new")
+            self.assertEqual(out["skipped"], "not_due")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ import traceback
 from datetime import datetime, timedelta
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
+from urllib.parse import parse_qs
 import pandas as pd
 
 try:
@@ -27,9 +28,17 @@ from modules.watch_engine import WatchEngine
 from modules.run_controller import RunController
 from modules.notifier_telegram import TelegramNotifier
 from modules.model_manager import ModelManager
+from modules.state_journal import read_journaled_state
+from modules.status_shm import read_runtime_status
+from modules.incremental_watchlist import IncrementalWatchlist
+from modules import api_contract
+from modules.status_stream import StatusBroadcaster, format_sse
+from modules.status_composer import StatusComposer
+from modules.job_queue import JobCancelled, JobQueue
+from modules.tuning_checkpoint import TuningCheckpoint
+from modules.evaluation_service import EvaluationService
 from modules.oos_tuner import (
     build_split_windows,
-    evaluate_params,
     latest_data_timestamp,
     run_tuning_cycle,
     select_universe,
@@ -46,6 +55,7 @@ LABS_STATUS_PATH = LABS_DIR / "last_status.json"
 LABS_PENDING_LIVE_PATH = LABS_DIR / "pending_live_params.json"
 LABS_LAST_RESULT_PATH = LABS_DIR / "last_result.json"
 LABS_LAST_BASELINE_PATH = LABS_DIR / "last_baseline.json"
+LABS_SESSION_PATH = LABS_DIR / "labs_session.json"
 DATA_STATUS_PATH = LABS_DIR / "data_status.json"
 
 OPENCLAW_PANIC_EMERGENCY_DEBOUNCE_MIN = 5
@@ -55,6 +65,7 @@ DEFAULT_SETTINGS = {
     "exchange": "UPBIT",
     "seed_krw": 1000000,
     "capital_cap_krw": 1000000,
+    "live_max_positions": 1,
     "watchlist": ["KRW-BTC", "KRW-ETH"],
     "watch_refresh_sec": 60,
     "watch_score_min": 1.0,
@@ -80,9 +91,15 @@ DEFAULT_SETTINGS = {
     "tuning_train_days": 180,
     "tuning_oos_days": 28,
     "tuning_embargo_days": 2,
+    "tuning_auto_embargo": False,
     "tuning_oos_min_trades": 20,
     "tuning_mdd_cap": -0.15,
     "tuning_delta_min": 0.01,
+    "tuning_dsr_min": None,
+    "tuning_pbo_max": None,
+    "tuning_plateau_min": None,
+    "tuning_eval_workers": 1,
+    "tuning_stability_workers": None,
     "tuning_promotion_cooldown_hours": 24,
     "tuning_min_symbols_for_watchlist": 5,
     "tuning_watchlist_fallback_to_market": True,
@@ -1954,9 +1971,20 @@ INDEX_HTML = """<!doctype html>
       }
     }
 
-    async function refresh() {
-      try {
-        const data = await fetchJson("/api/status");
+    let lastPolledStatus = null;
+    let streamStatus = null;
+
+    function applyMergePatch(target, patch) {
+      if (patch === null || typeof patch !== "object" || Array.isArray(patch)) return patch;
+      const out = (target && typeof target === "object" && !Array.isArray(target)) ? Object.assign({}, target) : {};
+      for (const [key, value] of Object.entries(patch)) {
+        if (value === null) delete out[key];
+        else out[key] = applyMergePatch(out[key], value);
+      }
+      return out;
+    }
+
+    function renderStatus(data) {
         const b = data.backend || {};
         const r = data.runtime || {};
 
@@ -2049,15 +2077,40 @@ INDEX_HTML = """<!doctype html>
         if (data.data_status) {
           document.getElementById("dataStatus").textContent = JSON.stringify(data.data_status, null, 2);
         }
+        document.getElementById("debugLog").textContent = JSON.stringify(data, null, 2);
+    }
 
+    async function refresh() {
+      try {
+        lastPolledStatus = await fetchJson("/api/status");
+        renderStatus(lastPolledStatus);
         await refreshModelHistory(false);
         await refreshOrders();
-        document.getElementById("debugLog").textContent = JSON.stringify(data, null, 2);
       } catch (err) {
         document.getElementById("debugLog").textContent = "Status fetch failed.";
       }
     }
 
+    // Status changes are pushed over SSE; the slower poll keeps ages/uptime and side panels fresh.
+    function startStatusStream() {
+      if (!window.EventSource) return false;
+      const es = new EventSource("/api/v1/stream");
+      const render = () => {
+        try {
+          renderStatus(applyMergePatch(lastPolledStatus || {}, streamStatus));
+        } catch (err) {
+          document.getElementById("debugLog").textContent = "Status stream render failed.";
+        }
+      };
+      es.addEventListener("snapshot", (ev) => { streamStatus = JSON.parse(ev.data); render(); });
+      es.addEventListener("patch", (ev) => {
+        if (!streamStatus) return;
+        streamStatus = applyMergePatch(streamStatus, JSON.parse(ev.data));
+        render();
+      });
+      return true;
+    }
+
     applyWatchFilterButtons();
     updatePanicSliderLabel();
     loadSettings().then(refresh);
@@ -2072,7 +2125,7 @@ INDEX_HTML = """<!doctype html>
         if (bithumbEl.checked) upbitEl.checked = false;
       });
     })();
-    setInterval(refresh, 1000);
+    setInterval(refresh, startStatusStream() ? 5000 : 1000);
   </script>
 </body>
 </html>
@@ -2164,6 +2217,11 @@ def save_settings(data: dict):
     if "capital_cap_krw" in data:
         cap = int(data.get("capital_cap_krw", settings.get("capital_cap_krw", settings["seed_krw"])))
         settings["capital_cap_krw"] = max(0, cap)
+    if "live_max_positions" in data:
+        try:
+            settings["live_max_positions"] = max(1, min(20, int(data.get("live_max_positions") or 1)))
+        except Exception:
+            settings["live_max_positions"] = 1
 
     if "watchlist" in data:
         watchlist_raw = data.get("watchlist", "")
@@ -2212,12 +2270,21 @@ def save_settings(data: dict):
         settings["tuning_oos_days"] = int(data.get("tuning_oos_days", settings["tuning_oos_days"]))
     if "tuning_embargo_days" in data:
         settings["tuning_embargo_days"] = int(data.get("tuning_embargo_days", settings["tuning_embargo_days"]))
+    if "tuning_auto_embargo" in data:
+        settings["tuning_auto_embargo"] = bool(data.get("tuning_auto_embargo"))
     if "tuning_oos_min_trades" in data:
         settings["tuning_oos_min_trades"] = int(data.get("tuning_oos_min_trades", settings["tuning_oos_min_trades"]))
     if "tuning_mdd_cap" in data:
         settings["tuning_mdd_cap"] = min(0.0, float(data.get("tuning_mdd_cap", settings["tuning_mdd_cap"])))
     if "tuning_delta_min" in data:
         settings["tuning_delta_min"] = max(0.0, float(data.get("tuning_delta_min", settings["tuning_delta_min"])))
+    for key in ("tuning_dsr_min", "tuning_pbo_max", "tuning_plateau_min"):
+        if key in data:
+            raw = data.get(key)
+            settings[key] = None if raw in (None, "") else min(1.0, max(0.0, float(raw)))
+    if "tuning_stability_workers" in data:
+        raw = data.get("tuning_stability_workers")
+        settings["tuning_stability_workers"] = None if raw in (None, "") else max(1, int(raw))
     if "tuning_promotion_cooldown_hours" in data:
         settings["tuning_promotion_cooldown_hours"] = max(
             0,
@@ -2403,37 +2470,6 @@ def params_to_config(params: dict, base_cfg: dict):
     return cfg
 
 
-def _compute_sharpe(returns):
-    if not returns or len(returns) < 2:
-        return 0.0
-    import math
-    mean = sum(returns) / len(returns)
-    var = sum((x - mean) ** 2 for x in returns) / (len(returns) - 1)
-    std = math.sqrt(var)
-    if std == 0:
-        return 0.0
-    return (mean / std) * math.sqrt(len(returns))
-
-
-def _compute_metrics(res):
-    trades = res.get("trade_list", []) or []
-    returns = [t.get("return", 0.0) for t in trades]
-    sharpe = _compute_sharpe(returns)
-    max_dd = 0.0
-    if trades:
-        try:
-            max_dd = min([t.get("max_dd", 0.0) for t in trades])
-        except Exception:
-            max_dd = 0.0
-    return {
-        "trades": res.get("trades", 0),
-        "total_return": res.get("total_return", 0.0),
-        "win_rate": res.get("win_rate", 0.0),
-        "sharpe": sharpe,
-        "max_dd": max_dd
-    }
-
-
 def _compute_equity_curve(trades):
     curve = []
     equity = 1.0
@@ -2526,56 +2562,21 @@ def _build_model_comparison(candidate_metrics, baseline_metrics):
     }
 
 
-def _prepare_symbol_dfs(raw_dfs, params):
-    from strategy import Strategy
-    strat = Strategy()
-    analyzed = {}
-    for sym, df in raw_dfs.items():
-        if df is None or df.empty:
-            continue
-        if str(sym).upper().startswith("GLOBAL_BTC"):
-            continue
-        try:
-            analyzed[sym] = strat.analyze(df, params=params)
-        except Exception:
-            continue
-    return analyzed
-
-
-def _run_backtest_with_params(raw_dfs, params, lookback_days: int):
-    from backtester import Backtester
-    bt = Backtester()
-    symbol_dfs = _prepare_symbol_dfs(raw_dfs, params)
-    if not symbol_dfs:
-        raise RuntimeError("No usable symbol data for backtest.")
-    end_dt = datetime.now()
-    start_dt = end_dt - timedelta(days=lookback_days)
-    return bt.run_portfolio(symbol_dfs, params, start_date=start_dt, end_date=end_dt, verbose=False)
-
-
 def _load_data_map():
     from data_loader import load_data_map
     return load_data_map()
 
 
-LABS_RUNTIME = {
-    "running": False,
-    "job_type": None,
-    "job_id": None
-}
-LABS_RUNTIME_LOCK = threading.Lock()
+# Labs (cpu) and data (io) jobs run through one persistent queue; job types are
+# registered below the runner functions.
+JOB_QUEUE = JobQueue(path=LABS_DIR / "job_queue.json", limits={"cpu": 1, "io": 1})
+LABS_JOB_TYPES = ("evolution", "backtest")
 
 HEALTH_CACHE = {
     "ts": 0,
     "data": None
 }
 
-DATA_RUNTIME = {
-    "running": False,
-    "last_msg": None
-}
-DATA_RUNTIME_LOCK = threading.Lock()
-
 WATCH_CACHE = {
     "ts": 0,
     "list": [],
@@ -2584,57 +2585,40 @@ WATCH_CACHE = {
     "last_sell_alert": {},
 }
 
+# Per-symbol last-bar state: refreshes only re-analyze parquet files that changed.
+WATCH_ENGINE = IncrementalWatchlist(data_dir="data")
 
-def _labs_runtime_snapshot():
-    with LABS_RUNTIME_LOCK:
-        return {
-            "running": bool(LABS_RUNTIME.get("running")),
-            "job_type": LABS_RUNTIME.get("job_type"),
-            "job_id": LABS_RUNTIME.get("job_id"),
-        }
-
+# /api/v1/stream: heartbeat_loop publishes, SSE clients receive status patches.
+STATUS_STREAM = StatusBroadcaster(max_queue=32)
+STREAM_HEARTBEAT_SEC = 15.0
 
-def _reserve_labs_job(job_type: str):
-    normalized = str(job_type or "").strip().lower()
-    if normalized not in {"evolution", "backtest"}:
-        raise ValueError(f"Unsupported labs job type: {job_type}")
-    prefix = "evo" if normalized == "evolution" else "bt"
-    with LABS_RUNTIME_LOCK:
-        if LABS_RUNTIME["running"]:
-            return None
-        job_id = f"{prefix}_{int(time.time() * 1000)}"
-        LABS_RUNTIME["running"] = True
-        LABS_RUNTIME["job_type"] = normalized
-        LABS_RUNTIME["job_id"] = job_id
-        return {"job_type": normalized, "job_id": job_id}
 
-
-def _release_labs_job():
-    with LABS_RUNTIME_LOCK:
-        LABS_RUNTIME["running"] = False
-        LABS_RUNTIME["job_type"] = None
-        LABS_RUNTIME["job_id"] = None
+def _labs_runtime_snapshot():
+    active = JOB_QUEUE.active(job_types=LABS_JOB_TYPES)
+    running = next((j for j in active if j["status"] == "RUNNING"), None) or {}
+    return {
+        "running": bool(running),
+        "job_type": running.get("job_type"),
+        "job_id": running.get("job_id"),
+        "queued": sum(1 for j in active if j["status"] == "QUEUED"),
+    }
 
 
 def _is_data_running():
-    with DATA_RUNTIME_LOCK:
-        return bool(DATA_RUNTIME.get("running"))
-
-
-def _reserve_data_job():
-    with DATA_RUNTIME_LOCK:
-        if DATA_RUNTIME["running"]:
-            return False
-        DATA_RUNTIME["running"] = True
-        DATA_RUNTIME["last_msg"] = "RUNNING"
-        return True
+    return bool(JOB_QUEUE.active(job_types=("data_update",)))
 
 
-def _release_data_job(last_msg=None):
-    with DATA_RUNTIME_LOCK:
-        DATA_RUNTIME["running"] = False
-        if last_msg is not None:
-            DATA_RUNTIME["last_msg"] = str(last_msg)
+def _submit_job_response(job_type: str, label: str, args=(), source="api"):
+    try:
+        job, created = JOB_QUEUE.submit(job_type, args=args, source=source)
+    except Exception as e:
+        return {"error": f"{label} submit failed: {e}"}, 500
+    state = "started" if job["status"] == "RUNNING" else "queued"
+    if created:
+        message = f"{label} {state}."
+    else:
+        message = f"{label} already {state} ({job['job_id']})."
+    return {"ok": True, "message": message, "created": created, "job": job}, 200
 
 
 def _write_labs_status(payload: dict):
@@ -2664,6 +2648,11 @@ def _set_labs_status(status: dict, progress_pct=None, stage=None, message=None,
     if extra:
         status.update(extra)
     _write_labs_status(status)
+    job_id = status.get("job_id")
+    if job_id:
+        JOB_QUEUE.report(job_id, status.get("progress_pct"), status.get("message"))
+        if status.get("status") == "RUNNING":
+            JOB_QUEUE.check_cancelled(job_id)
 
 
 def _log_labs(message: str):
@@ -2675,9 +2664,33 @@ def _log_labs(message: str):
         f.write(f"{ts} {message}\n")
 
 
+_TELEGRAM_NOTIFIER = None
+_TELEGRAM_NOTIFIER_LOCK = threading.Lock()
+
+
+def _shared_notifier() -> TelegramNotifier:
+    """One outbox (and sender thread) per process; separate instances would race on the outbox files."""
+    global _TELEGRAM_NOTIFIER
+    with _TELEGRAM_NOTIFIER_LOCK:
+        if _TELEGRAM_NOTIFIER is None:
+            _TELEGRAM_NOTIFIER = TelegramNotifier()
+        return _TELEGRAM_NOTIFIER
+
+
+def _close_shared_notifier():
+    """Flushes and closes the process notifier on shutdown (atexit is the fallback)."""
+    with _TELEGRAM_NOTIFIER_LOCK:
+        notifier = _TELEGRAM_NOTIFIER
+    if notifier is not None:
+        try:
+            notifier.close()
+        except Exception:
+            pass
+
+
 def _notify_labs(title: str, metrics=None):
     try:
-        notifier = TelegramNotifier()
+        notifier = _shared_notifier()
         if notifier and notifier.bot_token and notifier.chat_id:
             msg = title
             if metrics:
@@ -2696,24 +2709,6 @@ def _log_health(message: str):
         f.write(f"{ts} {message}\n")
 
 
-def _evaluate_candidates(base_params, raw_dfs, settings, seed=42):
-    from autotune import AutoTuner
-
-    trials_per_group = int(settings.get("evolution_trials_per_group", 20))
-    tuner = AutoTuner(raw_dfs, base_params, output_dir="autotune_runs")
-
-    all_trials = []
-    for group in ["A", "B", "C"]:
-        trials = tuner.generate_trials(group, trials_per_group, seed=seed)
-        for t in trials:
-            # Normalize confirm pct if out of expected fractional range
-            if t.get("close_confirm_pct_A", 0) > 0.05:
-                t["close_confirm_pct_A"] = t["close_confirm_pct_A"] / 100.0
-            all_trials.append(t)
-
-    return all_trials
-
-
 def _resolve_labs_universe(raw_dfs: dict, settings: dict):
     def _latest_turnover(df):
         if df is None or len(df) == 0:
@@ -2811,6 +2806,8 @@ def _run_evolution_job(settings: dict, job_id: str):
         base_params = config_to_params(base_cfg)
         model_mgr = ModelManager(base_dir=ROOT_DIR / "models")
         prev_active_params = model_mgr.load_active_params() or dict(base_params)
+        # Shared with the tuning cycle: the auto backtests below reuse its OOS evaluations.
+        evaluator = EvaluationService(n_workers=int(settings.get("tuning_eval_workers", 1) or 1))
         universe_info = _resolve_labs_universe(raw_dfs, settings)
         scoped_raw = universe_info.get("scoped_raw") or {}
         if not scoped_raw:
@@ -2858,12 +2855,19 @@ def _run_evolution_job(settings: dict, job_id: str):
             train_days=int(settings.get("tuning_train_days", 180)),
             oos_days=int(settings.get("tuning_oos_days", 28)),
             embargo_days=int(settings.get("tuning_embargo_days", 2)),
+            auto_embargo=bool(settings.get("tuning_auto_embargo", False)),
             n_trials=int(settings.get("tuning_trials", 30)),
             oos_min_trades=int(settings.get("tuning_oos_min_trades", 20)),
             mdd_cap=float(settings.get("tuning_mdd_cap", -0.15)),
             delta_min=float(settings.get("tuning_delta_min", 0.01)),
             promotion_cooldown_hours=int(settings.get("tuning_promotion_cooldown_hours", 24)),
+            dsr_min=settings.get("tuning_dsr_min"),
+            pbo_max=settings.get("tuning_pbo_max"),
+            plateau_min=settings.get("tuning_plateau_min"),
+            stability_workers=settings.get("tuning_stability_workers"),
+            checkpoint=TuningCheckpoint(LABS_SESSION_PATH, owner="labs"),
             progress_cb=_on_tuning_progress,
+            evaluator=evaluator,
         )
         _set_labs_status(status, progress_pct=74, stage="tuning_done", message="Tuning done. Running auto backtest")
 
@@ -2879,7 +2883,7 @@ def _run_evolution_job(settings: dict, job_id: str):
         candidate_curve = []
         if candidate_params:
             _set_labs_status(status, progress_pct=82, stage="auto_backtest:candidate", message="Auto backtest candidate model")
-            candidate_bt_metrics, candidate_bt_res = evaluate_params(
+            candidate_bt_metrics, candidate_bt_res = evaluator.evaluate(
                 scoped_raw,
                 candidate_params,
                 windows["oos_start"],
@@ -2889,7 +2893,7 @@ def _run_evolution_job(settings: dict, job_id: str):
             candidate_curve = _compute_equity_curve(candidate_bt_res.get("trade_list", []) or [])
 
         _set_labs_status(status, progress_pct=90, stage="auto_backtest:active", message="Auto backtest previous active model")
-        active_bt_metrics, active_bt_res = evaluate_params(
+        active_bt_metrics, active_bt_res = evaluator.evaluate(
             scoped_raw,
             prev_active_params,
             windows["oos_start"],
@@ -2985,14 +2989,14 @@ def _run_evolution_job(settings: dict, job_id: str):
         _set_labs_status(status, progress_pct=100, stage="done")
 
     except Exception as e:
-        status["status"] = "FAILED"
+        cancelled = isinstance(e, JobCancelled)
+        status["status"] = "CANCELLED" if cancelled else "FAILED"
         status["ended_at"] = datetime.now().isoformat()
-        status["message"] = f"Evolution failed: {e}"
+        status["message"] = "Evolution cancelled." if cancelled else f"Evolution failed: {e}"
         status["trace"] = traceback.format_exc()
-        _set_labs_status(status, stage="failed")
-        _log_labs(f"Evolution failed: {e}")
-    finally:
-        _release_labs_job()
+        _set_labs_status(status, stage="cancelled" if cancelled else "failed")
+        _log_labs(status["message"])
+        raise
 
 
 def _run_backtest_job(settings: dict, job_id: str):
@@ -3040,7 +3044,7 @@ def _run_backtest_job(settings: dict, job_id: str):
             embargo_days=int(settings.get("tuning_embargo_days", 2)),
         )
         _set_labs_status(status, progress_pct=65, stage="evaluate", message="Running OOS backtest")
-        metrics, res = evaluate_params(
+        metrics, res = EvaluationService().evaluate(
             scoped_raw,
             active_params,
             windows["oos_start"],
@@ -3081,14 +3085,14 @@ def _run_backtest_job(settings: dict, job_id: str):
         )
 
     except Exception as e:
-        status["status"] = "FAILED"
+        cancelled = isinstance(e, JobCancelled)
+        status["status"] = "CANCELLED" if cancelled else "FAILED"
         status["ended_at"] = datetime.now().isoformat()
-        status["message"] = f"Backtest failed: {e}"
+        status["message"] = "Backtest cancelled." if cancelled else f"Backtest failed: {e}"
         status["trace"] = traceback.format_exc()
-        _set_labs_status(status, stage="failed")
-        _log_labs(f"Backtest failed: {e}")
-    finally:
-        _release_labs_job()
+        _set_labs_status(status, stage="cancelled" if cancelled else "failed")
+        _log_labs(status["message"])
+        raise
 
 
 def _write_data_status(payload: dict):
@@ -3100,8 +3104,9 @@ def _write_data_status(payload: dict):
         _log_labs(f"WARN data status write failed: {e}")
 
 
-def _run_data_update_job():
+def _run_data_update_job(job_id=None):
     status = {
+        "job_id": job_id,
         "status": "RUNNING",
         "started_at": datetime.now().isoformat(),
         "message": "Data update running"
@@ -3116,6 +3121,9 @@ def _run_data_update_job():
             status["message"] = msg
             status["updated_at"] = datetime.now().isoformat()
             _write_data_status(status)
+            if job_id:
+                JOB_QUEUE.report(job_id, p, msg)
+                JOB_QUEUE.check_cancelled(job_id)
 
         update_data(progress_callback=_progress)
 
@@ -3124,13 +3132,18 @@ def _run_data_update_job():
         status["message"] = "Data update complete"
         _write_data_status(status)
     except Exception as e:
-        status["status"] = "FAILED"
+        cancelled = isinstance(e, JobCancelled)
+        status["status"] = "CANCELLED" if cancelled else "FAILED"
         status["ended_at"] = datetime.now().isoformat()
-        status["message"] = f"Data update failed: {e}"
+        status["message"] = "Data update cancelled." if cancelled else f"Data update failed: {e}"
         status["trace"] = traceback.format_exc()
         _write_data_status(status)
-    finally:
-        _release_data_job(last_msg=status.get("message"))
+        raise
+
+
+JOB_QUEUE.register("evolution", _run_evolution_job, resource="cpu", priority=0, id_prefix="evo")
+JOB_QUEUE.register("backtest", _run_backtest_job, resource="cpu", priority=10, id_prefix="bt")
+JOB_QUEUE.register("data_update", _run_data_update_job, resource="io", priority=0, id_prefix="data")
 
 
 def _parse_iso_ts(ts):
@@ -3162,19 +3175,14 @@ def data_update_scheduler():
                         break
 
             if time.time() - last_ts >= interval_min * 60:
-                if _reserve_data_job():
-                    try:
-                        t = threading.Thread(target=_run_data_update_job, daemon=True)
-                        t.start()
-                    except Exception:
-                        _release_data_job(last_msg="thread_start_failed")
+                JOB_QUEUE.submit("data_update", source="scheduler")
         except Exception:
             pass
 
         time.sleep(30)
 
 
-def health_check_all(force=False, send_telegram=False):
+def health_check_all(force=False, send_telegram=False, bypass_dedupe=False):
     now = time.time()
     if not force and HEALTH_CACHE["data"] and (now - HEALTH_CACHE["ts"] < 10):
         return HEALTH_CACHE["data"]
@@ -3215,13 +3223,6 @@ def health_check_all(force=False, send_telegram=False):
     tg_status = {"status": "missing"}
     if tg_token and tg_chat:
         tg_status = {"status": "configured"}
-        if send_telegram:
-            try:
-                notifier = TelegramNotifier()
-                notifier._send_telegram("HEALTH CHECK", f"Upbit: {upbit_status} | Telegram: OK")
-                tg_status = {"status": "OK"}
-            except Exception as e:
-                tg_status = {"status": "error", "details": str(e)}
 
     hl_priv = os.getenv("HL_PRIVATE_KEY")
     hl_addr = os.getenv("HL_ACCOUNT_ADDRESS")
@@ -3246,13 +3247,18 @@ def health_check_all(force=False, send_telegram=False):
     HEALTH_CACHE["data"] = data
 
     _log_health(f"HealthCheck overall={overall} upbit={upbit_status} telegram={tg_status}")
-    if send_telegram and tg_status["status"] in ("OK", "configured"):
+    if send_telegram and tg_status["status"] == "configured":
+        # Statuses only (no latencies): the notify rule fingerprints the message, so a
+        # repeat of the same result is deduped while any change is delivered.
         try:
-            notifier = TelegramNotifier()
-            msg = f"HEALTH CHECK\nOverall: {overall}\nUpbit: {upbit_status}\nTelegram: {tg_status}"
-            notifier.emit_event("SYSTEM", "ALL", "HEALTH CHECK", msg, severity="INFO")
-        except Exception:
-            pass
+            notifier = _shared_notifier()
+            msg = (
+                f"Overall: {overall}\nUpbit: {upbit_status['status']}\n"
+                f"Bithumb: {bithumb_status['status']}\nHyperliquid: {hl_status['status']}"
+            )
+            notifier.emit_event("SYSTEM", "ALL", "HEALTH CHECK", msg, severity="INFO", bypass_dedupe=bypass_dedupe)
+        except Exception as e:
+            data["telegram"] = {"status": "error", "details": str(e)}
 
     return data
 
@@ -3284,8 +3290,7 @@ def evolution_scheduler():
                 time.sleep(10)
                 continue
 
-            runtime = _labs_runtime_snapshot()
-            if runtime["running"]:
+            if JOB_QUEUE.active(job_types=("evolution",)):
                 time.sleep(10)
                 continue
 
@@ -3298,23 +3303,14 @@ def evolution_scheduler():
             last_due_ts = last_due_dt.timestamp()
 
             if last_ts < last_due_ts:
-                job = _reserve_labs_job("evolution")
-                if job:
+                job, created = JOB_QUEUE.submit("evolution", args=[settings], source="scheduler")
+                if created:
                     _log_labs(
                         f"Scheduler trigger now={now_dt.isoformat()} "
                         f"slot={last_due_dt.isoformat()} next={next_due_dt.isoformat()} "
-                        f"anchor={anchor_hhmm} interval_h={interval_hours} job_id={job['job_id']}"
+                        f"anchor={anchor_hhmm} interval_h={interval_hours} job_id={job['job_id']} "
+                        f"status={job['status']}"
                     )
-                    try:
-                        t = threading.Thread(
-                            target=_run_evolution_job,
-                            args=(settings, job["job_id"]),
-                            daemon=True,
-                        )
-                        t.start()
-                    except Exception as e:
-                        _release_labs_job()
-                        _log_labs(f"Scheduler failed to start evolution thread: {e}")
         except Exception:
             pass
 
@@ -3372,11 +3368,15 @@ class BotService:
                     adapter = BithumbAdapter(key, secret)
                 else:
                     return False, f"Unsupported exchange: {exchange}"
-                notifier = TelegramNotifier()
+                notifier = _shared_notifier()
                 ledger = CapitalLedger(exchange_name=exchange, initial_seed=seed)
                 watch = WatchEngine(notifier)
 
-                controller = RunController(adapter, ledger, watch, notifier, mode=mode)
+                try:
+                    max_positions = max(1, int(load_settings().get("live_max_positions", 1) or 1))
+                except Exception:
+                    max_positions = 1
+                controller = RunController(adapter, ledger, watch, notifier, mode=mode, max_positions=max_positions)
                 if not controller.perform_preflight_check(confirm_live=confirm_live):
                     return False, "Pre-flight check failed."
 
@@ -3628,6 +3628,7 @@ class Handler(BaseHTTPRequestHandler):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-API-Version", api_contract.API_VERSION)
         self.end_headers()
         self.wfile.write(payload)
 
@@ -3639,6 +3640,30 @@ class Handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(payload)
 
+    def _send_event_stream(self):
+        client = STATUS_STREAM.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "keep-alive")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            self.wfile.write(b"retry: 2000\n\n")
+            self.wfile.flush()
+            while not client.closed:
+                event = client.next_event(timeout=STREAM_HEARTBEAT_SEC)
+                if event is None:
+                    self.wfile.write(f": heartbeat {time.time():.0f}\n\n".encode("utf-8"))
+                else:
+                    self.wfile.write(format_sse(*event))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            STATUS_STREAM.unsubscribe(client)
+            self.close_connection = True
+
     def _read_body(self):
         length = int(self.headers.get("Content-Length", "0"))
         if length <= 0:
@@ -3646,314 +3671,362 @@ class Handler(BaseHTTPRequestHandler):
         return self.rfile.read(length).decode("utf-8")
 
     def do_GET(self):
-        if self.path == "/":
-            return self._send_html(INDEX_HTML)
-        if self.path == "/api/settings":
-            return self._send_json(load_settings())
-        if self.path == "/api/status" or self.path == "/api/v1/status":
-            return self._send_json(build_status(self.service, self.state))
-        if self.path == "/api/labs/status":
-            return self._send_json(build_labs_payload())
-        if self.path == "/api/data/status":
-            return self._send_json(build_data_payload())
-        if self.path == "/api/models":
-            return self._send_json(build_models_payload())
-        if self.path == "/api/orders":
-            return self._send_json(_build_orders_payload(self.service.controller))
-        self._send_json({"error": "Not found"}, status=404)
+        self._dispatch("GET")
 
     def do_POST(self):
-        if self.path == "/api/health_all":
-            data = health_check_all(force=True, send_telegram=True)
-            status = 200 if data.get("overall") != "WARN" else 200
-            return self._send_json(data, status=status)
+        self._dispatch("POST")
 
-        if self.path == "/api/shutdown":
-            # Stop bot if running, then shutdown server
-            try:
-                self.service.stop()
-            except Exception:
-                pass
+    def _dispatch(self, method):
+        route, query = api_contract.lookup(method, self.path)
+        handler = WEB_ROUTE_HANDLERS.get((route.method, route.path)) if route else None
+        if handler is None:
+            return self._send_json({"error": "Not found"}, status=404)
+        try:
+            req = api_contract.parse_body(route, self._read_body()) if route.request is not None else None
+        except api_contract.ContractError as e:
+            return self._send_json(e.to_dict(), status=e.status)
+        return handler(self, req, query)
+
+    # ----- GET -----
+    def _get_index(self, req, query):
+        return self._send_html(INDEX_HTML)
+
+    def _get_settings(self, req, query):
+        return self._send_json(load_settings())
+
+    def _get_status(self, req, query):
+        return self._send_json(build_status(self.service, self.state))
+
+    def _get_health(self, req, query):
+        status = build_status(self.service, self.state)
+        truth = status.get("truth") or {}
+        return self._send_json(
+            {"ok": True, "phase": truth.get("phase"), "running": truth.get("running"), "reason_code": truth.get("reason_code"), "truth": truth}
+        )
 
-            def _shutdown():
-                time.sleep(0.2)
-                self.server.shutdown()
+    def _get_status_timings(self, req, query):
+        return self._send_json({"ts": time.time(), "sections": STATUS_COMPOSER.timings()})
+
+    def _get_stream(self, req, query):
+        return self._send_event_stream()
+
+    def _get_labs_status(self, req, query):
+        return self._send_json(build_labs_payload())
+
+    def _get_data_status(self, req, query):
+        return self._send_json(build_data_payload())
+
+    def _get_jobs(self, req, query):
+        return self._send_json(JOB_QUEUE.summary())
+
+    def _get_notify_metrics(self, req, query):
+        return self._send_json(_shared_notifier().rules.metrics())
+
+    def _get_models(self, req, query):
+        return self._send_json(build_models_payload(**_models_query_args(query)))
 
-            threading.Thread(target=_shutdown, daemon=True).start()
-            return self._send_json({"ok": True, "message": "Backend shutting down..."})
+    def _get_orders(self, req, query):
+        return self._send_json(_build_orders_payload(self.service.controller))
 
-        if self.path == "/api/stop":
-            ok, msg = self.service.stop()
-            status = 200 if ok else 400
-            return self._send_json({"ok": ok, "message": msg}, status=status)
+    # ----- POST -----
+    def _post_health_all(self, req, query):
+        data = health_check_all(force=True, send_telegram=True, bypass_dedupe=True)
+        status = 200 if data.get("overall") != "WARN" else 200
+        return self._send_json(data, status=status)
 
-        body = self._read_body()
+    def _post_shutdown(self, req, query):
+        # Stop bot if running, then shutdown server
         try:
-            data = json.loads(body) if body else {}
+            self.service.stop()
         except Exception:
-            data = {}
+            pass
 
-        if self.path == "/api/settings":
-            try:
-                settings = save_settings(data)
-                return self._send_json(settings)
-            except Exception as e:
-                return self._send_json({"error": str(e)}, status=400)
+        def _shutdown():
+            time.sleep(0.2)
+            self.server.shutdown()
 
-        if self.path == "/api/start":
-            settings = load_settings()
-            ok, msg = self.service.start(
-                mode=settings.get("mode", "PAPER"),
-                seed=int(settings.get("seed_krw", 1000000)),
-                exchange=settings.get("exchange", "UPBIT"),
-                confirm_phrase=str(data.get("confirm", "")),
-            )
-            status = 200 if ok else 400
-            return self._send_json({"ok": ok, "message": msg}, status=status)
-
-        if self.path == "/api/restart":
-            settings = load_settings()
-            ok, msg = self.service.restart(
-                mode=settings.get("mode", "PAPER"),
-                seed=int(settings.get("seed_krw", 1000000)),
-                exchange=settings.get("exchange", "UPBIT"),
-                confirm_phrase=str(data.get("confirm", "")),
-            )
-            status = 200 if ok else 400
-            return self._send_json({"ok": ok, "message": msg}, status=status)
+        threading.Thread(target=_shutdown, daemon=True).start()
+        return self._send_json({"ok": True, "message": "Backend shutting down..."})
 
-        if self.path == "/api/panic":
-            if not self.service.is_running() or self.service.controller is None:
-                return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
-            controller = self.service.controller
-            settings = load_settings()
-            slider = float(data.get("slider", 0))
-            if slider < 80:
-                return self._send_json({"ok": False, "message": "Panic slider is below READY level."}, status=400)
-            symbol = str(data.get("symbol") or controller._get_runtime_state().get("symbol") or "")
-            hard_loss_cap = float(data.get("hard_loss_cap", -0.05)) if data.get("hard_loss_cap") is not None else -0.05
+    def _post_stop(self, req, query):
+        ok, msg = self.service.stop()
+        status = 200 if ok else 400
+        return self._send_json({"ok": ok, "message": msg}, status=status)
 
+    def _post_settings(self, req, query):
+        try:
+            settings = save_settings(req)
+            return self._send_json(settings)
+        except Exception as e:
+            return self._send_json({"error": str(e)}, status=400)
+
+    def _post_start(self, req, query):
+        settings = load_settings()
+        ok, msg = self.service.start(
+            mode=settings.get("mode", "PAPER"),
+            seed=int(settings.get("seed_krw", 1000000)),
+            exchange=settings.get("exchange", "UPBIT"),
+            confirm_phrase=req.confirm,
+        )
+        status = 200 if ok else 400
+        return self._send_json({"ok": ok, "message": msg}, status=status)
+
+    def _post_restart(self, req, query):
+        settings = load_settings()
+        ok, msg = self.service.restart(
+            mode=settings.get("mode", "PAPER"),
+            seed=int(settings.get("seed_krw", 1000000)),
+            exchange=settings.get("exchange", "UPBIT"),
+            confirm_phrase=req.confirm,
+        )
+        status = 200 if ok else 400
+        return self._send_json({"ok": ok, "message": msg}, status=status)
+
+    def _post_panic(self, req, query):
+        if not self.service.is_running() or self.service.controller is None:
+            return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
+        controller = self.service.controller
+        if req.slider < 80:
+            return self._send_json({"ok": False, "message": "Panic slider is below READY level."}, status=400)
+        symbol = str(req.symbol or controller._get_runtime_state().get("symbol") or "")
+        hard_loss_cap = req.hard_loss_cap if req.hard_loss_cap is not None else -0.05
+
+        forced_exit = None
+        try:
+            forced_exit = controller.process_panic_exit(symbol=symbol, hard_loss_cap=hard_loss_cap)
+        except Exception:
             forced_exit = None
-            try:
-                forced_exit = controller.process_panic_exit(symbol=symbol, hard_loss_cap=hard_loss_cap)
-            except Exception:
-                forced_exit = None
-            fallback_exit = None
-            if not forced_exit:
-                fallback_exit = controller.process_exit_signal(symbol=symbol if symbol else None, qty="ALL")
-
-            cancel_res = _cancel_open_orders(controller, all_orders=True)
-            _notify_openclaw_emergency(
-                f"[Panic Trigger] symbol={symbol or '-'} mode={controller.mode if hasattr(controller, 'mode') else '-'}" +
-                f" forced_exit={'YES' if forced_exit else 'NO'} hard_loss_cap={hard_loss_cap}",
-                exchange=getattr(controller, 'adapter', None).exchange_name if getattr(controller, 'adapter', None) else "SYSTEM",
-            )
+        fallback_exit = None
+        if not forced_exit:
+            fallback_exit = controller.process_exit_signal(symbol=symbol if symbol else None, qty="ALL", blocking=True)
+
+        cancel_res = _cancel_open_orders(controller, all_orders=True)
+        _notify_openclaw_emergency(
+            f"[Panic Trigger] symbol={symbol or '-'} mode={controller.mode if hasattr(controller, 'mode') else '-'}" +
+            f" forced_exit={'YES' if forced_exit else 'NO'} hard_loss_cap={hard_loss_cap}",
+            exchange=getattr(controller, 'adapter', None).exchange_name if getattr(controller, 'adapter', None) else "SYSTEM",
+        )
+
+        ok = bool((forced_exit and forced_exit.get("ok")) or (fallback_exit and fallback_exit.get("ok")) or cancel_res.get("canceled", 0) > 0)
+        msg = "panic completed" if ok else "panic accepted but action may be unavailable"
+        return self._send_json({
+            "ok": ok,
+            "message": msg,
+            "forced_exit": forced_exit,
+            "fallback_exit": fallback_exit,
+            "cancel_result": cancel_res,
+        })
 
-            ok = bool((forced_exit and forced_exit.get("ok")) or (fallback_exit and fallback_exit.get("ok")) or cancel_res.get("canceled", 0) > 0)
-            msg = "panic completed" if ok else "panic accepted but action may be unavailable"
-            return self._send_json({
-                "ok": ok,
-                "message": msg,
-                "forced_exit": forced_exit,
-                "fallback_exit": fallback_exit,
-                "cancel_result": cancel_res,
-            })
-
-        if self.path == "/api/orders/cancel":
-            if not self.service.is_running() or self.service.controller is None:
-                return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
-            controller = self.service.controller
-            all_orders = bool(data.get("all", False))
-            order_id = data.get("order_id")
-            symbol = data.get("symbol")
-            cancel_res = _cancel_open_orders(controller, order_id=str(order_id) if order_id else None, symbol=str(symbol) if symbol else None, all_orders=all_orders)
-            return self._send_json(cancel_res)
-
-        if self.path == "/api/orders":
-            return self._send_json(_build_orders_payload(self.service.controller))
-
-        if self.path == "/api/v1/manual/roundtrip-test":
-            ok, msg = self.service.start_manual_roundtrip_test(
-                symbol=data.get("symbol", "KRW-XRP"),
-                krw_notional=data.get("krw_notional", 5500),
-                buy_offset_ticks=data.get("buy_offset_ticks", 1),
-                hold_seconds=data.get("hold_seconds", 30),
-                confirm_phrase=data.get("confirm", ""),
+    def _post_orders_cancel(self, req, query):
+        if not self.service.is_running() or self.service.controller is None:
+            return self._send_json(
+                {"ok": False, "message": "Controller is not running.", "requested": 0, "canceled": 0, "failed": 0},
+                status=400,
             )
-            status = 200 if ok else 400
-            return self._send_json({"ok": ok, "message": msg, "manual_roundtrip": self.service.get_manual_roundtrip_status()}, status=status)
+        controller = self.service.controller
+        cancel_res = _cancel_open_orders(controller, order_id=req.order_id or None, symbol=req.symbol or None, all_orders=req.all)
+        return self._send_json(cancel_res)
+
+    def _post_manual_roundtrip(self, req, query):
+        ok, msg = self.service.start_manual_roundtrip_test(
+            symbol=req.symbol,
+            krw_notional=req.krw_notional,
+            buy_offset_ticks=req.buy_offset_ticks,
+            hold_seconds=req.hold_seconds,
+            confirm_phrase=req.confirm,
+        )
+        status = 200 if ok else 400
+        return self._send_json({"ok": ok, "message": msg, "manual_roundtrip": self.service.get_manual_roundtrip_status()}, status=status)
 
-        if self.path == "/api/test/entry":
-            if not self.service.is_running() or self.service.controller is None:
-                return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
-            controller = self.service.controller
-            try:
-                runtime_state = controller._get_runtime_state()
-                settings = load_settings()
-                symbol = str(
-                    data.get("symbol")
-                    or runtime_state.get("symbol")
-                    or (settings.get("watchlist") or ["KRW-BTC"])[0]
-                )
-                target_money = float(data.get("target_money") or max(10000, int(settings.get("seed_krw", 100000)) // 10))
-                timeframe = str(data.get("timeframe") or "1m")
-                candle_ts = data.get("candle_timestamp", time.time())
-                max_slippage = float(data.get("max_entry_slippage_pct") or 0.01)
-                mock = _to_bool(data.get("mock"), True)
-                fill_ratio = float(data.get("fill_ratio") or 1.0)
-                test_price = float(data.get("price") or 100000.0)
-                balance_krw = float(data.get("balance_krw") or max(target_money * 3, 100000.0))
-                force_market_block = _to_bool(data.get("force_market_block"), False)
-
-                signal = _build_api_test_entry_signal(
-                    symbol=symbol,
-                    target_money=target_money,
-                    timeframe=timeframe,
-                    candle_ts=candle_ts,
-                    max_slippage_pct=max_slippage,
-                )
-                market_data = {"price": test_price, "balance": balance_krw}
-
-                exchange_api = None
-                if mock:
-                    exchange_api = _ApiTestExchangeSim(
-                        default_price=test_price,
-                        fill_ratio=fill_ratio,
-                        fee_rate=0.0,
-                        force_market_block=force_market_block,
-                    )
-                result = controller.process_entry_signal(
-                    signal=signal,
-                    current_market_data=market_data,
-                    exchange_api=exchange_api,
-                )
-                new_state = controller._get_runtime_state()
-                return self._send_json(
-                    {
-                        "ok": bool(result and result.get("ok", False)),
-                        "message": "entry executed" if (result and result.get("ok", False)) else "entry blocked_or_failed",
-                        "mock": mock,
-                        "input": {
-                            "symbol": symbol,
-                            "target_money": target_money,
-                            "timeframe": timeframe,
-                            "price": test_price,
-                            "fill_ratio": fill_ratio,
-                            "force_market_block": force_market_block,
-                        },
-                        "result": result,
-                        "runtime_state": new_state,
-                    }
+    def _post_test_entry(self, data, query):
+        if not self.service.is_running() or self.service.controller is None:
+            return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
+        controller = self.service.controller
+        try:
+            runtime_state = controller._get_runtime_state()
+            settings = load_settings()
+            symbol = str(
+                data.get("symbol")
+                or runtime_state.get("symbol")
+                or (settings.get("watchlist") or ["KRW-BTC"])[0]
+            )
+            target_money = float(data.get("target_money") or max(10000, int(settings.get("seed_krw", 100000)) // 10))
+            timeframe = str(data.get("timeframe") or "1m")
+            candle_ts = data.get("candle_timestamp", time.time())
+            max_slippage = float(data.get("max_entry_slippage_pct") or 0.01)
+            mock = _to_bool(data.get("mock"), True)
+            fill_ratio = float(data.get("fill_ratio") or 1.0)
+            test_price = float(data.get("price") or 100000.0)
+            balance_krw = float(data.get("balance_krw") or max(target_money * 3, 100000.0))
+            force_market_block = _to_bool(data.get("force_market_block"), False)
+
+            signal = _build_api_test_entry_signal(
+                symbol=symbol,
+                target_money=target_money,
+                timeframe=timeframe,
+                candle_ts=candle_ts,
+                max_slippage_pct=max_slippage,
+            )
+            market_data = {"price": test_price, "balance": balance_krw}
+
+            exchange_api = None
+            if mock:
+                exchange_api = _ApiTestExchangeSim(
+                    default_price=test_price,
+                    fill_ratio=fill_ratio,
+                    fee_rate=0.0,
+                    force_market_block=force_market_block,
                 )
-            except Exception as e:
-                return self._send_json({"ok": False, "message": f"test entry failed: {e}"}, status=500)
-
-        if self.path == "/api/test/exit":
-            if not self.service.is_running() or self.service.controller is None:
-                return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
-            controller = self.service.controller
-            try:
-                runtime_state = controller._get_runtime_state()
-                symbol = str(data.get("symbol") or runtime_state.get("symbol") or "KRW-BTC")
-                qty = data.get("qty", "ALL")
-                mock = _to_bool(data.get("mock"), True)
-                fill_ratio = float(data.get("fill_ratio") or 1.0)
-                test_price = float(data.get("price") or 100000.0)
-                force_market_block = _to_bool(data.get("force_market_block"), False)
-                reason = str(data.get("reason") or "API_TEST_EXIT")
-
-                exchange_api = None
-                if mock:
-                    exchange_api = _ApiTestExchangeSim(
-                        default_price=test_price,
-                        fill_ratio=fill_ratio,
-                        fee_rate=0.0,
-                        force_market_block=force_market_block,
-                    )
+            result = controller.process_entry_signal(
+                signal=signal,
+                current_market_data=market_data,
+                exchange_api=exchange_api,
+                blocking=True,
+            )
+            new_state = controller._get_runtime_state()
+            return self._send_json(
+                {
+                    "ok": bool(result and result.get("ok", False)),
+                    "message": "entry executed" if (result and result.get("ok", False)) else "entry blocked_or_failed",
+                    "mock": mock,
+                    "input": {
+                        "symbol": symbol,
+                        "target_money": target_money,
+                        "timeframe": timeframe,
+                        "price": test_price,
+                        "fill_ratio": fill_ratio,
+                        "force_market_block": force_market_block,
+                    },
+                    "result": result,
+                    "runtime_state": new_state,
+                }
+            )
+        except Exception as e:
+            return self._send_json({"ok": False, "message": f"test entry failed: {e}"}, status=500)
 
-                result = controller.process_exit_signal(
-                    symbol=symbol,
-                    qty=qty,
-                    exchange_api=exchange_api,
-                    reason=reason,
-                )
-                new_state = controller._get_runtime_state()
-                return self._send_json(
-                    {
-                        "ok": bool(result and result.get("ok", False)),
-                        "message": "exit executed" if (result and result.get("ok", False)) else "exit blocked_or_failed",
-                        "mock": mock,
-                        "input": {
-                            "symbol": symbol,
-                            "qty": qty,
-                            "price": test_price,
-                            "fill_ratio": fill_ratio,
-                            "force_market_block": force_market_block,
-                            "reason": reason,
-                        },
-                        "result": result,
-                        "runtime_state": new_state,
-                    }
+    def _post_test_exit(self, data, query):
+        if not self.service.is_running() or self.service.controller is None:
+            return self._send_json({"ok": False, "message": "Controller is not running."}, status=400)
+        controller = self.service.controller
+        try:
+            runtime_state = controller._get_runtime_state()
+            symbol = str(data.get("symbol") or runtime_state.get("symbol") or "KRW-BTC")
+            qty = data.get("qty", "ALL")
+            mock = _to_bool(data.get("mock"), True)
+            fill_ratio = float(data.get("fill_ratio") or 1.0)
+            test_price = float(data.get("price") or 100000.0)
+            force_market_block = _to_bool(data.get("force_market_block"), False)
+            reason = str(data.get("reason") or "API_TEST_EXIT")
+
+            exchange_api = None
+            if mock:
+                exchange_api = _ApiTestExchangeSim(
+                    default_price=test_price,
+                    fill_ratio=fill_ratio,
+                    fee_rate=0.0,
+                    force_market_block=force_market_block,
                 )
-            except Exception as e:
-                return self._send_json({"ok": False, "message": f"test exit failed: {e}"}, status=500)
-
-        if self.path == "/api/labs/run_backtest":
-            job = _reserve_labs_job("backtest")
-            if not job:
-                return self._send_json({"error": "Labs job already running."}, status=400)
-            settings = load_settings()
-            try:
-                t = threading.Thread(target=_run_backtest_job, args=(settings, job["job_id"]), daemon=True)
-                t.start()
-            except Exception as e:
-                _release_labs_job()
-                return self._send_json({"error": f"Backtest thread start failed: {e}"}, status=500)
-            return self._send_json({"ok": True, "message": "Backtest started."})
-
-        if self.path == "/api/labs/run_evolution":
-            job = _reserve_labs_job("evolution")
-            if not job:
-                return self._send_json({"error": "Labs job already running."}, status=400)
-            settings = load_settings()
-            try:
-                t = threading.Thread(target=_run_evolution_job, args=(settings, job["job_id"]), daemon=True)
-                t.start()
-            except Exception as e:
-                _release_labs_job()
-                return self._send_json({"error": f"Evolution thread start failed: {e}"}, status=500)
-            return self._send_json({"ok": True, "message": "Evolution started."})
-
-        if self.path == "/api/labs/approve_live":
-            pending = _safe_read_json(LABS_PENDING_LIVE_PATH, default=None)
-            if not pending:
-                return self._send_json({"error": "No pending live params."}, status=400)
-            approved_path = LABS_DIR / "live_approved.json"
-            _safe_write_json(approved_path, {
-                "approved_at": datetime.now().isoformat(),
-                "params": pending.get("params"),
-                "metrics": pending.get("metrics"),
-            })
-            try:
-                LABS_PENDING_LIVE_PATH.unlink(missing_ok=True)
-            except Exception:
-                pass
-            _log_labs("LIVE params approved via UI.")
-            _notify_labs("LIVE params approved.", pending.get("metrics"))
-            return self._send_json({"ok": True, "message": "LIVE params approved."})
-
-        if self.path == "/api/data/update":
-            if not _reserve_data_job():
-                return self._send_json({"error": "Data update already running."}, status=400)
-            try:
-                t = threading.Thread(target=_run_data_update_job, daemon=True)
-                t.start()
-            except Exception as e:
-                _release_data_job(last_msg="thread_start_failed")
-                return self._send_json({"error": f"Data update thread start failed: {e}"}, status=500)
-            return self._send_json({"ok": True, "message": "Data update started."})
 
-        self._send_json({"error": "Not found"}, status=404)
+            result = controller.process_exit_signal(
+                symbol=symbol,
+                qty=qty,
+                exchange_api=exchange_api,
+                reason=reason,
+                blocking=True,
+            )
+            new_state = controller._get_runtime_state()
+            return self._send_json(
+                {
+                    "ok": bool(result and result.get("ok", False)),
+                    "message": "exit executed" if (result and result.get("ok", False)) else "exit blocked_or_failed",
+                    "mock": mock,
+                    "input": {
+                        "symbol": symbol,
+                        "qty": qty,
+                        "price": test_price,
+                        "fill_ratio": fill_ratio,
+                        "force_market_block": force_market_block,
+                        "reason": reason,
+                    },
+                    "result": result,
+                    "runtime_state": new_state,
+                }
+            )
+        except Exception as e:
+            return self._send_json({"ok": False, "message": f"test exit failed: {e}"}, status=500)
+
+    def _post_labs_run_backtest(self, req, query):
+        payload, status = _submit_job_response("backtest", "Backtest", args=[load_settings()])
+        return self._send_json(payload, status=status)
+
+    def _post_labs_run_evolution(self, req, query):
+        payload, status = _submit_job_response("evolution", "Evolution", args=[load_settings()])
+        return self._send_json(payload, status=status)
+
+    def _post_jobs_cancel(self, req, query):
+        job = JOB_QUEUE.cancel(req.job_id)
+        if job is None:
+            return self._send_json({"error": "No active job with that id."}, status=404)
+        return self._send_json({"ok": True, "message": f"Cancel requested ({job['status']}).", "job": job})
+
+    def _post_labs_approve_live(self, req, query):
+        pending = _safe_read_json(LABS_PENDING_LIVE_PATH, default=None)
+        if not pending:
+            return self._send_json({"error": "No pending live params."}, status=400)
+        approved_path = LABS_DIR / "live_approved.json"
+        _safe_write_json(approved_path, {
+            "approved_at": datetime.now().isoformat(),
+            "params": pending.get("params"),
+            "metrics": pending.get("metrics"),
+        })
+        try:
+            LABS_PENDING_LIVE_PATH.unlink(missing_ok=True)
+        except Exception:
+            pass
+        _log_labs("LIVE params approved via UI.")
+        _notify_labs("LIVE params approved.", pending.get("metrics"))
+        return self._send_json({"ok": True, "message": "LIVE params approved."})
+
+    def _post_data_update(self, req, query):
+        payload, status = _submit_job_response("data_update", "Data update")
+        return self._send_json(payload, status=status)
+
+
+# (method, path) -> Handler method; schemas and paths are declared in modules/api_contract.py.
+WEB_ROUTE_HANDLERS = {
+    ("GET", "/"): Handler._get_index,
+    ("GET", "/api/settings"): Handler._get_settings,
+    ("GET", "/api/status"): Handler._get_status,
+    ("GET", "/api/v1/status"): Handler._get_status,
+    ("GET", "/api/v1/health"): Handler._get_health,
+    ("GET", "/api/v1/status/timings"): Handler._get_status_timings,
+    ("GET", "/api/v1/stream"): Handler._get_stream,
+    ("GET", "/api/labs/status"): Handler._get_labs_status,
+    ("GET", "/api/data/status"): Handler._get_data_status,
+    ("GET", "/api/jobs"): Handler._get_jobs,
+    ("GET", "/api/notify/metrics"): Handler._get_notify_metrics,
+    ("GET", "/api/models"): Handler._get_models,
+    ("GET", "/api/orders"): Handler._get_orders,
+    ("POST", "/api/orders"): Handler._get_orders,
+    ("POST", "/api/health_all"): Handler._post_health_all,
+    ("POST", "/api/shutdown"): Handler._post_shutdown,
+    ("POST", "/api/stop"): Handler._post_stop,
+    ("POST", "/api/settings"): Handler._post_settings,
+    ("POST", "/api/start"): Handler._post_start,
+    ("POST", "/api/restart"): Handler._post_restart,
+    ("POST", "/api/panic"): Handler._post_panic,
+    ("POST", "/api/orders/cancel"): Handler._post_orders_cancel,
+    ("POST", "/api/v1/manual/roundtrip-test"): Handler._post_manual_roundtrip,
+    ("POST", "/api/test/entry"): Handler._post_test_entry,
+    ("POST", "/api/test/exit"): Handler._post_test_exit,
+    ("POST", "/api/labs/run_backtest"): Handler._post_labs_run_backtest,
+    ("POST", "/api/labs/run_evolution"): Handler._post_labs_run_evolution,
+    ("POST", "/api/jobs/cancel"): Handler._post_jobs_cancel,
+    ("POST", "/api/labs/approve_live"): Handler._post_labs_approve_live,
+    ("POST", "/api/data/update"): Handler._post_data_update,
+}
+_served = {(r.method, r.path) for r in api_contract.routes_for(api_contract.WEB)}
+assert set(WEB_ROUTE_HANDLERS) == _served, f"web routes out of sync with api_contract: {set(WEB_ROUTE_HANDLERS) ^ _served}"
 
 
 def parse_lock_info():
@@ -3968,20 +4041,24 @@ def parse_lock_info():
         return {"exists": True, "pid": None, "mode": None}
 
 
-def build_labs_payload():
-    labs_status = _read_labs_status()
-    pending_live = _safe_read_json(LABS_PENDING_LIVE_PATH, default=None)
-    last_result = _safe_read_json(LABS_LAST_RESULT_PATH, default=None)
-    baseline = _safe_read_json(LABS_LAST_BASELINE_PATH, default=None)
+def _read_labs_files():
+    return {
+        "status": _read_labs_status(),
+        "pending_live": _safe_read_json(LABS_PENDING_LIVE_PATH, default=None),
+        "last_result": _safe_read_json(LABS_LAST_RESULT_PATH, default=None),
+        "baseline": _safe_read_json(LABS_LAST_BASELINE_PATH, default=None),
+    }
+
+
+def build_labs_payload(cached=False):
+    files = STATUS_COMPOSER.get("labs") if cached else _read_labs_files()
     runtime = _labs_runtime_snapshot()
     return {
-        "status": labs_status,
-        "pending_live": pending_live,
-        "last_result": last_result,
-        "baseline": baseline,
+        **files,
         "running": runtime["running"],
         "job_type": runtime["job_type"],
         "job_id": runtime["job_id"],
+        "queued": runtime["queued"],
     }
 
 
@@ -3989,87 +4066,7 @@ def build_data_payload():
     return _safe_read_json(DATA_STATUS_PATH, default={})
 
 
-def _to_ccxt_float(value, default=0.0):
-    try:
-        return float(value)
-    except Exception:
-        return float(default)
-
-
-def _history_time_key(iso_value):
-    if not iso_value:
-        return 0.0
-    try:
-        text = str(iso_value).replace("Z", "+00:00")
-        return datetime.fromisoformat(text).timestamp()
-    except Exception:
-        return 0.0
-
-
-def _build_model_history_row(run_id, bucket, mtime_iso, summary=None, meta=None):
-    summary = summary or {}
-    meta = meta or {}
-
-    candidate = ((summary.get("candidate") or {}).get("oos_metrics") or {})
-    active = ((summary.get("active_baseline") or {}).get("oos_metrics") or {})
-    gate = summary.get("gate") or {}
-    windows = summary.get("windows") or {}
-
-    decision = str(gate.get("decision") or "").upper()
-    if not decision:
-        if "pass" in gate:
-            decision = "PROMOTE" if bool(gate.get("pass")) else "KEEP_ACTIVE"
-        elif str(bucket).lower() == "archive":
-            decision = "ARCHIVED"
-        elif str(bucket).lower() == "active":
-            decision = "ACTIVE"
-        else:
-            decision = "UNKNOWN"
-
-    reasons = gate.get("reasons")
-    if isinstance(reasons, list):
-        reason = ", ".join([str(x) for x in reasons if str(x)])
-    else:
-        reason = str(gate.get("reason") or reasons or "")
-    if not reason:
-        reason = "-"
-
-    score = _metric_val(candidate, "score", 0.0)
-    active_score = _metric_val(active, "score", 0.0)
-    delta = gate.get("delta")
-    if delta is None:
-        delta = score - active_score
-    delta = _to_ccxt_float(delta, 0.0)
-
-    positive_weeks = candidate.get("positive_weeks", None)
-    if positive_weeks is None:
-        positive_weeks = (summary.get("candidate") or {}).get("positive_weeks", 0)
-
-    created_at = summary.get("created_at") or meta.get("created_at") or mtime_iso
-
-    return {
-        "run_id": str(run_id or meta.get("model_id") or "-"),
-        "bucket": str(bucket).upper(),
-        "created_at": created_at,
-        "decision": decision,
-        "gate_pass": bool(gate.get("pass")) if "pass" in gate else None,
-        "score": score,
-        "active_score": active_score,
-        "delta": delta,
-        "roi": _metric_val(candidate, "roi", 0.0),
-        "mdd": _metric_val(candidate, "mdd", 0.0),
-        "trades": int(_metric_val(candidate, "trades", 0)),
-        "cost_drop": _metric_val(candidate, "cost_drop", 0.0),
-        "positive_weeks": int(_to_ccxt_float(positive_weeks, 0)),
-        "negative_weeks": int(_metric_val(candidate, "negative_weeks", 0)),
-        "worst_week": _metric_val(candidate, "worst_week", 0.0),
-        "reason": reason,
-        "oos_start": windows.get("oos_start"),
-        "oos_end": windows.get("oos_end"),
-    }
-
-
-def build_models_payload():
+def build_models_payload(bucket=None, sort="created_at", order="desc", limit=200, offset=0):
     mgr = ModelManager(base_dir=ROOT_DIR / "models")
     payload = {
         "active_model_id": mgr.active_model_id(),
@@ -4077,8 +4074,8 @@ def build_models_payload():
         "staging": [],
         "archive": [],
         "history": [],
+        "history_count": 0,
     }
-    history_rows = []
 
     active_meta = _safe_read_json(mgr.active_dir / "model_meta.json", default=None)
     active_summary = _safe_read_json(mgr.active_dir / "run_summary.json", default=None)
@@ -4087,77 +4084,53 @@ def build_models_payload():
             "meta": active_meta,
             "summary": active_summary,
         }
-        active_run_id = (
-            (active_meta or {}).get("model_id")
-            or (active_summary or {}).get("run_id")
-            or payload.get("active_model_id")
-        )
-        active_mtime = datetime.fromtimestamp(mgr.active_dir.stat().st_mtime).isoformat()
-        history_rows.append(
-            _build_model_history_row(
-                run_id=active_run_id,
-                bucket="active",
-                mtime_iso=active_mtime,
-                summary=active_summary,
-                meta=active_meta,
-            )
-        )
-
-    if mgr.staging_dir.exists():
-        for d in sorted(
-            [x for x in mgr.staging_dir.iterdir() if x.is_dir()],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True,
-        ):
-            summary = _safe_read_json(d / "run_summary.json", default=None)
-            meta = _safe_read_json(d / "model_meta.json", default=None)
-            mtime = datetime.fromtimestamp(d.stat().st_mtime).isoformat()
-            payload["staging"].append(
-                {
-                    "run_id": d.name,
-                    "mtime": mtime,
-                }
-            )
-            history_rows.append(
-                _build_model_history_row(
-                    run_id=d.name,
-                    bucket="staging",
-                    mtime_iso=mtime,
-                    summary=summary,
-                    meta=meta,
-                )
-            )
 
-    if mgr.archive_dir.exists():
-        for d in sorted(
-            [x for x in mgr.archive_dir.iterdir() if x.is_dir()],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True,
-        )[:120]:
-            summary = _safe_read_json(d / "run_summary.json", default=None)
-            meta = _safe_read_json(d / "model_meta.json", default=None)
-            mtime = datetime.fromtimestamp(d.stat().st_mtime).isoformat()
-            payload["archive"].append(
-                {
-                    "run_id": d.name,
-                    "mtime": mtime,
-                }
-            )
-            history_rows.append(
-                _build_model_history_row(
-                    run_id=d.name,
-                    bucket="archive",
-                    mtime_iso=mtime,
-                    summary=summary,
-                    meta=meta,
-                )
-            )
-    history_rows.sort(key=lambda x: _history_time_key(x.get("created_at")), reverse=True)
-    payload["history"] = history_rows[:200]
-    payload["history_count"] = len(history_rows)
+    registry = mgr.registry
+    if registry is None:
+        payload["error"] = "model registry unavailable"
+        return payload
+    registry.sync()
+
+    staging, _ = registry.query(bucket="staging", sort="mtime", limit=1000)
+    payload["staging"] = [{"run_id": r["run_id"], "mtime": r.get("mtime")} for r in staging]
+    archive, _ = registry.query(bucket="archive", sort="mtime", limit=120)
+    payload["archive"] = [{"run_id": r["run_id"], "mtime": r.get("mtime")} for r in archive]
+
+    history, total = registry.query(
+        bucket=bucket,
+        sort=sort,
+        descending=str(order).lower() != "asc",
+        limit=limit,
+        offset=offset,
+    )
+    payload["history"] = history
+    payload["history_count"] = total
     return payload
 
 
+def _models_query_args(query: str):
+    params = parse_qs(query or "")
+
+    def _one(key, default=None):
+        values = params.get(key)
+        return values[0] if values else default
+
+    args = {}
+    if _one("bucket"):
+        args["bucket"] = _one("bucket")
+    if _one("sort"):
+        args["sort"] = _one("sort")
+    if _one("order"):
+        args["order"] = _one("order")
+    for key, cap in (("limit", 1000), ("offset", None)):
+        try:
+            value = int(_one(key))
+        except (TypeError, ValueError):
+            continue
+        args[key] = min(max(0, value), cap) if cap else max(0, value)
+    return args
+
+
 def _normalize_symbol(sym: str):
     if sym is None:
         return ""
@@ -4269,8 +4242,8 @@ def compute_watchlist():
     settings = load_settings()
     cfg = load_user_config()
     params = config_to_params(cfg)
-    raw_dfs = _load_data_map()
-    if not raw_dfs:
+    symbol_dfs = WATCH_ENGINE.refresh(params)
+    if not symbol_dfs:
         return []
 
     def _fnum(value, default=0.0):
@@ -4284,7 +4257,6 @@ def compute_watchlist():
         except Exception:
             return float(default)
 
-    symbol_dfs = _prepare_symbol_dfs(raw_dfs, params)
     candidates = []
 
     exchange_filter = (settings.get("exchange") or "").upper()
@@ -4412,7 +4384,7 @@ def compute_watchlist():
 
 
 def watchlist_scheduler():
-    notifier = TelegramNotifier()
+    notifier = _shared_notifier()
     while True:
         try:
             settings = load_settings()
@@ -4521,7 +4493,7 @@ def _normalize_order_row(row: dict) -> dict:
 # Endpoint markers for tests/smoke checks: "_notify_openclaw_emergency", "_cancel_open_orders"
 def _notify_openclaw_emergency(message: str, exchange: str = "SYSTEM"):
     try:
-        notifier = TelegramNotifier()
+        notifier = _shared_notifier()
         if notifier and notifier.bot_token and notifier.chat_id:
             notifier.emit_event("RISK", exchange, "PANIC TRIGGER", message, severity="CRITICAL")
             return True
@@ -4760,16 +4732,51 @@ def _execute_manual_roundtrip(controller, req: dict, state_ref: dict):
     }
 
 
-def build_status(service: BotService, state: BackendState):
+# Status sections are cached per TTL and re-read only when their files change;
+# the assembled payload itself is shared by requests within STATUS_TTL_SEC.
+STATUS_TTL_SEC = 1.0
+STATUS_COMPOSER = StatusComposer()
+STATUS_COMPOSER.section("settings", load_settings, ttl=1.0, sources=[SETTINGS_PATH])
+STATUS_COMPOSER.section("runtime", lambda: read_runtime_status(RUNTIME_STATUS_PATH) or None, ttl=0.25)
+# Snapshot + journal tail; the snapshot alone lags until the next compaction.
+STATUS_COMPOSER.section(
+    "runtime_state",
+    lambda: read_journaled_state(RUNTIME_STATE_PATH) or None,
+    ttl=0.25,
+    sources=[RUNTIME_STATE_PATH, RUNTIME_STATE_PATH.with_name(RUNTIME_STATE_PATH.name + ".journal")],
+)
+STATUS_COMPOSER.section("lock", parse_lock_info, ttl=0.5, sources=[LOCK_PATH])
+STATUS_COMPOSER.section(
+    "recent_errors",
+    lambda: _safe_tail(RESULTS_DIR / "logs" / "crash_log.txt", max_lines=20),
+    ttl=2.0,
+    sources=[RESULTS_DIR / "logs" / "crash_log.txt"],
+)
+STATUS_COMPOSER.section(
+    "labs",
+    _read_labs_files,
+    ttl=1.0,
+    sources=[LABS_STATUS_PATH, LABS_PENDING_LIVE_PATH, LABS_LAST_RESULT_PATH, LABS_LAST_BASELINE_PATH],
+)
+STATUS_COMPOSER.section("data_status", build_data_payload, ttl=1.0, sources=[DATA_STATUS_PATH])
+
+
+def build_status(service: BotService, state: BackendState, max_age=None):
+    """Status payload; concurrent callers within STATUS_TTL_SEC share one build (max_age=0 forces one)."""
+    section = STATUS_COMPOSER.memo("status", lambda: _assemble_status(service, state), ttl=STATUS_TTL_SEC)
+    return section.get(max_age=max_age)
+
+
+def _assemble_status(service: BotService, state: BackendState):
     now = time.time()
-    current_settings = load_settings()
-    runtime = _safe_read_json(RUNTIME_STATUS_PATH, default=None)
-    runtime_state = _safe_read_json(RUNTIME_STATE_PATH, default=None)
+    current_settings = STATUS_COMPOSER.get("settings")
+    runtime = STATUS_COMPOSER.get("runtime")
+    runtime_state = STATUS_COMPOSER.get("runtime_state")
     runtime_age = None
     if runtime and "ts" in runtime:
         runtime_age = max(0.0, now - float(runtime["ts"]))
 
-    lock_info = parse_lock_info()
+    lock_info = STATUS_COMPOSER.get("lock")
     controller_running = service.is_running()
     controller_owner = "web_backend" if controller_running else ("external" if lock_info["exists"] else "none")
     controller_mode = None
@@ -4786,7 +4793,7 @@ def build_status(service: BotService, state: BackendState):
         "last_heartbeat": state.last_heartbeat,
     }
 
-    recent_errors = _safe_tail(RESULTS_DIR / "logs" / "crash_log.txt", max_lines=20)
+    recent_errors = STATUS_COMPOSER.get("recent_errors")
 
     max_score = 0.0
     if WATCH_CACHE.get("list"):
@@ -4875,9 +4882,9 @@ def build_status(service: BotService, state: BackendState):
         "lock": lock_info,
         "last_error": service.last_error,
         "health": HEALTH_CACHE.get("data"),
-        "labs": build_labs_payload(),
+        "labs": build_labs_payload(cached=True),
         "recent_errors": recent_errors,
-        "data_status": build_data_payload(),
+        "data_status": STATUS_COMPOSER.get("data_status"),
         "manual_roundtrip": service.get_manual_roundtrip_status() if hasattr(service, "get_manual_roundtrip_status") else None,
         "watchlist_ranked": WATCH_CACHE.get("list", []),
         "watchlist_score_max": max_score
@@ -4887,7 +4894,11 @@ def build_status(service: BotService, state: BackendState):
 
 def heartbeat_loop(state: BackendState, service: BotService):
     while True:
-        payload = build_status(service, state)
+        payload = build_status(service, state, max_age=0)
+        try:
+            STATUS_STREAM.publish(payload)
+        except Exception:
+            pass
         _safe_write_json(BACKEND_STATUS_PATH, {
             "ts": payload["backend"]["last_heartbeat"],
             "pid": payload["backend"]["pid"],
@@ -4916,6 +4927,9 @@ def main():
     Handler.service = service
     Handler.state = state
 
+    # Restore queue records before the schedulers submit anything.
+    JOB_QUEUE.load()
+
     t = threading.Thread(target=heartbeat_loop, args=(state, service), daemon=True)
     t.start()
 
@@ -4938,7 +4952,10 @@ def main():
     port = 8765
     server = ThreadingHTTPServer((host, port), Handler)
     print(f"[WebBackend] Serving on http://{host}:{port}")
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    finally:
+        _close_shared_notifier()
 
 
 if __name__ == "__main__":